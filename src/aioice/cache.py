@@ -0,0 +1,184 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+import ifaddr
+
+logger = logging.getLogger(__name__)
+
+# seconds for which the host addresses are trusted before being enumerated again
+INTERFACES_TTL = 30.0
+
+# seconds for which a DNS answer is trusted, the system resolver gives no TTL
+RESOLVE_TTL = 300.0
+
+# seconds for which a server-reflexive mapping is trusted, well below the
+# binding timeouts of NATs
+MAPPING_TTL = 30.0
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_caches = threading.local()
+
+
+class TtlCache(Generic[K, V]):
+    """
+    Values fetched by coroutines, which are kept for `ttl` seconds.
+
+    Concurrent lookups of a missing key share a single fetch, and failed
+    fetches are not cached.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+        self.__entries: dict[K, tuple[float, V]] = {}
+        self.__pending: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    async def get(self, key: K, fetch: Callable[[], Awaitable[V]]) -> V:
+        loop = asyncio.get_running_loop()
+        entry = self.__entries.get(key)
+        if entry is not None and entry[0] > loop.time():
+            return entry[1]
+
+        future = self.__pending.get(key)
+        if future is None:
+            future = self.__pending[key] = asyncio.ensure_future(
+                self.__fetch(key, fetch)
+            )
+        return await asyncio.shield(future)
+
+    async def __fetch(self, key: K, fetch: Callable[[], Awaitable[V]]) -> V:
+        try:
+            value = await fetch()
+            self.__entries[key] = (asyncio.get_running_loop().time() + self.ttl, value)
+            return value
+        finally:
+            del self.__pending[key]
+
+
+class InterfaceCache:
+    """
+    The addresses of the host interfaces, which are enumerated again once
+    they are older than :data:`INTERFACES_TTL`.
+
+    Each change of the addresses increments :attr:`generation`.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+
+        self.__addresses: list[tuple[str, int]] = []
+        self.__expires = 0.0
+        self.__lock = threading.Lock()
+
+    def get(self, use_ipv4: bool, use_ipv6: bool) -> list[str]:
+        with self.__lock:
+            now = time.monotonic()
+            if now >= self.__expires:
+                addresses = enumerate_addresses()
+                if addresses != self.__addresses:
+                    if self.generation:
+                        logger.info("Host addresses changed to %s", addresses)
+                    self.__addresses = addresses
+                    self.generation += 1
+                self.__expires = now + INTERFACES_TTL
+            addresses = self.__addresses
+
+        return [
+            address
+            for address, version in addresses
+            if (version == 4 and use_ipv4) or (version == 6 and use_ipv6)
+        ]
+
+    def invalidate(self) -> None:
+        """
+        Enumerate the addresses again on the next lookup.
+        """
+        with self.__lock:
+            self.__expires = 0.0
+
+
+def enumerate_addresses() -> list[tuple[str, int]]:
+    """
+    Enumerate the addresses of the host interfaces, along with their IP version.
+    """
+    addresses = []
+    for adapter in ifaddr.get_adapters():
+        for ip in adapter.ips:
+            if isinstance(ip.ip, str):
+                if ip.ip != "127.0.0.1":
+                    addresses.append((ip.ip, 4))
+            elif ip.ip[0] != "::1" and ip.ip[2] == 0:
+                addresses.append((ip.ip[0], 6))
+    return addresses
+
+
+def get_mapping_cache() -> TtlCache[tuple[str, int, str, int], tuple[str, int]]:
+    """
+    Return the server-reflexive mappings of the running event loop, keyed by
+    local address and STUN server.
+
+    The mappings are dropped whenever the host addresses change.
+    """
+    caches = get_loop_caches()
+    if caches.mappings_generation != interfaces.generation:
+        caches.mappings.clear()
+        caches.mappings_generation = interfaces.generation
+    return caches.mappings
+
+
+def get_loop_caches() -> threading.local:
+    loop = asyncio.get_running_loop()
+    if getattr(_caches, "loop", None) is not loop:
+        _caches.loop = loop
+        _caches.mappings = TtlCache(MAPPING_TTL)
+        _caches.mappings_generation = interfaces.generation
+        _caches.resolved = TtlCache(RESOLVE_TTL)
+    return _caches
+
+
+async def resolve_host(host: str, family: int = socket.AF_INET) -> str:
+    """
+    Resolve a host name to an address, which is cached for
+    :data:`RESOLVE_TTL` seconds.
+    """
+    return (await resolve_host_addresses(host, family=family))[0]
+
+
+async def resolve_host_addresses(host: str, family: int = socket.AF_INET) -> list[str]:
+    """
+    Resolve a host name to all its addresses, in the order given by the
+    resolver, which are cached for :data:`RESOLVE_TTL` seconds.
+    """
+    try:
+        ipaddress.ip_address(host)
+        return [host]
+    except ValueError:
+        pass
+
+    loop = asyncio.get_running_loop()
+    resolved: TtlCache[tuple[str, int], list[str]] = get_loop_caches().resolved
+
+    async def fetch() -> list[str]:
+        infos = await loop.getaddrinfo(
+            host, None, family=family, type=socket.SOCK_DGRAM
+        )
+        return list(dict.fromkeys(str(info[4][0]) for info in infos))
+
+    return list(await resolved.get((host, family), fetch))
+
+
+interfaces = InterfaceCache()
@@ -7,11 +7,14 @@ Key modifications:
 """
 
 import asyncio
+import collections
 import copy
 import enum
+import heapq
 import ipaddress
 import itertools
 import logging
+import math
 import random
 import re
 import secrets
@@ -20,10 +23,11 @@ import threading
 from collections.abc import Callable
 from typing import Optional, Union, cast
 
-import ifaddr
-
 from . import mdns, stun, turn
+from .cache import get_mapping_cache, interfaces, resolve_host
 from .candidate import Candidate, candidate_foundation, candidate_priority
+from .mux import UdpMux
+from .scheduler import Timer, get_timer_wheel
 from .utils import random_string
 
 logger = logging.getLogger(__name__)
@@ -31,6 +35,9 @@ logger = logging.getLogger(__name__)
 ICE_COMPLETED = 1
 ICE_FAILED = 2
 
+# the pacing of the ordinary checks (Ta)
+CHECK_INTERVAL = 0.02
+
 CONSENT_FAILURES = 60  # Increased from 6 to 60 (5 minutes of failures)
 CONSENT_INTERVAL = 5
 
@@ -38,6 +45,8 @@ connection_id = itertools.count()
 protocol_id = itertools.count()
 
 _mdns = threading.local()
+_turn_muxes = threading.local()
+_udp_muxes = threading.local()
 
 
 class TransportPolicy(enum.Enum):
@@ -75,6 +84,75 @@ async def unref_mdns_protocol(subscriber: object) -> None:
                 _mdns.protocol = None
 
 
+async def get_or_create_udp_mux(
+    address: str, port: int, sockets: int, subscriber: object
+) -> UdpMux:
+    loop = asyncio.get_running_loop()
+    if getattr(_udp_muxes, "loop", None) is not loop:
+        # the sockets of another event loop cannot be shared
+        _udp_muxes.loop = loop
+        _udp_muxes.lock = asyncio.Lock()
+        _udp_muxes.muxes = {}
+        _udp_muxes.subscribers = {}
+    async with _udp_muxes.lock:
+        key = (address, port)
+        if key not in _udp_muxes.muxes:
+            mux = UdpMux(address, port, sockets=sockets)
+            await mux.open(rcvbuf=turn.UDP_SOCKET_BUFFER_SIZE)
+            _udp_muxes.muxes[key] = mux
+            _udp_muxes.subscribers[key] = set()
+        _udp_muxes.subscribers[key].add(subscriber)
+    return _udp_muxes.muxes[key]
+
+
+async def unref_udp_muxes(subscriber: object) -> None:
+    if getattr(_udp_muxes, "loop", None) is asyncio.get_running_loop():
+        async with _udp_muxes.lock:
+            for key, subscribers in list(_udp_muxes.subscribers.items()):
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    await _udp_muxes.muxes.pop(key).close()
+                    del _udp_muxes.subscribers[key]
+
+
+async def get_or_create_turn_mux(
+    server_addr: tuple[str, int],
+    username: Optional[str],
+    password: Optional[str],
+    ssl: bool,
+    transport: str,
+    subscriber: object,
+) -> turn.TurnMux:
+    loop = asyncio.get_running_loop()
+    if getattr(_turn_muxes, "loop", None) is not loop:
+        # the allocations of another event loop cannot be shared
+        _turn_muxes.loop = loop
+        _turn_muxes.lock = asyncio.Lock()
+        _turn_muxes.muxes = {}
+        _turn_muxes.subscribers = {}
+    async with _turn_muxes.lock:
+        key = (server_addr, username, password, ssl, transport)
+        if key not in _turn_muxes.muxes:
+            mux = turn.TurnMux(
+                server_addr, username, password, ssl=ssl, transport=transport
+            )
+            await mux.open()
+            _turn_muxes.muxes[key] = mux
+            _turn_muxes.subscribers[key] = set()
+        _turn_muxes.subscribers[key].add(subscriber)
+    return _turn_muxes.muxes[key]
+
+
+async def unref_turn_muxes(subscriber: object) -> None:
+    if getattr(_turn_muxes, "loop", None) is asyncio.get_running_loop():
+        async with _turn_muxes.lock:
+            for key, subscribers in list(_turn_muxes.subscribers.items()):
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    await _turn_muxes.muxes.pop(key).close()
+                    del _turn_muxes.subscribers[key]
+
+
 def candidate_pair_priority(
     local: Candidate, remote: Candidate, ice_controlling: bool
 ) -> int:
@@ -88,16 +166,10 @@ def candidate_pair_priority(
 
 def get_host_addresses(use_ipv4: bool, use_ipv6: bool) -> list[str]:
     """
-    Get local IP addresses.
+    Get local IP addresses, which are enumerated again once they are older
+    than :data:`aioice.cache.INTERFACES_TTL`.
     """
-    addresses = []
-    for adapter in ifaddr.get_adapters():
-        for ip in adapter.ips:
-            if isinstance(ip.ip, str) and use_ipv4 and ip.ip != "127.0.0.1":
-                addresses.append(ip.ip)
-            elif use_ipv6 and ip.ip[0] != "::1" and ip.ip[2] == 0:
-                addresses.append(ip.ip[0])
-    return addresses
+    return interfaces.get(use_ipv4=use_ipv4, use_ipv6=use_ipv6)
 
 
 async def relayed_candidate(
@@ -108,19 +180,37 @@ async def relayed_candidate(
     turn_password: Optional[str],
     turn_ssl: bool,
     turn_transport: str,
+    shared_by: Optional["Connection"] = None,
 ) -> tuple[Candidate, "StunProtocol"]:
     """
     Connect to a TURN server to obtain a relayed candidate.
+
+    If `shared_by` is set, the allocation is shared with the other connections
+    using the same TURN server and credentials.
     """
-    # Connect to TURN server.
-    _, protocol = await turn.create_turn_endpoint(
-        protocol_factory,
-        server_addr=turn_server,
-        username=turn_username,
-        password=turn_password,
-        ssl=turn_ssl,
-        transport=turn_transport,
-    )
+    if shared_by is not None:
+        mux = await get_or_create_turn_mux(
+            turn_server,
+            turn_username,
+            turn_password,
+            ssl=turn_ssl,
+            transport=turn_transport,
+            subscriber=shared_by,
+        )
+        _, mux_protocol = mux.create_transport(
+            protocol_factory, shared_by.local_username
+        )
+        protocol = cast(StunProtocol, mux_protocol)
+    else:
+        # Connect to TURN server.
+        _, protocol = await turn.create_turn_endpoint(
+            protocol_factory,
+            server_addr=turn_server,
+            username=turn_username,
+            password=turn_password,
+            ssl=turn_ssl,
+            transport=turn_transport,
+        )
 
     # Build relayed candidate.
     candidate_address = protocol.transport.get_extra_info("sockname")
@@ -144,28 +234,33 @@ async def server_reflexive_candidate(
 ) -> tuple[Candidate, None]:
     """
     Query STUN server to obtain a server-reflexive candidate.
+
+    The mapping of a local address is shared with the connections using the
+    same address, for instance on a shared UDP port.
     """
     # lookup address
-    loop = asyncio.get_event_loop()
-    stun_server = (
-        await loop.run_in_executor(None, socket.gethostbyname, stun_server[0]),
-        stun_server[1],
-    )
+    stun_server = (await resolve_host(stun_server[0]), stun_server[1])
 
-    # perform STUN query
-    request = stun.Message(
-        message_method=stun.Method.BINDING, message_class=stun.Class.REQUEST
-    )
-    response, _ = await protocol.request(request, stun_server)
+    async def query() -> tuple[str, int]:
+        request = stun.Message(
+            message_method=stun.Method.BINDING, message_class=stun.Class.REQUEST
+        )
+        response, _ = await protocol.request(request, stun_server)
+        return response.attributes["XOR-MAPPED-ADDRESS"]
 
+    # perform STUN query, unless the mapping is fresh
     local_candidate = protocol.local_candidate
+    mapped_address = await get_mapping_cache().get(
+        (local_candidate.host, local_candidate.port) + stun_server, query
+    )
+
     return Candidate(
         foundation=candidate_foundation("srflx", "udp", local_candidate.host),
         component=local_candidate.component,
         transport=local_candidate.transport,
         priority=candidate_priority(local_candidate.component, "srflx"),
-        host=response.attributes["XOR-MAPPED-ADDRESS"][0],
-        port=response.attributes["XOR-MAPPED-ADDRESS"][1],
+        host=mapped_address[0],
+        port=mapped_address[1],
         type="srflx",
         related_address=local_candidate.host,
         related_port=local_candidate.port,
@@ -221,6 +316,7 @@ class CandidatePair:
         self.nominated = False
         self.protocol = protocol
         self.remote_candidate = remote_candidate
+        self.order = 0
         self.remote_nominated = False
         self.state = CandidatePair.State.FROZEN
 
@@ -327,6 +423,10 @@ class StunProtocol(asyncio.DatagramProtocol):
     async def send_data(self, data: bytes, addr: tuple[str, int]) -> None:
         self.transport.sendto(data, addr)
 
+    def send_data_batch(self, datas: list[bytes], addr: tuple[str, int]) -> None:
+        for data in datas:
+            self.transport.sendto(data, addr)
+
     def send_stun(self, message: stun.Message, addr: tuple[str, int]) -> None:
         """
         Send a STUN message.
@@ -361,6 +461,11 @@ class Connection:
     :param turn_password: The password for the TURN server.
     :param turn_ssl: Whether to use TLS for the TURN server.
     :param turn_transport: The transport for TURN server, `"udp"` or `"tcp"`.
+    :param turn_shared: Whether the TURN allocation is shared with the other
+                        connections using the same TURN server and
+                        credentials, instead of an allocation per connection.
+                        Like a shared UDP port, this requires a single
+                        component and distinct local usernames.
     :param use_ipv4: Whether to use IPv4 candidates.
     :param use_ipv6: Whether to use IPv6 candidates.
     :param transport_policy: Transport policy.
@@ -368,6 +473,13 @@ class Connection:
                            will be generated.
     :param local_password: An optional local password, otherwise a random one
                            will be generated.
+    :param udp_port: An optional UDP port, shared by all the connections which
+                     use it, instead of a port per connection. Datagrams are
+                     routed to the connections by ICE username then by remote
+                     address, so the connections must have a single component
+                     and distinct local usernames.
+    :param udp_sockets: The number of sockets bound to the shared UDP port,
+                        for instance one per core.
     """
 
     def __init__(
@@ -380,16 +492,22 @@ class Connection:
         turn_password: Optional[str] = None,
         turn_ssl: bool = False,
         turn_transport: str = "udp",
+        turn_shared: bool = False,
         use_ipv4: bool = True,
         use_ipv6: bool = True,
         transport_policy: TransportPolicy = TransportPolicy.ALL,
         local_username: Optional[str] = None,
         local_password: Optional[str] = None,
+        udp_port: Optional[int] = None,
+        udp_sockets: int = 1,
     ) -> None:
         self.ice_controlling = ice_controlling
 
         if local_username is None:
-            local_username = random_string(4)
+            # a shared port or allocation needs usernames which do not collide
+            local_username = random_string(
+                4 if udp_port is None and not turn_shared else 8
+            )
         else:
             validate_username(local_username)
 
@@ -411,6 +529,7 @@ class Connection:
         self.turn_password = turn_password
         self.turn_ssl = turn_ssl
         self.turn_transport = turn_transport
+        self.turn_shared = turn_shared
 
         # private
         self._closed = False
@@ -418,6 +537,18 @@ class Connection:
         self._check_list: list[CandidatePair] = []
         self._check_list_done = False
         self._check_list_state: asyncio.Queue = asyncio.Queue()
+        self._check_last = -math.inf
+        self._check_pacing: Optional[asyncio.Future[None]] = None
+        self._check_queues: dict[
+            CandidatePair.State, list[tuple[int, int, int, CandidatePair]]
+        ] = {CandidatePair.State.WAITING: [], CandidatePair.State.FROZEN: []}
+        self._check_queued = itertools.count()
+        self._check_states: collections.Counter[CandidatePair.State] = (
+            collections.Counter()
+        )
+        self._check_timer: Optional[Timer] = None
+        self._consent_failures = 0
+        self._consent_timer: Optional[Timer] = None
         self._early_checks: list[
             tuple[stun.Message, tuple[str, int], StunProtocol]
         ] = []
@@ -439,6 +570,8 @@ class Connection:
             asyncio.Queue()
         )
         self._tie_breaker = secrets.randbits(64)
+        self._udp_port = udp_port
+        self._udp_sockets = udp_sockets
         self._use_ipv4 = use_ipv4
         self._use_ipv6 = use_ipv6
 
@@ -453,6 +586,11 @@ class Connection:
 
         self._transport_policy = transport_policy
 
+        if udp_port is not None and components > 1:
+            raise ValueError("A shared UDP port supports a single component.")
+        if turn_shared and components > 1:
+            raise ValueError("A shared TURN allocation supports a single component.")
+
     @property
     def local_candidates(self) -> list[Candidate]:
         """
@@ -497,6 +635,7 @@ class Connection:
         if remote_candidate is None:
             self._prune_components()
             self._remote_candidates_end = True
+            self._schedule_check()
             return
 
         # resolve mDNS candidate
@@ -532,8 +671,7 @@ class Connection:
             if protocol.local_candidate.can_pair_with(
                 remote_candidate
             ) and not self._find_pair(protocol, remote_candidate):
-                pair = CandidatePair(protocol, remote_candidate)
-                self._check_list.append(pair)
+                self._add_pair(CandidatePair(protocol, remote_candidate))
         self.sort_check_list()
 
     async def gather_candidates(self) -> None:
@@ -585,8 +723,7 @@ class Connection:
                 if protocol.local_candidate.can_pair_with(
                     remote_candidate
                 ) and not self._find_pair(protocol, remote_candidate):
-                    pair = CandidatePair(protocol, remote_candidate)
-                    self._check_list.append(pair)
+                    self._add_pair(CandidatePair(protocol, remote_candidate))
         self.sort_check_list()
 
         self._unfreeze_initial()
@@ -597,11 +734,10 @@ class Connection:
         self._early_checks = []
         self._early_checks_done = True
 
-        # perform checks
-        while True:
-            if not self.check_periodic():
-                break
-            await asyncio.sleep(0.02)
+        # perform checks, paced by the timer wheel
+        self._check_pacing = asyncio.get_running_loop().create_future()
+        self._check_tick()
+        await self._check_pacing
 
         # wait for completion
         if self._check_list:
@@ -620,13 +756,16 @@ class Connection:
         # start consent freshness tests
         # Note: CONSENT_FAILURES increased to 60 to prevent premature connection closure
         # in high RTT/high error network conditions
-        self._query_consent_task = asyncio.create_task(self.query_consent())
+        self._schedule_consent()
 
     async def close(self) -> None:
         """
         Close the connection.
         """
         # stop consent freshness tests
+        if self._consent_timer is not None:
+            self._consent_timer.cancel()
+            self._consent_timer = None
         if self._query_consent_task and not self._query_consent_task.done():
             self._query_consent_task.cancel()
             try:
@@ -637,6 +776,7 @@ class Connection:
         # stop check list
         if self._check_list and not self._check_list_done:
             self._check_list_state.put_nowait(ICE_FAILED)
+        self._stop_checks()
 
         # unreference mDNS
         await unref_mdns_protocol(self)
@@ -647,6 +787,10 @@ class Connection:
         self._protocols.clear()
         self._local_candidates.clear()
 
+        # unreference shared UDP ports and TURN allocations
+        await unref_udp_muxes(self)
+        await unref_turn_muxes(self)
+
         # emit event
         if not self._closed:
             self._emit_event(ConnectionClosed())
@@ -695,6 +839,29 @@ class Connection:
             raise ConnectionError("Connection lost while receiving data")
         return result
 
+    async def recv_batch(self) -> list[bytes]:
+        """
+        Receive all the datagrams which are queued, waiting for at least one.
+
+        If the connection is not established, a `ConnectionError` is raised.
+        """
+        if not len(self._nominated):
+            raise ConnectionError("Cannot receive data, not connected")
+
+        data, component = await self._queue.get()
+        if data is None:
+            raise ConnectionError("Connection lost while receiving data")
+
+        datas = [data]
+        while not self._queue.empty():
+            data, component = self._queue.get_nowait()
+            if data is None:
+                # report the lost connection on the next call
+                self._queue.put_nowait((None, None))
+                break
+            datas.append(data)
+        return datas
+
     async def send(self, data: bytes) -> None:
         """
         Send a datagram on the first component.
@@ -720,6 +887,20 @@ class Connection:
         else:
             raise ConnectionError("Cannot send data, not connected")
 
+    async def send_batch(self, datas: list[bytes]) -> None:
+        """
+        Send several datagrams on the first component.
+
+        If the connection is not established, a `ConnectionError` is raised.
+
+        :param datas: The data to be sent.
+        """
+        active_pair = self._nominated.get(1)
+        if active_pair:
+            active_pair.protocol.send_data_batch(datas, active_pair.remote_addr)
+        else:
+            raise ConnectionError("Cannot send data, not connected")
+
     def set_selected_pair(
         self, component: int, local_foundation: str, remote_foundation: str
     ) -> None:
@@ -792,6 +973,7 @@ class Connection:
                     self.__log_info("ICE completed")
                     self._check_list_state.put_nowait(ICE_COMPLETED)
                     self._check_list_done = True
+                    self._schedule_check()
                 return
 
             # 7.1.3.2.3.  Updating Pair States
@@ -802,22 +984,24 @@ class Connection:
                 ):
                     self.check_state(p, CandidatePair.State.WAITING)
 
-        for p in self._check_list:
-            if p.state not in [
-                CandidatePair.State.SUCCEEDED,
-                CandidatePair.State.FAILED,
-            ]:
-                return
+        if (
+            self._check_states[CandidatePair.State.FROZEN]
+            or self._check_states[CandidatePair.State.WAITING]
+            or self._check_states[CandidatePair.State.IN_PROGRESS]
+        ):
+            return
 
-        if not self.ice_controlling:
-            for p in self._check_list:
-                if p.state == CandidatePair.State.SUCCEEDED:
-                    return
+        if (
+            not self.ice_controlling
+            and self._check_states[CandidatePair.State.SUCCEEDED]
+        ):
+            return
 
         if not self._check_list_done:
             self.__log_info("ICE failed")
             self._check_list_state.put_nowait(ICE_FAILED)
             self._check_list_done = True
+            self._schedule_check()
 
     def check_incoming(
         self, message: stun.Message, addr: tuple[str, int], protocol: StunProtocol
@@ -853,7 +1037,7 @@ class Connection:
         if pair is None:
             pair = CandidatePair(protocol, remote_candidate)
             pair.state = CandidatePair.State.WAITING
-            self._check_list.append(pair)
+            self._add_pair(pair)
             self.sort_check_list()
 
         # triggered check
@@ -869,17 +1053,8 @@ class Connection:
                 self.check_complete(pair)
 
     def check_periodic(self) -> bool:
-        # find the highest-priority pair that is in the waiting state
-        for pair in self._check_list:
-            if pair.state == CandidatePair.State.WAITING:
-                self.check_start_task(pair)
-                return True
-
-        # find the highest-priority pair that is in the frozen state
-        for pair in self._check_list:
-            if pair.state == CandidatePair.State.FROZEN:
-                self.check_start_task(pair)
-                return True
+        if self._check_next():
+            return True
 
         # if we expect more candidates, keep going
         if not self._remote_candidates_end:
@@ -960,7 +1135,10 @@ class Connection:
         Updates the state of a check.
         """
         self.__log_info("Check %s %s -> %s", pair, pair.state, state)
+        self._check_states[pair.state] -= 1
+        self._check_states[state] += 1
         pair.state = state
+        self._queue_pair(pair)
 
     def _emit_event(self, event: ConnectionEvent) -> None:
         if self._event_waiter is not None:
@@ -990,9 +1168,19 @@ class Connection:
         for address in addresses:
             # create transport
             try:
-                transport, protocol = await loop.create_datagram_endpoint(
-                    lambda: StunProtocol(self), local_addr=(address, 0)
-                )
+                transport: asyncio.DatagramTransport
+                if self._udp_port is not None:
+                    mux = await get_or_create_udp_mux(
+                        address, self._udp_port, self._udp_sockets, self
+                    )
+                    transport, mux_protocol = mux.create_transport(
+                        lambda: StunProtocol(self), self.local_username
+                    )
+                    protocol = cast(StunProtocol, mux_protocol)
+                else:
+                    transport, protocol = await loop.create_datagram_endpoint(
+                        lambda: StunProtocol(self), local_addr=(address, 0)
+                    )
                 sock = transport.get_extra_info("socket")
                 if sock is not None:
                     sock.setsockopt(
@@ -1042,6 +1230,7 @@ class Connection:
                         turn_password=self.turn_password,
                         turn_ssl=self.turn_ssl,
                         turn_transport=self.turn_transport,
+                        shared_by=self if self.turn_shared else None,
                     )
                 )
             )
@@ -1076,29 +1265,27 @@ class Connection:
 
     async def query_consent(self) -> None:
         """
-        Periodically check consent (RFC 7675).
+        Check consent (RFC 7675), then schedule the next check.
         """
-        failures = 0
-        while True:
-            # randomize between 0.8 and 1.2 times CONSENT_INTERVAL
-            await asyncio.sleep(CONSENT_INTERVAL * (0.8 + 0.4 * random.random()))
-
-            for pair in self._nominated.values():
-                request = self.build_request(pair, nominate=False)
-                try:
-                    await pair.protocol.request(
-                        request,
-                        pair.remote_addr,
-                        integrity_key=self.remote_password.encode("utf8"),
-                        retransmissions=0,
-                    )
-                    failures = 0
-                except stun.TransactionError:
-                    failures += 1
-                if failures >= CONSENT_FAILURES:
-                    self.__log_info("Consent to send expired")
-                    self._query_consent_task = None
-                    return await self.close()
+        for pair in list(self._nominated.values()):
+            request = self.build_request(pair, nominate=False)
+            try:
+                await pair.protocol.request(
+                    request,
+                    pair.remote_addr,
+                    integrity_key=self.remote_password.encode("utf8"),
+                    retransmissions=0,
+                )
+                self._consent_failures = 0
+            except stun.TransactionError:
+                self._consent_failures += 1
+            if self._consent_failures >= CONSENT_FAILURES:
+                self.__log_info("Consent to send expired")
+                self._query_consent_task = None
+                return await self.close()
+
+        self._query_consent_task = None
+        self._schedule_consent()
 
     def data_received(self, data: Optional[bytes], component: Optional[int]) -> None:
         self._queue.put_nowait((data, component))
@@ -1182,6 +1369,94 @@ class Connection:
         self.ice_controlling = ice_controlling
         self.sort_check_list()
 
+        # the pair priorities depend on the role
+        for queue in self._check_queues.values():
+            queue.clear()
+        for pair in self._check_list:
+            self._queue_pair(pair)
+
+    def _add_pair(self, pair: CandidatePair) -> None:
+        pair.order = len(self._check_list)
+        self._check_list.append(pair)
+        self._check_states[pair.state] += 1
+        self._queue_pair(pair)
+
+        # bind the TURN channel ahead of the check, to spare it a round-trip
+        transport = pair.protocol.transport
+        if isinstance(transport, (turn.TurnTransport, turn.TurnMuxTransport)):
+            transport.bind_channel(pair.remote_addr)
+
+    def _check_next(self) -> bool:
+        """
+        Start the check of the highest-priority waiting pair, otherwise of the
+        highest-priority frozen pair.
+        """
+        for state, queue in self._check_queues.items():
+            while queue:
+                pair = heapq.heappop(queue)[-1]
+                if pair.state == state and pair.task is None:
+                    self.check_start_task(pair)
+                    return True
+        return False
+
+    def _check_tick(self) -> None:
+        self._check_timer = None
+        if self._check_next():
+            self._check_last = asyncio.get_running_loop().time()
+            self._schedule_check()
+        elif self._remote_candidates_end or self._check_list_done:
+            self._stop_checks()
+
+    def _queue_pair(self, pair: CandidatePair) -> None:
+        """
+        Queue a frozen or waiting pair for an ordinary check.
+        """
+        queue = self._check_queues.get(pair.state)
+        if queue is not None:
+            priority = candidate_pair_priority(
+                pair.local_candidate, pair.remote_candidate, self.ice_controlling
+            )
+            heapq.heappush(
+                queue, (-priority, pair.order, next(self._check_queued), pair)
+            )
+            self._schedule_check()
+
+    def _schedule_check(self) -> None:
+        """
+        Schedule the next ordinary check, unless one is scheduled already.
+
+        Without pairs to check, the checks wait for new pairs, the
+        end-of-candidates or the completion of the check list.
+        """
+        if (
+            self._check_pacing is not None
+            and not self._check_pacing.done()
+            and self._check_timer is None
+        ):
+            delay = (
+                self._check_last + CHECK_INTERVAL - asyncio.get_running_loop().time()
+            )
+            self._check_timer = get_timer_wheel().call_later(
+                max(delay, 0.0), self._check_tick
+            )
+
+    def _schedule_consent(self) -> None:
+        # randomize between 0.8 and 1.2 times CONSENT_INTERVAL
+        self._consent_timer = get_timer_wheel().call_later(
+            CONSENT_INTERVAL * (0.8 + 0.4 * random.random()), self._start_consent
+        )
+
+    def _start_consent(self) -> None:
+        self._consent_timer = None
+        self._query_consent_task = asyncio.create_task(self.query_consent())
+
+    def _stop_checks(self) -> None:
+        if self._check_timer is not None:
+            self._check_timer.cancel()
+            self._check_timer = None
+        if self._check_pacing is not None and not self._check_pacing.done():
+            self._check_pacing.set_result(None)
+
     def _unfreeze_initial(self) -> None:
         # unfreeze first pair for the first component
         first_pair = None
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import socket
+from collections.abc import Callable
+from struct import pack
+from typing import Any, Optional, Union, cast
+
+from . import stun
+
+logger = logging.getLogger(__name__)
+
+STUN_COOKIE = pack("!I", stun.COOKIE)
+
+
+def is_stun(data: bytes) -> bool:
+    """
+    Return whether a datagram looks like a STUN message.
+    """
+    return len(data) >= stun.HEADER_LENGTH and data[0] < 4 and data[4:8] == STUN_COOKIE
+
+
+class UdpMuxProtocol(asyncio.DatagramProtocol):
+    def __init__(self, mux: "UdpMux") -> None:
+        self.__closed: asyncio.Future[bool] = asyncio.Future()
+        self.mux = mux
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if not self.__closed.done():
+            self.__closed.set_result(True)
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.DatagramTransport, transport)
+
+    def datagram_received(self, data: Union[bytes, str], addr: tuple) -> None:
+        self.mux._datagram_received(cast(bytes, data), (addr[0], addr[1]))
+
+    async def close(self) -> None:
+        assert self.transport is not None
+        self.transport.close()
+        await self.__closed
+
+
+class UdpMuxTransport(asyncio.DatagramTransport):
+    """
+    The transport of one ICE connection on a :class:`UdpMux`.
+    """
+
+    def __init__(
+        self,
+        mux: "UdpMux",
+        protocol: asyncio.DatagramProtocol,
+        username: str,
+        extra: Optional[dict[str, Any]] = None,
+    ) -> None:
+        super().__init__({"sockname": mux.local_addr} if extra is None else extra)
+        self.mux = mux
+        self.protocol = protocol
+        self.username = username
+
+        self.__closing = False
+
+    def abort(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.__closing:
+            return
+        self.__closing = True
+        self.mux._unregister(self)
+        asyncio.get_event_loop().call_soon(self.protocol.connection_lost, None)
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        return self.protocol
+
+    def has_transaction(self, transaction_id: bytes) -> bool:
+        """
+        Return whether the protocol awaits the response to a STUN request.
+        """
+        return transaction_id in getattr(self.protocol, "transactions", {})
+
+    def is_closing(self) -> bool:
+        return self.__closing
+
+    def sendto(self, data: Any, addr: Any = None) -> None:
+        if not self.__closing:
+            self.mux._sendto(self, data, (addr[0], addr[1]))
+
+
+class UdpMux:
+    """
+    A UDP port on a local address, shared by several ICE connections.
+
+    STUN binding requests are routed to the connection whose local username
+    fragment starts their USERNAME attribute, and the other datagrams to the
+    connection which last exchanged datagrams with their source address, so a
+    remote address can only reach one connection at a time.
+
+    :param sockets: The number of sockets bound to the port with
+                    `SO_REUSEPORT`, between which the kernel spreads the
+                    remote addresses.
+    """
+
+    transport_class: type[UdpMuxTransport] = UdpMuxTransport
+
+    def __init__(self, address: str, port: int = 0, sockets: int = 1) -> None:
+        self.local_addr = (address, port)
+
+        self.__by_addr: dict[tuple[str, int], UdpMuxTransport] = {}
+        self.__by_username: dict[str, UdpMuxTransport] = {}
+        self.__protocols: list[UdpMuxProtocol] = []
+        self.__sockets = sockets
+
+    def __len__(self) -> int:
+        return len(self.__by_username)
+
+    async def close(self) -> None:
+        """
+        Close the sockets, along with the transports still using them.
+        """
+        for transport in list(self.__by_username.values()):
+            transport.close()
+        for protocol in self.__protocols:
+            await protocol.close()
+        self.__protocols.clear()
+
+    def create_transport(
+        self,
+        protocol_factory: Callable[[], asyncio.DatagramProtocol],
+        username: str,
+    ) -> tuple[UdpMuxTransport, asyncio.DatagramProtocol]:
+        """
+        Create the transport of the ICE connection whose local username
+        fragment is `username`.
+        """
+        if username in self.__by_username:
+            raise OSError("ICE username %s already uses %s" % (username, self))
+
+        protocol = protocol_factory()
+        transport = self.transport_class(self, protocol, username)
+        self.__by_username[username] = transport
+        protocol.connection_made(transport)
+        return transport, protocol
+
+    async def open(self, rcvbuf: Optional[int] = None) -> None:
+        """
+        Bind the sockets.
+        """
+        loop = asyncio.get_event_loop()
+        for i in range(self.__sockets):
+            sock = socket.socket(
+                socket.AF_INET6 if ":" in self.local_addr[0] else socket.AF_INET,
+                socket.SOCK_DGRAM,
+            )
+            try:
+                if self.__sockets > 1:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                if rcvbuf is not None:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+                sock.bind(self.local_addr)
+            except OSError:
+                sock.close()
+                await self.close()
+                raise
+            self.local_addr = sock.getsockname()[:2]
+
+            _, protocol = await loop.create_datagram_endpoint(
+                lambda: UdpMuxProtocol(self), sock=sock
+            )
+            self.__protocols.append(protocol)
+
+    def _datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        transport = self.__by_addr.get(addr)
+
+        if is_stun(data):
+            try:
+                message = stun.parse_message(data)
+            except ValueError:
+                return
+
+            if message.message_class == stun.Class.REQUEST:
+                # the request may come from a new session reusing the address
+                username = message.attributes.get("USERNAME", "").split(":")[0]
+                transport = self.__by_username.get(username)
+                if transport is None:
+                    logger.debug("%s no connection for username %s", self, username)
+                    return
+                self.__by_addr[addr] = transport
+            elif transport is None or not transport.has_transaction(
+                message.transaction_id
+            ):
+                # several connections may query the same STUN server
+                transport = next(
+                    (
+                        t
+                        for t in self.__by_username.values()
+                        if t.has_transaction(message.transaction_id)
+                    ),
+                    None,
+                )
+
+        if transport is not None:
+            transport.protocol.datagram_received(data, addr)
+
+    def _sendto(
+        self, transport: UdpMuxTransport, data: bytes, addr: tuple[str, int]
+    ) -> None:
+        if self.__by_addr.get(addr) is not transport:
+            self.__by_addr[addr] = transport
+        self._send(data, addr)
+
+    def _send(self, data: bytes, addr: tuple[str, int]) -> None:
+        # all the sockets share the port, any of them will do
+        self.__protocols[0].transport.sendto(data, addr)
+
+    def _unregister(self, transport: UdpMuxTransport) -> None:
+        if self.__by_username.get(transport.username) is transport:
+            del self.__by_username[transport.username]
+        for addr in [a for a, t in self.__by_addr.items() if t is transport]:
+            del self.__by_addr[addr]
+
+    def __repr__(self) -> str:
+        return "UdpMux(%s, %d)" % self.local_addr
@@ -0,0 +1,109 @@
+import asyncio
+import heapq
+import math
+import threading
+from collections.abc import Callable
+from typing import Optional
+
+# the resolution of the timers, which are coalesced within a tick
+TICK = 0.01
+
+_wheels = threading.local()
+
+
+class Timer:
+    """
+    A callback scheduled on a :class:`TimerWheel`.
+    """
+
+    def __init__(self, callback: Callable[[], None]) -> None:
+        self.callback: Optional[Callable[[], None]] = callback
+
+    def cancel(self) -> None:
+        self.callback = None
+
+    def cancelled(self) -> bool:
+        return self.callback is None
+
+
+class TimerWheel:
+    """
+    The timers of all the ICE connections of an event loop.
+
+    The timers are hashed into one slot per tick, and the event loop only
+    holds a single timer, for the next slot which is due. Idle connections
+    therefore cost nothing, and a tick only costs as much as its timers.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.__handle: Optional[asyncio.TimerHandle] = None
+        self.__handle_tick: Optional[int] = None
+        self.__loop = loop
+        self.__slots: dict[int, list[Timer]] = {}
+        self.__ticks: list[int] = []
+
+    def __len__(self) -> int:
+        return sum(
+            1
+            for timers in self.__slots.values()
+            for timer in timers
+            if not timer.cancelled()
+        )
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """
+        Run `callback` once `delay` seconds have elapsed, rounded up to the
+        next tick.
+        """
+        tick = math.ceil((self.__loop.time() + delay) / TICK)
+        timer = Timer(callback)
+        timers = self.__slots.get(tick)
+        if timers is None:
+            timers = self.__slots[tick] = []
+            heapq.heappush(self.__ticks, tick)
+        timers.append(timer)
+
+        if self.__handle_tick is None or tick < self.__handle_tick:
+            self.__arm(tick)
+        return timer
+
+    def __arm(self, tick: int) -> None:
+        if self.__handle is not None:
+            self.__handle.cancel()
+        self.__handle = self.__loop.call_at(tick * TICK, self.__run)
+        self.__handle_tick = tick
+
+    def __run(self) -> None:
+        assert self.__handle_tick is not None
+        due = max(self.__handle_tick, math.floor(self.__loop.time() / TICK))
+        self.__handle = None
+        self.__handle_tick = None
+
+        timers: list[Timer] = []
+        while self.__ticks and self.__ticks[0] <= due:
+            timers += self.__slots.pop(heapq.heappop(self.__ticks))
+        if self.__ticks:
+            self.__arm(self.__ticks[0])
+
+        for timer in timers:
+            callback = timer.callback
+            if callback is None:
+                continue
+            timer.callback = None
+            try:
+                callback()
+            except Exception as exc:
+                self.__loop.call_exception_handler(
+                    {"message": "Exception in timer callback", "exception": exc}
+                )
+
+
+def get_timer_wheel() -> TimerWheel:
+    """
+    Return the timer wheel of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if getattr(_wheels, "loop", None) is not loop:
+        _wheels.loop = loop
+        _wheels.wheel = TimerWheel(loop)
+    return _wheels.wheel
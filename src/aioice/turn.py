@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import hashlib
 import logging
 import socket
@@ -9,6 +10,8 @@ from collections.abc import Callable
 from typing import Any, Optional, TypeVar, Union, cast
 
 from . import stun
+from .cache import resolve_host_addresses
+from .mux import UdpMux, UdpMuxProtocol, UdpMuxTransport
 from .utils import random_transaction_id
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,26 @@ def make_integrity_key(username: str, realm: str, password: str) -> bytes:
     return hashlib.md5(":".join([username, realm, password]).encode("utf8")).digest()
 
 
+class TurnAllocationStats:
+    """
+    The traffic of a TURN allocation.
+
+    The `bytes_*` counters are payload relayed to or from the peers, and the
+    `overhead_*` counters are everything else exchanged with the TURN server:
+    ChannelData headers and padding, and STUN messages.
+    """
+
+    def __init__(self) -> None:
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.channels_bound = 0
+        self.created = time.monotonic()
+        self.overhead_received = 0
+        self.overhead_sent = 0
+        self.packets_received = 0
+        self.packets_sent = 0
+
+
 class TurnStreamMixin:
     datagram_received: Callable[[bytes, Any], None]
     transport: asyncio.BaseTransport
@@ -62,7 +85,7 @@ class TurnStreamMixin:
 
 
 class TurnClientMixin:
-    _send: Callable[[bytes], None]
+    _send: Callable[[bytes], int]
 
     def __init__(
         self,
@@ -73,6 +96,7 @@ class TurnClientMixin:
         channel_refresh_time: int,
     ) -> None:
         self.channel_refresh_at: dict[int, float] = {}
+        self.channel_refresh_tasks: dict[int, asyncio.Task] = {}
         self.channel_to_peer: dict[int, tuple[str, int]] = {}
         self.peer_connect_waiters: dict[
             tuple[str, int], list[asyncio.Future[None]]
@@ -90,6 +114,7 @@ class TurnClientMixin:
         self.refresh_task: Optional[asyncio.Task] = None
         self.relayed_address: Optional[tuple[str, int]] = None
         self.server = server
+        self.stats = TurnAllocationStats()
         self.transactions: dict[bytes, stun.Transaction] = {}
         self.username = username
 
@@ -100,8 +125,47 @@ class TurnClientMixin:
         request.attributes["CHANNEL-NUMBER"] = channel_number
         request.attributes["XOR-PEER-ADDRESS"] = addr
         await self.request_with_retry(request)
+        self.stats.channels_bound += 1
         logger.info("TURN channel bound %d %s", channel_number, addr)
 
+    async def bind_channel(self, addr: tuple[str, int]) -> int:
+        """
+        Bind a TURN channel to a remote host, unless one is already bound,
+        and return its number.
+        """
+        channel = self.peer_to_channel.get(addr)
+        if channel is not None:
+            return channel
+
+        # if a channel is being bound for the peer, wait
+        if addr in self.peer_connect_waiters:
+            loop = asyncio.get_event_loop()
+            waiter = loop.create_future()
+            self.peer_connect_waiters[addr].append(waiter)
+            await waiter
+            return self.peer_to_channel[addr]
+
+        self.peer_connect_waiters[addr] = []
+        channel = self.channel_number
+        self.channel_number += 1
+        try:
+            await self.channel_bind(channel, addr)
+        except Exception as exc:
+            # notify waiters
+            for waiter in self.peer_connect_waiters.pop(addr):
+                waiter.set_exception(exc)
+            raise
+
+        # update state
+        self.channel_refresh_at[channel] = time.time() + self.channel_refresh_time
+        self.channel_to_peer[channel] = addr
+        self.peer_to_channel[addr] = channel
+
+        # notify waiters
+        for waiter in self.peer_connect_waiters.pop(addr):
+            waiter.set_result(None)
+        return channel
+
     async def connect(self) -> tuple[str, int]:
         """
         Create a TURN allocation.
@@ -145,11 +209,15 @@ class TurnClientMixin:
             if len(data) >= length + 4 and self.receiver is not None:
                 peer_address = self.channel_to_peer.get(channel)
                 if peer_address:
+                    self.stats.bytes_received += length
+                    self.stats.overhead_received += len(data) - length
+                    self.stats.packets_received += 1
                     payload = data[4 : 4 + length]
                     self.receiver.datagram_received(payload, peer_address)
 
             return
 
+        self.stats.overhead_received += len(data)
         try:
             message = stun.parse_message(data)
             logger.debug("%s < %s %s", self, addr, message)
@@ -170,6 +238,8 @@ class TurnClientMixin:
         if self.refresh_task:
             self.refresh_task.cancel()
             self.refresh_task = None
+        for task in self.channel_refresh_tasks.values():
+            task.cancel()
 
         request = stun.Message(
             message_method=stun.Method.REFRESH, message_class=stun.Class.REQUEST
@@ -181,7 +251,18 @@ class TurnClientMixin:
             # we do not care, we need to shutdown
             pass
 
-        logger.info("TURN allocation deleted %s", self.relayed_address)
+        logger.info(
+            "TURN allocation deleted %s (%d seconds, sent %d packets / %d bytes "
+            "+ %d overhead, received %d packets / %d bytes + %d overhead)",
+            self.relayed_address,
+            time.monotonic() - self.stats.created,
+            self.stats.packets_sent,
+            self.stats.bytes_sent,
+            self.stats.overhead_sent,
+            self.stats.packets_received,
+            self.stats.bytes_received,
+            self.stats.overhead_received,
+        )
         self.transport.close()
 
     async def refresh(self, time_to_expiry: int) -> None:
@@ -263,47 +344,51 @@ class TurnClientMixin:
         """
         Send data to a remote host via the TURN server.
         """
-        # if a channel is being bound for the peer, wait
-        if addr in self.peer_connect_waiters:
-            loop = asyncio.get_event_loop()
-            waiter = loop.create_future()
-            self.peer_connect_waiters[addr].append(waiter)
-            await waiter
+        if not self.send_channel_data(data, addr):
+            await self.bind_channel(addr)
+            self.send_channel_data(data, addr)
 
+    def send_channel_data(self, data: bytes, addr: tuple[str, int]) -> bool:
+        """
+        Send data to a remote host as ChannelData, without waiting.
+
+        Returns `False` if no channel is bound to the remote host yet. A channel
+        which is due for a refresh keeps being used while it is refreshed in the
+        background, as its binding lasts longer than the refresh time.
+        """
         channel = self.peer_to_channel.get(addr)
-        now = time.time()
         if channel is None:
-            self.peer_connect_waiters[addr] = []
-            channel = self.channel_number
-            self.channel_number += 1
-
-            # bind channel
-            await self.channel_bind(channel, addr)
-
-            # update state
-            self.channel_refresh_at[channel] = now + self.channel_refresh_time
-            self.channel_to_peer[channel] = addr
-            self.peer_to_channel[addr] = channel
-
-            # notify waiters
-            for waiter in self.peer_connect_waiters.pop(addr):
-                waiter.set_result(None)
-        elif now > self.channel_refresh_at[channel]:
-            # refresh channel
-            await self.channel_bind(channel, addr)
+            return False
 
-            # update state
-            self.channel_refresh_at[channel] = now + self.channel_refresh_time
+        if (
+            time.time() > self.channel_refresh_at[channel]
+            and channel not in self.channel_refresh_tasks
+        ):
+            self.channel_refresh_tasks[channel] = asyncio.create_task(
+                self.__refresh_channel(channel, addr)
+            )
 
         header = struct.pack("!HH", channel, len(data))
-        self._send(header + data)
+        self.stats.bytes_sent += len(data)
+        self.stats.overhead_sent += self._send(header + data) - len(data)
+        self.stats.packets_sent += 1
+        return True
 
     def send_stun(self, message: stun.Message, addr: tuple[str, int]) -> None:
         """
         Send a STUN message to the TURN server.
         """
         logger.debug("%s > %s %s", self, addr, message)
-        self._send(bytes(message))
+        self.stats.overhead_sent += self._send(bytes(message))
+
+    async def __refresh_channel(self, channel: int, addr: tuple[str, int]) -> None:
+        try:
+            await self.channel_bind(channel, addr)
+            self.channel_refresh_at[channel] = time.time() + self.channel_refresh_time
+        except (ConnectionError, stun.TransactionError) as exc:
+            logger.warning("TURN channel %d refresh failed: %s", channel, exc)
+        finally:
+            del self.channel_refresh_tasks[channel]
 
     def __add_authentication(self, request: stun.Message) -> None:
         request.attributes["USERNAME"] = self.username
@@ -319,8 +404,10 @@ class TurnClientTcpProtocol(TurnClientMixin, TurnStreamMixin, asyncio.Protocol):
 
     transport: asyncio.Transport
 
-    def _send(self, data: bytes) -> None:
-        self.transport.write(self._padded(data))
+    def _send(self, data: bytes) -> int:
+        data = self._padded(data)
+        self.transport.write(data)
+        return len(data)
 
     def __repr__(self) -> str:
         return "turn/tcp"
@@ -333,8 +420,9 @@ class TurnClientUdpProtocol(TurnClientMixin, asyncio.DatagramProtocol):
 
     transport: asyncio.DatagramTransport
 
-    def _send(self, data: bytes) -> None:
+    def _send(self, data: bytes) -> int:
         self.transport.sendto(data)
+        return len(data)
 
     def __repr__(self) -> str:
         return "turn/udp"
@@ -352,6 +440,20 @@ class TurnTransport:
         self.__inner_protocol = inner_protocol
         self.__relayed_address: Optional[tuple[str, int]] = None
 
+    @property
+    def stats(self) -> TurnAllocationStats:
+        """
+        The traffic of the TURN allocation.
+        """
+        return self.__inner_protocol.stats
+
+    def bind_channel(self, addr: tuple[str, int]) -> None:
+        """
+        Bind a TURN channel to the remote peer given `addr` in the background,
+        so the first datagrams sent to it do not wait for the binding.
+        """
+        asyncio.create_task(self.__bind_channel(addr))
+
     def close(self) -> None:
         """
         Close the transport.
@@ -380,7 +482,14 @@ class TurnTransport:
 
         This will bind a TURN channel as necessary.
         """
-        asyncio.create_task(self.__inner_protocol.send_data(data, addr))
+        if not self.__inner_protocol.send_channel_data(data, addr):
+            asyncio.create_task(self.__inner_protocol.send_data(data, addr))
+
+    async def __bind_channel(self, addr: tuple[str, int]) -> None:
+        try:
+            await self.__inner_protocol.bind_channel(addr)
+        except (ConnectionError, stun.TransactionError) as exc:
+            logger.info("TURN channel for %s could not be bound: %s", addr, exc)
 
     async def _connect(self, protocol: asyncio.DatagramProtocol) -> None:
         self.__relayed_address = await self.__inner_protocol.connect()
@@ -403,7 +512,42 @@ async def create_turn_endpoint(
 ) -> tuple[TurnTransport, _ProtocolT]:
     """
     Create datagram connection relayed over TURN.
+
+    If the server name resolves to several addresses, they are tried in turn
+    until an allocation succeeds.
     """
+    server_host = server_addr[0]
+    addresses = await resolve_host_addresses(server_host, family=socket.AF_UNSPEC)
+    connect = functools.partial(
+        _create_turn_endpoint,
+        protocol_factory,
+        server_host=server_host,
+        username=username,
+        password=password,
+        lifetime=lifetime,
+        channel_refresh_time=channel_refresh_time,
+        ssl=ssl,
+        transport=transport,
+    )
+    for address in addresses[:-1]:
+        try:
+            return await connect((address, server_addr[1]))
+        except (OSError, stun.TransactionError) as exc:
+            logger.info("TURN server %s at %s failed: %s", server_host, address, exc)
+    return await connect((addresses[-1], server_addr[1]))
+
+
+async def _create_turn_endpoint(
+    protocol_factory: Callable[[], _ProtocolT],
+    server_addr: tuple[str, int],
+    server_host: str,
+    username: Optional[str],
+    password: Optional[str],
+    lifetime: int,
+    channel_refresh_time: int,
+    ssl: Optional[Union[bool, ssl.SSLContext]],
+    transport: str,
+) -> tuple[TurnTransport, _ProtocolT]:
     loop = asyncio.get_event_loop()
     inner_protocol: TurnClientProtocol
     inner_transport: asyncio.BaseTransport
@@ -419,6 +563,7 @@ async def create_turn_endpoint(
             host=server_addr[0],
             port=server_addr[1],
             ssl=ssl,
+            server_hostname=server_host if ssl else None,
         )
     else:
         inner_transport, inner_protocol = await loop.create_datagram_endpoint(
@@ -444,3 +589,105 @@ async def create_turn_endpoint(
         raise
 
     return turn_transport, protocol
+
+
+class TurnMuxTransport(UdpMuxTransport):
+    """
+    The transport of one ICE connection on a :class:`TurnMux`.
+    """
+
+    mux: "TurnMux"
+
+    def __init__(
+        self, mux: "TurnMux", protocol: asyncio.DatagramProtocol, username: str
+    ) -> None:
+        super().__init__(
+            mux,
+            protocol,
+            username,
+            extra={"sockname": mux.local_addr, "related_address": mux.related_addr},
+        )
+
+    def bind_channel(self, addr: tuple[str, int]) -> None:
+        """
+        Bind a TURN channel to the remote peer given `addr` in the background.
+        """
+        self.mux.bind_channel(addr)
+
+
+class TurnMux(UdpMux):
+    """
+    A TURN allocation, shared by several ICE connections using the same TURN
+    server and credentials.
+
+    The datagrams relayed by the allocation are routed to the connections in
+    the same way as those of a :class:`~aioice.mux.UdpMux`, so a remote
+    address can only reach one connection at a time.
+    """
+
+    transport_class = TurnMuxTransport
+
+    def __init__(
+        self,
+        server_addr: tuple[str, int],
+        username: Optional[str],
+        password: Optional[str],
+        ssl: Optional[Union[bool, ssl.SSLContext]] = None,
+        transport: str = "udp",
+    ) -> None:
+        super().__init__("0.0.0.0")
+        self.related_addr: Optional[tuple[str, int]] = None
+        self.server_addr = server_addr
+
+        self.__password = password
+        self.__protocol: Optional[UdpMuxProtocol] = None
+        self.__ssl = ssl
+        self.__transport = transport
+        self.__turn: Optional[TurnTransport] = None
+        self.__username = username
+
+    @property
+    def stats(self) -> TurnAllocationStats:
+        """
+        The traffic of the TURN allocation.
+        """
+        assert self.__turn is not None
+        return self.__turn.stats
+
+    def bind_channel(self, addr: tuple[str, int]) -> None:
+        """
+        Bind a TURN channel to the remote peer given `addr` in the background.
+        """
+        assert self.__turn is not None
+        self.__turn.bind_channel(addr)
+
+    async def close(self) -> None:
+        """
+        Delete the allocation, along with the transports still using it.
+        """
+        await super().close()
+        if self.__protocol is not None:
+            await self.__protocol.close()
+            self.__protocol = None
+
+    async def open(self, rcvbuf: Optional[int] = None) -> None:
+        """
+        Create the allocation.
+        """
+        self.__turn, self.__protocol = await create_turn_endpoint(
+            lambda: UdpMuxProtocol(self),
+            server_addr=self.server_addr,
+            username=self.__username,
+            password=self.__password,
+            ssl=self.__ssl,
+            transport=self.__transport,
+        )
+        self.local_addr = self.__turn.get_extra_info("sockname")
+        self.related_addr = self.__turn.get_extra_info("related_address")
+
+    def _send(self, data: bytes, addr: tuple[str, int]) -> None:
+        assert self.__turn is not None
+        self.__turn.sendto(data, addr)
+
+    def __repr__(self) -> str:
+        return "TurnMux(%s, %d)" % self.local_addr
@@ -28,6 +28,7 @@ from .rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpEncodingParameters,
     RTCRtpHeaderExtensionCapability,
     RTCRtpHeaderExtensionParameters,
     RTCRtpParameters,
@@ -83,6 +84,7 @@ __all__ = [
     "RTCRtpCapabilities",
     "RTCRtpCodecCapability",
     "RTCRtpCodecParameters",
+    "RTCRtpEncodingParameters",
     "RTCRtpContributingSource",
     "RTCRtpHeaderExtensionCapability",
     "RTCRtpHeaderExtensionParameters",
@@ -3,6 +3,7 @@
 from .base import CongestionController
 from .remb import RembController  
 from .gcc_v0 import GccV0Controller
+from .gcc_twcc import GccTwccController
 
 __all__ = ["CongestionController", "create_controller"]
 
@@ -10,13 +11,14 @@ __all__ = ["CongestionController", "create_controller"]
 _ALGORITHMS = {
     "remb": RembController,
     "gcc-v0": GccV0Controller,
+    "gcc-twcc": GccTwccController,
 }
 
 def create_controller(algorithm: str, **kwargs) -> CongestionController:
     """Create a congestion control algorithm instance.
     
     Args:
-        algorithm: Algorithm name ("remb", "gcc-v0", etc.)
+        algorithm: Algorithm name ("remb", "gcc-v0", "gcc-twcc", etc.)
         **kwargs: Algorithm-specific parameters
         
     Returns:
@@ -3,6 +3,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from ..rtp import RtcpTransportFeedback
+
 
 class CongestionController(ABC):
     """Abstract base class for congestion control algorithms.
@@ -10,6 +12,10 @@ class CongestionController(ABC):
     This interface is used by RTCRtpReceiver and RTCRtpSender to implement
     different congestion control strategies (REMB, GCC, CUBIC, etc.).
     """
+
+    #: Whether the sender should stamp packets with transport-wide sequence
+    #: numbers and feed RTCP transport-cc feedback to this controller.
+    uses_transport_feedback = False
     
     @abstractmethod
     def on_packet_received(
@@ -49,4 +55,30 @@ class CongestionController(ABC):
         Returns:
             Target bitrate in bits per second, or None if not available
         """
-        pass
\ No newline at end of file
+        pass
+
+    def on_packet_sent(
+        self,
+        *,
+        transport_sequence_number: int,
+        send_time_ms: int,
+        payload_size: int,
+        ssrc: int
+    ) -> None:
+        """Handle an outgoing RTP packet for send-side estimation.
+
+        Args:
+            transport_sequence_number: Transport-wide sequence number of the packet
+            send_time_ms: Local send time in milliseconds
+            payload_size: Size of RTP payload + padding in bytes
+            ssrc: RTP stream identifier
+        """
+        pass
+
+    def on_transport_feedback(self, feedback: RtcpTransportFeedback) -> None:
+        """Handle RTCP transport-wide congestion control feedback.
+
+        Args:
+            feedback: Parsed transport-cc feedback from the remote receiver
+        """
+        pass
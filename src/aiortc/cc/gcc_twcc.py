@@ -0,0 +1,231 @@
+"""Google Congestion Control driven by transport-wide feedback (send-side)."""
+
+from typing import Optional
+
+from ..rate import RemoteBitrateEstimator
+from ..rtp import RtcpTransportFeedback
+from ..utils import uint16_add
+from .base import CongestionController
+from .gcc_v0 import LossRateControl
+
+# interval between two transport-cc feedback messages
+TWCC_FEEDBACK_INTERVAL_MS = 100
+
+# number of sent packets remembered while waiting for feedback
+TWCC_HISTORY_SIZE = 4096
+
+# loss-based controller update pacing
+LOSS_UPDATE_INTERVAL_MS = 1000
+LOSS_FAST_DECREASE_MIN_PACKETS = 20
+
+
+class TransportFeedbackGenerator:
+    """Receiver-side recorder which builds transport-cc feedback messages.
+
+    Arrival times are recorded per transport-wide sequence number and
+    reported every ``interval_ms``.
+    """
+
+    def __init__(self, interval_ms: int = TWCC_FEEDBACK_INTERVAL_MS) -> None:
+        self._arrivals: dict[int, int] = {}
+        self._base_seq: Optional[int] = None
+        self._feedback_count = 0
+        self._interval_ms = interval_ms
+        self._last_feedback_ms: Optional[int] = None
+        self._last_seq: Optional[int] = None
+        self._max_seq: Optional[int] = None
+
+    @property
+    def interval_ms(self) -> int:
+        """The interval between two feedback messages, in milliseconds."""
+        return self._interval_ms
+
+    def add(self, sequence_number: int, arrival_time_ms: int) -> None:
+        """Record the arrival of a packet carrying a transport-wide sequence number."""
+        # unwrap the 16-bit sequence number
+        if self._last_seq is None:
+            seq = sequence_number
+        else:
+            delta = uint16_add(sequence_number, -(self._last_seq & 0xFFFF))
+            if delta >= 0x8000:
+                delta -= 0x10000
+            seq = self._last_seq + delta
+        self._last_seq = seq
+
+        # packets older than the last feedback have already been reported
+        if self._base_seq is None:
+            self._base_seq = seq
+        elif seq < self._base_seq:
+            return
+
+        if seq not in self._arrivals:
+            self._arrivals[seq] = arrival_time_ms
+        if self._max_seq is None or seq > self._max_seq:
+            self._max_seq = seq
+
+    def feedback(self, now_ms: int) -> Optional[RtcpTransportFeedback]:
+        """Return a feedback message if one is due, otherwise `None`."""
+        if not self._arrivals:
+            return None
+        if (
+            self._last_feedback_ms is not None
+            and now_ms - self._last_feedback_ms < self._interval_ms
+        ):
+            return None
+        self._last_feedback_ms = now_ms
+
+        first_arrival_ms = self._arrivals[min(self._arrivals)]
+        reference_time = first_arrival_ms // 64
+        last_ticks = reference_time * 64 * 4
+
+        deltas: list[Optional[int]] = []
+        seq = self._base_seq
+        while seq <= self._max_seq and len(deltas) < 0xFFFF:
+            arrival_time_ms = self._arrivals.pop(seq, None)
+            if arrival_time_ms is None:
+                deltas.append(None)
+            else:
+                ticks = arrival_time_ms * 4
+                delta = ticks - last_ticks
+                if delta < -0x8000 or delta > 0x7FFF:
+                    # report the remaining packets in the next feedback
+                    self._arrivals[seq] = arrival_time_ms
+                    break
+                deltas.append(delta)
+                last_ticks = ticks
+            seq += 1
+
+        feedback = RtcpTransportFeedback(
+            base_sequence_number=self._base_seq & 0xFFFF,
+            reference_time=reference_time & 0xFFFFFF,
+            feedback_count=self._feedback_count,
+            deltas=deltas,
+        )
+        self._base_seq = seq
+        self._feedback_count = (self._feedback_count + 1) & 0xFF
+        if not self._arrivals:
+            self._max_seq = None
+        return feedback
+
+
+class GccTwccController(CongestionController):
+    """Google Congestion Control estimated on the sender from transport-cc feedback.
+
+    Send times are recorded for every outgoing packet and matched against the
+    per-packet arrival times reported by the receiver, so both the delay-based
+    estimate (Ar) and the loss-based estimate (As) react within one feedback
+    interval instead of waiting for REMB or RTCP receiver reports.
+    """
+
+    uses_transport_feedback = True
+
+    def __init__(self, initial_bitrate: int = 500_000, **kwargs):
+        """Initialize GCC transport-wide controller.
+
+        Args:
+            initial_bitrate: Starting bitrate for loss controller
+        """
+        self._delay_estimator = RemoteBitrateEstimator()
+        self._ar: Optional[int] = None
+        self._loss_controller = LossRateControl(initial_bitrate)
+
+        # sent packets awaiting feedback, keyed by sequence number modulo history
+        self._history: dict[int, tuple[int, int, int, int]] = {}
+        self._has_feedback = False
+
+        # loss accumulated since the last loss-based update
+        self._loss_expected = 0
+        self._loss_lost = 0
+        self._loss_update_ms: Optional[int] = None
+
+    def on_packet_received(
+        self,
+        *,
+        abs_send_time: int,
+        arrival_time_ms: int,
+        payload_size: int,
+        ssrc: int
+    ) -> Optional[tuple[int, list[int]]]:
+        """Estimation happens on the sender, so no REMB is produced."""
+        return None
+
+    def on_receiver_report(self, fraction_lost: int) -> None:
+        """Use RTCP RR loss only until transport-cc feedback is flowing."""
+        if not self._has_feedback:
+            self._loss_controller.update(fraction_lost / 255.0)
+
+    def on_packet_sent(
+        self,
+        *,
+        transport_sequence_number: int,
+        send_time_ms: int,
+        payload_size: int,
+        ssrc: int
+    ) -> None:
+        """Remember the send time of a packet until its feedback arrives."""
+        self._history[transport_sequence_number % TWCC_HISTORY_SIZE] = (
+            transport_sequence_number,
+            send_time_ms,
+            payload_size,
+            ssrc,
+        )
+
+    def on_transport_feedback(self, feedback: RtcpTransportFeedback) -> None:
+        """Run the delay-based and loss-based controllers on a feedback message."""
+        self._has_feedback = True
+
+        acked: list[tuple[int, int, int, int]] = []
+        expected = 0
+        lost = 0
+        arrival_ticks = feedback.reference_time * 64 * 4
+        for i, delta in enumerate(feedback.deltas):
+            seq = uint16_add(feedback.base_sequence_number, i)
+            if delta is not None:
+                arrival_ticks += delta
+
+            sent = self._history.get(seq % TWCC_HISTORY_SIZE)
+            if sent is None or sent[0] != seq:
+                # not one of our packets
+                continue
+            del self._history[seq % TWCC_HISTORY_SIZE]
+            expected += 1
+            if delta is None:
+                lost += 1
+            else:
+                _, send_time_ms, payload_size, ssrc = sent
+                acked.append((arrival_ticks // 4, send_time_ms, payload_size, ssrc))
+
+        # delay-based estimate, fed in arrival order
+        for arrival_time_ms, send_time_ms, payload_size, ssrc in sorted(acked):
+            result = self._delay_estimator.add(
+                arrival_time_ms=arrival_time_ms,
+                abs_send_time=((send_time_ms << 18) // 1000) & 0x00FFFFFF,
+                payload_size=payload_size,
+                ssrc=ssrc,
+            )
+            if result is not None:
+                self._ar = result[0]
+
+        # loss-based estimate
+        if acked:
+            now_ms = max(x[0] for x in acked)
+            self._loss_expected += expected
+            self._loss_lost += lost
+            if self._loss_update_ms is None:
+                self._loss_update_ms = now_ms
+            fraction_lost = self._loss_lost / max(self._loss_expected, 1)
+            if now_ms - self._loss_update_ms >= LOSS_UPDATE_INTERVAL_MS or (
+                fraction_lost > 0.10
+                and self._loss_expected >= LOSS_FAST_DECREASE_MIN_PACKETS
+            ):
+                self._loss_controller.update(fraction_lost)
+                self._loss_expected = 0
+                self._loss_lost = 0
+                self._loss_update_ms = now_ms
+
+    def target_bitrate(self) -> Optional[int]:
+        """Get combined target bitrate: min(Ar, As)."""
+        as_bitrate = self._loss_controller.bitrate
+        if self._ar is None:
+            return as_bitrate
+        return max(10_000, min(self._ar, as_bitrate))
@@ -2,6 +2,7 @@
 
 from typing import Optional, Tuple
 import os
+from .. import eventlog
 from .base import CongestionController
 from ..rate import RemoteBitrateEstimator
 
@@ -17,6 +18,7 @@ class LossRateControl:
         """
         self._as = initial_bitrate  # As(t) - sender-side estimate
         self._target_bitrate: Optional[int] = None  # Target bitrate constraint
+        self._log_increase = os.getenv("DEBUG_GCC_INCREASE", "0") == "1"
     
     def update(self, fraction_lost: float) -> int:
         """Update sender-side estimate based on packet loss.
@@ -38,13 +40,11 @@ class LossRateControl:
         if fraction_lost > 0.10:
             # Fast decrease on serious loss
             self._as *= (1.0 - 0.5 * fraction_lost)
-            action = f"DECREASE (loss={fraction_lost:.3f})"
+            action = "DECREASE"
         elif fraction_lost < 0.02:
             # Gentle increase when almost no loss
             self._as *= 1.05
-            action = f"INCREASE (loss={fraction_lost:.3f})"
-        else:
-            action = f"HOLD (loss={fraction_lost:.3f})"
+            action = "INCREASE"
         
         # Apply target bitrate constraint if set
         if self._target_bitrate is not None:
@@ -59,23 +59,18 @@ class LossRateControl:
         self._as = min(self._as, 10_000_000)  # 10 Mbps max (4K video territory)
         
         # Optional logging for debugging
-        try:
-            import os, time
-            loss_log_path = os.getenv("RTCP_LOSS_LOG")
-            if loss_log_path:
-                # Log all changes, but mark different types
-                if fraction_lost > 0.0:
-                    # Log losses prominently
-                    with open(loss_log_path, "a", encoding="utf-8") as f:
-                        f.write(f"GCC_LOSS {action}: As {int(old_as)} -> {int(self._as)}, time={time.time():.3f}\n")
-                elif old_as != self._as:
-                    # Log increases when debugging
-                    debug_log = os.getenv("DEBUG_GCC_INCREASE", "0") == "1"
-                    if debug_log:
-                        with open(loss_log_path, "a", encoding="utf-8") as f:
-                            f.write(f"GCC_INCREASE {action}: As {int(old_as)} -> {int(self._as)}, time={time.time():.3f}\n")
-        except Exception:
-            pass
+        event_log = eventlog.get("RTCP_LOSS_LOG")
+        if event_log is not None and (
+            # Log losses prominently, increases when debugging
+            fraction_lost > 0.0 or (old_as != self._as and self._log_increase)
+        ):
+            event_log.log(
+                "gcc_loss" if fraction_lost > 0.0 else "gcc_increase",
+                action=action,
+                fraction_lost=round(fraction_lost, 3),
+                old_as_bps=int(old_as),
+                as_bps=int(self._as),
+            )
         
         return int(self._as)
     
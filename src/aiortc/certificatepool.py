@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .rtcdtlstransport import SRTP_PROFILES, RTCCertificate
+
+logger = logging.getLogger(__name__)
+
+# certificates kept ready for the next peer connections
+POOL_SIZE = 4
+
+# seconds after which a certificate is no longer handed out
+ROTATION_INTERVAL = 24 * 3600.0
+
+
+class CertificatePoolStats:
+    def __init__(self) -> None:
+        self.generated = 0
+        self.hits = 0
+        self.misses = 0
+
+
+class PooledCertificate:
+    def __init__(self, certificate: RTCCertificate, created: float) -> None:
+        self.certificate = certificate
+        self.created = created
+        self.uses = 0
+
+
+class CertificatePool:
+    """
+    Certificates generated ahead of time by a background thread, along with
+    their DTLS contexts, for the peer connections to draw from instead of
+    generating their own on the event loop.
+
+    :param size: The number of certificates kept ready.
+    :param reuse: The number of peer connections which are handed the same
+                  certificate, `1` giving each connection its own.
+    :param rotation: The number of seconds after which a certificate is no
+                     longer handed out.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        reuse: int = 1,
+        rotation: float = ROTATION_INTERVAL,
+    ) -> None:
+        self.stats = CertificatePoolStats()
+
+        self._certificates: deque[PooledCertificate] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._filling = False
+        self._lock = threading.Lock()
+        self._reuse = reuse
+        self._rotation = rotation
+        self._size = size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._certificates)
+
+    def fill(self) -> None:
+        """
+        Generate certificates in the background until the pool is full.
+        """
+        with self._lock:
+            if self._filling or len(self._certificates) >= self._size:
+                return
+            self._filling = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="certificate"
+                )
+        self._executor.submit(self._run)
+
+    def get(self) -> RTCCertificate:
+        """
+        Return a certificate, which is generated on the spot if none is ready.
+        """
+        now = time.monotonic()
+        certificate: Optional[RTCCertificate] = None
+        with self._lock:
+            while (
+                self._certificates
+                and now - self._certificates[0].created >= self._rotation
+            ):
+                self._certificates.popleft()
+            if self._certificates:
+                pooled = self._certificates[0]
+                pooled.uses += 1
+                if pooled.uses >= self._reuse:
+                    self._certificates.popleft()
+                certificate = pooled.certificate
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+        self.fill()
+
+        if certificate is None:
+            certificate = RTCCertificate.generateCertificate()
+        return certificate
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if len(self._certificates) >= self._size:
+                    self._filling = False
+                    return
+            try:
+                certificate = RTCCertificate.generateCertificate()
+                certificate._get_ssl_context(SRTP_PROFILES)
+            except Exception:
+                logger.exception("Could not generate a certificate")
+                with self._lock:
+                    self._filling = False
+                return
+            with self._lock:
+                self._certificates.append(
+                    PooledCertificate(certificate, time.monotonic())
+                )
+                self.stats.generated += 1
+
+
+default_pool = CertificatePool()
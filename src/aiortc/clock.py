@@ -1,9 +1,16 @@
 import datetime
+import time
+from collections.abc import Callable
+from typing import Optional
 
 NTP_EPOCH = datetime.datetime(1900, 1, 1, tzinfo=datetime.timezone.utc)
 
+_time_source: Optional[Callable[[], float]] = None
+
 
 def current_datetime() -> datetime.datetime:
+    if _time_source is not None:
+        return datetime.datetime.fromtimestamp(_time_source(), datetime.timezone.utc)
     return datetime.datetime.now(datetime.timezone.utc)
 
 
@@ -16,6 +23,15 @@ def current_ntp_time() -> int:
     return datetime_to_ntp(current_datetime())
 
 
+def current_time() -> float:
+    """
+    Return the number of seconds since the epoch.
+    """
+    if _time_source is not None:
+        return _time_source()
+    return time.time()
+
+
 def datetime_from_ntp(ntp: int) -> datetime.datetime:
     seconds = ntp >> 32
     microseconds = ((ntp & 0xFFFFFFFF) * 1000000) / (1 << 32)
@@ -27,3 +43,14 @@ def datetime_to_ntp(dt: datetime.datetime) -> int:
     high = int(delta.total_seconds())
     low = round((delta.microseconds * (1 << 32)) // 1000000)
     return (high << 32) | low
+
+
+def set_time_source(source: Optional[Callable[[], float]]) -> None:
+    """
+    Make the clock follow `source`, which returns the number of seconds since
+    the epoch, or the system clock if `source` is `None`.
+
+    This allows running peer connections against a virtual clock.
+    """
+    global _time_source
+    _time_source = source
@@ -9,6 +9,7 @@ from ..rtcrtpparameters import (
     RTCRtpHeaderExtensionCapability,
     RTCRtpHeaderExtensionParameters,
 )
+from ..rtp import TRANSPORT_WIDE_CC_URI
 from .base import Decoder, Encoder
 from .g711 import PcmaDecoder, PcmaEncoder, PcmuDecoder, PcmuEncoder
 from .g722 import G722Decoder, G722Encoder
@@ -58,8 +59,18 @@ HEADER_EXTENSIONS: dict[str, list[RTCRtpHeaderExtensionParameters]] = {
         RTCRtpHeaderExtensionParameters(
             id=3, uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time"
         ),
+        RTCRtpHeaderExtensionParameters(id=4, uri=TRANSPORT_WIDE_CC_URI),
     ],
 }
+# Only negotiated for the video senders which send several encodings.
+SIMULCAST_HEADER_EXTENSIONS: list[RTCRtpHeaderExtensionParameters] = [
+    RTCRtpHeaderExtensionParameters(
+        id=10, uri="urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+    ),
+    RTCRtpHeaderExtensionParameters(
+        id=11, uri="urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id"
+    ),
+]
 
 
 def init_codecs() -> None:
@@ -80,6 +91,7 @@ def init_codecs() -> None:
                     RTCRtcpFeedback(type="nack"),
                     RTCRtcpFeedback(type="nack", parameter="pli"),
                     RTCRtcpFeedback(type="goog-remb"),
+                    RTCRtcpFeedback(type="transport-cc"),
                 ],
                 parameters=parameters or {},
             ),
@@ -103,6 +115,16 @@ def init_codecs() -> None:
             },
         )
 
+    # FEC is only negotiated if it is in the transceiver's codec preferences
+    CODECS["video"].append(
+        RTCRtpCodecParameters(
+            mimeType="video/flexfec-03",
+            clockRate=90000,
+            payloadType=dynamic_pt,
+            parameters={"repair-window": 10000000},
+        )
+    )
+
 
 def depayload(codec: RTCRtpCodecParameters, payload: bytes) -> bytes:
     if codec.name == "VP8":
@@ -183,6 +205,10 @@ def get_encoder(codec: RTCRtpCodecParameters) -> Encoder:
         raise ValueError(f"No encoder found for MIME type `{mimeType}`")
 
 
+def is_fec(codec: Union[RTCRtpCodecCapability, RTCRtpCodecParameters]) -> bool:
+    return codec.name.lower() == "flexfec-03"
+
+
 def is_rtx(codec: Union[RTCRtpCodecCapability, RTCRtpCodecParameters]) -> bool:
     return codec.name.lower() == "rtx"
 
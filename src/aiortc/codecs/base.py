@@ -12,6 +12,16 @@ class Decoder(metaclass=ABCMeta):
         pass  # pragma: no cover
 
 
+class EncoderStats:
+    def __init__(self) -> None:
+        self.keyframes = 0
+        # bitrate changes applied to the running codec
+        self.reconfigurations = 0
+        # codec recreations, and those caused by a bitrate change
+        self.resets = 0
+        self.rate_resets = 0
+
+
 class Encoder(metaclass=ABCMeta):
     @abstractmethod
     def encode(
@@ -13,7 +13,7 @@ from av.video.codeccontext import VideoCodecContext
 
 from ..jitterbuffer import JitterFrame
 from ..mediastreams import VIDEO_TIME_BASE, convert_timebase
-from .base import Decoder, Encoder
+from .base import Decoder, Encoder, EncoderStats
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +25,10 @@ DEFAULT_BITRATE = 1000000  # 1 Mbps
 MIN_BITRATE = 500000  # 500 kbps
 MAX_BITRATE = 5000000  # 5 Mbps
 
+# The rate control is opened with a ceiling this many times the target, and
+# the target can then be changed below the ceiling without recreating it.
+BITRATE_HEADROOM = 2
+
 MAX_FRAME_RATE = 30
 PACKET_MAX = 1300
 
@@ -136,6 +140,8 @@ class H264Encoder(Encoder):
         self.buffer_data = b""
         self.buffer_pts: Optional[int] = None
         self.codec: Optional[VideoCodecContext] = None
+        self.stats = EncoderStats()
+        self.__max_bitrate = 0
         self.__target_bitrate = DEFAULT_BITRATE
 
     @staticmethod
@@ -259,15 +265,13 @@ class H264Encoder(Encoder):
         self, frame: av.VideoFrame, force_keyframe: bool
     ) -> Iterator[bytes]:
         if self.codec and (
-            frame.width != self.codec.width
-            or frame.height != self.codec.height
-            # we only adjust bitrate if it changes by over 10%
-            or abs(self.target_bitrate - self.codec.bit_rate) / self.codec.bit_rate
-            > 0.1
+            frame.width != self.codec.width or frame.height != self.codec.height
         ):
-            self.buffer_data = b""
-            self.buffer_pts = None
-            self.codec = None
+            self._reset()
+        elif self.codec and self.target_bitrate > self.__max_bitrate:
+            # the target is above the ceiling of the rate control
+            self.stats.rate_resets += 1
+            self._reset()
 
         if force_keyframe:
             # force a complete image
@@ -277,26 +281,47 @@ class H264Encoder(Encoder):
             frame.pict_type = av.video.frame.PictureType.NONE
 
         if self.codec is None:
+            # Open the rate control in CBR mode at the ceiling, as libx264
+            # only follows bitrate changes when a VBV is configured.
+            self.__max_bitrate = min(
+                MAX_BITRATE, self.target_bitrate * BITRATE_HEADROOM
+            )
             self.codec = av.CodecContext.create("libx264", "w")
             self.codec.width = frame.width
             self.codec.height = frame.height
-            self.codec.bit_rate = self.target_bitrate
+            self.codec.bit_rate = self.__max_bitrate
             self.codec.pix_fmt = "yuv420p"
             self.codec.framerate = fractions.Fraction(MAX_FRAME_RATE, 1)
             self.codec.time_base = fractions.Fraction(1, MAX_FRAME_RATE)
             self.codec.options = {
+                "bufsize": str(self.target_bitrate),
                 "level": "31",
+                "maxrate": str(self.__max_bitrate),
                 "tune": "zerolatency",
             }
             self.codec.profile = "Baseline"
+            self.codec.open()
+            self.codec.bit_rate = self.target_bitrate
+        elif self.codec.bit_rate != self.target_bitrate:
+            # applied by libx264 when encoding the next frame
+            self.codec.bit_rate = self.target_bitrate
+            self.stats.reconfigurations += 1
 
         data_to_send = b""
         for package in self.codec.encode(frame):
             data_to_send += bytes(package)
+            if package.is_keyframe:
+                self.stats.keyframes += 1
 
         if data_to_send:
             yield from self._split_bitstream(data_to_send)
 
+    def _reset(self) -> None:
+        self.buffer_data = b""
+        self.buffer_pts = None
+        self.codec = None
+        self.stats.resets += 1
+
     def encode(
         self, frame: Frame, force_keyframe: bool = False
     ) -> tuple[list[bytes], int]:
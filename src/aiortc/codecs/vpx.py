@@ -11,8 +11,8 @@ from av.packet import Packet
 from av.video.codeccontext import VideoCodecContext
 
 from ..jitterbuffer import JitterFrame
-from ..mediastreams import VIDEO_TIME_BASE, convert_timebase
-from .base import Decoder, Encoder
+from ..mediastreams import VIDEO_CLOCK_RATE, VIDEO_TIME_BASE, convert_timebase
+from .base import Decoder, Encoder, EncoderStats
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +20,10 @@ DEFAULT_BITRATE = 500000  # 500 kbps
 MIN_BITRATE = 250000  # 250 kbps
 MAX_BITRATE = 10000000  # 10 Mbps (increased for experiments) was 1.5Mbps
 
+# The libvpx encoder cannot change its bitrate once opened, so it is recreated
+# for bitrate changes, but at most once per this many seconds of frames.
+MIN_RATE_RESET_INTERVAL = 1
+
 MAX_FRAME_RATE = 30
 PACKET_MAX = 1300
 
@@ -185,6 +189,8 @@ class Vp8Encoder(Encoder):
     def __init__(self) -> None:
         self.codec: Optional[VideoCodecContext] = None
         self.picture_id = random.randint(0, (1 << 15) - 1)
+        self.stats = EncoderStats()
+        self.__reset_timestamp: Optional[int] = None
         self.__target_bitrate = DEFAULT_BITRATE
 
     def encode(
@@ -194,14 +200,26 @@ class Vp8Encoder(Encoder):
         if frame.format.name != "yuv420p":
             frame = frame.reformat(format="yuv420p")
 
+        timestamp = convert_timebase(frame.pts, frame.time_base, VIDEO_TIME_BASE)
         if self.codec and (
-            frame.width != self.codec.width
-            or frame.height != self.codec.height
+            frame.width != self.codec.width or frame.height != self.codec.height
+        ):
+            self.codec = None
+            self.stats.resets += 1
+        elif (
+            self.codec
             # We only adjust bitrate if it changes by over 10%.
-            or abs(self.target_bitrate - self.codec.bit_rate) / self.codec.bit_rate
+            and abs(self.target_bitrate - self.codec.bit_rate) / self.codec.bit_rate
             > 0.1
+            and (
+                self.__reset_timestamp is None
+                or timestamp - self.__reset_timestamp
+                >= MIN_RATE_RESET_INTERVAL * VIDEO_CLOCK_RATE
+            )
         ):
             self.codec = None
+            self.stats.resets += 1
+            self.stats.rate_resets += 1
 
         # Force a complete image if a keyframe was requested.
         if force_keyframe:
@@ -238,14 +256,16 @@ class Vp8Encoder(Encoder):
             self.codec.thread_count = number_of_threads(
                 frame.width * frame.height, multiprocessing.cpu_count()
             )
+            self.__reset_timestamp = timestamp
 
         data_to_send = b""
         for package in self.codec.encode(frame):
             data_to_send += bytes(package)
+            if package.is_keyframe:
+                self.stats.keyframes += 1
 
         # Packetize.
         payloads = self._packetize(data_to_send, self.picture_id)
-        timestamp = convert_timebase(frame.pts, frame.time_base, VIDEO_TIME_BASE)
         self.picture_id = (self.picture_id + 1) % (1 << 15)
         return payloads, timestamp
 
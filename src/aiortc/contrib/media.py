@@ -1,4 +1,5 @@
 import asyncio
+import concurrent.futures
 import errno
 import fractions
 import logging
@@ -40,9 +41,133 @@ REAL_TIME_FORMATS = [
     "x11grab",
 ]
 
+# what a full media queue does with a new frame or packet
+QUEUE_POLICIES = ("block", "drop-oldest", "never-drop")
+
+# default capacity of the player and relay queues, about one second of audio
+DEFAULT_QUEUE_SIZE = 64
+
 _AudioOrVideoStream = Union[AudioStream, VideoStream]
 
 
+def default_queue_policy(kind: str, live: bool) -> str:
+    """
+    Audio is never dropped, live video drops the oldest frames and the
+    playback of a file waits for the consumer.
+    """
+    if kind == "audio":
+        return "never-drop"
+    elif live:
+        return "drop-oldest"
+    else:
+        return "block"
+
+
+class MediaQueue:
+    """
+    A queue of frames or packets between a media source and a track.
+
+    :param maxsize: The capacity of the queue.
+    :param policy: What happens when the queue is full: `'block'` waits for
+        room, `'drop-oldest'` discards the oldest item and `'never-drop'` lets
+        the queue grow. Encoded packets are never dropped, as the following
+        ones could not be decoded until the next keyframe.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = "block"):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown media queue policy `{policy}`")
+        if maxsize <= 0:
+            raise ValueError("The media queue size must be positive")
+
+        self.closed = False
+        self.consumed = False
+        self.dropped = 0
+        self.maxsize = maxsize
+        self.policy = policy
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._queue: asyncio.Queue[Union[Frame, Packet, None]] = asyncio.Queue()
+
+    def close(self) -> None:
+        """
+        Stop accepting items, and wake up a producer waiting for room.
+        """
+        self.closed = True
+        self._not_full.set()
+
+    def full(self) -> bool:
+        return self.policy != "never-drop" and self.qsize() >= self.maxsize
+
+    async def get(self) -> Union[Frame, Packet, None]:
+        self.consumed = True
+        item = await self._queue.get()
+        if not self.full():
+            self._not_full.set()
+        return item
+
+    async def put(self, item: Union[Frame, Packet, None]) -> None:
+        """
+        Put an item in the queue, waiting for room with the `'block'` policy.
+
+        Items put in a closed queue are discarded.
+        """
+        if self.policy == "block":
+            while self.full() and not self.closed:
+                self._not_full.clear()
+                await self._not_full.wait()
+            if not self.closed:
+                self._queue.put_nowait(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item: Union[Frame, Packet, None]) -> None:
+        """
+        Put an item in the queue without waiting, dropping the oldest frame
+        if the queue is full.
+        """
+        if self.closed:
+            return
+        if self.full() and isinstance(item, Frame):
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+def player_queue_put(
+    loop: asyncio.AbstractEventLoop,
+    track: "PlayerStreamTrack",
+    item: Union[Frame, Packet, None],
+    quit_event: threading.Event,
+) -> None:
+    """
+    Hand an item from the worker thread to a track.
+
+    With the `'block'` policy the worker waits for room, unless nobody reads
+    from the track yet. Items for a stopped track are discarded, so that it
+    does not hold up the other track.
+    """
+    if track.readyState != "live":
+        return
+
+    queue = track._queue
+    if queue.policy != "block" or not queue.consumed:
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+        return
+
+    future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+    while not quit_event.is_set() and track.readyState == "live":
+        try:
+            future.result(timeout=0.1)
+            return
+        except concurrent.futures.TimeoutError:
+            pass
+    future.cancel()
+
+
 async def blackhole_consume(track: MediaStreamTrack) -> None:
     while True:
         try:
@@ -122,9 +247,9 @@ def player_worker_decode(
                 container.seek(0)
                 continue
             if audio_track:
-                asyncio.run_coroutine_threadsafe(audio_track._queue.put(None), loop)
+                player_queue_put(loop, audio_track, None, quit_event)
             if video_track:
-                asyncio.run_coroutine_threadsafe(video_track._queue.put(None), loop)
+                player_queue_put(loop, video_track, None, quit_event)
             break
 
         # read up to 1 second ahead
@@ -141,7 +266,7 @@ def player_worker_decode(
                 audio_samples += frame.samples
 
                 frame_time = frame.time
-                asyncio.run_coroutine_threadsafe(audio_track._queue.put(frame), loop)
+                player_queue_put(loop, audio_track, frame, quit_event)
         elif isinstance(frame, VideoFrame) and video_track:
             if frame.pts is None:  # pragma: no cover
                 logger.warning(
@@ -155,7 +280,7 @@ def player_worker_decode(
             frame.pts -= video_first_pts
 
             frame_time = frame.time
-            asyncio.run_coroutine_threadsafe(video_track._queue.put(frame), loop)
+            player_queue_put(loop, video_track, frame, quit_event)
 
 
 def player_worker_demux(
@@ -185,9 +310,9 @@ def player_worker_demux(
                 container.seek(0)
                 continue
             if audio_track:
-                asyncio.run_coroutine_threadsafe(audio_track._queue.put(None), loop)
+                player_queue_put(loop, audio_track, None, quit_event)
             if video_track:
-                asyncio.run_coroutine_threadsafe(video_track._queue.put(None), loop)
+                player_queue_put(loop, video_track, None, quit_event)
             break
 
         # read up to 1 second ahead
@@ -218,17 +343,24 @@ def player_worker_demux(
             and packet.time_base is not None
         ):
             frame_time = int(packet.pts * packet.time_base)
-            asyncio.run_coroutine_threadsafe(track._queue.put(packet), loop)
+            player_queue_put(loop, track, packet, quit_event)
 
 
 class PlayerStreamTrack(MediaStreamTrack):
-    def __init__(self, player: "MediaPlayer", kind: str) -> None:
+    def __init__(self, player: "MediaPlayer", kind: str, queue: MediaQueue) -> None:
         super().__init__()
         self.kind = kind
         self._player: Optional[MediaPlayer] = player
-        self._queue: asyncio.Queue[Union[Frame, Packet]] = asyncio.Queue()
+        self._queue = queue
         self._start: Optional[float] = None
 
+    @property
+    def framesDropped(self) -> int:
+        """
+        The number of frames or packets dropped because the queue was full.
+        """
+        return self._queue.dropped
+
     async def recv(self) -> Union[Frame, Packet]:
         if self.readyState != "live":
             raise MediaStreamError
@@ -300,6 +432,10 @@ class MediaPlayer:
     :param options: Additional options to pass to FFmpeg.
     :param timeout: Open/read timeout to pass to FFmpeg.
     :param loop: Whether to repeat playback indefinitely (requires a seekable file).
+    :param queue_size: The number of frames or packets read ahead per track.
+    :param queue_policy: What happens when a track's queue is full, see
+        :class:`MediaQueue`. By default audio is never dropped, video from a
+        device drops the oldest frames and file playback waits for the consumer.
     """
 
     def __init__(
@@ -310,6 +446,8 @@ class MediaPlayer:
         timeout: Optional[int] = None,
         loop: bool = False,
         decode: bool = True,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        queue_policy: Optional[str] = None,
     ) -> None:
         self.__container = av.open(
             file=file, format=format, mode="r", options=options, timeout=timeout
@@ -317,6 +455,18 @@ class MediaPlayer:
         self.__thread: Optional[threading.Thread] = None
         self.__thread_quit: Optional[threading.Event] = None
 
+        # check whether we need to throttle playback
+        container_format = set(self.__container.format.name.split(","))
+        self._throttle_playback = not container_format.intersection(REAL_TIME_FORMATS)
+
+        def create_track(kind: str) -> PlayerStreamTrack:
+            policy = queue_policy or default_queue_policy(
+                kind, live=not self._throttle_playback
+            )
+            return PlayerStreamTrack(
+                self, kind=kind, queue=MediaQueue(maxsize=queue_size, policy=policy)
+            )
+
         # examine streams
         self.__started: set[PlayerStreamTrack] = set()
         self.__streams: list[_AudioOrVideoStream] = []
@@ -326,23 +476,19 @@ class MediaPlayer:
         for stream in self.__container.streams:
             if stream.type == "audio" and not self.__audio:
                 if self.__decode:
-                    self.__audio = PlayerStreamTrack(self, kind="audio")
+                    self.__audio = create_track("audio")
                     self.__streams.append(stream)
                 elif stream.codec_context.name in ["opus", "pcm_alaw", "pcm_mulaw"]:
-                    self.__audio = PlayerStreamTrack(self, kind="audio")
+                    self.__audio = create_track("audio")
                     self.__streams.append(stream)
             elif stream.type == "video" and not self.__video:
                 if self.__decode:
-                    self.__video = PlayerStreamTrack(self, kind="video")
+                    self.__video = create_track("video")
                     self.__streams.append(stream)
                 elif stream.codec_context.name in ["h264", "vp8"]:
-                    self.__video = PlayerStreamTrack(self, kind="video")
+                    self.__video = create_track("video")
                     self.__streams.append(stream)
 
-        # check whether we need to throttle playback
-        container_format = set(self.__container.format.name.split(","))
-        self._throttle_playback = not container_format.intersection(REAL_TIME_FORMATS)
-
         # check whether the looping is supported
         assert not loop or self.__container.duration is not None, (
             "The `loop` argument requires a seekable file"
@@ -519,6 +665,8 @@ class RelayStreamTrack(MediaStreamTrack):
         relay: "MediaRelay",
         source: MediaStreamTrack,
         buffered: bool,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        queue_policy: Optional[str] = None,
     ) -> None:
         super().__init__()
         self.kind = source.kind
@@ -527,14 +675,24 @@ class RelayStreamTrack(MediaStreamTrack):
         self._buffered = buffered
 
         self._frame: Union[Frame, Packet, None] = None
-        self._queue: Optional[asyncio.Queue[Union[Frame, Packet, None]]] = None
+        self._queue: Optional[MediaQueue] = None
         self._new_frame_event: Optional[asyncio.Event] = None
 
         if self._buffered:
-            self._queue = asyncio.Queue()
+            self._queue = MediaQueue(
+                maxsize=queue_size,
+                policy=queue_policy or default_queue_policy(self.kind, live=True),
+            )
         else:
             self._new_frame_event = asyncio.Event()
 
+    @property
+    def framesDropped(self) -> int:
+        """
+        The number of frames or packets dropped because the queue was full.
+        """
+        return self._queue.dropped if self._queue is not None else 0
+
     async def recv(self) -> Union[Frame, Packet]:
         if self.readyState != "live":
             raise MediaStreamError
@@ -554,6 +712,9 @@ class RelayStreamTrack(MediaStreamTrack):
 
     def stop(self) -> None:
         super().stop()
+        if self._queue is not None:
+            # the relay may be waiting for room in the queue
+            self._queue.close()
         if self._relay is not None:
             self._relay._stop(self)
             self._relay = None
@@ -573,7 +734,11 @@ class MediaRelay:
         self.__tasks: dict[MediaStreamTrack, asyncio.Future[None]] = {}
 
     def subscribe(
-        self, track: MediaStreamTrack, buffered: bool = True
+        self,
+        track: MediaStreamTrack,
+        buffered: bool = True,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        queue_policy: Optional[str] = None,
     ) -> MediaStreamTrack:
         """
         Create a proxy around the given `track` for a new consumer.
@@ -581,10 +746,15 @@ class MediaRelay:
         :param track: Source :class:`MediaStreamTrack` which is relayed.
         :param buffered: Whether there need a buffer between the source track and
             relayed track.
+        :param queue_size: The capacity of the buffer.
+        :param queue_policy: What happens when the buffer is full, see
+            :class:`MediaQueue`. By default audio is never dropped and video
+            drops the oldest frames. With `'block'`, a slow consumer holds up
+            all the consumers of the source track.
 
         :rtype: :class: MediaStreamTrack
         """
-        proxy = RelayStreamTrack(self, track, buffered)
+        proxy = RelayStreamTrack(self, track, buffered, queue_size, queue_policy)
         self.__log_debug("Create proxy %s for source %s", id(proxy), id(track))
         if track not in self.__proxies:
             self.__proxies[track] = set()
@@ -620,9 +790,11 @@ class MediaRelay:
                 frame = await track.recv()
             except MediaStreamError:
                 frame = None
-            for proxy in self.__proxies[track]:
+            for proxy in list(self.__proxies[track]):
+                if proxy.readyState != "live":
+                    continue
                 if proxy._buffered:
-                    proxy._queue.put_nowait(frame)
+                    await proxy._queue.put(frame)
                 else:
                     proxy._frame = frame
                     proxy._new_frame_event.set()
@@ -0,0 +1,468 @@
+"""
+In-process network emulation.
+
+The UDP endpoints created by ICE are attached to an emulated network instead
+of sockets, and the datagrams they send cross links with a limited bandwidth,
+a propagation delay, a bounded queue and losses. Driven by a virtual clock,
+a connection over such links is reproducible and runs as fast as the CPU
+allows.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import errno
+import random
+import selectors
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, Optional
+
+from .. import clock
+
+# the IPv4 and UDP headers also use the bandwidth of a link
+IP_UDP_OVERHEAD = 28
+
+# RED drops packets with a probability rising from 0 to RED_MAX_PROBABILITY
+# as the average queue fills from RED_MIN_THRESHOLD to RED_MAX_THRESHOLD
+RED_MAX_PROBABILITY = 0.1
+RED_MAX_THRESHOLD = 0.75
+RED_MIN_THRESHOLD = 0.25
+RED_WEIGHT = 0.002
+
+# each iteration of a loop with a virtual clock takes this long, so that the
+# timers rounded to the current time cannot keep the clock from advancing
+VIRTUAL_CLOCK_TICK = 1e-6
+
+# the ports handed out to endpoints which do not ask for one
+EPHEMERAL_PORT_START = 49152
+
+_current_link: contextvars.ContextVar[Optional["EmulatedLink"]] = (
+    contextvars.ContextVar("current_link", default=None)
+)
+
+
+class LossModel(ABC):
+    """
+    Decides which of the packets crossing a link are lost.
+    """
+
+    @abstractmethod
+    def lost(self, now: float) -> bool:
+        """
+        Return whether the packet sent at loop time `now` is lost.
+        """
+
+
+class RandomLoss(LossModel):
+    """
+    Loses packets independently of each other.
+
+    :param probability: The probability of losing a packet, between 0 and 1.
+    :param seed: The seed of the random numbers, for reproducible losses.
+    """
+
+    def __init__(self, probability: float, seed: int = 0) -> None:
+        self.probability = probability
+        self.__random = random.Random(seed)
+
+    def lost(self, now: float) -> bool:
+        return self.__random.random() < self.probability
+
+
+class TraceLoss(LossModel):
+    """
+    Replays a loss trace, such as those of `simulation_loss/cellular_traces_90s.py`.
+
+    The trace is made of segments, the i-th one lasting `gaps[i]` seconds
+    during which `loss[i]` percent of the packets are lost. There are no more
+    losses once the trace is over.
+
+    :param gaps: The duration of the segments, in seconds.
+    :param loss: The loss of the segments, in percent.
+    :param start: The loop time at which the trace starts, by default when the
+                  first packet is sent.
+    :param seed: The seed of the random numbers, for reproducible losses.
+    """
+
+    def __init__(
+        self,
+        gaps: Sequence[float],
+        loss: Sequence[float],
+        start: Optional[float] = None,
+        seed: int = 0,
+    ) -> None:
+        if len(gaps) != len(loss):
+            raise ValueError("A loss trace needs as many gaps as losses")
+
+        self.start = start
+        self.__ends: list[float] = []
+        self.__loss = [value / 100 for value in loss]
+        self.__random = random.Random(seed)
+
+        end = 0.0
+        for gap in gaps:
+            end += gap
+            self.__ends.append(end)
+
+    @property
+    def duration(self) -> float:
+        """
+        The duration of the trace, in seconds.
+        """
+        return self.__ends[-1] if self.__ends else 0.0
+
+    def loss_at(self, elapsed: float) -> float:
+        """
+        Return the probability of losing a packet `elapsed` seconds into the trace.
+        """
+        index = bisect.bisect_right(self.__ends, elapsed)
+        if elapsed < 0 or index >= len(self.__ends):
+            return 0.0
+        return self.__loss[index]
+
+    def lost(self, now: float) -> bool:
+        if self.start is None:
+            self.start = now
+        probability = self.loss_at(now - self.start)
+        return probability > 0 and self.__random.random() < probability
+
+
+class EmulatedLinkStats:
+    def __init__(self) -> None:
+        self.bytes_delivered = 0
+        self.packets_delivered = 0
+        self.packets_dropped = 0
+        self.packets_lost = 0
+        self.packets_sent = 0
+
+
+class EmulatedLink:
+    """
+    A one-way link, which transmits the packets of its queue one after the
+    other at `bandwidth`, and delivers them after `delay`.
+
+    :param bandwidth: The bandwidth in bits per second, or `None` for unlimited.
+    :param delay: The one-way propagation delay, in seconds.
+    :param queue_size: The number of packets the queue holds.
+    :param queue: The queue management, `"droptail"` to drop the packets which
+                  do not fit in the queue, or `"red"` to drop packets early as
+                  the queue fills up.
+    :param loss: The :class:`LossModel` of the packets leaving the queue, or
+                 `None` for no losses.
+    :param seed: The seed of the random numbers used by RED.
+    """
+
+    def __init__(
+        self,
+        bandwidth: Optional[int] = None,
+        delay: float = 0.0,
+        queue_size: int = 100,
+        queue: str = "droptail",
+        loss: Optional[LossModel] = None,
+        seed: int = 0,
+    ) -> None:
+        if queue not in ("droptail", "red"):
+            raise ValueError("Queue management must be 'droptail' or 'red'")
+
+        self.bandwidth = bandwidth
+        self.delay = delay
+        self.loss = loss
+        self.queue = queue
+        self.queue_size = queue_size
+        self.stats = EmulatedLinkStats()
+
+        self.__average_queue = 0.0
+        self.__busy_until = 0.0
+        self.__departures: deque[float] = deque()
+        self.__in_flight: deque[tuple[bytes, Callable[[bytes], None]]] = deque()
+        self.__random = random.Random(seed)
+
+    def queue_length(self, now: float) -> int:
+        """
+        Return the number of packets waiting to be transmitted at loop time `now`.
+        """
+        while self.__departures and self.__departures[0] <= now:
+            self.__departures.popleft()
+        return len(self.__departures)
+
+    def send(self, data: bytes, deliver: Callable[[bytes], None]) -> None:
+        """
+        Send a packet, which is handed to `deliver` if it crosses the link.
+        """
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        self.stats.packets_sent += 1
+
+        if self.__drop(self.queue_length(now)):
+            self.stats.packets_dropped += 1
+            return
+
+        # a lost packet still uses the bandwidth of the link
+        if self.bandwidth:
+            departure = max(now, self.__busy_until) + (
+                (len(data) + IP_UDP_OVERHEAD) * 8 / self.bandwidth
+            )
+            self.__busy_until = departure
+            self.__departures.append(departure)
+        else:
+            departure = now
+        if self.loss is not None and self.loss.lost(now):
+            self.stats.packets_lost += 1
+            return
+
+        # the timers of simultaneous packets may fire in any order, so each of
+        # them delivers the oldest packet in flight
+        self.__in_flight.append((data, deliver))
+        loop.call_at(departure + self.delay, self.__deliver)
+
+    def __deliver(self) -> None:
+        data, deliver = self.__in_flight.popleft()
+        self.stats.bytes_delivered += len(data)
+        self.stats.packets_delivered += 1
+        deliver(data)
+
+    def __drop(self, queue_length: int) -> bool:
+        if queue_length >= self.queue_size:
+            return True
+        if self.queue != "red":
+            return False
+
+        self.__average_queue += RED_WEIGHT * (queue_length - self.__average_queue)
+        fill = self.__average_queue / self.queue_size
+        if fill < RED_MIN_THRESHOLD:
+            return False
+        elif fill >= RED_MAX_THRESHOLD:
+            return True
+        probability = (
+            RED_MAX_PROBABILITY
+            * (fill - RED_MIN_THRESHOLD)
+            / (RED_MAX_THRESHOLD - RED_MIN_THRESHOLD)
+        )
+        return self.__random.random() < probability
+
+
+class EmulatedTransport(asyncio.DatagramTransport):
+    """
+    A UDP endpoint of an :class:`EmulatedNetwork`, whose datagrams cross
+    `link` on their way out.
+    """
+
+    def __init__(
+        self,
+        network: "EmulatedNetwork",
+        protocol: asyncio.DatagramProtocol,
+        local_addr: tuple[str, int],
+        link: Optional[EmulatedLink],
+    ) -> None:
+        super().__init__({"sockname": local_addr})
+        self.link = link
+        self.local_addr = local_addr
+
+        self.__closing = False
+        self.__network = network
+        self.__protocol = protocol
+
+    def abort(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.__closing:
+            return
+        self.__closing = True
+        self.__network._unbind(self)
+        asyncio.get_event_loop().call_soon(self.__protocol.connection_lost, None)
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        return self.__protocol
+
+    def is_closing(self) -> bool:
+        return self.__closing
+
+    def sendto(self, data: Any, addr: Any = None) -> None:
+        if not self.__closing:
+            self.__network._send(self, bytes(data), (addr[0], addr[1]))
+
+    def _receive(self, data: bytes, addr: tuple[str, int]) -> None:
+        if not self.__closing:
+            self.__protocol.datagram_received(data, addr)
+
+
+class EmulatedNetwork:
+    """
+    The UDP endpoints of an :class:`EmulatedEventLoop`, by address.
+
+    The datagrams sent by an endpoint cross the link which was current when
+    it was created, see :meth:`link`. Datagrams sent to an address without an
+    endpoint are silently dropped.
+    """
+
+    def __init__(self) -> None:
+        self.__endpoints: dict[tuple[str, int], EmulatedTransport] = {}
+        self.__next_port: dict[str, int] = {}
+
+    async def create_datagram_endpoint(
+        self,
+        protocol_factory: Callable[[], asyncio.DatagramProtocol],
+        local_addr: tuple[str, int],
+    ) -> tuple[EmulatedTransport, asyncio.DatagramProtocol]:
+        """
+        Create a UDP endpoint bound to `local_addr`, picking a free port if
+        its port is 0.
+        """
+        host, port = local_addr[0], local_addr[1]
+        if not port:
+            port = self.__next_port.get(host, EPHEMERAL_PORT_START)
+            while (host, port) in self.__endpoints:
+                port += 1
+            self.__next_port[host] = port + 1
+        elif (host, port) in self.__endpoints:
+            raise OSError(errno.EADDRINUSE, "Address already in use")
+
+        protocol = protocol_factory()
+        transport = EmulatedTransport(
+            network=self,
+            protocol=protocol,
+            local_addr=(host, port),
+            link=_current_link.get(),
+        )
+        self.__endpoints[transport.local_addr] = transport
+        protocol.connection_made(transport)
+        return transport, protocol
+
+    @contextlib.contextmanager
+    def link(self, link: EmulatedLink) -> Iterator[EmulatedLink]:
+        """
+        Make the endpoints created in this context, including those of the
+        tasks it starts, send their datagrams over `link`.
+
+        For instance to emulate the uplink of a peer connection::
+
+            with network.link(EmulatedLink(bandwidth=1000000, delay=0.02)):
+                await pc.setLocalDescription(await pc.createOffer())
+        """
+        token = _current_link.set(link)
+        try:
+            yield link
+        finally:
+            _current_link.reset(token)
+
+    def _send(
+        self, source: EmulatedTransport, data: bytes, addr: tuple[str, int]
+    ) -> None:
+        def deliver(data: bytes) -> None:
+            destination = self.__endpoints.get(addr)
+            if destination is not None:
+                destination._receive(data, source.local_addr)
+
+        if source.link is None:
+            asyncio.get_event_loop().call_soon(deliver, data)
+        else:
+            source.link.send(data, deliver)
+
+    def _unbind(self, transport: EmulatedTransport) -> None:
+        if self.__endpoints.get(transport.local_addr) is transport:
+            del self.__endpoints[transport.local_addr]
+
+
+class VirtualClockSelector(selectors.DefaultSelector):
+    """
+    A selector which, instead of waiting for a timer, skips to it.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pending_jobs = 0
+        self.time = time.monotonic()
+
+    def select(
+        self, timeout: Optional[float] = None
+    ) -> list[tuple[selectors.SelectorKey, int]]:
+        # the work done in threads takes no virtual time
+        if self.pending_jobs or timeout is None:
+            return super().select(timeout)
+
+        events = super().select(0)
+        if not events:
+            self.time += timeout
+        self.time += VIRTUAL_CLOCK_TICK
+        return events
+
+
+class EmulatedEventLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop whose UDP endpoints are attached to an :class:`EmulatedNetwork`.
+
+    Only the endpoints bound to a local address, such as the ICE host
+    candidates, are emulated. Use an empty list of `iceServers` to keep
+    the peer connections off the real network.
+
+    With a virtual clock, the loop skips to its next timer whenever it is
+    idle, and :mod:`aiortc.clock` follows it while the loop runs. The work
+    submitted with :meth:`run_in_executor`, such as encoding video, is
+    waited for and takes no virtual time.
+
+    :param network: The :class:`EmulatedNetwork`, by default a new one.
+    :param virtual_clock: Whether to use a virtual clock.
+    """
+
+    def __init__(
+        self, network: Optional[EmulatedNetwork] = None, virtual_clock: bool = True
+    ) -> None:
+        self.network = network if network is not None else EmulatedNetwork()
+
+        self.__selector: Optional[VirtualClockSelector] = None
+        if virtual_clock:
+            self.__selector = VirtualClockSelector()
+            self.__epoch = time.time() - self.__selector.time
+        super().__init__(self.__selector)
+
+    async def create_datagram_endpoint(  # type: ignore[override]
+        self,
+        protocol_factory: Callable[[], asyncio.DatagramProtocol],
+        local_addr: Optional[tuple[str, int]] = None,
+        remote_addr: Optional[tuple[str, int]] = None,
+        **kwargs: Any,
+    ) -> tuple[asyncio.DatagramTransport, asyncio.DatagramProtocol]:
+        if local_addr is None or remote_addr is not None or kwargs:
+            return await super().create_datagram_endpoint(
+                protocol_factory,
+                local_addr=local_addr,
+                remote_addr=remote_addr,
+                **kwargs,
+            )
+        return await self.network.create_datagram_endpoint(protocol_factory, local_addr)
+
+    def run_forever(self) -> None:
+        if self.__selector is None:
+            return super().run_forever()
+
+        clock.set_time_source(self.__wall_time)
+        try:
+            super().run_forever()
+        finally:
+            clock.set_time_source(None)
+
+    def run_in_executor(  # type: ignore[override]
+        self, executor: Any, func: Any, *args: Any
+    ) -> Any:
+        future = super().run_in_executor(executor, func, *args)
+        if self.__selector is not None:
+            self.__selector.pending_jobs += 1
+            future.add_done_callback(self.__job_done)
+        return future
+
+    def time(self) -> float:
+        if self.__selector is None:
+            return super().time()
+        return self.__selector.time
+
+    def __job_done(self, future: asyncio.Future) -> None:
+        assert self.__selector is not None
+        self.__selector.pending_jobs -= 1
+
+    def __wall_time(self) -> float:
+        return self.__epoch + self.time()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from av.frame import Frame
+
+from .codecs import get_decoder
+from .codecs.base import Decoder
+from .jitterbuffer import JitterFrame
+from .rtcrtpparameters import RTCRtpCodecParameters
+
+logger = logging.getLogger(__name__)
+
+# a stream gives its worker back after this many frames, to be fair to others
+MAX_FRAMES_PER_RUN = 8
+
+
+def default_workers() -> int:
+    """
+    The number of decoder threads, which can be set with the
+    `AIORTC_DECODER_THREADS` environment variable.
+    """
+    try:
+        workers = int(os.getenv("AIORTC_DECODER_THREADS", "0"))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+class DecoderStreamStats:
+    def __init__(self) -> None:
+        self.frames_decoded = 0
+        self.total_decode_time = 0.0
+        self.total_queue_delay = 0.0
+
+
+class DecoderStream:
+    """
+    The encoded frames of one receiver, decoded in order by the threads of a
+    :class:`DecoderPool`.
+
+    The decoded frames are handed to `deliver` on the event loop, in batches.
+    `None` is delivered once the stream has been closed.
+    """
+
+    def __init__(
+        self,
+        pool: "DecoderPool",
+        loop: asyncio.AbstractEventLoop,
+        deliver: Callable[[list[Optional[Frame]]], None],
+    ) -> None:
+        self.stats = DecoderStreamStats()
+
+        self._codec_name: Optional[str] = None
+        self._decoder: Optional[Decoder] = None
+        self._deliver = deliver
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._pending: deque[
+            Optional[tuple[RTCRtpCodecParameters, JitterFrame, float]]
+        ] = deque()
+        self._pool = pool
+        self._running = False
+
+    def close(self) -> None:
+        """
+        Stop decoding once the pending frames have been decoded.
+        """
+        self._put(None)
+
+    def decode(self, codec: RTCRtpCodecParameters, encoded_frame: JitterFrame) -> None:
+        self._put((codec, encoded_frame, time.monotonic()))
+
+    def _put(
+        self, task: Optional[tuple[RTCRtpCodecParameters, JitterFrame, float]]
+    ) -> None:
+        with self._lock:
+            self._pending.append(task)
+            if self._running:
+                return
+            self._running = True
+        self._pool._submit(self._run)
+
+    def _run(self) -> None:
+        """
+        Decode the pending frames, in the worker thread.
+        """
+        frames: list[Optional[Frame]] = []
+        for i in range(MAX_FRAMES_PER_RUN):
+            with self._lock:
+                if not self._pending:
+                    break
+                task = self._pending.popleft()
+
+            if task is None:
+                # inform the track that it has ended
+                self._decoder = None
+                frames.append(None)
+                break
+
+            codec, encoded_frame, queued = task
+            if codec.name != self._codec_name:
+                self._decoder = get_decoder(codec)
+                self._codec_name = codec.name
+
+            started = time.monotonic()
+            try:
+                frames.extend(self._decoder.decode(encoded_frame))
+            except Exception:
+                logger.exception("DecoderStream(%s) failed to decode", codec.name)
+            finished = time.monotonic()
+            self.stats.frames_decoded += 1
+            self.stats.total_decode_time += finished - started
+            self.stats.total_queue_delay += started - queued
+
+        if frames:
+            try:
+                self._loop.call_soon_threadsafe(self._deliver, frames)
+            except RuntimeError:
+                # the event loop is closed
+                pass
+
+        with self._lock:
+            if frames and frames[-1] is None:
+                self._pending.clear()
+            if not self._pending:
+                self._running = False
+                return
+        self._pool._submit(self._run)
+
+
+class DecoderPool:
+    """
+    Threads which decode the frames received by all the receivers.
+
+    The frames of each stream are decoded in order, and a stream only ever
+    uses one thread at a time.
+
+    :param workers: The number of threads, see :func:`default_workers`.
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._workers = workers
+
+    @property
+    def workers(self) -> int:
+        return self._workers or default_workers()
+
+    def create_stream(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        deliver: Callable[[list[Optional[Frame]]], None],
+    ) -> DecoderStream:
+        return DecoderStream(self, loop, deliver)
+
+    def _submit(self, fn: Callable[[], None]) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="decoder"
+                )
+        self._executor.submit(fn)
+
+
+default_pool = DecoderPool()
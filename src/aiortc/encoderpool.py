@@ -0,0 +1,382 @@
+import asyncio
+import math
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Optional, Union
+
+from av import VideoFrame
+from av.frame import Frame
+from av.packet import Packet
+
+from .codecs import get_encoder
+from .codecs.base import Encoder, EncoderStats
+from .mediastreams import MediaStreamTrack
+from .rtcrtpparameters import RTCRtpCodecParameters
+
+# senders whose target bitrates are within this ratio may share an encoder
+BITRATE_BUCKET_RATIO = 1.5
+
+# a sender only changes bucket once its target is this far past the boundary
+BITRATE_BUCKET_HYSTERESIS = 1.1
+
+# number of encoded frames kept for the senders which lag behind
+ENCODED_FRAME_CACHE_SIZE = 8
+
+# seconds beyond which a frame older than the last one encoded is taken for a
+# restart of the source, rather than for a frame a sender lags behind with
+STALE_FRAME_WINDOW = 5.0
+
+EncodeResult = tuple[list[bytes], int]
+PoolKey = tuple[object, str, int, tuple, float, Optional[int]]
+
+
+def bitrate_bucket(bitrate: Optional[int]) -> Optional[int]:
+    """
+    Return the bucket of similar target bitrates `bitrate` belongs to.
+    """
+    if not bitrate or bitrate <= 0:
+        return None
+    return math.floor(math.log(bitrate, BITRATE_BUCKET_RATIO))
+
+
+def scale_frame(frame: VideoFrame, scale: float) -> VideoFrame:
+    """
+    Scale a video frame down by `scale`, keeping its dimensions even.
+    """
+    width = max(2, int(frame.width / scale) // 2 * 2)
+    height = max(2, int(frame.height / scale) // 2 * 2)
+    return frame.reformat(width=width, height=height)
+
+
+def track_source(track: MediaStreamTrack) -> MediaStreamTrack:
+    """
+    Return the track whose frames `track` delivers.
+
+    The proxies created by :class:`aiortc.contrib.media.MediaRelay` deliver
+    the very same frames as their source, so they can share an encoder.
+    """
+    source = getattr(track, "_source", None)
+    if isinstance(source, MediaStreamTrack):
+        return source
+    return track
+
+
+class EncodedFrame:
+    def __init__(
+        self,
+        data: Union[Frame, Packet],
+        sequence: int,
+        keyframe: bool,
+        result: "asyncio.Future[EncodeResult]",
+    ) -> None:
+        self.data = data
+        self.keyframe = keyframe
+        self.result = result
+        self.sequence = sequence
+
+
+class SharedEncoder:
+    """
+    Encoder whose output is shared by all the senders which send frames from
+    the same source track, with the same codec, scale and a similar target
+    bitrate.
+
+    Each frame is encoded once, and keyframe requests from the senders are
+    coalesced into the next encoded frame.
+
+    As every encoded frame may reference the previous one, a sender which
+    skipped a frame is only given a keyframe: either the frame it asks for
+    is encoded as one, or it gets no payloads until the next keyframe.
+    """
+
+    def __init__(self, encoder: Encoder, scale: float = 1.0) -> None:
+        self.encoder = encoder
+        self.handles: set["SharedEncoderHandle"] = set()
+        self.scale = scale
+
+        self._force_keyframe = False
+        self._lock = asyncio.Lock()
+        self._results: OrderedDict[int, EncodedFrame] = OrderedDict()
+        self._sequence = 0
+
+    def request_keyframe(self) -> None:
+        self._force_keyframe = True
+
+    async def encode(
+        self, handle: "SharedEncoderHandle", data: Union[Frame, Packet]
+    ) -> EncodeResult:
+        """
+        Encode a frame, or pack a pre-encoded packet, unless another sender
+        already did.
+
+        No payloads are returned if the sender of `handle` skipped a frame
+        which the encoded frame references.
+        """
+        restart = False
+        if isinstance(data, Frame):
+            restart = self._is_restart(handle, data)
+            handle._last_pts = data.pts
+
+        entry = self._results.get(id(data))
+        if entry is None or entry.data is not data:
+            if isinstance(data, Frame) and not restart and self._is_stale(data):
+                # the frame was encoded and evicted, encoding it again would
+                # break the references of the following frames
+                return self._miss(handle, None)
+
+            # a restarted source, such as a looping file, starts over with
+            # a keyframe rather than being taken for frames already sent
+            keyframe = (
+                self._force_keyframe
+                or restart
+                or (isinstance(data, Frame) and handle._last != self._sequence)
+            )
+            self._force_keyframe = False
+            self._sequence += 1
+
+            # the encoding is not cancelled along with the sender asking
+            # for it, as the other senders may be waiting for it
+            entry = EncodedFrame(
+                data,
+                self._sequence,
+                keyframe,
+                asyncio.ensure_future(self._encode(data, keyframe)),
+            )
+            self._results[id(data)] = entry
+            while len(self._results) > ENCODED_FRAME_CACHE_SIZE:
+                self._results.popitem(last=False)
+        elif (
+            isinstance(data, Frame)
+            and not entry.keyframe
+            and handle._last != entry.sequence - 1
+        ):
+            return self._miss(handle, entry.sequence)
+
+        handle._last = entry.sequence
+        return await asyncio.shield(entry.result)
+
+    async def _encode(
+        self, data: Union[Frame, Packet], force_keyframe: bool
+    ) -> EncodeResult:
+        async with self._lock:
+            if not isinstance(data, Frame):
+                return self.encoder.pack(data)
+
+            # encode at the lowest target of the senders, so that no
+            # receiver is sent more than it asked for
+            targets = [h._target for h in self.handles if h._target]
+            if targets and hasattr(self.encoder, "target_bitrate"):
+                self.encoder.target_bitrate = min(targets)
+
+            return await asyncio.get_event_loop().run_in_executor(
+                None, self._encode_frame, data, force_keyframe
+            )
+
+    def _encode_frame(self, frame: Frame, force_keyframe: bool) -> EncodeResult:
+        if self.scale > 1 and isinstance(frame, VideoFrame):
+            frame = scale_frame(frame, self.scale)
+        return self.encoder.encode(frame, force_keyframe)
+
+    def _is_restart(self, handle: "SharedEncoderHandle", frame: Frame) -> bool:
+        """
+        Return whether `frame` is older than the last frame the sender of
+        `handle` asked for, which means the source started over.
+        """
+        return (
+            frame.pts is not None
+            and handle._last_pts is not None
+            and frame.pts < handle._last_pts
+        )
+
+    def _is_stale(self, frame: Frame) -> bool:
+        """
+        Return whether `frame` is no newer than the last frame encoded, and
+        so was already encoded or skipped by all the senders.
+        """
+        if frame.pts is None or frame.time_base is None or not self._results:
+            return False
+        last = next(reversed(self._results.values())).data
+        if not isinstance(last, Frame) or last.pts is None:
+            return False
+        return 0 <= (last.pts - frame.pts) * frame.time_base < STALE_FRAME_WINDOW
+
+    def _miss(
+        self, handle: "SharedEncoderHandle", sequence: Optional[int]
+    ) -> EncodeResult:
+        # a keyframe the sender will reach may already be on its way
+        handle._last = None
+        if not any(
+            entry.keyframe and (sequence is None or entry.sequence > sequence)
+            for entry in self._results.values()
+        ):
+            self.request_keyframe()
+        return [], 0
+
+
+class SharedEncoderHandle:
+    """
+    A sender's view of the :class:`SharedEncoder` matching its track, codec,
+    scale and target bitrate.
+
+    Setting :attr:`target_bitrate` moves the sender to another shared encoder
+    when the new target falls in a different bitrate bucket.
+    """
+
+    def __init__(
+        self,
+        pool: "EncoderPool",
+        track: MediaStreamTrack,
+        codec: RTCRtpCodecParameters,
+        scale: float,
+    ) -> None:
+        self._bucket: Optional[int] = None
+        self._codec = codec
+        self._last: Optional[int] = None
+        self._last_pts: Optional[int] = None
+        self._pool = pool
+        self._scale = scale
+        self._shared: Optional[SharedEncoder] = None
+        self._source = track_source(track)
+        self._track = track
+        self._target: Optional[int] = None
+        self._attach()
+
+    @property
+    def stats(self) -> Optional[EncoderStats]:
+        """
+        The statistics of the shared encoder, if it keeps any.
+        """
+        if self._shared is None:
+            return None
+        return getattr(self._shared.encoder, "stats", None)
+
+    @property
+    def target_bitrate(self) -> Optional[int]:
+        """
+        The target bitrate of the sender, or else that of the encoder.
+        """
+        if self._target is None and self._shared is not None:
+            return getattr(self._shared.encoder, "target_bitrate", None)
+        return self._target
+
+    @target_bitrate.setter
+    def target_bitrate(self, bitrate: Optional[int]) -> None:
+        self._target = bitrate
+        if self._shared is None or self._bucket == bitrate_bucket(bitrate):
+            return
+
+        # do not flap between two encoders around a bucket boundary
+        if (
+            bitrate
+            and self._bucket is not None
+            and self._bucket
+            in (
+                bitrate_bucket(int(bitrate * BITRATE_BUCKET_HYSTERESIS)),
+                bitrate_bucket(int(bitrate / BITRATE_BUCKET_HYSTERESIS)),
+            )
+        ):
+            return
+
+        self._detach()
+        self._attach()
+
+    def close(self) -> None:
+        """
+        Stop using the shared encoder.
+        """
+        if self._shared is not None:
+            self._detach()
+
+    async def encode(
+        self, data: Union[Frame, Packet], force_keyframe: bool = False
+    ) -> EncodeResult:
+        assert self._shared is not None, "encoder handle is closed"
+        if force_keyframe:
+            self._shared.request_keyframe()
+        return await self._shared.encode(self, data)
+
+    def _attach(self) -> None:
+        # only the proxies of a relay are handed the same frames, the senders
+        # of a track each read different frames from it
+        owner = self._source if self._source is not self._track else self
+        self._bucket = bitrate_bucket(self._target)
+        self._last = None
+        self._last_pts = None
+        self._shared = self._pool._get(owner, self._codec, self._scale, self._target)
+        self._shared.handles.add(self)
+
+        # the receiver cannot decode anything before a keyframe
+        self._shared.request_keyframe()
+
+    def _detach(self) -> None:
+        assert self._shared is not None
+        self._shared.handles.discard(self)
+        if not self._shared.handles:
+            self._pool._release(self._shared)
+        self._shared = None
+
+
+class EncoderPool:
+    """
+    The shared encoders in use, by source track, codec and bitrate bucket.
+
+    Only the senders of :class:`aiortc.contrib.media.MediaRelay` proxies share
+    encoders, a sender of any other track has an encoder of its own.
+
+    :param factory: A function creating an encoder for a codec.
+    """
+
+    def __init__(
+        self, factory: Callable[[RTCRtpCodecParameters], Encoder] = get_encoder
+    ) -> None:
+        self._encoders: dict[PoolKey, SharedEncoder] = {}
+        self._factory = factory
+
+    def __len__(self) -> int:
+        return len(self._encoders)
+
+    def acquire(
+        self,
+        track: MediaStreamTrack,
+        codec: RTCRtpCodecParameters,
+        scale: float = 1.0,
+    ) -> SharedEncoderHandle:
+        """
+        Return a handle to the encoder for the frames of `track`, which must
+        be closed once the sender is done with it.
+
+        :param scale: The factor by which video frames are scaled down before
+                      being encoded.
+        """
+        return SharedEncoderHandle(self, track, codec, scale)
+
+    def _get(
+        self,
+        owner: object,
+        codec: RTCRtpCodecParameters,
+        scale: float,
+        bitrate: Optional[int],
+    ) -> SharedEncoder:
+        key: PoolKey = (
+            owner,
+            codec.mimeType.lower(),
+            codec.clockRate,
+            tuple(sorted(codec.parameters.items())),
+            scale,
+            bitrate_bucket(bitrate),
+        )
+        shared = self._encoders.get(key)
+        if shared is None:
+            encoder = self._factory(codec)
+            if bitrate and hasattr(encoder, "target_bitrate"):
+                encoder.target_bitrate = bitrate
+            shared = self._encoders[key] = SharedEncoder(encoder, scale)
+        return shared
+
+    def _release(self, shared: SharedEncoder) -> None:
+        for key, value in list(self._encoders.items()):
+            if value is shared:
+                del self._encoders[key]
+
+
+default_pool = EncoderPool()
@@ -0,0 +1,142 @@
+import atexit
+import json
+import os
+import random
+import threading
+from collections import deque
+from typing import Optional, TextIO
+
+from . import clock
+
+# events are written out at least this often, in seconds
+FLUSH_INTERVAL = 0.5
+
+# maximum number of events waiting to be written, older ones are dropped
+MAX_PENDING_EVENTS = 65536
+
+# environment variable giving the fraction of events which are kept
+SAMPLING_VARIABLE = "AIORTC_EVENT_LOG_SAMPLING"
+
+
+class EventLog:
+    """
+    Non-blocking sink for experiment events.
+
+    :meth:`log` only appends the event to a bounded buffer, a background
+    thread formats the events and writes them to `path`. Events are written
+    as JSON lines, or as comma-separated values if `format` is `"csv"`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        format: str = "jsonl",
+        sample_rate: float = 1.0,
+        capacity: int = MAX_PENDING_EVENTS,
+    ) -> None:
+        if format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported event log format {format}")
+
+        self.dropped = 0
+        self.path = path
+        self._format = format
+        self._pending: deque[tuple[float, str, dict]] = deque(maxlen=capacity)
+        self._sample_rate = sample_rate
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """
+        Write out the pending events and stop the background thread.
+        """
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+
+    def log(self, event: str, **fields: object) -> None:
+        """
+        Record an event.
+
+        With the `"csv"` format, the event name is not written and the
+        fields are written in the order they are given.
+        """
+        if self._sample_rate < 1.0 and random.random() >= self._sample_rate:
+            return
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((clock.current_time(), event, fields))
+
+    def _format_event(self, timestamp: float, event: str, fields: dict) -> str:
+        if self._format == "csv":
+            return ", ".join([f"{timestamp:.3f}"] + [str(v) for v in fields.values()])
+        return json.dumps({"time": round(timestamp, 3), "event": event, **fields})
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as fp:
+            while not self._stop.wait(FLUSH_INTERVAL):
+                self._write(fp)
+            self._write(fp)
+
+    def _write(self, fp: TextIO) -> None:
+        lines = []
+        while self._pending:
+            lines.append(self._format_event(*self._pending.popleft()))
+        if lines:
+            fp.write("\n".join(lines) + "\n")
+            fp.flush()
+
+
+_event_logs: dict[str, Optional[EventLog]] = {}
+_lock = threading.Lock()
+
+
+def configure(
+    name: str,
+    path: Optional[str],
+    format: str = "jsonl",
+    sample_rate: Optional[float] = None,
+) -> Optional[EventLog]:
+    """
+    Set up the event log called `name` to write to `path`, or disable it if
+    `path` is `None`.
+    """
+    if sample_rate is None:
+        try:
+            sample_rate = float(os.getenv(SAMPLING_VARIABLE, "1"))
+        except ValueError:
+            sample_rate = 1.0
+
+    event_log = EventLog(path, format=format, sample_rate=sample_rate) if path else None
+    with _lock:
+        previous = _event_logs.get(name)
+        _event_logs[name] = event_log
+    if previous is not None:
+        previous.close()
+    return event_log
+
+
+def get(name: str, format: str = "jsonl") -> Optional[EventLog]:
+    """
+    Return the event log called `name`.
+
+    If it was not configured, the path is read once from the environment
+    variable of the same name.
+    """
+    try:
+        return _event_logs[name]
+    except KeyError:
+        return configure(name, os.getenv(name), format=format)
+
+
+@atexit.register
+def close_all() -> None:
+    """
+    Write out the pending events of all the event logs.
+    """
+    with _lock:
+        event_logs = list(_event_logs.values())
+        _event_logs.clear()
+    for event_log in event_logs:
+        if event_log is not None:
+            event_log.close()
@@ -0,0 +1,346 @@
+import math
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+from struct import Struct
+from typing import Optional, Union
+
+from .rtp import RtpPacket
+from .utils import uint16_add
+
+# R, F, P, X, CC, M, PT, length and timestamp recovery, SSRCCount, SSRC, SN base
+FLEXFEC_HEADER = Struct("!BBHLB3xLH")
+
+# the sizes of the packet masks, a FEC packet protects at most 109 packets
+FEC_MASK_SIZES = (15, 46, 109)
+MAX_PROTECTED_PACKETS = FEC_MASK_SIZES[-1]
+
+# protection level, as FEC packets per media packet
+FEC_LOSS_DECAY = 0.8
+FEC_LOSS_FACTOR = 2.0
+FEC_MAX_RATE = 0.5
+FEC_MIN_LOSS = 0.01
+
+# the share of the bitrate spent on FEC is averaged over the recent frames
+FEC_OVERHEAD_ALPHA = 0.9
+
+# the number of packets the decoder keeps to repair others
+FEC_RECOVERY_WINDOW = 512
+MAX_PENDING_FEC_PACKETS = 128
+
+
+def pack_packet_mask(offsets: list[int]) -> bytes:
+    """
+    Pack the offsets of the protected packets from the SN base.
+    """
+    size = next(s for s in FEC_MASK_SIZES if max(offsets) < s)
+    mask = 0
+    for offset in offsets:
+        mask |= 1 << (size - 1 - offset)
+
+    # a K bit precedes each chunk of the mask, and is set on the last one
+    data = b""
+    for chunk_size, chunk_bits in zip(FEC_MASK_SIZES, (15, 31, 63)):
+        k = 1 if chunk_size == size else 0
+        bits = (mask >> (size - chunk_size)) & ((1 << chunk_bits) - 1)
+        data += ((k << chunk_bits) | bits).to_bytes((chunk_bits + 1) // 8, "big")
+        if k:
+            break
+    return data
+
+
+def unpack_packet_mask(data: Union[bytes, memoryview]) -> tuple[list[int], int]:
+    """
+    Unpack a packet mask, returning the offsets of the protected packets and
+    the length of the mask.
+    """
+    offsets = []
+    pos = 0
+    start = 0
+    for chunk_size, chunk_bits in zip(FEC_MASK_SIZES, (15, 31, 63)):
+        length = (chunk_bits + 1) // 8
+        if len(data) < pos + length:
+            raise ValueError("FEC packet mask is truncated")
+        chunk = int.from_bytes(data[pos : pos + length], "big")
+        pos += length
+        for i in range(chunk_bits):
+            if chunk & (1 << (chunk_bits - 1 - i)):
+                offsets.append(start + i)
+        start = chunk_size
+        if chunk >> chunk_bits:
+            break
+    return offsets, pos
+
+
+def xor_payloads(payloads: Sequence[Union[bytes, memoryview]], length: int) -> bytes:
+    """
+    XOR payloads together, the shorter ones being padded with zeros.
+    """
+    value = 0
+    for payload in payloads:
+        value ^= int.from_bytes(payload, "big") << (8 * (length - len(payload)))
+    return value.to_bytes(length, "big")
+
+
+@dataclass
+class FecPacket:
+    """
+    A FlexFEC repair packet, as described in draft-ietf-payload-flexible-fec-scheme-03.
+
+    The payload of the protected packets, their marker bit, payload type,
+    payload length and timestamp are protected. Their CSRCs and header
+    extensions are not.
+    """
+
+    ssrc: int
+    seq_base: int
+    offsets: list[int]
+    marker_recovery: int = 0
+    payload_type_recovery: int = 0
+    length_recovery: int = 0
+    timestamp_recovery: int = 0
+    payload: bytes = b""
+
+    def __bytes__(self) -> bytes:
+        data = FLEXFEC_HEADER.pack(
+            0,
+            (self.marker_recovery << 7) | self.payload_type_recovery,
+            self.length_recovery,
+            self.timestamp_recovery,
+            1,
+            self.ssrc,
+            self.seq_base,
+        )
+        return data + pack_packet_mask(self.offsets) + self.payload
+
+    @property
+    def sequence_numbers(self) -> list[int]:
+        return [uint16_add(self.seq_base, offset) for offset in self.offsets]
+
+    @classmethod
+    def parse(cls, data: Union[bytes, memoryview]) -> "FecPacket":
+        if len(data) < FLEXFEC_HEADER.size:
+            raise ValueError("FEC packet is truncated")
+        (
+            r_f_p_x_cc,
+            m_pt,
+            length_recovery,
+            timestamp_recovery,
+            ssrc_count,
+            ssrc,
+            seq_base,
+        ) = FLEXFEC_HEADER.unpack_from(data)
+        if r_f_p_x_cc & 0xC0:
+            raise ValueError("FEC packet does not use a flexible mask")
+        if ssrc_count != 1:
+            raise ValueError("FEC packet does not protect a single SSRC")
+
+        offsets, mask_length = unpack_packet_mask(data[FLEXFEC_HEADER.size :])
+        if not offsets:
+            raise ValueError("FEC packet does not protect any packet")
+
+        return cls(
+            ssrc=ssrc,
+            seq_base=seq_base,
+            offsets=offsets,
+            marker_recovery=m_pt >> 7,
+            payload_type_recovery=m_pt & 0x7F,
+            length_recovery=length_recovery,
+            timestamp_recovery=timestamp_recovery,
+            payload=bytes(data[FLEXFEC_HEADER.size + mask_length :]),
+        )
+
+
+def fec_protect(packets: list[RtpPacket]) -> FecPacket:
+    """
+    Create a FEC packet protecting media packets of one SSRC, which span at
+    most :data:`MAX_PROTECTED_PACKETS` sequence numbers.
+    """
+    fec = FecPacket(
+        ssrc=packets[0].ssrc,
+        seq_base=packets[0].sequence_number,
+        offsets=[
+            (packet.sequence_number - packets[0].sequence_number) & 0xFFFF
+            for packet in packets
+        ],
+    )
+    for packet in packets:
+        fec.marker_recovery ^= packet.marker
+        fec.payload_type_recovery ^= packet.payload_type
+        fec.length_recovery ^= len(packet.payload)
+        fec.timestamp_recovery ^= packet.timestamp
+    fec.payload = xor_payloads(
+        [packet.payload for packet in packets],
+        max(len(packet.payload) for packet in packets),
+    )
+    return fec
+
+
+class FecEncoder:
+    """
+    Protects the packets of a media stream with FEC packets, at a rate which
+    follows the loss reported by the receiver.
+
+    The packets of each frame are interleaved across its FEC packets, so that
+    bursts of losses can be repaired as well as isolated ones.
+    """
+
+    def __init__(self) -> None:
+        self.loss = 0.0
+
+        self.__fec_bytes = 0.0
+        self.__media_bytes = 0.0
+
+    @property
+    def overhead(self) -> float:
+        """
+        The bitrate of the FEC packets, relative to that of the media packets.
+        """
+        rate = self.rate
+        if not rate or not self.__media_bytes:
+            return rate
+        return max(rate, self.__fec_bytes / self.__media_bytes)
+
+    @property
+    def rate(self) -> float:
+        """
+        The number of FEC packets sent for each media packet.
+        """
+        if self.loss < FEC_MIN_LOSS:
+            return 0.0
+        return min(FEC_MAX_RATE, self.loss * FEC_LOSS_FACTOR)
+
+    def encode(self, packets: list[RtpPacket]) -> list[FecPacket]:
+        """
+        Create the FEC packets for the packets of a frame.
+        """
+        fec_packets = []
+        rate = self.rate
+        if rate:
+            for start in range(0, len(packets), MAX_PROTECTED_PACKETS):
+                group = packets[start : start + MAX_PROTECTED_PACKETS]
+                count = min(len(group), math.ceil(len(group) * rate))
+                for i in range(count):
+                    fec_packets.append(fec_protect(group[i::count]))
+
+        # keep track of the actual overhead, as each frame gets at least
+        # one FEC packet
+        media_bytes = sum(len(packet.payload) for packet in packets)
+        fec_bytes = sum(len(fec.payload) for fec in fec_packets)
+        self.__media_bytes = (
+            FEC_OVERHEAD_ALPHA * self.__media_bytes
+            + (1 - FEC_OVERHEAD_ALPHA) * media_bytes
+        )
+        self.__fec_bytes = (
+            FEC_OVERHEAD_ALPHA * self.__fec_bytes + (1 - FEC_OVERHEAD_ALPHA) * fec_bytes
+        )
+        return fec_packets
+
+    def update_loss(self, fraction_lost: int) -> None:
+        """
+        Update the protection level from the `fraction_lost` of an RTCP report.
+
+        The protection rises as soon as losses are reported, but decays slowly.
+        """
+        loss = fraction_lost / 256
+        if loss >= self.loss:
+            self.loss = loss
+        else:
+            self.loss = FEC_LOSS_DECAY * self.loss + (1 - FEC_LOSS_DECAY) * loss
+
+
+class FecDecoder:
+    """
+    Repairs the lost packets of a media stream using the FEC packets received.
+
+    A FEC packet repairs the packet it protects once all the others have been
+    received or repaired.
+    """
+
+    def __init__(self) -> None:
+        self.__media: dict[int, RtpPacket] = {}
+        self.__media_order: deque[int] = deque()
+        self.__pending: OrderedDict[int, FecPacket] = OrderedDict()
+        self.__pending_by_seq: dict[int, list[FecPacket]] = {}
+
+    def add(self, packet: RtpPacket) -> list[RtpPacket]:
+        """
+        Add a media packet, and return the packets it allows to repair.
+        """
+        if packet.sequence_number in self.__media:
+            return []
+        self.__store(packet)
+        return self.__recover(self.__pending_by_seq.pop(packet.sequence_number, []))
+
+    def add_fec(self, fec: FecPacket) -> list[RtpPacket]:
+        """
+        Add a FEC packet, and return the packets it allows to repair.
+        """
+        return self.__recover([fec])
+
+    def __discard(self, fec: FecPacket) -> None:
+        for seq in fec.sequence_numbers:
+            waiting = self.__pending_by_seq.get(seq)
+            if waiting is not None:
+                waiting[:] = [f for f in waiting if f is not fec]
+                if not waiting:
+                    del self.__pending_by_seq[seq]
+
+    def __recover(self, fec_packets: list[FecPacket]) -> list[RtpPacket]:
+        recovered = []
+        while fec_packets:
+            fec = fec_packets.pop()
+            missing = [seq for seq in fec.sequence_numbers if seq not in self.__media]
+            if len(missing) > 1:
+                # wait for more packets
+                if id(fec) not in self.__pending:
+                    for seq in missing:
+                        self.__pending_by_seq.setdefault(seq, []).append(fec)
+                    self.__pending[id(fec)] = fec
+                    if len(self.__pending) > MAX_PENDING_FEC_PACKETS:
+                        self.__discard(self.__pending.popitem(last=False)[1])
+                continue
+
+            if self.__pending.pop(id(fec), None) is not None:
+                self.__discard(fec)
+            if missing:
+                packet = self.__repair(fec, missing[0])
+                if packet is not None:
+                    self.__store(packet)
+                    recovered.append(packet)
+                    fec_packets.extend(self.__pending_by_seq.pop(missing[0], []))
+        return recovered
+
+    def __repair(self, fec: FecPacket, sequence_number: int) -> Optional[RtpPacket]:
+        packets = [
+            self.__media[seq] for seq in fec.sequence_numbers if seq != sequence_number
+        ]
+        length = fec.length_recovery
+        marker = fec.marker_recovery
+        payload_type = fec.payload_type_recovery
+        timestamp = fec.timestamp_recovery
+        for packet in packets:
+            length ^= len(packet.payload)
+            marker ^= packet.marker
+            payload_type ^= packet.payload_type
+            timestamp ^= packet.timestamp
+        if length > len(fec.payload):
+            return None
+
+        payload = xor_payloads(
+            [fec.payload, *(packet.payload for packet in packets)], len(fec.payload)
+        )
+        return RtpPacket(
+            payload_type=payload_type,
+            marker=marker,
+            sequence_number=sequence_number,
+            timestamp=timestamp,
+            ssrc=fec.ssrc,
+            payload=payload[:length],
+        )
+
+    def __store(self, packet: RtpPacket) -> None:
+        self.__media[packet.sequence_number] = packet
+        self.__media_order.append(packet.sequence_number)
+        if len(self.__media_order) > FEC_RECOVERY_WINDOW:
+            del self.__media[self.__media_order.popleft()]
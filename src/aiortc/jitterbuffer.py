@@ -1,3 +1,4 @@
+from collections import deque
 from typing import Optional
 
 from .rtp import RtpPacket
@@ -23,6 +24,12 @@ class JitterBuffer:
         self._prefetch = prefetch
         self._is_video = is_video
 
+        # Frame boundaries in the contiguous run of packets starting at the
+        # origin, as offsets from the origin. The run is only examined once.
+        self._frame_ends: deque[int] = deque()
+        self._packet_count = 0
+        self._scanned = 0
+
     @property
     def capacity(self) -> int:
         return self._capacity
@@ -56,53 +63,94 @@ class JitterBuffer:
                 pli_flag = True
 
         pos = packet.sequence_number % self._capacity
+        if self._packets[pos] is None:
+            self._packet_count += 1
         self._packets[pos] = packet
 
         return pli_flag, self._remove_frame(packet.sequence_number)
 
-    def _remove_frame(self, sequence_number: int) -> Optional[JitterFrame]:
-        frame = None
-        frames = 0
-        packets: list[RtpPacket] = []
-        remove = 0
-        timestamp = None
+    def get_frame(self) -> Optional[JitterFrame]:
+        """
+        Return the next complete frame, if any.
 
-        for count in range(self.capacity):
-            pos = (self._origin + count) % self._capacity
-            packet = self._packets[pos]
+        A single frame is returned by :meth:`add`, so several frames can be
+        waiting once a missing packet has arrived.
+        """
+        if self._origin is None:
+            return None
+        return self._remove_frame(self._origin)
+
+    def incomplete_frame_timestamp(self) -> Optional[int]:
+        """
+        Return the timestamp of the frame at the origin if it cannot be
+        assembled because packets are missing, otherwise `None`.
+        """
+        if self._frame_ends or self._packet_count <= self._scanned:
+            return None
+        for i in range(self._capacity):
+            packet = self._packets[(self._origin + i) % self._capacity]
+            if packet is not None:
+                return packet.timestamp
+        return None
+
+    def remove_incomplete_frame(self) -> None:
+        """
+        Discard the frame at the origin, which is missing packets, so that the
+        following frames can be assembled.
+        """
+        timestamp = self.incomplete_frame_timestamp()
+        if timestamp is None:
+            return
+
+        gap = False
+        for count in range(self._capacity):
+            packet = self._packets[(self._origin + count) % self._capacity]
             if packet is None:
+                gap = True
+            elif gap and packet.timestamp != timestamp:
                 break
-            if timestamp is None:
-                timestamp = packet.timestamp
-            elif packet.timestamp != timestamp:
-                # we now have a complete frame, only store the first one
-                if frame is None:
-                    frame = JitterFrame(
-                        data=b"".join([x._data for x in packets]),  # type: ignore
-                        timestamp=timestamp,
-                    )
-                    remove = count
-
-                # check we have prefetched enough
-                frames += 1
-                if frames >= self._prefetch:
-                    self.remove(remove)
-                    return frame
-
-                # start a new frame
-                packets = []
-                timestamp = packet.timestamp
-
-            packets.append(packet)
+        else:
+            count = self._capacity
+        self.remove(count)
 
-        return None
+    def _remove_frame(self, sequence_number: int) -> Optional[JitterFrame]:
+        # extend the contiguous run, a frame ends when the timestamp changes
+        while self._scanned < self._capacity:
+            packet = self._packets[(self._origin + self._scanned) % self._capacity]
+            if packet is None:
+                break
+            if self._scanned:
+                previous = self._packets[
+                    (self._origin + self._scanned - 1) % self._capacity
+                ]
+                if packet.timestamp != previous.timestamp:
+                    self._frame_ends.append(self._scanned)
+            self._scanned += 1
+
+        # check we have prefetched enough
+        if len(self._frame_ends) < max(self._prefetch, 1):
+            return None
+
+        count = self._frame_ends[0]
+        packets = [
+            self._packets[(self._origin + i) % self._capacity] for i in range(count)
+        ]
+        frame = JitterFrame(
+            data=b"".join([x._data for x in packets]),  # type: ignore
+            timestamp=packets[0].timestamp,
+        )
+        self.remove(count)
+        return frame
 
     def remove(self, count: int) -> None:
         assert count <= self._capacity
         for i in range(count):
             pos = self._origin % self._capacity
+            if self._packets[pos] is not None:
+                self._packet_count -= 1
             self._packets[pos] = None
             self._origin = uint16_add(self._origin, 1)
+        self._advance(count)
 
     def smart_remove(self, count: int) -> bool:
         """
@@ -117,8 +165,22 @@ class JitterBuffer:
                 if i >= count and timestamp != packet.timestamp:
                     break
                 timestamp = packet.timestamp
+                self._packet_count -= 1
             self._packets[pos] = None
             self._origin = uint16_add(self._origin, 1)
             if i == self._capacity - 1:
+                self._advance(self._capacity)
                 return True
+        self._advance(i)
         return False
+
+    def _advance(self, count: int) -> None:
+        """
+        Account for the origin having moved forward by `count` packets.
+        """
+        if count >= self._scanned:
+            self._frame_ends.clear()
+            self._scanned = 0
+        else:
+            self._frame_ends = deque(x - count for x in self._frame_ends if x > count)
+            self._scanned -= count
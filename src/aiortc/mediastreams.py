@@ -1,6 +1,5 @@
 import asyncio
 import fractions
-import time
 import uuid
 from abc import ABCMeta, abstractmethod
 from typing import Union
@@ -10,6 +9,8 @@ from av.frame import Frame
 from av.packet import Packet
 from pyee.asyncio import AsyncIOEventEmitter
 
+from . import clock
+
 AUDIO_PTIME = 0.020  # 20ms audio packetization
 VIDEO_CLOCK_RATE = 90000
 VIDEO_PTIME = 1 / 30  # 30fps
@@ -93,10 +94,10 @@ class AudioStreamTrack(MediaStreamTrack):
 
         if hasattr(self, "_timestamp"):
             self._timestamp += samples
-            wait = self._start + (self._timestamp / sample_rate) - time.time()
+            wait = self._start + (self._timestamp / sample_rate) - clock.current_time()
             await asyncio.sleep(wait)
         else:
-            self._start = time.time()
+            self._start = clock.current_time()
             self._timestamp = 0
 
         frame = AudioFrame(format="s16", layout="mono", samples=samples)
@@ -124,10 +125,14 @@ class VideoStreamTrack(MediaStreamTrack):
 
         if hasattr(self, "_timestamp"):
             self._timestamp += int(VIDEO_PTIME * VIDEO_CLOCK_RATE)
-            wait = self._start + (self._timestamp / VIDEO_CLOCK_RATE) - time.time()
+            wait = (
+                self._start
+                + (self._timestamp / VIDEO_CLOCK_RATE)
+                - clock.current_time()
+            )
             await asyncio.sleep(wait)
         else:
-            self._start = time.time()
+            self._start = clock.current_time()
             self._timestamp = 0
         return self._timestamp, VIDEO_TIME_BASE
 
@@ -0,0 +1,200 @@
+import asyncio
+import enum
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Optional
+
+# pacing rate relative to the sum of the senders' target bitrates
+PACING_FACTOR = 2.5
+
+# unused budget is capped to this many seconds at the pacing rate
+MAX_BURST_INTERVAL = 0.005
+MIN_BURST_BYTES = 1500
+
+# packets which waited longer than this are discarded
+MAX_QUEUE_DELAY = 2.0
+
+
+class PacerPriority(enum.IntEnum):
+    AUDIO = 0
+    RETRANSMISSION = 1
+    VIDEO = 2
+
+
+class PacerStreamStats:
+    def __init__(self) -> None:
+        self.packets_discarded = 0
+        self.total_send_delay = 0.0
+
+
+class Pacer:
+    """
+    Token bucket which spreads the RTP packets of all senders sharing a
+    transport over time instead of sending each frame as a line-rate burst.
+
+    Audio packets are sent ahead of retransmissions, which are sent ahead of
+    video. Audio packets consume budget but never wait for it. All the packets
+    the budget allows are handed to `send` as a single batch.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[bytes]], Awaitable[None]],
+        factor: float = PACING_FACTOR,
+        max_queue_delay: float = MAX_QUEUE_DELAY,
+    ) -> None:
+        self._budget = 0.0
+        self._budget_time: Optional[float] = None
+        self._factor = factor
+        self._max_queue_delay = max_queue_delay
+        self._queues: list[deque] = [deque() for priority in PacerPriority]
+        self._send = send
+        self._stats: dict[int, PacerStreamStats] = {}
+        self._targets: dict[int, int] = {}
+        self._task: Optional[asyncio.Future[None]] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._factor > 0
+
+    @property
+    def pacing_rate(self) -> Optional[int]:
+        """
+        The current pacing rate in bits per second, or `None` if unknown.
+        """
+        total = sum(self._targets.values())
+        if not total:
+            return None
+        return int(self._factor * total)
+
+    def queue_delay(self, now: Optional[float] = None) -> float:
+        """
+        The time in seconds the oldest queued packet has been waiting.
+        """
+        if now is None:
+            now = asyncio.get_event_loop().time()
+        oldest = [queue[0][2] for queue in self._queues if queue]
+        return now - min(oldest) if oldest else 0.0
+
+    def remove_stream(self, ssrc: int) -> None:
+        self._targets.pop(ssrc, None)
+
+    async def send(
+        self, prepare: Callable[[], bytes], ssrc: int, priority: PacerPriority
+    ) -> None:
+        """
+        Queue an RTP packet for transmission.
+
+        `prepare` is called right before the packet is sent and returns its
+        serialized form, so that send-time header extensions are accurate.
+        """
+        await self.send_batch([prepare], ssrc=ssrc, priority=priority)
+
+    async def send_batch(
+        self, prepares: list[Callable[[], bytes]], ssrc: int, priority: PacerPriority
+    ) -> None:
+        """
+        Queue several RTP packets for transmission, such as those of a frame.
+        """
+        if not self.enabled:
+            await self._send([prepare() for prepare in prepares])
+            return
+
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        self._queues[priority].extend((prepare, ssrc, now) for prepare in prepares)
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+
+    def set_target_bitrate(self, ssrc: int, bitrate: Optional[int]) -> None:
+        """
+        Set the target bitrate of a stream, in bits per second.
+        """
+        if bitrate:
+            self._targets[ssrc] = bitrate
+        else:
+            self._targets.pop(ssrc, None)
+
+    def stats(self, ssrc: int) -> PacerStreamStats:
+        return self._stream_stats(ssrc)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for queue in self._queues:
+            queue.clear()
+
+    def _refill(self, now: float, rate: int) -> None:
+        max_budget = max(rate / 8 * MAX_BURST_INTERVAL, MIN_BURST_BYTES)
+        if self._budget_time is None:
+            self._budget = max_budget
+        else:
+            self._budget = min(
+                self._budget + (now - self._budget_time) * rate / 8, max_budget
+            )
+        self._budget_time = now
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            rate = self.pacing_rate
+            if rate is not None:
+                self._refill(now, rate)
+
+            # collect all the packets the budget allows
+            batch = []
+            while True:
+                priority = next(
+                    (priority for priority in PacerPriority if self._queues[priority]),
+                    None,
+                )
+                if priority is None or (
+                    rate is not None
+                    and priority != PacerPriority.AUDIO
+                    and self._budget < 0
+                ):
+                    break
+
+                prepare, ssrc, queued_at = self._queues[priority].popleft()
+                stats = self._stream_stats(ssrc)
+                if priority != PacerPriority.AUDIO and (
+                    now - queued_at > self._max_queue_delay
+                ):
+                    stats.packets_discarded += 1
+                    continue
+
+                data = prepare()
+                self._budget -= len(data)
+                stats.total_send_delay += now - queued_at
+                batch.append(data)
+
+            if batch:
+                try:
+                    await self._send(batch)
+                except ConnectionError:
+                    pass
+                continue
+
+            # wait for packets, or for enough budget unless a higher priority
+            # packet arrives
+            self._wakeup.clear()
+            if priority is None:
+                await self._wakeup.wait()
+            else:
+                assert rate is not None
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=-self._budget * 8 / rate
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    def _stream_stats(self, ssrc: int) -> PacerStreamStats:
+        if ssrc not in self._stats:
+            self._stats[ssrc] = PacerStreamStats()
+        return self._stats[ssrc]
@@ -0,0 +1,607 @@
+"""
+Offline replay of the delay-based bandwidth estimator.
+
+This module replays recorded packet traces through the same computations as
+:class:`aiortc.rate.RemoteBitrateEstimator` and produces identical estimates,
+but is intended for tuning the overuse detector over many parameter sets.
+
+The work is split in two stages:
+
+- the trace is preprocessed once: packets are grouped by :class:`InterArrival`
+  and the incoming bitrate is computed with NumPy,
+- the Kalman filter, the overuse detector and the rate controller are then run
+  for all the parameter sets at once, the state of each set being a NumPy
+  array element.
+
+NumPy is required to use this module.
+"""
+
+import math
+import multiprocessing
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .rate import (
+    DELTA_COUNTER_MAX,
+    INTER_ARRIVAL_SHIFT,
+    MAX_ADAPT_OFFSET_MS,
+    MIN_FRAME_PERIOD_HISTORY_LENGTH,
+    MIN_NUM_DELTAS,
+    TIMESTAMP_GROUP_LENGTH_MS,
+    TIMESTAMP_TO_MS,
+    AimdRateControl,
+    BandwidthUsage,
+    InterArrival,
+    RateControlState,
+)
+
+RATE_WINDOW_MS = 1000
+RATE_SCALE = 8000
+
+NORMAL = BandwidthUsage.NORMAL.value
+UNDERUSING = BandwidthUsage.UNDERUSING.value
+OVERUSING = BandwidthUsage.OVERUSING.value
+
+
+@dataclass
+class DetectorParameters:
+    """
+    Tunable parameters of the :class:`aiortc.rate.OveruseDetector`.
+    """
+
+    k_up: float = 0.0087
+    k_down: float = 0.039
+    threshold: float = 12.5
+    overuse_time_threshold: float = 10
+
+
+@dataclass
+class ReplayResult:
+    """
+    The bitrate estimates produced for one parameter set, at the times the
+    online estimator would have returned them.
+    """
+
+    time_ms: np.ndarray
+    bitrate: np.ndarray
+
+
+@dataclass
+class PreparedTrace:
+    """
+    The parameter-independent part of a replay.
+    """
+
+    # per packet
+    arrival_time_ms: np.ndarray
+    incoming_bitrate: np.ndarray
+
+    # per inter-group delta
+    packet_index: np.ndarray
+    time_delta_ms: np.ndarray
+    timestamp_delta_ms: np.ndarray
+    size_delta: np.ndarray
+    min_frame_period: np.ndarray
+
+
+class AimdRateControlArray:
+    """
+    :class:`aiortc.rate.AimdRateControl` for several parameter sets at once.
+    """
+
+    def __init__(self, count: int) -> None:
+        reference = AimdRateControl()
+        self.avg_max_bitrate_kbps = np.zeros(count)
+        self.has_avg_max_bitrate = np.zeros(count, dtype=bool)
+        self.var_max_bitrate_kbps = np.full(count, reference.var_max_bitrate_kbps)
+        self.current_bitrate = np.full(count, reference.current_bitrate, dtype=np.int64)
+        self.current_bitrate_initialized = np.zeros(count, dtype=bool)
+        self.first_estimated_throughput_time = np.zeros(count, dtype=np.int64)
+        self.has_first_estimated_throughput = np.zeros(count, dtype=bool)
+        self.last_change_ms = np.zeros(count, dtype=np.int64)
+        self.has_last_change = np.zeros(count, dtype=bool)
+        self.near_max = np.zeros(count, dtype=bool)
+        self.latest_estimated_throughput = np.full(
+            count, reference.latest_estimated_throughput, dtype=np.int64
+        )
+        self.rtt = reference.rtt
+        self.state = np.full(count, RateControlState.HOLD.value, dtype=np.int64)
+
+        # the multiplicative increase only depends on the elapsed milliseconds,
+        # so compute it with the same function as the online controller
+        self.increase_factor = np.array(
+            [pow(1.08, elapsed_ms / 1000) for elapsed_ms in range(1001)]
+        )
+
+    def update(
+        self,
+        mask: np.ndarray,
+        bandwidth_usage: np.ndarray,
+        estimated_throughput: Optional[int],
+        now_ms: int,
+    ) -> np.ndarray:
+        """
+        Update the controllers selected by `mask` and return the mask of the
+        controllers which produced an estimate.
+        """
+        if estimated_throughput is not None:
+            waiting = mask & ~self.current_bitrate_initialized
+            first = waiting & ~self.has_first_estimated_throughput
+            initialize = (
+                waiting
+                & ~first
+                & (now_ms - self.first_estimated_throughput_time > 3000)
+            )
+            self.first_estimated_throughput_time[first] = now_ms
+            self.has_first_estimated_throughput |= first
+            self.current_bitrate[initialize] = estimated_throughput
+            self.current_bitrate_initialized |= initialize
+
+        # wait for initialisation or overuse
+        active = mask & (
+            self.current_bitrate_initialized | (bandwidth_usage == OVERUSING)
+        )
+
+        # update state
+        start_increase = (
+            active
+            & (bandwidth_usage == NORMAL)
+            & (self.state == RateControlState.HOLD.value)
+        )
+        self.last_change_ms[start_increase] = now_ms
+        self.has_last_change |= start_increase
+        self.state[start_increase] = RateControlState.INCREASE.value
+        self.state[active & (bandwidth_usage == OVERUSING)] = (
+            RateControlState.DECREASE.value
+        )
+        self.state[active & (bandwidth_usage == UNDERUSING)] = (
+            RateControlState.HOLD.value
+        )
+
+        # helper variables
+        if estimated_throughput is not None:
+            self.latest_estimated_throughput[active] = estimated_throughput
+            throughput = np.full(len(mask), estimated_throughput, dtype=np.int64)
+        else:
+            throughput = self.latest_estimated_throughput.copy()
+        throughput_kbps = throughput / 1000
+        increase = active & (self.state == RateControlState.INCREASE.value)
+        decrease = active & (self.state == RateControlState.DECREASE.value)
+        sigma_kbps = np.sqrt(self.var_max_bitrate_kbps * self.avg_max_bitrate_kbps)
+        new_bitrate = self.current_bitrate.copy()
+
+        # if the estimated throughput increases significantly,
+        # clear estimated max throughput
+        clear = (
+            increase
+            & self.has_avg_max_bitrate
+            & (throughput_kbps >= self.avg_max_bitrate_kbps + 3 * sigma_kbps)
+        )
+        self.near_max[clear] = False
+        self.has_avg_max_bitrate[clear] = False
+
+        # additive or multiplicative rate increase
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bits_per_frame = self.current_bitrate / 30
+            packets_per_frame = np.ceil(bits_per_frame / (8 * 1200))
+            avg_packet_size_bits = bits_per_frame / packets_per_frame
+            response_time = self.rtt + 100
+            near_max_rate_increase = np.maximum(
+                4000, ((avg_packet_size_bits * 1000) / response_time).astype(np.int64)
+            )
+        additive = (
+            ((now_ms - self.last_change_ms) * near_max_rate_increase) / 1000
+        ).astype(np.int64)
+        elapsed_ms = np.where(
+            self.has_last_change, np.minimum(now_ms - self.last_change_ms, 1000), 1000
+        )
+        multiplicative = np.maximum(
+            (self.increase_factor[elapsed_ms] - 1) * new_bitrate, 1000
+        ).astype(np.int64)
+        new_bitrate[increase] += np.where(self.near_max, additive, multiplicative)[
+            increase
+        ]
+
+        # if the estimated throughput drops significantly,
+        # clear estimated max throughput
+        clear = (
+            decrease
+            & self.has_avg_max_bitrate
+            & (throughput_kbps < self.avg_max_bitrate_kbps - 3 * sigma_kbps)
+        )
+        self.has_avg_max_bitrate[clear] = False
+
+        # update max throughput estimate
+        alpha = 0.05
+        avg_max_bitrate_kbps = np.where(
+            self.has_avg_max_bitrate,
+            (1 - alpha) * self.avg_max_bitrate_kbps + alpha * throughput_kbps,
+            throughput_kbps,
+        )
+        norm = np.maximum(1, avg_max_bitrate_kbps)
+        var_max_bitrate_kbps = (1 - alpha) * self.var_max_bitrate_kbps + alpha * (
+            (avg_max_bitrate_kbps - throughput_kbps) ** 2
+        ) / norm
+        var_max_bitrate_kbps = np.maximum(0.4, np.minimum(var_max_bitrate_kbps, 2.5))
+        self.avg_max_bitrate_kbps[decrease] = avg_max_bitrate_kbps[decrease]
+        self.var_max_bitrate_kbps[decrease] = var_max_bitrate_kbps[decrease]
+        self.has_avg_max_bitrate |= decrease
+        self.near_max |= decrease
+        new_bitrate[decrease] = np.rint(0.85 * self.current_bitrate[decrease])
+        self.state[decrease] = RateControlState.HOLD.value
+
+        self.last_change_ms[increase | decrease] = now_ms
+        self.has_last_change |= increase | decrease
+
+        # clamp bitrate
+        max_bitrate = np.maximum(
+            (1.5 * throughput).astype(np.int64) + 10000, self.current_bitrate
+        )
+        self.current_bitrate[active] = np.minimum(new_bitrate, max_bitrate)[active]
+        return active
+
+
+def incoming_bitrate(
+    arrival_time_ms: np.ndarray, payload_size: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the incoming bitrate seen by the estimator after each packet,
+    or -1 where :class:`aiortc.rate.RateCounter` returns `None`.
+
+    Arrival times must be non-decreasing.
+    """
+    count = len(arrival_time_ms)
+    result = np.full(count, -1, dtype=np.int64)
+    if not count:
+        return result
+
+    cumulative = np.concatenate(([0], np.cumsum(payload_size, dtype=np.int64)))
+    window_start = np.searchsorted(
+        arrival_time_ms, arrival_time_ms - (RATE_WINDOW_MS - 1), side="left"
+    )
+    index = np.arange(count)
+
+    # The counter is reset when the rate becomes unavailable after having been
+    # available, so the trace is processed one counter lifetime at a time.
+    start = 0
+    while start < count:
+        i = index[start:]
+        first = np.maximum(window_start[start:], start)
+        span = np.minimum(arrival_time_ms[start:] - arrival_time_ms[start], 999) + 1
+
+        # rate queried before adding the packet
+        before_none = (i - first == 0) | (span <= 1)
+        before_none[0] = True
+        resets = np.flatnonzero(before_none[2:] & ~before_none[1:-1]) + 2
+        end = start + resets[0] if len(resets) else count
+
+        # rate queried after adding the packet
+        n = end - start
+        total = cumulative[start + 1 : end + 1] - cumulative[first[:n]]
+        valid = span[:n] > 1
+        result[start:end][valid] = np.rint(
+            (RATE_SCALE * total[valid]) / span[:n][valid]
+        ).astype(np.int64)
+        start = end
+
+    return result
+
+
+def prepare_trace(
+    abs_send_time: np.ndarray, arrival_time_ms: np.ndarray, payload_size: np.ndarray
+) -> PreparedTrace:
+    """
+    Preprocess a packet trace, which can then be replayed with any number of
+    parameter sets.
+
+    :param abs_send_time: The 24-bit abs-send-time of each packet.
+    :param arrival_time_ms: The arrival time of each packet in milliseconds,
+        which must be non-decreasing.
+    :param payload_size: The payload size of each packet in bytes.
+    """
+    abs_send_time = np.asarray(abs_send_time, dtype=np.int64)
+    arrival_time_ms = np.asarray(arrival_time_ms, dtype=np.int64)
+    payload_size = np.asarray(payload_size, dtype=np.int64)
+    if not (len(abs_send_time) == len(arrival_time_ms) == len(payload_size)):
+        raise ValueError("Trace arrays must have the same length")
+    if np.any(np.diff(arrival_time_ms) < 0):
+        raise ValueError("Arrival times must be non-decreasing")
+
+    # group packets, this is inherently sequential
+    inter_arrival = InterArrival(
+        (TIMESTAMP_GROUP_LENGTH_MS << INTER_ARRIVAL_SHIFT) // 1000, TIMESTAMP_TO_MS
+    )
+    packet_index = []
+    time_delta_ms = []
+    timestamp_delta_ms = []
+    size_delta = []
+    min_frame_period = []
+    history: list[float] = []
+    for i, (timestamp, arrival, size) in enumerate(
+        zip(
+            (abs_send_time << 8).tolist(),
+            arrival_time_ms.tolist(),
+            payload_size.tolist(),
+        )
+    ):
+        deltas = inter_arrival.compute_deltas(timestamp, arrival, size)
+        if deltas is not None:
+            ts_delta = deltas.timestamp * TIMESTAMP_TO_MS
+            period = ts_delta
+            if len(history) >= MIN_FRAME_PERIOD_HISTORY_LENGTH:
+                history.pop(0)
+            for old_ts_delta in history:
+                period = min(old_ts_delta, period)
+            history.append(ts_delta)
+
+            packet_index.append(i)
+            time_delta_ms.append(deltas.arrival_time)
+            timestamp_delta_ms.append(ts_delta)
+            size_delta.append(deltas.size)
+            min_frame_period.append(period)
+
+    return PreparedTrace(
+        arrival_time_ms=arrival_time_ms,
+        incoming_bitrate=incoming_bitrate(arrival_time_ms, payload_size),
+        packet_index=np.array(packet_index, dtype=np.int64),
+        time_delta_ms=np.array(time_delta_ms, dtype=np.int64),
+        timestamp_delta_ms=np.array(timestamp_delta_ms, dtype=np.float64),
+        size_delta=np.array(size_delta, dtype=np.int64),
+        min_frame_period=np.array(min_frame_period, dtype=np.float64),
+    )
+
+
+def replay_prepared(
+    trace: PreparedTrace, parameters: Sequence[DetectorParameters]
+) -> list[ReplayResult]:
+    """
+    Replay a preprocessed trace for several parameter sets at once.
+    """
+    n = len(parameters)
+    k_up = np.array([p.k_up for p in parameters], dtype=np.float64)
+    k_down = np.array([p.k_down for p in parameters], dtype=np.float64)
+    overuse_time_threshold = np.array(
+        [p.overuse_time_threshold for p in parameters], dtype=np.float64
+    )
+
+    # overuse estimator
+    e00 = np.full(n, 100.0)
+    e01 = np.zeros(n)
+    e10 = np.zeros(n)
+    e11 = np.full(n, 0.1)
+    offset = np.zeros(n)
+    estimator_previous_offset = np.zeros(n)
+    slope = np.full(n, 1 / 64)
+    avg_noise = np.zeros(n)
+    var_noise = np.full(n, 50.0)
+    process_noise = (1e-13, 1e-3)
+
+    # overuse detector
+    hypothesis = np.full(n, NORMAL, dtype=np.int64)
+    overuse_counter = np.zeros(n, dtype=np.int64)
+    overuse_time = np.zeros(n)
+    has_overuse_time = np.zeros(n, dtype=bool)
+    detector_previous_offset = np.zeros(n)
+    threshold = np.array([p.threshold for p in parameters], dtype=np.float64)
+    detector_last_update_ms: Optional[int] = None
+
+    # rate control
+    rate_control = AimdRateControlArray(n)
+    last_update_ms = np.zeros(n, dtype=np.int64)
+    has_last_update = np.zeros(n, dtype=bool)
+    updates: list[tuple[int, np.ndarray, np.ndarray]] = []
+
+    arrival_times = trace.arrival_time_ms.tolist()
+    incoming = trace.incoming_bitrate.tolist()
+    feedback_interval = AimdRateControl().feedback_interval()
+    events = iter(
+        zip(
+            trace.packet_index.tolist(),
+            trace.time_delta_ms.tolist(),
+            trace.timestamp_delta_ms.tolist(),
+            trace.size_delta.tolist(),
+            trace.min_frame_period.tolist(),
+        )
+    )
+    event = next(events, None)
+    num_of_deltas = 0
+
+    # no set needs a periodic update before this time
+    any_overusing = False
+    next_update_ms = -math.inf
+
+    for i, now_ms in enumerate(arrival_times):
+        if event is not None and event[0] == i:
+            _, time_delta_ms, ts_delta_ms, size_delta, min_frame_period = event
+            event = next(events, None)
+
+            # OveruseEstimator.update
+            t_ts_delta = time_delta_ms - ts_delta_ms
+            num_of_deltas = min(num_of_deltas + 1, DELTA_COUNTER_MAX)
+
+            e00 = e00 + process_noise[0]
+            e11 = e11 + process_noise[1]
+            bump = (
+                (hypothesis == OVERUSING) & (offset < estimator_previous_offset)
+            ) | ((hypothesis == UNDERUSING) & (offset > estimator_previous_offset))
+            e11 = np.where(bump, e11 + 10 * process_noise[1], e11)
+
+            h0 = size_delta
+            h1 = 1.0
+            eh0 = e00 * h0 + e01 * h1
+            eh1 = e10 * h0 + e11 * h1
+
+            residual = t_ts_delta - slope * h0 - offset
+            normal = hypothesis == NORMAL
+            if normal.any():
+                max_residual = 3.0 * np.sqrt(var_noise)
+                clipped = np.where(
+                    np.abs(residual) < max_residual,
+                    residual,
+                    np.where(residual < 0, -max_residual, max_residual),
+                )
+                alpha = 0.01
+                if num_of_deltas > 10 * 30:
+                    alpha = 0.002
+                beta = pow(1 - alpha, min_frame_period * 30.0 / 1000.0)
+                new_avg = beta * avg_noise + (1 - beta) * clipped
+                new_var = beta * var_noise + (1 - beta) * (new_avg - clipped) ** 2
+                new_var = np.where(new_var < 1, 1.0, new_var)
+                avg_noise = np.where(normal, new_avg, avg_noise)
+                var_noise = np.where(normal, new_var, var_noise)
+
+            denom = var_noise + h0 * eh0 + h1 * eh1
+            k0 = eh0 / denom
+            k1 = eh1 / denom
+            ikh00 = 1.0 - k0 * h0
+            ikh01 = -k0 * h1
+            ikh10 = -k1 * h0
+            ikh11 = 1.0 - k1 * h1
+            e00, e01, e10, e11 = (
+                e00 * ikh00 + e10 * ikh01,
+                e01 * ikh00 + e11 * ikh01,
+                e00 * ikh10 + e10 * ikh11,
+                e01 * ikh10 + e11 * ikh11,
+            )
+
+            estimator_previous_offset = offset
+            slope = slope + k0 * residual
+            offset = offset + k1 * residual
+
+            # OveruseDetector.detect
+            if num_of_deltas >= 2:
+                T = min(num_of_deltas, MIN_NUM_DELTAS) * offset
+                over = T > threshold
+                under = T < -threshold
+
+                overuse_time = np.where(
+                    over,
+                    np.where(
+                        has_overuse_time, overuse_time + ts_delta_ms, ts_delta_ms / 2
+                    ),
+                    overuse_time,
+                )
+                has_overuse_time = over
+                overuse_counter = np.where(over, overuse_counter + 1, 0)
+                triggered = (
+                    over
+                    & (overuse_time > overuse_time_threshold)
+                    & (overuse_counter > 1)
+                    & (offset >= detector_previous_offset)
+                )
+                overuse_counter = np.where(triggered, 0, overuse_counter)
+                overuse_time = np.where(triggered, 0.0, overuse_time)
+                hypothesis = np.where(
+                    triggered,
+                    OVERUSING,
+                    np.where(over, hypothesis, np.where(under, UNDERUSING, NORMAL)),
+                )
+                detector_previous_offset = offset
+
+                # OveruseDetector.update_threshold
+                if detector_last_update_ms is None:
+                    detector_last_update_ms = now_ms
+                abs_t = np.abs(T)
+                k = np.where(abs_t < threshold, k_down, k_up)
+                time_delta = min(now_ms - detector_last_update_ms, 100)
+                adapted = threshold + k * (abs_t - threshold) * time_delta
+                adapted = np.maximum(6, np.minimum(adapted, 600))
+                threshold = np.where(
+                    abs_t > threshold + MAX_ADAPT_OFFSET_MS, threshold, adapted
+                )
+                detector_last_update_ms = now_ms
+
+            any_overusing = bool((hypothesis == OVERUSING).any())
+
+        # RemoteBitrateEstimator rate control update
+        if not any_overusing and now_ms <= next_update_ms:
+            continue
+        update = (
+            ~has_last_update
+            | (now_ms - last_update_ms > feedback_interval)
+            | (hypothesis == OVERUSING)
+        )
+        rate = incoming[i] if incoming[i] >= 0 else None
+        updated = rate_control.update(update, hypothesis, rate, now_ms)
+        if updated.any():
+            index = np.flatnonzero(updated)
+            updates.append((now_ms, index, rate_control.current_bitrate[index]))
+            last_update_ms[updated] = now_ms
+            has_last_update |= updated
+            if has_last_update.all():
+                next_update_ms = int(last_update_ms.min()) + feedback_interval
+
+    # regroup the estimates by parameter set, preserving their order
+    if updates:
+        index = np.concatenate([x[1] for x in updates])
+        time_ms = np.concatenate(
+            [np.full(len(x[1]), x[0], dtype=np.int64) for x in updates]
+        )
+        bitrate = np.concatenate([x[2] for x in updates])
+    else:
+        index = time_ms = bitrate = np.zeros(0, dtype=np.int64)
+    order = np.argsort(index, kind="stable")
+    bounds = np.searchsorted(index[order], np.arange(n + 1))
+    return [
+        ReplayResult(
+            time_ms=time_ms[order[bounds[j] : bounds[j + 1]]],
+            bitrate=bitrate[order[bounds[j] : bounds[j + 1]]],
+        )
+        for j in range(n)
+    ]
+
+
+def _replay_chunk(
+    args: tuple[PreparedTrace, Sequence[DetectorParameters]],
+) -> list[ReplayResult]:
+    return replay_prepared(*args)
+
+
+def replay(
+    abs_send_time: np.ndarray,
+    arrival_time_ms: np.ndarray,
+    payload_size: np.ndarray,
+    parameters: Optional[DetectorParameters] = None,
+) -> ReplayResult:
+    """
+    Replay a packet trace and return the bitrate estimates.
+
+    The estimates only depend on the send and arrival times and sizes, so the
+    SSRC of each packet is not needed.
+    """
+    if parameters is None:
+        parameters = DetectorParameters()
+    trace = prepare_trace(abs_send_time, arrival_time_ms, payload_size)
+    return replay_prepared(trace, [parameters])[0]
+
+
+def replay_batch(
+    abs_send_time: np.ndarray,
+    arrival_time_ms: np.ndarray,
+    payload_size: np.ndarray,
+    parameters: Sequence[DetectorParameters],
+    processes: int = 1,
+) -> list[ReplayResult]:
+    """
+    Replay a packet trace for several parameter sets.
+
+    The trace is only preprocessed once. If `processes` is greater than one,
+    the parameter sets are split across that many worker processes.
+    """
+    trace = prepare_trace(abs_send_time, arrival_time_ms, payload_size)
+    parameters = list(parameters)
+    processes = max(1, min(processes, len(parameters)))
+    if processes == 1:
+        return replay_prepared(trace, parameters)
+
+    chunk_size = math.ceil(len(parameters) / processes)
+    chunks = [
+        (trace, parameters[i : i + chunk_size])
+        for i in range(0, len(parameters), chunk_size)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_replay_chunk, chunks)
+    return [result for chunk in results for result in chunk]
@@ -64,3 +64,17 @@ class RTCConfiguration:
 
     bundlePolicy: RTCBundlePolicy = RTCBundlePolicy.BALANCED
     "The media-bundling policy to use when gathering ICE candidates."
+
+    udpPort: Optional[int] = None
+    """
+    A UDP port shared by the ICE transports of all the peer connections which
+    use it, instead of a port per transport. The number of sockets bound to
+    the port can be set with the `AIORTC_UDP_SOCKETS` environment variable.
+    """
+
+    turnShared: bool = False
+    """
+    Whether the ICE transports of all the peer connections which use the same
+    TURN server and credentials share a single TURN allocation, instead of an
+    allocation per transport.
+    """
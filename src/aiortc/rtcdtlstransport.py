@@ -5,6 +5,7 @@ import enum
 import logging
 import os
 import traceback
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Optional, Protocol, Type, TypeVar, Union
 
@@ -18,6 +19,8 @@ from pyee.asyncio import AsyncIOEventEmitter
 from pylibsrtp import Policy, Session
 
 from . import clock, rtp
+from .cc.gcc_twcc import TransportFeedbackGenerator
+from .pacer import PACING_FACTOR, Pacer, PacerPriority
 from .rtcicetransport import RTCIceTransport
 from .rtcrtpparameters import RTCRtpReceiveParameters, RTCRtpSendParameters
 from .rtp import (
@@ -28,10 +31,12 @@ from .rtp import (
     RtcpRrPacket,
     RtcpRtpfbPacket,
     RtcpSrPacket,
+    RtcpTransportFeedback,
     RtpPacket,
     is_rtcp,
 )
 from .stats import RTCStatsReport, RTCTransportStats
+from .utils import uint16_add
 
 CERTIFICATE_T = TypeVar("CERTIFICATE_T", bound="RTCCertificate")
 K = TypeVar("K")
@@ -159,6 +164,7 @@ class RTCCertificate:
     def __init__(self, key: ec.EllipticCurvePrivateKey, cert: x509.Certificate) -> None:
         self._key = key
         self._cert = cert
+        self._ssl_contexts: dict[tuple[bytes, ...], SSL.Context] = {}
 
     @property
     def expires(self) -> datetime.datetime:
@@ -205,6 +211,22 @@ class RTCCertificate:
         )
         ctx.set_tlsext_use_srtp(b":".join(x.openssl_profile for x in srtp_profiles))
 
+        # the context may be shared by many connections, which never resume
+        ctx.set_session_cache_mode(SSL.SESS_CACHE_OFF)
+
+        return ctx
+
+    def _get_ssl_context(
+        self, srtp_profiles: list[SRTPProtectionProfile]
+    ) -> SSL.Context:
+        """
+        Return the context for the DTLS connections using this certificate,
+        which is only created once for a list of SRTP profiles.
+        """
+        key = tuple(x.openssl_profile for x in srtp_profiles)
+        ctx = self._ssl_contexts.get(key)
+        if ctx is None:
+            ctx = self._ssl_contexts[key] = self._create_ssl_context(srtp_profiles)
         return ctx
 
 
@@ -292,6 +314,10 @@ class RtpRouter:
         if isinstance(packet, (RtcpRrPacket, RtcpSrPacket)):
             for report in packet.reports:
                 add_recipient(self.senders.get(report.ssrc))
+        elif isinstance(packet, RtcpRtpfbPacket) and packet.fmt == rtp.RTCP_RTPFB_TWCC:
+            # transport-wide feedback covers the packets of all senders
+            for sender in self.senders.values():
+                add_recipient(sender)
         elif isinstance(packet, (RtcpPsfbPacket, RtcpRtpfbPacket)):
             add_recipient(self.senders.get(packet.media_ssrc))
 
@@ -371,6 +397,21 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self.__tx_bytes = 0
         self.__tx_packets = 0
 
+        # transport-wide congestion control
+        self._transport_feedback = TransportFeedbackGenerator()
+        self._transport_feedback_ssrc = 0
+        self._transport_feedback_task: Optional[asyncio.Future[None]] = None
+        self.__transport_sequence_number = 0
+
+        # packet pacing, shared by all RTP senders
+        try:
+            pacing_factor = float(os.getenv("AIORTC_PACING_FACTOR", PACING_FACTOR))
+        except ValueError:
+            pacing_factor = PACING_FACTOR
+        self._pacer = Pacer(
+            send=lambda datas: self._send_rtp_batch(datas), factor=pacing_factor
+        )
+
         # SRTP
         self._rx_srtp: Session = None
         self._tx_srtp: Session = None
@@ -515,9 +556,7 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
 
         # Initialise SSL.
         self._ssl = SSL.Connection(
-            self.__local_certificate._create_ssl_context(
-                srtp_profiles=self._srtp_profiles
-            )
+            self.__local_certificate._get_ssl_context(srtp_profiles=self._srtp_profiles)
         )
         if self._role == "server":
             self._ssl.set_accept_state()
@@ -552,6 +591,8 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         if self._task is not None:
             self._task.cancel()
             self._task = None
+        self.__stop_transport_feedback()
+        self._pacer.stop()
 
         if self._ssl and self._state in [State.CONNECTING, State.CONNECTED]:
             try:
@@ -576,8 +617,28 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
                 self.__log_warning(traceback.format_exc())
             raise exc
         finally:
+            self.__stop_transport_feedback()
             self._set_state(State.CLOSED)
 
+    async def __run_transport_feedback(self) -> None:
+        """
+        Report the packets received since the last feedback, even when no
+        more packets arrive to trigger it.
+        """
+        interval = self._transport_feedback.interval_ms / 1000
+        while True:
+            await asyncio.sleep(interval)
+            feedback = self._transport_feedback.feedback(clock.current_ms())
+            if feedback is not None:
+                await self._send_transport_feedback(
+                    feedback, media_ssrc=self._transport_feedback_ssrc
+                )
+
+    def __stop_transport_feedback(self) -> None:
+        if self._transport_feedback_task is not None:
+            self._transport_feedback_task.cancel()
+            self._transport_feedback_task = None
+
     def _get_stats(self) -> RTCStatsReport:
         report = RTCStatsReport()
         report.add(
@@ -611,11 +672,26 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
 
     async def _handle_rtp_data(self, data: bytes, arrival_time_ms: int) -> None:
         try:
-            packet = RtpPacket.parse(data, self._rtp_header_extensions_map)
+            # parse without copying, the payload is a view into the datagram
+            packet = RtpPacket.parse(memoryview(data), self._rtp_header_extensions_map)
         except ValueError as exc:
             self.__log_debug("x RTP parsing failed: %s", exc)
             return
 
+        # record arrival for transport-wide congestion control
+        if packet.extensions.transport_sequence_number is not None:
+            self._transport_feedback.add(
+                packet.extensions.transport_sequence_number, arrival_time_ms
+            )
+            self._transport_feedback_ssrc = packet.ssrc
+            if self._transport_feedback_task is None:
+                self._transport_feedback_task = asyncio.ensure_future(
+                    self.__run_transport_feedback()
+                )
+            feedback = self._transport_feedback.feedback(arrival_time_ms)
+            if feedback is not None:
+                await self._send_transport_feedback(feedback, media_ssrc=packet.ssrc)
+
         # route RTP packet
         receiver = self._rtp_router.route_rtp(packet)
         if receiver is not None:
@@ -636,9 +712,15 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
                 self._ssl.DTLSv1_handle_timeout()
                 await self._write_ssl()
                 return
+            await self._handle_datagram(data)
+        elif self.encrypted:
+            # handle all the queued datagrams before yielding to the event loop
+            for data in await self.transport._recv_batch():
+                await self._handle_datagram(data)
         else:
-            data = await self.transport._recv()
+            await self._handle_datagram(await self.transport._recv())
 
+    async def _handle_datagram(self, data: bytes) -> None:
         self.__rx_bytes += len(data)
         self.__rx_packets += 1
 
@@ -671,6 +753,15 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
             except pylibsrtp.Error as exc:
                 self.__log_debug("x SRTP unprotect failed: %s", exc)
 
+    def _next_transport_sequence_number(self) -> int:
+        """
+        Return the next transport-wide sequence number, shared by all senders.
+        """
+        self.__transport_sequence_number = uint16_add(
+            self.__transport_sequence_number, 1
+        )
+        return self.__transport_sequence_number
+
     def _register_data_receiver(self, receiver: DataReceiver) -> None:
         assert self._data_receiver is None
         self._data_receiver = receiver
@@ -694,7 +785,8 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self, sender: RtpSender, parameters: RTCRtpSendParameters
     ) -> None:
         self._rtp_header_extensions_map.configure(parameters)
-        self._rtp_router.register_sender(sender, ssrc=sender._ssrc)
+        for ssrc in [e.ssrc for e in parameters.encodings] or [sender._ssrc]:
+            self._rtp_router.register_sender(sender, ssrc=ssrc)
 
     async def _send_data(self, data: bytes) -> None:
         if self._state != State.CONNECTED:
@@ -703,6 +795,25 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self._ssl.send(data)
         await self._write_ssl()
 
+    async def _send_data_batch(self, datas: list[bytes]) -> None:
+        """
+        Encrypt several application data packets and send them in one go.
+        """
+        if self._state != State.CONNECTED:
+            raise ConnectionError("Cannot send encrypted data, not connected")
+
+        records = []
+        for data in datas:
+            # read back each record so that it gets its own datagram
+            self._ssl.send(data)
+            try:
+                records.append(self._ssl.bio_read(1500))
+            except SSL.Error:
+                pass
+        await self.transport._send_batch(records)
+        self.__tx_bytes += sum(len(record) for record in records)
+        self.__tx_packets += len(records)
+
     async def _send_rtp(self, data: bytes) -> None:
         if self._state != State.CONNECTED:
             raise ConnectionError("Cannot send encrypted RTP, not connected")
@@ -715,6 +826,51 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self.__tx_bytes += len(data)
         self.__tx_packets += 1
 
+    async def _send_rtp_batch(self, datas: list[bytes]) -> None:
+        """
+        Protect several RTP or RTCP packets and send them in one go.
+        """
+        if self._state != State.CONNECTED:
+            raise ConnectionError("Cannot send encrypted RTP, not connected")
+
+        protected = [
+            self._tx_srtp.protect_rtcp(data)
+            if is_rtcp(data)
+            else self._tx_srtp.protect(data)
+            for data in datas
+        ]
+        await self.transport._send_batch(protected)
+        self.__tx_bytes += sum(len(data) for data in protected)
+        self.__tx_packets += len(protected)
+
+    async def _send_rtp_paced(
+        self, prepares: list[Callable[[], bytes]], ssrc: int, priority: PacerPriority
+    ) -> None:
+        """
+        Queue RTP packets in the pacer shared by all senders.
+        """
+        if self._state != State.CONNECTED:
+            raise ConnectionError("Cannot send encrypted RTP, not connected")
+
+        await self._pacer.send_batch(prepares, ssrc=ssrc, priority=priority)
+
+    async def _send_transport_feedback(
+        self, feedback: RtcpTransportFeedback, media_ssrc: int
+    ) -> None:
+        # use the SSRC of one of our senders, if any
+        ssrc = next(iter(self._rtp_router.senders), 1)
+        packet = RtcpRtpfbPacket(
+            fmt=rtp.RTCP_RTPFB_TWCC,
+            ssrc=ssrc,
+            media_ssrc=media_ssrc,
+            fci=bytes(feedback),
+        )
+        self.__log_debug("> %s", packet)
+        try:
+            await self._send_rtp(bytes(packet))
+        except ConnectionError:
+            pass
+
     def _set_role(self, role: str) -> None:
         self._role = role
 
@@ -732,6 +888,9 @@ class RTCDtlsTransport(AsyncIOEventEmitter):
         self._rtp_router.unregister_receiver(receiver)
 
     def _unregister_rtp_sender(self, sender: RtpSender) -> None:
+        for ssrc, ssrc_sender in list(self._rtp_router.senders.items()):
+            if ssrc_sender is sender:
+                self._pacer.remove_stream(ssrc)
         self._rtp_router.unregister_sender(sender)
 
     async def _write_ssl(self) -> None:
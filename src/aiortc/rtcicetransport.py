@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 import re
 from dataclasses import dataclass
 from typing import Any, Optional
@@ -173,12 +174,29 @@ def parse_stun_turn_uri(uri: str) -> dict[str, Any]:
     return parsed
 
 
+def default_udp_sockets() -> int:
+    """
+    The number of sockets bound to a shared UDP port, which can be set with
+    the `AIORTC_UDP_SOCKETS` environment variable.
+    """
+    try:
+        sockets = int(os.getenv("AIORTC_UDP_SOCKETS", "1"))
+    except ValueError:
+        sockets = 1
+    return max(sockets, 1)
+
+
 class RTCIceGatherer(AsyncIOEventEmitter):
     """
     The :class:`RTCIceGatherer` interface gathers local host, server reflexive
     and relay candidates, as well as enabling the retrieval of local
     Interactive Connectivity Establishment (ICE) parameters which can be
     exchanged in signaling.
+
+    :param udpPort: An optional UDP port shared with the other ICE gatherers
+                    which use it.
+    :param turnShared: Whether the TURN allocation is shared with the other ICE
+                       gatherers which use the same TURN server and credentials.
     """
 
     def __init__(
@@ -186,12 +204,19 @@ class RTCIceGatherer(AsyncIOEventEmitter):
         iceServers: Optional[list[RTCIceServer]] = None,
         local_username: Optional[str] = None,
         local_password: Optional[str] = None,
+        udpPort: Optional[int] = None,
+        turnShared: bool = False,
     ) -> None:
         super().__init__()
 
         if iceServers is None:
             iceServers = self.getDefaultIceServers()
         ice_kwargs = connection_kwargs(iceServers)
+        if udpPort is not None:
+            ice_kwargs["udp_port"] = udpPort
+            ice_kwargs["udp_sockets"] = default_udp_sockets()
+        if turnShared:
+            ice_kwargs["turn_shared"] = True
 
         self._connection = Connection(ice_controlling=False, **ice_kwargs)
         self._remote_candidates_end = False
@@ -263,7 +288,9 @@ class RTCIceTransport(AsyncIOEventEmitter):
 
         # expose recv / send methods
         self._recv = self._connection.recv
+        self._recv_batch = self._connection.recv_batch
         self._send = self._connection.send
+        self._send_batch = self._connection.send_batch
 
     @property
     def iceGatherer(self) -> RTCIceGatherer:
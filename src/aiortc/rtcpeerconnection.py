@@ -7,7 +7,14 @@ from typing import Optional, Union
 from pyee.asyncio import AsyncIOEventEmitter
 
 from . import clock, rtp, sdp
-from .codecs import CODECS, HEADER_EXTENSIONS, is_rtx
+from .certificatepool import CertificatePool, default_pool
+from .codecs import (
+    CODECS,
+    HEADER_EXTENSIONS,
+    SIMULCAST_HEADER_EXTENSIONS,
+    is_fec,
+    is_rtx,
+)
 from .events import RTCTrackEvent
 from .exceptions import (
     InternalError,
@@ -18,7 +25,7 @@ from .exceptions import (
 from .mediastreams import MediaStreamTrack
 from .rtcconfiguration import RTCBundlePolicy, RTCConfiguration
 from .rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
-from .rtcdtlstransport import RTCCertificate, RTCDtlsParameters, RTCDtlsTransport
+from .rtcdtlstransport import RTCDtlsParameters, RTCDtlsTransport
 from .rtcicetransport import (
     RTCIceCandidate,
     RTCIceGatherer,
@@ -29,6 +36,8 @@ from .rtcrtpparameters import (
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
     RTCRtpDecodingParameters,
+    RTCRtpEncodingParameters,
+    RTCRtpFecParameters,
     RTCRtpHeaderExtensionParameters,
     RTCRtpParameters,
     RTCRtpReceiveParameters,
@@ -53,13 +62,14 @@ def filter_preferred_codecs(
     codecs: list[RTCRtpCodecParameters], preferred: list[RTCRtpCodecCapability]
 ) -> list[RTCRtpCodecParameters]:
     if not preferred:
-        return codecs
+        # FEC is only used if it is preferred explicitly
+        return [c for c in codecs if not is_fec(c)]
 
     rtx_codecs = list(filter(is_rtx, codecs))
     rtx_enabled = next(filter(is_rtx, preferred), None) is not None
 
     filtered = []
-    for pref in filter(lambda x: not is_rtx(x), preferred):
+    for pref in filter(lambda x: not is_rtx(x) and not is_fec(x), preferred):
         for codec in codecs:
             if (
                 codec.mimeType.lower() == pref.mimeType.lower()
@@ -76,6 +86,10 @@ def filter_preferred_codecs(
 
                 break
 
+    # FEC protects the media codecs, so it comes last
+    if filtered and next(filter(is_fec, preferred), None) is not None:
+        filtered += list(filter(is_fec, codecs))
+
     return filtered
 
 
@@ -122,6 +136,45 @@ def find_common_header_extensions(
     return common
 
 
+def find_send_encodings(
+    encodings: list[RTCRtpEncodingParameters],
+    remote_media: Optional[sdp.MediaDescription],
+) -> list[RTCRtpEncodingParameters]:
+    """
+    Return the encodings of a sender which the remote party accepts.
+
+    Simulcast layers are only sent if the remote description lists their RID
+    among the simulcast streams it receives, otherwise only the first encoding
+    is sent. Layers listed as paused, with a "~" prefix, start inactive.
+    """
+    if len(encodings) < 2 or remote_media is None:
+        return encodings
+
+    paused: dict[str, bool] = {}
+    if remote_media.simulcast is not None:
+        for stream in remote_media.simulcast.recv:
+            for rid in stream.split(","):
+                paused[rid.lstrip("~")] = rid.startswith("~")
+
+    accepted = []
+    for encoding in encodings:
+        if encoding.rid in paused:
+            if paused[encoding.rid]:
+                encoding = copy.copy(encoding)
+                encoding.active = False
+            accepted.append(encoding)
+    return accepted or encodings[:1]
+
+
+def get_header_extensions(
+    transceiver: RTCRtpTransceiver,
+) -> list[RTCRtpHeaderExtensionParameters]:
+    extensions = HEADER_EXTENSIONS[transceiver.kind][:]
+    if len(transceiver.sender._encodings) > 1:
+        extensions += SIMULCAST_HEADER_EXTENSIONS
+    return extensions
+
+
 def is_codec_compatible(a: RTCRtpCodecParameters, b: RTCRtpCodecParameters) -> bool:
     if a.mimeType.lower() != b.mimeType.lower() or a.clockRate != b.clockRate:
         return False
@@ -218,7 +271,11 @@ def create_media_description_for_sctp(
 
 
 def create_media_description_for_transceiver(
-    transceiver: RTCRtpTransceiver, cname: str, direction: str, mid: str
+    transceiver: RTCRtpTransceiver,
+    cname: str,
+    direction: str,
+    mid: str,
+    encodings: list[RTCRtpEncodingParameters],
 ) -> sdp.MediaDescription:
     media = sdp.MediaDescription(
         kind=transceiver.kind,
@@ -237,19 +294,49 @@ def create_media_description_for_transceiver(
     media.rtcp_host = DISCARD_HOST
     media.rtcp_port = DISCARD_PORT
     media.rtcp_mux = True
-    media.ssrc = [sdp.SsrcDescription(ssrc=transceiver.sender._ssrc, cname=cname)]
+    fec_enabled = next(filter(is_fec, media.rtp.codecs), None) is not None
+    rtx_enabled = next(filter(is_rtx, media.rtp.codecs), None) is not None
+    for encoding in encodings:
+        media.ssrc.append(sdp.SsrcDescription(ssrc=encoding.ssrc, cname=cname))
+
+        # if RTX is enabled, add corresponding SSRC
+        if rtx_enabled and encoding.rtx is not None:
+            media.ssrc.append(sdp.SsrcDescription(ssrc=encoding.rtx.ssrc, cname=cname))
+            media.ssrc_group.append(
+                sdp.GroupDescription(
+                    semantic="FID", items=[encoding.ssrc, encoding.rtx.ssrc]
+                )
+            )
 
-    # if RTX is enabled, add corresponding SSRC
-    if next(filter(is_rtx, media.rtp.codecs), None):
-        media.ssrc.append(
-            sdp.SsrcDescription(ssrc=transceiver.sender._rtx_ssrc, cname=cname)
-        )
-        media.ssrc_group = [
-            sdp.GroupDescription(
-                semantic="FID",
-                items=[transceiver.sender._ssrc, transceiver.sender._rtx_ssrc],
+        # if FEC is enabled, add corresponding SSRC
+        if fec_enabled and encoding.fec is not None:
+            media.ssrc.append(sdp.SsrcDescription(ssrc=encoding.fec.ssrc, cname=cname))
+            media.ssrc_group.append(
+                sdp.GroupDescription(
+                    semantic="FEC-FR", items=[encoding.ssrc, encoding.fec.ssrc]
+                )
             )
-        ]
+
+    # simulcast layers are identified by their RID
+    if len(encodings) > 1:
+        for encoding in encodings:
+            assert encoding.rid is not None
+            media.rid.append(
+                sdp.RidDescription(
+                    rid=encoding.rid,
+                    direction="send",
+                    params=(
+                        f"max-br={encoding.maxBitrate}" if encoding.maxBitrate else None
+                    ),
+                )
+            )
+        media.simulcast = sdp.SimulcastDescription(
+            send=[
+                encoding.rid if encoding.active else "~" + encoding.rid
+                for encoding in encodings
+                if encoding.rid
+            ]
+        )
 
     add_transport_description(media, transceiver.receiver.transport)
 
@@ -288,11 +375,17 @@ class RTCPeerConnection(AsyncIOEventEmitter):
     between the local computer and a remote peer.
 
     :param configuration: An optional :class:`RTCConfiguration`.
+    :param certificatePool: The :class:`~aiortc.certificatepool.CertificatePool`
+                            from which the DTLS certificate is drawn.
     """
 
-    def __init__(self, configuration: Optional[RTCConfiguration] = None) -> None:
+    def __init__(
+        self,
+        configuration: Optional[RTCConfiguration] = None,
+        certificatePool: CertificatePool = default_pool,
+    ) -> None:
         super().__init__()
-        self.__certificates = [RTCCertificate.generateCertificate()]
+        self.__certificates = [certificatePool.get()]
         self.__cname = f"{uuid.uuid4()}"
         self.__configuration = configuration or RTCConfiguration()
         self.__dtlsTransports: set[RTCDtlsTransport] = set()
@@ -472,10 +565,17 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         return transceiver.sender
 
     def addTransceiver(
-        self, trackOrKind: Union[str, MediaStreamTrack], direction: str = "sendrecv"
+        self,
+        trackOrKind: Union[str, MediaStreamTrack],
+        direction: str = "sendrecv",
+        sendEncodings: Optional[list[RTCRtpEncodingParameters]] = None,
     ) -> RTCRtpTransceiver:
         """
         Add a new :class:`RTCRtpTransceiver`.
+
+        :param sendEncodings: The :class:`RTCRtpEncodingParameters` to send,
+                              several video encodings with distinct RIDs
+                              being sent as simulcast layers.
         """
         self.__assertNotClosed()
 
@@ -498,7 +598,10 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             self.__assertTrackHasNoSender(track)
 
         return self.__createTransceiver(
-            direction=direction, kind=kind, sender_track=track
+            direction=direction,
+            kind=kind,
+            sender_track=track,
+            send_encodings=sendEncodings,
         )
 
     async def close(self) -> None:
@@ -569,6 +672,9 @@ class RTCPeerConnection(AsyncIOEventEmitter):
                         transceiver.direction, transceiver._offerDirection
                     ),
                     mid=transceiver.mid,
+                    encodings=find_send_encodings(
+                        transceiver.sender._encodings, remote_m
+                    ),
                 )
                 dtlsTransport = transceiver.receiver.transport
             else:
@@ -639,7 +745,7 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             transceiver._codecs = filter_preferred_codecs(
                 CODECS[transceiver.kind][:], transceiver._preferred_codecs
             )
-            transceiver._headerExtensions = HEADER_EXTENSIONS[transceiver.kind][:]
+            transceiver._headerExtensions = get_header_extensions(transceiver)
 
         mids = self.__seenMids.copy()
 
@@ -679,6 +785,7 @@ class RTCPeerConnection(AsyncIOEventEmitter):
                         cname=self.__cname,
                         direction=transceiver.direction,
                         mid=mid,
+                        encodings=transceiver.sender._encodings,
                     )
                 )
             elif media_kind == "application":
@@ -703,6 +810,7 @@ class RTCPeerConnection(AsyncIOEventEmitter):
                     cname=self.__cname,
                     direction=transceiver.direction,
                     mid=allocate_mid(mids),
+                    encodings=transceiver.sender._encodings,
                 )
             )
         if self.__sctp and self.__sctp.mid is None:
@@ -906,7 +1014,7 @@ class RTCPeerConnection(AsyncIOEventEmitter):
 
                 transceiver._codecs = common
                 transceiver._headerExtensions = find_common_header_extensions(
-                    HEADER_EXTENSIONS[media.kind], media.rtp.headerExtensions
+                    get_header_extensions(transceiver), media.rtp.headerExtensions
                 )
 
                 # configure direction
@@ -1106,9 +1214,15 @@ class RTCPeerConnection(AsyncIOEventEmitter):
                 iceServers=self.__configuration.iceServers,
                 local_username=parameters.usernameFragment,
                 local_password=parameters.password,
+                udpPort=self.__configuration.udpPort,
+                turnShared=self.__configuration.turnShared,
             )
         else:
-            iceGatherer = RTCIceGatherer(iceServers=self.__configuration.iceServers)
+            iceGatherer = RTCIceGatherer(
+                iceServers=self.__configuration.iceServers,
+                udpPort=self.__configuration.udpPort,
+                turnShared=self.__configuration.turnShared,
+            )
 
         iceGatherer.on("statechange", self.__updateIceGatheringState)
         iceTransport = RTCIceTransport(iceGatherer)
@@ -1147,7 +1261,11 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             self.emit("datachannel", channel)
 
     def __createTransceiver(
-        self, direction: str, kind: str, sender_track: Optional[MediaStreamTrack] = None
+        self,
+        direction: str,
+        kind: str,
+        sender_track: Optional[MediaStreamTrack] = None,
+        send_encodings: Optional[list[RTCRtpEncodingParameters]] = None,
     ) -> RTCRtpTransceiver:
         dtlsTransport = None
         bundled = False
@@ -1172,7 +1290,9 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         transceiver = RTCRtpTransceiver(
             direction=direction,
             kind=kind,
-            sender=RTCRtpSender(sender_track or kind, dtlsTransport),
+            sender=RTCRtpSender(
+                sender_track or kind, dtlsTransport, sendEncodings=send_encodings
+            ),
             receiver=RTCRtpReceiver(kind, dtlsTransport),
         )
         transceiver.receiver._set_rtcp_ssrc(transceiver.sender._ssrc)
@@ -1201,6 +1321,10 @@ class RTCPeerConnection(AsyncIOEventEmitter):
         rtp.rtcp.cname = self.__cname
         rtp.rtcp.ssrc = transceiver.sender._ssrc
         rtp.rtcp.mux = True
+        rtp.encodings = find_send_encodings(
+            transceiver.sender._encodings,
+            self.__remoteDescription().media[transceiver._get_mline_index()],
+        )
         return rtp
 
     def __log_debug(self, msg: str, *args: object) -> None:
@@ -1219,22 +1343,31 @@ class RTCPeerConnection(AsyncIOEventEmitter):
             rtcp=media.rtp.rtcp,
         )
         if len(media.ssrc):
+            # the FEC SSRC is announced along with the media and RTX ones
+            fec = None
+            ssrcs = [ssrc.ssrc for ssrc in media.ssrc]
+            for group in media.ssrc_group:
+                if (
+                    group.semantic == "FEC-FR"
+                    and len(group.items) == 2
+                    and group.items[1] in ssrcs
+                ):
+                    ssrcs.remove(group.items[1])
+                    if any(map(is_fec, transceiver._codecs)):
+                        fec = RTCRtpFecParameters(ssrc=group.items[1])
+
             encodings: dict[int, RTCRtpDecodingParameters] = {}
             for codec in transceiver._codecs:
+                if is_fec(codec):
+                    continue
                 if is_rtx(codec):
                     apt = codec.parameters.get("apt")
-                    if (
-                        isinstance(apt, int)
-                        and apt in encodings
-                        and len(media.ssrc) == 2
-                    ):
-                        encodings[apt].rtx = RTCRtpRtxParameters(
-                            ssrc=media.ssrc[1].ssrc
-                        )
+                    if isinstance(apt, int) and apt in encodings and len(ssrcs) == 2:
+                        encodings[apt].rtx = RTCRtpRtxParameters(ssrc=ssrcs[1])
                     continue
 
                 encodings[codec.payloadType] = RTCRtpDecodingParameters(
-                    ssrc=media.ssrc[0].ssrc, payloadType=codec.payloadType
+                    ssrc=ssrcs[0], payloadType=codec.payloadType, fec=fec
                 )
             receiveParameters.encodings = list(encodings.values())
         return receiveParameters
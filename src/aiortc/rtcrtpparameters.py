@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import Optional, Union
 
+from .utils import random32
+
 ParametersDict = dict[str, Union[int, str, None]]
 
 
@@ -56,6 +58,12 @@ class RTCRtpCodecParameters:
         return s
 
 
+@dataclass
+class RTCRtpFecParameters:
+    ssrc: int
+    mechanism: str = "flexfec-03"
+
+
 @dataclass
 class RTCRtpRtxParameters:
     ssrc: int
@@ -66,14 +74,32 @@ class RTCRtpCodingParameters:
     ssrc: int
     payloadType: int
     rtx: Optional[RTCRtpRtxParameters] = None
+    fec: Optional[RTCRtpFecParameters] = None
 
 
 class RTCRtpDecodingParameters(RTCRtpCodingParameters):
     pass
 
 
+@dataclass
 class RTCRtpEncodingParameters(RTCRtpCodingParameters):
-    pass
+    """
+    The :class:`RTCRtpEncodingParameters` dictionary describes one of the
+    encodings sent by an :class:`RTCRtpSender`, for instance a simulcast layer.
+    """
+
+    ssrc: int = field(default_factory=random32)
+    "The SSRC of the encoding, chosen at random by default."
+    payloadType: int = 0
+    "The payload type, set by the sender from the negotiated codec."
+    rid: Optional[str] = None
+    "The RTP stream ID (RID) of the encoding, required for simulcast."
+    active: bool = True
+    "Whether the encoding is being sent."
+    maxBitrate: Optional[int] = None
+    "The maximum bitrate of the encoding, in bits per second."
+    scaleResolutionDownBy: float = 1.0
+    "The factor by which the resolution of the track is scaled down."
 
 
 @dataclass
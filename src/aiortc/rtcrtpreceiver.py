@@ -1,21 +1,27 @@
 import asyncio
 import datetime
 import logging
+import math
 import os
-import queue
 import random
-import threading
-import time
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Optional
 
 from av.frame import Frame
 
-from . import clock
-from .codecs import depayload, get_capabilities, get_decoder, is_rtx
+from . import clock, eventlog
+from .codecs import depayload, get_capabilities, is_fec, is_rtx
+from .decoderpool import (
+    DecoderPool,
+    DecoderStream,
+    DecoderStreamStats,
+    default_pool,
+)
 from .exceptions import InvalidStateError
-from .jitterbuffer import JitterBuffer
+from .fec import FecDecoder, FecPacket
+from .jitterbuffer import JitterBuffer, JitterFrame
 from .mediastreams import MediaStreamError, MediaStreamTrack
 from .rate import RemoteBitrateEstimator
 from .cc import create_controller
@@ -51,31 +57,12 @@ from .utils import uint16_add, uint16_gt
 
 logger = logging.getLogger(__name__)
 
-
-def decoder_worker(
-    loop: asyncio.AbstractEventLoop, input_q: queue.Queue, output_q: asyncio.Queue
-) -> None:
-    codec_name = None
-    decoder = None
-
-    while True:
-        task = input_q.get()
-        if task is None:
-            # inform the track that is has ended
-            asyncio.run_coroutine_threadsafe(output_q.put(None), loop)
-            break
-        codec, encoded_frame = task
-
-        if codec.name != codec_name:
-            decoder = get_decoder(codec)
-            codec_name = codec.name
-
-        for frame in decoder.decode(encoded_frame):
-            # pass the decoded frame to the track
-            asyncio.run_coroutine_threadsafe(output_q.put(frame), loop)
-
-    if decoder is not None:
-        del decoder
+# adaptive playout delay
+PLAYOUT_DELAY_MIN_MS = 10
+PLAYOUT_DELAY_MAX_MS = 1000
+PLAYOUT_JITTER_FACTOR = 3
+PLAYOUT_RECOVERY_HALF_LIFE_MS = 5000
+PLAYOUT_TRANSIT_WINDOW_MS = 2000
 
 
 class NackGenerator:
@@ -149,7 +136,7 @@ class StreamStatistics:
             self.base_seq = packet.sequence_number
 
         if in_order:
-            arrival = int(time.time() * self._clockrate)
+            arrival = int(clock.current_time() * self._clockrate)
 
             if self.max_seq is not None and packet.sequence_number < self.max_seq:
                 self.cycles += 1 << 16
@@ -190,6 +177,102 @@ class StreamStatistics:
         return clamp_packets_lost(self.packets_expected - self.packets_received)
 
 
+class PlayoutDelay:
+    """
+    Schedule the playout of frames after a target delay.
+
+    The target delay covers a multiple of the interarrival jitter, plus the
+    time it recently took to recover a lost packet by retransmission. Frames
+    are scheduled relative to the lowest transit time seen recently.
+    """
+
+    def __init__(self, clockrate: int) -> None:
+        self.late_frames_dropped = 0
+        self._clockrate = clockrate
+        self._nack_times: dict[int, int] = {}
+        self._recovery_ms = 0.0
+        self._recovery_time_ms: Optional[int] = None
+        self._reference: Optional[tuple[int, float]] = None
+        self._target_ms = float(PLAYOUT_DELAY_MIN_MS)
+        self._transits: deque[tuple[int, float]] = deque()
+
+    @property
+    def target_delay_ms(self) -> int:
+        return round(self._target_ms)
+
+    def deadline_ms(self, timestamp: int) -> Optional[float]:
+        """
+        Return the playout time of the frame with the given timestamp, or
+        `None` if no frame was scheduled yet.
+        """
+        if not self._transits:
+            return None
+        return self._timestamp_ms(timestamp) + self._transits[0][1] + self._target_ms
+
+    def frame_completed(self, timestamp: int, now_ms: int) -> float:
+        """
+        Make note of a complete frame and return its playout time.
+        """
+        timestamp_ms = self._timestamp_ms(timestamp)
+        self._reference = (timestamp, timestamp_ms)
+
+        # track the lowest transit time over a sliding window
+        transit = now_ms - timestamp_ms
+        while self._transits and self._transits[-1][1] >= transit:
+            self._transits.pop()
+        self._transits.append((now_ms, transit))
+        while self._transits[0][0] < now_ms - PLAYOUT_TRANSIT_WINDOW_MS:
+            self._transits.popleft()
+
+        return timestamp_ms + self._transits[0][1] + self._target_ms
+
+    def nack_sent(self, sequence_numbers: list[int], now_ms: int) -> None:
+        # forget packets which were not recovered in time
+        for sequence_number, sent_ms in list(self._nack_times.items()):
+            if now_ms - sent_ms > PLAYOUT_DELAY_MAX_MS:
+                del self._nack_times[sequence_number]
+        for sequence_number in sequence_numbers:
+            self._nack_times.setdefault(sequence_number, now_ms)
+
+    def packet_received(self, sequence_number: int, now_ms: int) -> None:
+        sent_ms = self._nack_times.pop(sequence_number, None)
+        if sent_ms is not None:
+            self._recovery_ms = max(self._decayed_recovery_ms(now_ms), now_ms - sent_ms)
+            self._recovery_time_ms = now_ms
+
+    def update(self, jitter: int, now_ms: int) -> None:
+        """
+        Update the target delay from the interarrival jitter, expressed in
+        timestamp units.
+        """
+        target_ms = (
+            PLAYOUT_JITTER_FACTOR * jitter * 1000 / self._clockrate
+            + self._decayed_recovery_ms(now_ms)
+        )
+        target_ms = max(PLAYOUT_DELAY_MIN_MS, min(target_ms, PLAYOUT_DELAY_MAX_MS))
+
+        # increase immediately, decrease slowly
+        if target_ms > self._target_ms:
+            self._target_ms = target_ms
+        else:
+            self._target_ms += (target_ms - self._target_ms) / 16
+
+    def _decayed_recovery_ms(self, now_ms: int) -> float:
+        if self._recovery_time_ms is None:
+            return 0.0
+        elapsed_ms = now_ms - self._recovery_time_ms
+        return self._recovery_ms * 0.5 ** (elapsed_ms / PLAYOUT_RECOVERY_HALF_LIFE_MS)
+
+    def _timestamp_ms(self, timestamp: int) -> float:
+        if self._reference is None:
+            return 0.0
+        reference_timestamp, reference_ms = self._reference
+        delta = (timestamp - reference_timestamp) & 0xFFFFFFFF
+        if delta >= 0x80000000:
+            delta -= 1 << 32
+        return reference_ms + delta * 1000 / self._clockrate
+
+
 class RemoteStreamTrack(MediaStreamTrack):
     def __init__(self, kind: str, id: Optional[str] = None) -> None:
         super().__init__()
@@ -262,21 +345,47 @@ class RTCRtpReceiver:
 
     :param kind: The kind of media (`'audio'` or `'video'`).
     :param transport: An :class:`RTCDtlsTransport`.
+    :param decoderPool: The :class:`~aiortc.decoderpool.DecoderPool` whose
+                        threads decode the received frames.
     """
 
-    def __init__(self, kind: str, transport: RTCDtlsTransport) -> None:
+    def __init__(
+        self,
+        kind: str,
+        transport: RTCDtlsTransport,
+        decoderPool: DecoderPool = default_pool,
+    ) -> None:
         if transport.state == "closed":
             raise InvalidStateError
 
         self._enabled = True
         self.__active_ssrc: dict[int, datetime.datetime] = {}
         self.__codecs: dict[int, RTCRtpCodecParameters] = {}
-        self.__decoder_queue: queue.Queue = queue.Queue()
-        self.__decoder_thread: Optional[threading.Thread] = None
+        self.__decoder_pool = decoderPool
+        self.__decoder_stats = DecoderStreamStats()
+        self.__decoder_stream: Optional[DecoderStream] = None
+        self.__fec_decoders: dict[int, FecDecoder] = {}
+        self.__fec_enabled = False
         self.__kind = kind
+
+        # Frames are either released once enough frames are buffered, or
+        # after an adaptive playout delay.
+        self.__playout_adaptive = os.getenv("AIORTC_PLAYOUT_DELAY") == "adaptive"
+        self.__playout_delay: Optional[PlayoutDelay] = None
+        self.__playout_last_ms = -math.inf
+        self.__playout_queue: deque[
+            tuple[float, RTCRtpCodecParameters, JitterFrame]
+        ] = deque()
+        self.__playout_timer: Optional[asyncio.TimerHandle] = None
+        self.__playout_deadline_timer: Optional[asyncio.TimerHandle] = None
+
         if kind == "audio":
-            self.__jitter_buffer = JitterBuffer(capacity=16, prefetch=4)
-            self.__nack_generator = None #for audio, WebRTC does not enable nack and congestion control 
+            self.__jitter_buffer = JitterBuffer(
+                capacity=16, prefetch=0 if self.__playout_adaptive else 4
+            )
+            self.__nack_generator = (
+                None  # for audio, WebRTC does not enable nack and congestion control
+            )
             self.__remote_bitrate_estimator = None
         else:
             self.__jitter_buffer = JitterBuffer(capacity=128, is_video=True)
@@ -285,6 +394,12 @@ class RTCRtpReceiver:
             cc_algorithm = os.getenv("AIORTC_CC", "remb")
             self.__cc_controller = create_controller(cc_algorithm)
             print(f"[RECEIVER] Created CC controller: {cc_algorithm} -> {type(self.__cc_controller).__name__}")
+        self.__eval_log_estimates = os.getenv("EVAL_LOG_ESTIMATES", "0") not in (
+            "",
+            "0",
+            "false",
+            "False",
+        )
         self._track: Optional[RemoteStreamTrack] = None
         self.__rtcp_exited = asyncio.Event()
         self.__rtcp_started = asyncio.Event()
@@ -295,6 +410,11 @@ class RTCRtpReceiver:
         self.__timestamp_mapper = TimestampMapper()
         self.__transport = transport
 
+        # stats
+        self.__fec_packets_received = 0
+        self.__packets_recovered_by_fec = 0
+        self.__packets_recovered_by_rtx = 0
+
         # RTCP
         self.__lsr: dict[int, int] = {}
         self.__lsr_time: dict[int, float] = {}
@@ -355,6 +475,22 @@ class RTCRtpReceiver:
                     packetsLost=stream.packets_lost,
                     jitter=stream.jitter,
                     # RTPInboundRtpStreamStats
+                    targetPlayoutDelay=(
+                        self.__playout_delay.target_delay_ms / 1000
+                        if self.__playout_delay is not None
+                        else 0.0
+                    ),
+                    lateFramesDropped=(
+                        self.__playout_delay.late_frames_dropped
+                        if self.__playout_delay is not None
+                        else 0
+                    ),
+                    framesDecoded=self.__decoder_stats.frames_decoded,
+                    totalDecodeTime=self.__decoder_stats.total_decode_time,
+                    totalDecodeQueueDelay=self.__decoder_stats.total_queue_delay,
+                    fecPacketsReceived=self.__fec_packets_received,
+                    packetsRecoveredByFec=self.__packets_recovered_by_fec,
+                    packetsRecoveredByRtx=self.__packets_recovered_by_rtx,
                 )
             )
         self.__stats.update(self.transport._get_stats())
@@ -384,21 +520,17 @@ class RTCRtpReceiver:
         if not self.__started:
             for codec in parameters.codecs:
                 self.__codecs[codec.payloadType] = codec
+                if is_fec(codec):
+                    self.__fec_enabled = True
             for encoding in parameters.encodings:
                 if encoding.rtx:
                     self.__rtx_ssrc[encoding.rtx.ssrc] = encoding.ssrc
 
-            # start decoder thread
-            self.__decoder_thread = threading.Thread(
-                target=decoder_worker,
-                name=self.__kind + "-decoder",
-                args=(
-                    asyncio.get_event_loop(),
-                    self.__decoder_queue,
-                    self._track._queue,
-                ),
+            # start decoding
+            self.__decoder_stream = self.__decoder_pool.create_stream(
+                asyncio.get_event_loop(), self.__deliver_frames
             )
-            self.__decoder_thread.start()
+            self.__decoder_stats = self.__decoder_stream.stats
 
             self.__transport._register_rtp_receiver(self, parameters)
             self.__rtcp_task = asyncio.ensure_future(self._run_rtcp())
@@ -449,7 +581,7 @@ class RTCRtpReceiver:
             self.__lsr[packet.ssrc] = (
                 (packet.sender_info.ntp_timestamp) >> 16
             ) & 0xFFFFFFFF
-            self.__lsr_time[packet.ssrc] = time.time()
+            self.__lsr_time[packet.ssrc] = clock.current_time()
         elif isinstance(packet, RtcpByePacket):
             self.__stop_decoder()
 
@@ -499,16 +631,10 @@ class RTCRtpReceiver:
                 )
                 await self._send_rtcp(rtcp_packet)
                 # optional logging of REMB/Ar for experiments
-                try:
-                    import os, time as _time
-                    loss_log_path = os.getenv("RTCP_LOSS_LOG")
-                    log_est = os.getenv("EVAL_LOG_ESTIMATES", "0")
-                    if loss_log_path and log_est not in ("", "0", "false", "False"):
-                        target_bps, ssrcs = remb
-                        with open(loss_log_path, "a", encoding="utf-8") as f:
-                            f.write(f"REMB Ar={target_bps}, ssrcs={ssrcs}, time={_time.time():.3f}\n")
-                except Exception:
-                    pass
+                event_log = eventlog.get("RTCP_LOSS_LOG")
+                if event_log is not None and self.__eval_log_estimates:
+                    target_bps, ssrcs = remb
+                    event_log.log("remb", ar_bps=target_bps, ssrcs=ssrcs)
 
         # keep track of sources
         self.__active_ssrc[packet.ssrc] = clock.current_datetime()
@@ -526,6 +652,9 @@ class RTCRtpReceiver:
             self.__remote_streams[packet.ssrc] = StreamStatistics(codec.clockRate)
         self.__remote_streams[packet.ssrc].add(packet)
 
+        if self.__playout_adaptive and self.__playout_delay is None:
+            self.__playout_delay = PlayoutDelay(codec.clockRate)
+
         # unwrap retransmission packet
         if is_rtx(codec):
             original_ssrc = self.__rtx_ssrc.get(packet.ssrc)
@@ -543,35 +672,36 @@ class RTCRtpReceiver:
 
             packet = unwrap_rtx(packet, payload_type=apt, ssrc=original_ssrc)
             codec = self.__codecs[apt]
+            if (
+                self.__nack_generator is not None
+                and packet.sequence_number in self.__nack_generator.missing
+            ):
+                self.__packets_recovered_by_rtx += 1
 
-        # send NACKs for any missing any packets
-        if self.__nack_generator is not None and self.__nack_generator.add(packet):
-            await self._send_rtcp_nack(
-                packet.ssrc, sorted(self.__nack_generator.missing)
-            )
+        # repair lost packets using FEC packets
+        elif is_fec(codec):
+            if not self.__fec_enabled:
+                return
+            try:
+                fec = FecPacket.parse(packet.payload)
+            except ValueError as exc:
+                self.__log_debug("x FEC packet invalid: %s", exc)
+                return
 
-        # parse codec-specific information
-        try:
-            if packet.payload:
-                packet._data = depayload(codec, packet.payload)  # type: ignore
-            else:
-                packet._data = b""  # type: ignore
-        except ValueError as exc:
-            self.__log_debug("x RTP payload parsing failed: %s", exc)
+            # only repair the media streams being received
+            self.__fec_packets_received += 1
+            fec_decoder = self.__fec_decoders.get(fec.ssrc)
+            if fec_decoder is not None:
+                await self.__handle_recovered_packets(fec_decoder.add_fec(fec))
             return
 
-        # try to re-assemble encoded frame
-        pli_flag, encoded_frame = self.__jitter_buffer.add(packet)
-        # check if the PLI should be sent
-        if pli_flag:
-            await self._send_rtcp_pli(packet.ssrc)
+        await self.__handle_media_packet(packet, codec)
 
-        # if we have a complete encoded frame, decode it
-        if encoded_frame is not None and self.__decoder_thread:
-            encoded_frame.timestamp = self.__timestamp_mapper.map(
-                encoded_frame.timestamp
+        # the packet may allow lost packets to be repaired
+        if self.__fec_enabled:
+            await self.__handle_recovered_packets(
+                self.__get_fec_decoder(packet.ssrc).add(packet)
             )
-            self.__decoder_queue.put((codec, encoded_frame))
 
     async def _run_rtcp(self) -> None:
         self.__log_debug("- RTCP started")
@@ -590,7 +720,7 @@ class RTCRtpReceiver:
                     dlsr = 0
                     if ssrc in self.__lsr:
                         lsr = self.__lsr[ssrc]
-                        delay = time.time() - self.__lsr_time[ssrc]
+                        delay = clock.current_time() - self.__lsr_time[ssrc]
                         if delay > 0 and delay < 65536:
                             dlsr = int(delay * 65536)
 
@@ -608,18 +738,12 @@ class RTCRtpReceiver:
 
                 if self.__rtcp_ssrc is not None and reports:
                     # optional logging of loss from RR
-                    try:
-                        import os, time as _time
-                        loss_log_path = os.getenv("RTCP_LOSS_LOG")
-                        if loss_log_path:
-                            for ri in reports:
-                                loss_pct = (ri.fraction_lost / 255.0) * 100.0
-                                with open(loss_log_path, "a", encoding="utf-8") as f:
-                                    f.write(
-                                        f"RR ssrc={ri.ssrc} loss={ri.fraction_lost}/255 ({loss_pct:.1f}%), time={_time.time():.3f}\n"
-                                    )
-                    except Exception:
-                        pass
+                    event_log = eventlog.get("RTCP_LOSS_LOG")
+                    if event_log is not None:
+                        for ri in reports:
+                            event_log.log(
+                                "rr_sent", ssrc=ri.ssrc, fraction_lost=ri.fraction_lost
+                            )
 
                     packet = RtcpRrPacket(ssrc=self.__rtcp_ssrc, reports=reports)
                     await self._send_rtcp(packet)
@@ -664,11 +788,183 @@ class RTCRtpReceiver:
     def _set_rtcp_ssrc(self, ssrc: int) -> None:
         self.__rtcp_ssrc = ssrc
 
+    def __decode_frame(
+        self, codec: RTCRtpCodecParameters, encoded_frame: JitterFrame
+    ) -> None:
+        if self.__decoder_stream:
+            encoded_frame.timestamp = self.__timestamp_mapper.map(
+                encoded_frame.timestamp
+            )
+            self.__decoder_stream.decode(codec, encoded_frame)
+
+    def __deliver_frames(self, frames: list[Optional[Frame]]) -> None:
+        """
+        Pass a batch of decoded frames to the track.
+        """
+        for frame in frames:
+            self._track._queue.put_nowait(frame)
+
+    def __release_frames(self) -> None:
+        """
+        Pass the frames whose playout time has come to the decoder.
+        """
+        self.__playout_timer = None
+        now_ms = clock.current_ms()
+        while self.__playout_queue and self.__playout_queue[0][0] <= now_ms:
+            _, codec, encoded_frame = self.__playout_queue.popleft()
+            self.__decode_frame(codec, encoded_frame)
+
+        if self.__playout_queue:
+            self.__playout_timer = asyncio.get_event_loop().call_later(
+                (self.__playout_queue[0][0] - now_ms) / 1000, self.__release_frames
+            )
+
+    def __expire_playout(self, ssrc: int, codec: RTCRtpCodecParameters) -> None:
+        """
+        Discard the incomplete frame whose playout time has come.
+        """
+        self.__playout_deadline_timer = None
+        if self.__schedule_playout(ssrc, codec, None):
+            asyncio.ensure_future(self._send_rtcp_pli(ssrc))
+
+    def __get_fec_decoder(self, ssrc: int) -> FecDecoder:
+        if ssrc not in self.__fec_decoders:
+            self.__fec_decoders[ssrc] = FecDecoder()
+        return self.__fec_decoders[ssrc]
+
+    async def __handle_media_packet(
+        self, packet: RtpPacket, codec: RTCRtpCodecParameters
+    ) -> None:
+        """
+        Handle a media packet, which was received, retransmitted or repaired.
+        """
+        # send NACKs for any missing any packets
+        if self.__playout_delay is not None:
+            self.__playout_delay.packet_received(
+                packet.sequence_number, clock.current_ms()
+            )
+        if self.__nack_generator is not None and self.__nack_generator.add(packet):
+            missing = sorted(self.__nack_generator.missing)
+            if self.__playout_delay is not None:
+                self.__playout_delay.nack_sent(missing, clock.current_ms())
+            await self._send_rtcp_nack(packet.ssrc, missing)
+
+        # parse codec-specific information
+        try:
+            if packet.payload:
+                packet._data = depayload(codec, packet.payload)  # type: ignore
+            else:
+                packet._data = b""  # type: ignore
+        except ValueError as exc:
+            self.__log_debug("x RTP payload parsing failed: %s", exc)
+            return
+
+        # try to re-assemble encoded frame
+        pli_flag, encoded_frame = self.__jitter_buffer.add(packet)
+
+        # schedule complete frames for playout
+        if self.__playout_delay is not None:
+            if self.__schedule_playout(packet.ssrc, codec, encoded_frame):
+                pli_flag = True
+            encoded_frame = None
+
+        # check if the PLI should be sent
+        if pli_flag:
+            await self._send_rtcp_pli(packet.ssrc)
+
+        # if we have a complete encoded frame, decode it
+        if encoded_frame is not None:
+            self.__decode_frame(codec, encoded_frame)
+
+    async def __handle_recovered_packets(self, packets: list[RtpPacket]) -> None:
+        for packet in packets:
+            codec = self.__codecs.get(packet.payload_type)
+            if codec is None or is_fec(codec) or is_rtx(codec):
+                self.__log_debug(
+                    "x FEC repaired packet with invalid payload type %d",
+                    packet.payload_type,
+                )
+                continue
+
+            self.__packets_recovered_by_fec += 1
+            await self.__handle_media_packet(packet, codec)
+
+    def __schedule_playout(
+        self,
+        ssrc: int,
+        codec: RTCRtpCodecParameters,
+        encoded_frame: Optional[JitterFrame],
+    ) -> bool:
+        """
+        Schedule the complete frames for playout, and give up on incomplete
+        frames which are due.
+
+        Returns `True` if a video frame was discarded.
+        """
+        assert self.__playout_delay is not None
+        now_ms = clock.current_ms()
+        stream = self.__remote_streams.get(ssrc)
+        if stream is not None:
+            self.__playout_delay.update(stream.jitter, now_ms)
+
+        discarded = False
+        deadline_ms: Optional[float] = None
+        encoded_frames = [encoded_frame] if encoded_frame is not None else []
+        while True:
+            encoded_frame = self.__jitter_buffer.get_frame()
+            if encoded_frame is not None:
+                encoded_frames.append(encoded_frame)
+                continue
+
+            timestamp = self.__jitter_buffer.incomplete_frame_timestamp()
+            if timestamp is None:
+                deadline_ms = None
+                break
+            deadline_ms = self.__playout_delay.deadline_ms(timestamp)
+            if deadline_ms is None or now_ms < deadline_ms:
+                break
+            self.__jitter_buffer.remove_incomplete_frame()
+            self.__playout_delay.late_frames_dropped += 1
+            discarded = self.__kind == "video"
+
+        # give up on the incomplete frame even if no more packets arrive
+        if self.__playout_deadline_timer is not None:
+            self.__playout_deadline_timer.cancel()
+            self.__playout_deadline_timer = None
+        if deadline_ms is not None:
+            self.__playout_deadline_timer = asyncio.get_event_loop().call_later(
+                (deadline_ms - now_ms) / 1000, self.__expire_playout, ssrc, codec
+            )
+
+        for encoded_frame in encoded_frames:
+            playout_ms = self.__playout_delay.frame_completed(
+                encoded_frame.timestamp, now_ms
+            )
+
+            # late audio is discarded, late video is still needed for decoding
+            if playout_ms < now_ms and self.__kind == "audio":
+                self.__playout_delay.late_frames_dropped += 1
+                continue
+
+            self.__playout_last_ms = max(self.__playout_last_ms, playout_ms)
+            self.__playout_queue.append((self.__playout_last_ms, codec, encoded_frame))
+
+        if self.__playout_timer is None and self.__playout_queue:
+            self.__release_frames()
+        return discarded
+
     def __stop_decoder(self) -> None:
         """
-        Stop the decoder thread, which will in turn stop the track.
+        Stop decoding, which will in turn stop the track.
         """
-        if self.__decoder_thread:
-            self.__decoder_queue.put(None)
-            self.__decoder_thread.join()
-            self.__decoder_thread = None
+        if self.__playout_timer is not None:
+            self.__playout_timer.cancel()
+            self.__playout_timer = None
+        if self.__playout_deadline_timer is not None:
+            self.__playout_deadline_timer.cancel()
+            self.__playout_deadline_timer = None
+        self.__playout_queue.clear()
+
+        if self.__decoder_stream:
+            self.__decoder_stream.close()
+            self.__decoder_stream = None
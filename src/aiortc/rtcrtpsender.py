@@ -1,25 +1,32 @@
 import asyncio
+import dataclasses
+import functools
 import logging
 import os
 import random
-import time
 import traceback
 import uuid
 from collections.abc import Callable
 from typing import Optional, Union
 
-from av import AudioFrame
+from av import AudioFrame, VideoFrame
 from av.frame import Frame
+from av.packet import Packet
 
-from . import clock, rtp
-from .codecs import get_capabilities, get_encoder, is_rtx
-from .codecs.base import Encoder
+from . import clock, eventlog, rtp
+from .codecs import get_capabilities, is_fec, is_rtx
+from .encoderpool import EncoderPool, SharedEncoderHandle, default_pool
 from .exceptions import InvalidStateError
+from .fec import FecEncoder
 from .mediastreams import MediaStreamError, MediaStreamTrack
+from .pacer import PacerPriority
 from .rtcdtlstransport import RTCDtlsTransport
 from .rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecParameters,
+    RTCRtpEncodingParameters,
+    RTCRtpFecParameters,
+    RTCRtpRtxParameters,
     RTCRtpSendParameters,
 )
 from .cc import create_controller
@@ -27,7 +34,9 @@ from .rtp import (
     RTCP_PSFB_APP,
     RTCP_PSFB_PLI,
     RTCP_RTPFB_NACK,
+    RTCP_RTPFB_TWCC,
     RTP_HISTORY_SIZE,
+    TRANSPORT_WIDE_CC_URI,
     AnyRtcpPacket,
     RtcpByePacket,
     RtcpPsfbPacket,
@@ -37,10 +46,12 @@ from .rtp import (
     RtcpSenderInfo,
     RtcpSourceInfo,
     RtcpSrPacket,
+    RtcpTransportFeedback,
     RtpPacket,
     unpack_remb_fci,
     wrap_rtx,
 )
+from .simulcast import allocate_bitrate
 from .stats import (
     RTCOutboundRtpStreamStats,
     RTCRemoteInboundRtpStreamStats,
@@ -73,6 +84,47 @@ class RTCEncodedFrame:
         self.audio_level = audio_level
 
 
+class RTCRtpSenderStream:
+    """
+    The RTP stream sent by an :class:`RTCRtpSender` for one of its encodings.
+    """
+
+    def __init__(self, encoding: RTCRtpEncodingParameters) -> None:
+        self.encoding = encoding
+        self.encoder: Optional[SharedEncoderHandle] = None
+        self.fec: Optional[FecEncoder] = None
+        self.fec_sequence_number = random_sequence_number()
+        self.force_keyframe = False
+        self.history: dict[int, RtpPacket] = {}
+        self.rtx_sequence_number = random_sequence_number()
+        self.sequence_number = random_sequence_number()
+
+        # the share of the sender's bitrate, `None` if the stream is paused
+        self.enabled = True
+        self.target_bitrate: Optional[int] = None
+
+        # stats
+        self.lsr: Optional[int] = None
+        self.lsr_time: Optional[float] = None
+        self.ntp_timestamp = 0
+        self.rtp_timestamp = 0
+        self.octet_count = 0
+        self.packet_count = 0
+
+    @property
+    def media_bitrate(self) -> Optional[int]:
+        """
+        The share of the target bitrate left for the media once FEC is budgeted.
+        """
+        if self.target_bitrate is None or self.fec is None:
+            return self.target_bitrate
+        return int(self.target_bitrate / (1 + self.fec.overhead))
+
+    @property
+    def ssrc(self) -> int:
+        return self.encoding.ssrc
+
+
 class RTCRtpSender:
     """
     The :class:`RTCRtpSender` interface provides the ability to control and
@@ -82,48 +134,70 @@ class RTCRtpSender:
     :param trackOrKind: Either a :class:`MediaStreamTrack` instance or a
                          media kind (`'audio'` or `'video'`).
     :param transport: An :class:`RTCDtlsTransport`.
+    :param encoderPool: The :class:`~aiortc.encoderpool.EncoderPool` whose
+                        encoders are shared with the senders of other peers.
+    :param sendEncodings: The :class:`RTCRtpEncodingParameters` to send. Several
+                          video encodings with distinct RIDs enable simulcast.
     """
 
     def __init__(
-        self, trackOrKind: Union[MediaStreamTrack, str], transport: RTCDtlsTransport
+        self,
+        trackOrKind: Union[MediaStreamTrack, str],
+        transport: RTCDtlsTransport,
+        encoderPool: EncoderPool = default_pool,
+        sendEncodings: Optional[list[RTCRtpEncodingParameters]] = None,
     ) -> None:
         if transport.state == "closed":
             raise InvalidStateError
 
+        self.__streams: list[RTCRtpSenderStream] = []
         if isinstance(trackOrKind, MediaStreamTrack):
             self.__kind = trackOrKind.kind
             self.replaceTrack(trackOrKind)
         else:
             self.__kind = trackOrKind
             self.replaceTrack(None)
+
+        if not sendEncodings:
+            sendEncodings = [RTCRtpEncodingParameters()]
+        if len(sendEncodings) > 1:
+            if self.__kind != "video":
+                raise ValueError("Simulcast is only supported for video")
+            rids = [encoding.rid for encoding in sendEncodings]
+            if None in rids or len(set(rids)) != len(rids):
+                raise ValueError("Simulcast encodings must have distinct RIDs")
+        for encoding in sendEncodings:
+            if encoding.rtx is None:
+                encoding.rtx = RTCRtpRtxParameters(ssrc=random32())
+            if encoding.fec is None and self.__kind == "video":
+                encoding.fec = RTCRtpFecParameters(ssrc=random32())
+        self._encodings = sendEncodings
+
         self.__cname: Optional[str] = None
-        self._ssrc = random32()
-        self._rtx_ssrc = random32()
         # FIXME: how should this be initialised?
         self._stream_id = str(uuid.uuid4())
         self._enabled = True
-        self.__encoder: Optional[Encoder] = None
-        self.__force_keyframe = False
-        self.__loop = asyncio.get_event_loop()
+        self.__encoder_pool = encoderPool
+        self.__fec_payload_type: Optional[int] = None
         self.__mid: Optional[str] = None
         self.__rtp_exited = asyncio.Event()
         self.__rtp_header_extensions_map = rtp.HeaderExtensionsMap()
         self.__rtp_started = asyncio.Event()
         self.__rtp_task: Optional[asyncio.Future[None]] = None
-        self.__rtp_history: dict[int, RtpPacket] = {}
         self.__rtcp_exited = asyncio.Event()
         self.__rtcp_started = asyncio.Event()
         self.__rtcp_task: Optional[asyncio.Future[None]] = None
         self.__rtx_payload_type: Optional[int] = None
-        self.__rtx_sequence_number = random_sequence_number()
         self.__started = False
         self.__stats = RTCStatsReport()
+        self.__streams = [RTCRtpSenderStream(e) for e in sendEncodings]
         self.__transport = transport
         
         # Initialize congestion control for sender-side loss feedback
         cc_algorithm = os.getenv("AIORTC_CC", "remb")
         self.__cc_controller = create_controller(cc_algorithm)
         print(f"[SENDER] Created CC controller: {cc_algorithm} -> {type(self.__cc_controller).__name__}")
+        self.__transport_wide_cc = False
 
         # Evaluation knobs
         try:
@@ -134,14 +208,14 @@ class RTCRtpSender:
             self.__eval_target_bps = int(os.getenv("EVAL_TARGET_BPS", "0"))
         except Exception:
             self.__eval_target_bps = 0
+        self.__eval_log_estimates = os.getenv("EVAL_LOG_ESTIMATES", "0") not in (
+            "",
+            "0",
+            "false",
+            "False",
+        )
 
         # stats
-        self.__lsr: Optional[int] = None
-        self.__lsr_time: Optional[float] = None
-        self.__ntp_timestamp = 0
-        self.__rtp_timestamp = 0
-        self.__octet_count = 0
-        self.__packet_count = 0
         self.__rtt: Optional[float] = None
         # last REMB received from receiver (bps) for logging / Ar
         self.__last_remb_bitrate: Optional[int] = None
@@ -157,6 +231,23 @@ class RTCRtpSender:
     def kind(self) -> str:
         return self.__kind
 
+    @property
+    def _ssrc(self) -> int:
+        return self.__streams[0].ssrc
+
+    @_ssrc.setter
+    def _ssrc(self, ssrc: int) -> None:
+        self.__streams[0].encoding.ssrc = ssrc
+
+    @property
+    def _rtx_ssrc(self) -> int:
+        assert self.__streams[0].encoding.rtx is not None
+        return self.__streams[0].encoding.rtx.ssrc
+
+    @_rtx_ssrc.setter
+    def _rtx_ssrc(self, ssrc: int) -> None:
+        self.__streams[0].encoding.rtx = RTCRtpRtxParameters(ssrc=ssrc)
+
     @property
     def track(self) -> MediaStreamTrack:
         """
@@ -188,29 +279,47 @@ class RTCRtpSender:
 
         :rtype: :class:`RTCStatsReport`
         """
-        self.__stats.add(
-            RTCOutboundRtpStreamStats(
-                # RTCStats
-                timestamp=clock.current_datetime(),
-                type="outbound-rtp",
-                id="outbound-rtp_" + str(id(self)),
-                # RTCStreamStats
-                ssrc=self._ssrc,
-                kind=self.__kind,
-                transportId=self.transport._stats_id,
-                # RTCSentRtpStreamStats
-                packetsSent=self.__packet_count,
-                bytesSent=self.__octet_count,
-                # RTCOutboundRtpStreamStats
-                trackId=str(id(self.track)),
+        for stream in self.__streams:
+            pacer_stats = self.transport._pacer.stats(stream.ssrc)
+            encoder_stats = stream.encoder.stats if stream.encoder else None
+            self.__stats.add(
+                RTCOutboundRtpStreamStats(
+                    # RTCStats
+                    timestamp=clock.current_datetime(),
+                    type="outbound-rtp",
+                    id=self.__stats_id("outbound-rtp", stream),
+                    # RTCStreamStats
+                    ssrc=stream.ssrc,
+                    kind=self.__kind,
+                    transportId=self.transport._stats_id,
+                    # RTCSentRtpStreamStats
+                    packetsSent=stream.packet_count,
+                    bytesSent=stream.octet_count,
+                    # RTCOutboundRtpStreamStats
+                    trackId=str(id(self.track)),
+                    rid=stream.encoding.rid,
+                    totalPacketSendDelay=pacer_stats.total_send_delay,
+                    packetsDiscardedOnSend=pacer_stats.packets_discarded,
+                    keyFramesEncoded=encoder_stats.keyframes if encoder_stats else 0,
+                    encoderReconfigurations=(
+                        encoder_stats.reconfigurations if encoder_stats else 0
+                    ),
+                    encoderResets=encoder_stats.resets if encoder_stats else 0,
+                )
             )
-        )
         self.__stats.update(self.transport._get_stats())
 
         return self.__stats
 
     def replaceTrack(self, track: Optional[MediaStreamTrack]) -> None:
         self.__track = track
+
+        # the encoders are shared by source track, acquire them again
+        for stream in self.__streams:
+            if stream.encoder is not None:
+                stream.encoder.close()
+                stream.encoder = None
+
         if track is not None:
             self._track_id = track.id
         else:
@@ -229,9 +338,22 @@ class RTCRtpSender:
             self.__cname = parameters.rtcp.cname
             self.__mid = parameters.muxId
 
+            # only send the negotiated encodings
+            if parameters.encodings:
+                self.__streams = [RTCRtpSenderStream(e) for e in parameters.encodings]
+            for stream in self.__streams:
+                stream.encoding.payloadType = parameters.codecs[0].payloadType
+
             # make note of the RTP header extension IDs
             self.__transport._register_rtp_sender(self, parameters)
             self.__rtp_header_extensions_map.configure(parameters)
+            self.__transport_wide_cc = (
+                self.__cc_controller.uses_transport_feedback
+                and any(
+                    ext.uri == TRANSPORT_WIDE_CC_URI
+                    for ext in parameters.headerExtensions
+                )
+            )
 
             # make note of RTX payload type
             for codec in parameters.codecs:
@@ -242,6 +364,15 @@ class RTCRtpSender:
                     self.__rtx_payload_type = codec.payloadType
                     break
 
+            # make note of FEC payload type
+            for codec in parameters.codecs:
+                if is_fec(codec):
+                    self.__fec_payload_type = codec.payloadType
+                    for stream in self.__streams:
+                        if stream.encoding.fec is not None:
+                            stream.fec = FecEncoder()
+                    break
+
             self.__rtp_task = asyncio.ensure_future(self._run_rtp(parameters.codecs[0]))
             self.__rtcp_task = asyncio.ensure_future(self._run_rtcp())
             self.__started = True
@@ -261,10 +392,15 @@ class RTCRtpSender:
 
     async def _handle_rtcp_packet(self, packet: AnyRtcpPacket) -> None:
         if isinstance(packet, (RtcpRrPacket, RtcpSrPacket)):
-            for report in filter(lambda x: x.ssrc == self._ssrc, packet.reports):
+            losses: list[tuple[RTCRtpSenderStream, int]] = []
+            for report in packet.reports:
+                stream = self.__get_stream(report.ssrc)
+                if stream is None:
+                    continue
+
                 # estimate round-trip time
-                if self.__lsr == report.lsr and report.dlsr:
-                    rtt = time.time() - self.__lsr_time - (report.dlsr / 65536)
+                if stream.lsr == report.lsr and report.dlsr:
+                    rtt = clock.current_time() - stream.lsr_time - (report.dlsr / 65536)
                     if self.__rtt is None:
                         self.__rtt = rtt
                     else:
@@ -275,13 +411,13 @@ class RTCRtpSender:
                         # RTCStats
                         timestamp=clock.current_datetime(),
                         type="remote-inbound-rtp",
-                        id="remote-inbound-rtp_" + str(id(self)),
+                        id=self.__stats_id("remote-inbound-rtp", stream),
                         # RTCStreamStats
                         ssrc=packet.ssrc,
                         kind=self.__kind,
                         transportId=self.transport._stats_id,
                         # RTCReceivedRtpStreamStats
-                        packetsReceived=self.__packet_count - report.packets_lost,
+                        packetsReceived=stream.packet_count - report.packets_lost,
                         packetsLost=report.packets_lost,
                         jitter=report.jitter,
                         # RTCRemoteInboundRtpStreamStats
@@ -289,151 +425,146 @@ class RTCRtpSender:
                         fractionLost=report.fraction_lost,
                     )
                 )
-                
-                # Feed loss information to congestion control and optionally log
-                self.__cc_controller.on_receiver_report(report.fraction_lost)
+
+                if stream.fec is not None:
+                    stream.fec.update_loss(report.fraction_lost)
+                if stream.encoding.active and stream.enabled:
+                    losses.append((stream, report.fraction_lost))
 
                 # Optional lightweight loss logging for experiments
                 # Enable by setting env var RTCP_LOSS_LOG to a file path
-                try:
-                    loss_log_path = os.getenv("RTCP_LOSS_LOG")
-                    if loss_log_path:
-                        # fraction_lost is 0..255 per RFC
-                        loss_pct = (report.fraction_lost / 255.0) * 100.0
-                        with open(loss_log_path, "a", encoding="utf-8") as f:
-                            f.write(
-                                f"loss={report.fraction_lost}/255 ({loss_pct:.1f}%), "
-                                f"rtt_ms={(self.__rtt or 0)*1000:.1f}, "
-                                f"time={time.time():.3f}\n"
-                            )
-                except Exception:
-                    # Never let logging affect media path
-                    pass
+                event_log = eventlog.get("RTCP_LOSS_LOG")
+                if event_log is not None:
+                    # fraction_lost is 0..255 per RFC
+                    event_log.log(
+                        "rr_received",
+                        ssrc=report.ssrc,
+                        fraction_lost=report.fraction_lost,
+                        rtt_ms=round((self.__rtt or 0) * 1000, 1),
+                    )
+
+            # Feed loss information to congestion control once per report,
+            # from the lowest active layer: paused layers report no loss, and
+            # the loss controller steps once per update
+            if not losses:
+                return
+            _, fraction_lost = max(
+                losses, key=lambda loss: loss[0].encoding.scaleResolutionDownBy
+            )
+            self.__cc_controller.on_receiver_report(fraction_lost)
+
+            # Update encoder bitrate based on CC decision
+            # Prefer combined min(Ar from REMB, As from loss controller)
+            combined_target = None
+            try:
+                as_bps = None
+                if hasattr(self.__cc_controller, "estimates"):
+                    _ar_unused, as_bps, _a_unused = self.__cc_controller.estimates()  # type: ignore[attr-defined]
+                ar_bps = self.__last_remb_bitrate
+                if as_bps and ar_bps:
+                    combined_target = min(ar_bps, as_bps)
+                elif ar_bps:
+                    combined_target = ar_bps
+                elif as_bps:
+                    combined_target = as_bps
                 
-                # Update encoder bitrate based on CC decision
-                # Prefer combined min(Ar from REMB, As from loss controller)
+                # Log GCC estimates for analysis
+                gcc_log = eventlog.get("GCC_ESTIMATES_LOG", format="csv")
+                if gcc_log is not None and (as_bps or ar_bps):
+                    gcc_log.log(
+                        "gcc_estimates",
+                        as_bps=as_bps or 0,
+                        ar_bps=ar_bps or 0,
+                        gcc_bps=combined_target or 0,
+                    )
+            except Exception:
                 combined_target = None
-                try:
-                    as_bps = None
-                    if hasattr(self.__cc_controller, "estimates"):
-                        _ar_unused, as_bps, _a_unused = self.__cc_controller.estimates()  # type: ignore[attr-defined]
-                    ar_bps = self.__last_remb_bitrate
-                    if as_bps and ar_bps:
-                        combined_target = min(ar_bps, as_bps)
-                    elif ar_bps:
-                        combined_target = ar_bps
-                    elif as_bps:
-                        combined_target = as_bps
-                    
-                    # Log GCC estimates for analysis
-                    try:
-                        gcc_log_path = os.getenv("GCC_ESTIMATES_LOG")
-                        if gcc_log_path and (as_bps or ar_bps):
-                            with open(gcc_log_path, "a", encoding="utf-8") as f:
-                                timestamp_s = time.time()
-                                f.write(f"{timestamp_s:.3f}, {as_bps or 0}, {ar_bps or 0}, {combined_target or 0}\n")
-                    except Exception:
-                        # Never let logging affect media path
-                        pass
-                except Exception:
-                    combined_target = None
-
-                # Fallback to controller-supplied target (may be None on sender)
-                if combined_target is None:
-                    target_bitrate = self.__cc_controller.target_bitrate()
-                    combined_target = target_bitrate
-
-                if combined_target and self.__encoder and hasattr(self.__encoder, "target_bitrate"):
-                    old_target = getattr(self.__encoder, "target_bitrate", "unknown")
-                    self.__encoder.target_bitrate = combined_target
-
-                # If evaluation mode requests forcing encoder rate, apply it last
-                if (
-                    self.__eval_force_encoder
-                    and self.__eval_target_bps > 0
-                    and self.__encoder
-                    and hasattr(self.__encoder, "target_bitrate")
-                ):
-                    self.__encoder.target_bitrate = self.__eval_target_bps
-
-                # Optional estimates logging (A/Ar/As) to same file as RTCP loss log
-                try:
-                    loss_log_path = os.getenv("RTCP_LOSS_LOG")
-                    log_est = os.getenv("EVAL_LOG_ESTIMATES", "0")
-                    if loss_log_path and log_est not in ("", "0", "false", "False"):
-                        # Prefer REMB as Ar on the sender side; compute A = min(Ar, As)
-                        last_ar = self.__last_remb_bitrate or 0
-                        as_bps = 0
-                        if hasattr(self.__cc_controller, "estimates"):
-                            _ar_unused, as_bps, _a_unused = self.__cc_controller.estimates()  # type: ignore[attr-defined]
-                        computed_a = min(last_ar, as_bps) if last_ar and as_bps else 0
-                        with open(loss_log_path, "a", encoding="utf-8") as f:
-                            f.write(
-                                f"A={computed_a}, Ar={last_ar}, As={as_bps}, time={time.time():.3f}\n"
-                            )
-                except Exception:
-                    pass
+
+            # Fallback to controller-supplied target (may be None on sender)
+            if combined_target is None:
+                target_bitrate = self.__cc_controller.target_bitrate()
+                combined_target = target_bitrate
+
+            if combined_target:
+                self.__set_target_bitrate(combined_target)
+
+            # If evaluation mode requests forcing encoder rate, apply it last
+            if self.__eval_force_encoder and self.__eval_target_bps > 0:
+                self.__set_target_bitrate(self.__eval_target_bps)
+
+            # Optional estimates logging (A/Ar/As) to same file as RTCP loss log
+            event_log = eventlog.get("RTCP_LOSS_LOG")
+            if event_log is not None and self.__eval_log_estimates:
+                # Prefer REMB as Ar on the sender side; compute A = min(Ar, As)
+                last_ar = self.__last_remb_bitrate or 0
+                as_bps = 0
+                if hasattr(self.__cc_controller, "estimates"):
+                    _ar_unused, as_bps, _a_unused = self.__cc_controller.estimates()  # type: ignore[attr-defined]
+                computed_a = min(last_ar, as_bps) if last_ar and as_bps else 0
+                event_log.log(
+                    "estimates", a_bps=computed_a, ar_bps=last_ar, as_bps=as_bps
+                )
+        elif isinstance(packet, RtcpRtpfbPacket) and packet.fmt == RTCP_RTPFB_TWCC:
+            if not self.__transport_wide_cc:
+                return
+            try:
+                feedback = RtcpTransportFeedback.parse(packet.fci)
+            except ValueError as exc:
+                self.__log_debug("x RTCP transport-wide feedback invalid: %s", exc)
+                return
+            self.__cc_controller.on_transport_feedback(feedback)
+
+            # apply the send-side estimate immediately
+            target_bitrate = self.__cc_controller.target_bitrate()
+            if target_bitrate:
+                self.__set_target_bitrate(target_bitrate)
         elif isinstance(packet, RtcpRtpfbPacket) and packet.fmt == RTCP_RTPFB_NACK:
             for seq in packet.lost:
-                await self._retransmit(seq)
+                await self._retransmit(seq, ssrc=packet.media_ssrc)
         elif isinstance(packet, RtcpPsfbPacket) and packet.fmt == RTCP_PSFB_PLI:
-            self._send_keyframe()
+            self._send_keyframe(ssrc=packet.media_ssrc)
         elif isinstance(packet, RtcpPsfbPacket) and packet.fmt == RTCP_PSFB_APP:
             try:
                 bitrate, ssrcs = unpack_remb_fci(packet.fci)
-                if self._ssrc in ssrcs:
+                if any(stream.ssrc in ssrcs for stream in self.__streams):
                     self.__log_debug(
                         "- receiver estimated maximum bitrate %d bps", bitrate
                     )
                     # Remember last REMB for logging A/Ar/As (but don't print noise)
                     self.__last_remb_bitrate = bitrate
-                    if self.__encoder and hasattr(self.__encoder, "target_bitrate"):
-                        self.__encoder.target_bitrate = bitrate
+                    self.__set_target_bitrate(bitrate)
             except ValueError as e:
                 print(f"[SENDER] Failed to unpack REMB: {e}")
                 pass
 
     async def _next_encoded_frame(
-        self, codec: RTCRtpCodecParameters
+        self,
+        stream: RTCRtpSenderStream,
+        codec: RTCRtpCodecParameters,
+        data: Union[Frame, Packet],
     ) -> Optional[RTCEncodedFrame]:
-        # Get [Frame|Packet].
-        data = await self.__track.recv()
-
-        # If the sender is disabled, drop the frame instead of encoding it.
-        # We still want to read from the track in order to avoid frames
-        # accumulating in memory.
-        if not self._enabled:
-            return None
-
         audio_level = None
 
-        if self.__encoder is None:
-            self.__encoder = get_encoder(codec)
+        # Senders relaying the same source with the same codec at a similar
+        # bitrate share one encoder, and only packetize separately.
+        if stream.encoder is None:
+            stream.encoder = self.__encoder_pool.acquire(
+                self.__track, codec, scale=stream.encoding.scaleResolutionDownBy
+            )
+            if stream.target_bitrate:
+                stream.encoder.target_bitrate = stream.media_bitrate
 
         if isinstance(data, Frame):
             # Encode the frame.
             if isinstance(data, AudioFrame):
                 audio_level = rtp.compute_audio_level_dbov(data)
 
-            force_keyframe = self.__force_keyframe
-            self.__force_keyframe = False
-            payloads, timestamp = await self.__loop.run_in_executor(
-                None, self.__encoder.encode, data, force_keyframe
-            )
-            # If evaluation flag requests forcing encoder bitrate, ensure it sticks even after encoder (re)init
-            if (
-                self.__eval_force_encoder
-                and self.__eval_target_bps > 0
-                and hasattr(self.__encoder, "target_bitrate")
-            ):
-                try:
-                    # apply without throwing if unsupported
-                    self.__encoder.target_bitrate = self.__eval_target_bps
-                except Exception:
-                    pass
+            force_keyframe = stream.force_keyframe
+            stream.force_keyframe = False
+            payloads, timestamp = await stream.encoder.encode(data, force_keyframe)
         else:
             # Pack the pre-encoded data.
-            payloads, timestamp = self.__encoder.pack(data)
+            payloads, timestamp = await stream.encoder.encode(data)
 
         # If the encoder did not return any payloads, return `None`.
         # This may be due to a delay caused by resampling.
@@ -442,39 +573,54 @@ class RTCRtpSender:
 
         return RTCEncodedFrame(payloads, timestamp, audio_level)
 
-    async def _retransmit(self, sequence_number: int) -> None:
+    async def _retransmit(
+        self, sequence_number: int, ssrc: Optional[int] = None
+    ) -> None:
         """
         Retransmit an RTP packet which was reported as lost.
         """
-        packet = self.__rtp_history.get(sequence_number % RTP_HISTORY_SIZE)
+        stream = self.__get_stream(ssrc) or self.__streams[0]
+        packet = stream.history.get(sequence_number % RTP_HISTORY_SIZE)
         if packet and packet.sequence_number == sequence_number:
-            if self.__rtx_payload_type is not None:
+            if self.__rtx_payload_type is not None and stream.encoding.rtx:
+                rid = packet.extensions.rtp_stream_id
                 packet = wrap_rtx(
                     packet,
                     payload_type=self.__rtx_payload_type,
-                    sequence_number=self.__rtx_sequence_number,
-                    ssrc=self._rtx_ssrc,
+                    sequence_number=stream.rtx_sequence_number,
+                    ssrc=stream.encoding.rtx.ssrc,
                 )
-                self.__rtx_sequence_number = uint16_add(self.__rtx_sequence_number, 1)
+                if rid is not None:
+                    packet.extensions = dataclasses.replace(
+                        packet.extensions,
+                        rtp_stream_id=None,
+                        repaired_rtp_stream_id=rid,
+                    )
+                stream.rtx_sequence_number = uint16_add(stream.rtx_sequence_number, 1)
 
             self.__log_debug("> %s", packet)
-            packet_bytes = packet.serialize(self.__rtp_header_extensions_map)
-            
-
-            
-            await self.transport._send_rtp(packet_bytes)
+            await self.transport._send_rtp_paced(
+                [functools.partial(self.__prepare_packet, packet)],
+                ssrc=stream.ssrc,
+                priority=PacerPriority.RETRANSMISSION,
+            )
 
-    def _send_keyframe(self) -> None:
+    def _send_keyframe(self, ssrc: Optional[int] = None) -> None:
         """
-        Request the next frame to be a keyframe.
+        Request the next frame to be a keyframe, on the stream with the given
+        SSRC or else on all of them.
         """
-        self.__force_keyframe = True
+        stream = self.__get_stream(ssrc)
+        for stream in [stream] if stream else self.__streams:
+            stream.force_keyframe = True
 
     async def _run_rtp(self, codec: RTCRtpCodecParameters) -> None:
         self.__log_debug("- RTP started")
         self.__rtp_started.set()
 
-        sequence_number = random_sequence_number()
+        priority = (
+            PacerPriority.AUDIO if self.__kind == "audio" else PacerPriority.VIDEO
+        )
         timestamp_origin = random32()
         try:
             while True:
@@ -482,45 +628,33 @@ class RTCRtpSender:
                     await asyncio.sleep(0.02)
                     continue
 
-                # Fetch the next encoded frame. This can be `None` if the sender
-                # is disabled, in which case we just continue the loop.
-                enc_frame = await self._next_encoded_frame(codec)
-                if enc_frame is None:
+                # Get [Frame|Packet].
+                data = await self.__track.recv()
+
+                # If the sender is disabled, drop the frame instead of encoding it.
+                # We still want to read from the track in order to avoid frames
+                # accumulating in memory.
+                if not self._enabled:
                     continue
 
-                timestamp = uint32_add(timestamp_origin, enc_frame.timestamp)
+                # If evaluation flag requests forcing encoder bitrate, ensure it
+                # sticks even after encoder (re)init
+                if self.__eval_force_encoder and self.__eval_target_bps > 0:
+                    self.__set_target_bitrate(self.__eval_target_bps)
 
-                for i, payload in enumerate(enc_frame.payloads):
-                    packet = RtpPacket(
-                        payload_type=codec.payloadType,
-                        sequence_number=sequence_number,
-                        timestamp=timestamp,
-                    )
-                    packet.ssrc = self._ssrc
-                    packet.payload = payload
-                    packet.marker = (i == len(enc_frame.payloads) - 1) and 1 or 0
-
-                    # set header extensions
-                    packet.extensions.abs_send_time = (
-                        clock.current_ntp_time() >> 14
-                    ) & 0x00FFFFFF
-                    packet.extensions.mid = self.__mid
-                    if enc_frame.audio_level is not None:
-                        packet.extensions.audio_level = (False, -enc_frame.audio_level)
-
-                    # send packet
-                    self.__log_debug("> %s", packet)
-                    self.__rtp_history[packet.sequence_number % RTP_HISTORY_SIZE] = (
-                        packet
-                    )
-                    packet_bytes = packet.serialize(self.__rtp_header_extensions_map)
-                    await self.transport._send_rtp(packet_bytes)
-
-                    self.__ntp_timestamp = clock.current_ntp_time()
-                    self.__rtp_timestamp = packet.timestamp
-                    self.__octet_count += len(payload)
-                    self.__packet_count += 1
-                    sequence_number = uint16_add(sequence_number, 1)
+                # Only video frames can be scaled down for the simulcast layers.
+                streams = [s for s in self.__streams if s.encoding.active and s.enabled]
+                if not isinstance(data, VideoFrame):
+                    streams = streams[:1]
+
+                await asyncio.gather(
+                    *[
+                        self.__send_frame(
+                            stream, codec, data, timestamp_origin, priority
+                        )
+                        for stream in streams
+                    ]
+                )
         except (asyncio.CancelledError, ConnectionError, MediaStreamError):
             pass
         except Exception:
@@ -533,8 +667,11 @@ class RTCRtpSender:
             self.__track.stop()
             self.__track = None
 
-        # release encoder
-        self.__encoder = None
+        # release encoders
+        for stream in self.__streams:
+            if stream.encoder is not None:
+                stream.encoder.close()
+                stream.encoder = None
 
         self.__log_debug("- RTP finished")
         self.__rtp_exited.set()
@@ -550,19 +687,21 @@ class RTCRtpSender:
                 await asyncio.sleep(0.5 + random.random())
 
                 # RTCP SR
-                packets: list[AnyRtcpPacket] = [
-                    RtcpSrPacket(
-                        ssrc=self._ssrc,
-                        sender_info=RtcpSenderInfo(
-                            ntp_timestamp=self.__ntp_timestamp,
-                            rtp_timestamp=self.__rtp_timestamp,
-                            packet_count=self.__packet_count & 0xFFFFFFFF,
-                            octet_count=self.__octet_count & 0xFFFFFFFF,
-                        ),
+                packets: list[AnyRtcpPacket] = []
+                for stream in self.__streams:
+                    packets.append(
+                        RtcpSrPacket(
+                            ssrc=stream.ssrc,
+                            sender_info=RtcpSenderInfo(
+                                ntp_timestamp=stream.ntp_timestamp,
+                                rtp_timestamp=stream.rtp_timestamp,
+                                packet_count=stream.packet_count & 0xFFFFFFFF,
+                                octet_count=stream.octet_count & 0xFFFFFFFF,
+                            ),
+                        )
                     )
-                ]
-                self.__lsr = ((self.__ntp_timestamp) >> 16) & 0xFFFFFFFF
-                self.__lsr_time = time.time()
+                    stream.lsr = ((stream.ntp_timestamp) >> 16) & 0xFFFFFFFF
+                    stream.lsr_time = clock.current_time()
 
                 # RTCP SDES
                 if self.__cname is not None:
@@ -570,9 +709,10 @@ class RTCRtpSender:
                         RtcpSdesPacket(
                             chunks=[
                                 RtcpSourceInfo(
-                                    ssrc=self._ssrc,
+                                    ssrc=stream.ssrc,
                                     items=[(1, self.__cname.encode("utf8"))],
                                 )
+                                for stream in self.__streams
                             ]
                         )
                     )
@@ -582,7 +722,7 @@ class RTCRtpSender:
             pass
 
         # RTCP BYE
-        packet = RtcpByePacket(sources=[self._ssrc])
+        packet = RtcpByePacket(sources=[stream.ssrc for stream in self.__streams])
         await self._send_rtcp([packet])
 
         self.__log_debug("- RTCP finished")
@@ -601,5 +741,144 @@ class RTCRtpSender:
         except ConnectionError:
             pass
 
+    def __get_stream(self, ssrc: Optional[int]) -> Optional[RTCRtpSenderStream]:
+        for stream in self.__streams:
+            if stream.ssrc == ssrc:
+                return stream
+        return None
+
+    def __set_target_bitrate(self, bitrate: int) -> None:
+        """
+        Set the target bitrate of the sender, which is split between its
+        encodings. The FEC packets of each encoding are sent within its share.
+        """
+        allocation = allocate_bitrate(bitrate, [s.encoding for s in self.__streams])
+        for stream, stream_bitrate in zip(self.__streams, allocation):
+            if stream_bitrate is None:
+                stream.enabled = False
+                continue
+
+            # the receiver cannot decode a resumed layer before a keyframe
+            if not stream.enabled:
+                stream.enabled = True
+                stream.force_keyframe = True
+
+            stream.target_bitrate = stream_bitrate
+            if stream.encoder is not None:
+                stream.encoder.target_bitrate = stream.media_bitrate
+
+    async def __send_frame(
+        self,
+        stream: RTCRtpSenderStream,
+        codec: RTCRtpCodecParameters,
+        data: Union[Frame, Packet],
+        timestamp_origin: int,
+        priority: PacerPriority,
+    ) -> None:
+        """
+        Encode a frame for one of the streams, then packetize and send it.
+        """
+        enc_frame = await self._next_encoded_frame(stream, codec, data)
+        if enc_frame is None:
+            return
+
+        timestamp = uint32_add(timestamp_origin, enc_frame.timestamp)
+
+        # let the pacer know how fast this stream is supposed to go
+        if len(self.__streams) > 1:
+            target_bitrate = stream.target_bitrate
+        else:
+            target_bitrate = self.__cc_controller.target_bitrate()
+        if target_bitrate is None:
+            target_bitrate = getattr(stream.encoder, "target_bitrate", None)
+        self.transport._pacer.set_target_bitrate(stream.ssrc, target_bitrate)
+
+        packets = []
+        prepares: list[Callable[[], bytes]] = []
+        for i, payload in enumerate(enc_frame.payloads):
+            packet = RtpPacket(
+                payload_type=codec.payloadType,
+                sequence_number=stream.sequence_number,
+                timestamp=timestamp,
+            )
+            packet.ssrc = stream.ssrc
+            packet.payload = payload
+            packet.marker = (i == len(enc_frame.payloads) - 1) and 1 or 0
+
+            # set header extensions, send-time ones are set by the pacer
+            packet.extensions.mid = self.__mid
+            packet.extensions.rtp_stream_id = stream.encoding.rid
+            if enc_frame.audio_level is not None:
+                packet.extensions.audio_level = (False, -enc_frame.audio_level)
+
+            self.__log_debug("> %s", packet)
+            stream.history[packet.sequence_number % RTP_HISTORY_SIZE] = packet
+            packets.append(packet)
+            prepares.append(functools.partial(self.__prepare_packet, packet))
+
+            stream.ntp_timestamp = clock.current_ntp_time()
+            stream.rtp_timestamp = packet.timestamp
+            stream.octet_count += len(payload)
+            stream.packet_count += 1
+            stream.sequence_number = uint16_add(stream.sequence_number, 1)
+
+        # protect the packets of the frame with FEC packets
+        if stream.fec is not None and stream.encoding.fec is not None:
+            for fec in stream.fec.encode(packets):
+                packet = RtpPacket(
+                    payload_type=self.__fec_payload_type,
+                    sequence_number=stream.fec_sequence_number,
+                    timestamp=timestamp,
+                )
+                packet.ssrc = stream.encoding.fec.ssrc
+                packet.payload = bytes(fec)
+                packet.extensions.mid = self.__mid
+
+                self.__log_debug("> %s", packet)
+                prepares.append(functools.partial(self.__prepare_packet, packet))
+                stream.fec_sequence_number = uint16_add(stream.fec_sequence_number, 1)
+
+        # send all the packets of the frame in one go
+        await self.transport._send_rtp_paced(
+            prepares, ssrc=stream.ssrc, priority=priority
+        )
+
+    def __stats_id(self, prefix: str, stream: RTCRtpSenderStream) -> str:
+        if len(self.__streams) > 1:
+            return f"{prefix}_{id(self)}_{stream.ssrc}"
+        return f"{prefix}_{id(self)}"
+
+    def __prepare_packet(self, packet: RtpPacket) -> bytes:
+        """
+        Set the send-time header extensions and serialize a packet as it
+        leaves the pacer.
+
+        The extensions are copied as they may be shared with a packet in the
+        history, retransmissions being acknowledged separately.
+        """
+        packet.extensions = dataclasses.replace(
+            packet.extensions,
+            abs_send_time=(clock.current_ntp_time() >> 14) & 0x00FFFFFF,
+        )
+        if self.__transport_wide_cc:
+            packet.extensions.transport_sequence_number = (
+                self.transport._next_transport_sequence_number()
+            )
+        packet_bytes = packet.serialize(self.__rtp_header_extensions_map)
+        self.__packet_sent(packet)
+        return packet_bytes
+
+    def __packet_sent(self, packet: RtpPacket) -> None:
+        """
+        Inform the congestion controller that a packet left the sender.
+        """
+        if packet.extensions.transport_sequence_number is not None:
+            self.__cc_controller.on_packet_sent(
+                transport_sequence_number=packet.extensions.transport_sequence_number,
+                send_time_ms=clock.current_ms(),
+                payload_size=len(packet.payload) + packet.padding_size,
+                ssrc=packet.ssrc,
+            )
+
     def __log_warning(self, msg: str, *args: object) -> None:
         logger.warning(f"RTCRtpsender(%s) {msg}", self.__kind, *args)
@@ -104,6 +104,8 @@ class RTCRtpTransceiver:
 
         See :meth:`RTCRtpSender.getCapabilities` and
         :meth:`RTCRtpReceiver.getCapabilities` for the supported codecs.
+        Forward error correction is only negotiated if the `video/flexfec-03`
+        codec is preferred.
 
         :param codecs: A list of :class:`RTCRtpCodecCapability`, in decreasing order
                         of preference. If empty, restores the default preferences.
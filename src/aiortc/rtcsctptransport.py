@@ -1,12 +1,12 @@
 import asyncio
+import contextlib
 import enum
 import hmac
 import logging
 import math
 import os
-import time
 from collections import deque
-from collections.abc import Callable, Iterator
+from collections.abc import AsyncIterator, Callable, Iterator
 from dataclasses import dataclass, field
 from struct import pack, unpack_from
 from typing import Deque, Optional, Union, cast
@@ -14,6 +14,7 @@ from typing import Deque, Optional, Union, cast
 from google_crc32c import value as crc32c
 from pyee.asyncio import AsyncIOEventEmitter
 
+from . import clock
 from .exceptions import InvalidStateError
 from .rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
 from .rtcdtlstransport import RTCDtlsTransport
@@ -27,6 +28,10 @@ COOKIE_LIFETIME = 60
 MAX_STREAMS = 65535
 USERDATA_MAX_LENGTH = 1200
 
+# maximum length of a bundled SCTP packet, which is that of a packet carrying
+# a single full DATA chunk (common header + DATA chunk header + user data)
+PACKET_MAX_LENGTH = 12 + 16 + USERDATA_MAX_LENGTH
+
 # protocol constants
 SCTP_CAUSE_INVALID_STREAM = 0x0001
 SCTP_CAUSE_STALE_COOKIE = 0x0003
@@ -72,7 +77,8 @@ WEBRTC_BINARY = 53
 WEBRTC_STRING_EMPTY = 56
 WEBRTC_BINARY_EMPTY = 57
 
-DataChannelQueue = Deque[tuple[RTCDataChannel, int, bytes]]
+# messages waiting to be sent, per data channel in round-robin order
+DataChannelQueue = dict[RTCDataChannel, Deque[tuple[int, bytes]]]
 
 
 def chunk_type(chunk: "Chunk") -> str:
@@ -162,6 +168,7 @@ class DataChunk(Chunk):
     _abandoned: bool
     _book_size: int
     _expiry: Optional[float]
+    _fragments: list["DataChunk"]
     _max_retransmits: Optional[int]
     _misses: int
     _retransmit: bool
@@ -208,6 +215,65 @@ class DataChunk(Chunk):
         )
 
 
+class IDataChunk(DataChunk):
+    """
+    I-DATA chunk, which allows messages to be interleaved (RFC 8260).
+
+    The payload protocol identifier is only carried by the first fragment,
+    the other fragments carry their fragment sequence number instead.
+    """
+
+    type = 64
+
+    def __init__(self, flags: int = 0, body: Optional[bytes] = None) -> None:
+        self.flags = flags
+        self.stream_seq = 0
+        if body:
+            (self.tsn, self.stream_id, self.mid, ppid_fsn) = unpack_from(
+                "!LHxxLL", body
+            )
+            if flags & SCTP_DATA_FIRST_FRAG:
+                self.fsn = 0
+                self.protocol = ppid_fsn
+            else:
+                self.fsn = ppid_fsn
+                self.protocol = 0
+            self.user_data = body[16:]
+        else:
+            self.tsn = 0
+            self.stream_id = 0
+            self.mid = 0
+            self.fsn = 0
+            self.protocol = 0
+            self.user_data = b""
+
+    def __bytes__(self) -> bytes:
+        length = 20 + len(self.user_data)
+        data = (
+            pack(
+                "!BBHLHHLL",
+                self.type,
+                self.flags,
+                length,
+                self.tsn,
+                self.stream_id,
+                0,
+                self.mid,
+                self.protocol if self.flags & SCTP_DATA_FIRST_FRAG else self.fsn,
+            )
+            + self.user_data
+        )
+        if length % 4:
+            data += b"\x00" * padl(length)
+        return data
+
+    def __repr__(self) -> str:
+        return (
+            f"IDataChunk(flags={self.flags}, tsn={self.tsn}, "
+            f"stream_id={self.stream_id}, mid={self.mid}, fsn={self.fsn})"
+        )
+
+
 class ErrorChunk(BaseParamsChunk):
     type = 9
 
@@ -243,6 +309,41 @@ class ForwardTsnChunk(Chunk):
         )
 
 
+class IForwardTsnChunk(Chunk):
+    """
+    I-FORWARD-TSN chunk, which is used instead of FORWARD TSN when
+    messages are sent in I-DATA chunks (RFC 8260).
+    """
+
+    type = 194
+
+    def __init__(self, flags: int = 0, body: Optional[bytes] = None) -> None:
+        self.flags = flags
+        self.streams: list[tuple[int, bool, int]] = []
+        if body:
+            self.cumulative_tsn = unpack_from("!L", body, 0)[0]
+            pos = 4
+            while pos < len(body):
+                stream_id, unordered, mid = unpack_from("!HHL", body, pos)
+                self.streams.append((stream_id, bool(unordered & 1), mid))
+                pos += 8
+        else:
+            self.cumulative_tsn = 0
+
+    @property
+    def body(self) -> bytes:  # type: ignore
+        body = pack("!L", self.cumulative_tsn)
+        for stream_id, unordered, mid in self.streams:
+            body += pack("!HHL", stream_id, int(unordered), mid)
+        return body
+
+    def __repr__(self) -> str:
+        return (
+            f"IForwardTsnChunk(cumulative_tsn={self.cumulative_tsn}, "
+            f"streams={self.streams})"
+        )
+
+
 class HeartbeatChunk(BaseParamsChunk):
     type = 4
 
@@ -391,9 +492,14 @@ CHUNK_CLASSES = [
     ShutdownCompleteChunk,
     ReconfigChunk,
     ForwardTsnChunk,
+    IDataChunk,
+    IForwardTsnChunk,
 ]
 CHUNK_TYPES = dict((cls.type, cls) for cls in CHUNK_CLASSES)
 
+# chunks which are bundled together by RTCSctpTransport
+BUNDLED_CHUNK_CLASSES = (DataChunk, ForwardTsnChunk, IForwardTsnChunk, SackChunk)
+
 
 def parse_packet(data: bytes) -> tuple[int, int, int, list[Chunk]]:
     length = len(data)
@@ -420,10 +526,20 @@ def parse_packet(data: bytes) -> tuple[int, int, int, list[Chunk]]:
 
 
 def serialize_packet(
-    source_port: int, destination_port: int, verification_tag: int, chunk: Chunk
+    source_port: int, destination_port: int, verification_tag: int, *chunks: Chunk
+) -> bytes:
+    return serialize_packet_data(
+        source_port,
+        destination_port,
+        verification_tag,
+        b"".join(bytes(chunk) for chunk in chunks),
+    )
+
+
+def serialize_packet_data(
+    source_port: int, destination_port: int, verification_tag: int, data: bytes
 ) -> bytes:
     header = pack("!HHL", source_port, destination_port, verification_tag)
-    data = bytes(chunk)
     checksum = crc32c(header + b"\x00\x00\x00\x00" + data)
     return header + pack("<L", checksum) + data
 
@@ -504,81 +620,232 @@ RECONFIG_PARAM_TYPES: dict[
 
 
 class InboundStream:
+    """
+    Reassembly of the messages received on a stream.
+
+    Chunks are indexed by TSN and runs of consecutive fragments are tracked
+    by their first and last TSN, so that adding a chunk and completing a
+    message take constant time however many fragments the message has.
+    """
+
     def __init__(self) -> None:
-        self.reassembly: list[DataChunk] = []
         self.sequence_number = 0
 
-    def add_chunk(self, chunk: DataChunk) -> None:
-        if not self.reassembly or uint32_gt(chunk.tsn, self.reassembly[-1].tsn):
-            self.reassembly.append(chunk)
-            return
+        # chunks awaiting reassembly, by TSN
+        self._chunks: dict[int, DataChunk] = {}
 
-        for i, rchunk in enumerate(self.reassembly):
-            # should never happen, the chunk should have been eliminated
-            # as a duplicate when _mark_received() is called
-            assert rchunk.tsn != chunk.tsn, "duplicate chunk in reassembly"
+        # incomplete runs of fragments, first TSN -> last TSN and conversely
+        self._run_lasts: dict[int, int] = {}
+        self._run_firsts: dict[int, int] = {}
 
-            if uint32_gt(rchunk.tsn, chunk.tsn):
-                self.reassembly.insert(i, chunk)
-                break
+        # complete messages as (first TSN, last TSN)
+        self._ordered: dict[int, tuple[int, int]] = {}
+        self._unordered: Deque[tuple[int, int]] = deque()
+        self._delivered_sequence_number = 0
+
+    @property
+    def reassembly(self) -> list[DataChunk]:
+        """
+        The chunks awaiting reassembly, in TSN order.
+        """
+        if not self._chunks:
+            return []
+        origin = next(iter(self._chunks)) - SCTP_TSN_MODULO // 2
+        return sorted(
+            self._chunks.values(),
+            key=lambda chunk: (chunk.tsn - origin) % SCTP_TSN_MODULO,
+        )
+
+    def add_chunk(self, chunk: DataChunk) -> None:
+        # should never happen, the chunk should have been eliminated
+        # as a duplicate when _mark_received() is called
+        assert chunk.tsn not in self._chunks, "duplicate chunk in reassembly"
+        self._chunks[chunk.tsn] = chunk
+
+        # merge with the adjacent runs of the same message
+        first = last = chunk.tsn
+        previous_tsn = tsn_minus_one(chunk.tsn)
+        if (
+            not (chunk.flags & SCTP_DATA_FIRST_FRAG)
+            and previous_tsn in self._run_firsts
+            and not (self._chunks[previous_tsn].flags & SCTP_DATA_LAST_FRAG)
+        ):
+            first = self._run_firsts.pop(previous_tsn)
+            del self._run_lasts[first]
+        next_tsn = tsn_plus_one(chunk.tsn)
+        if (
+            not (chunk.flags & SCTP_DATA_LAST_FRAG)
+            and next_tsn in self._run_lasts
+            and not (self._chunks[next_tsn].flags & SCTP_DATA_FIRST_FRAG)
+        ):
+            last = self._run_lasts.pop(next_tsn)
+            del self._run_firsts[last]
+
+        self._add_run(first, last)
 
     def pop_messages(self) -> Iterator[tuple[int, int, bytes]]:
-        pos = 0
-        start_pos = None
-        while pos < len(self.reassembly):
-            chunk = self.reassembly[pos]
-            if start_pos is None:
-                ordered = not (chunk.flags & SCTP_DATA_UNORDERED)
-                if not (chunk.flags & SCTP_DATA_FIRST_FRAG):
-                    if ordered:
-                        break
-                    else:
-                        pos += 1
-                        continue
-                if ordered and uint16_gt(chunk.stream_seq, self.sequence_number):
+        while self._unordered:
+            yield self._pop_message(*self._unordered.popleft())
+
+        if self._ordered and self.sequence_number != self._delivered_sequence_number:
+            # the sequence number was moved forward by a FORWARD TSN, deliver
+            # the complete messages which were skipped
+            skipped = sorted(
+                (
+                    stream_seq
+                    for stream_seq in self._ordered
+                    if uint16_gt(self.sequence_number, stream_seq)
+                ),
+                key=lambda stream_seq: (stream_seq - self.sequence_number) % 65536,
+            )
+            for stream_seq in skipped:
+                yield self._pop_message(*self._ordered.pop(stream_seq))
+
+        while self.sequence_number in self._ordered:
+            first, last = self._ordered.pop(self.sequence_number)
+            self.sequence_number = uint16_add(self.sequence_number, 1)
+            self._delivered_sequence_number = self.sequence_number
+            yield self._pop_message(first, last)
+        self._delivered_sequence_number = self.sequence_number
+
+    def prune_chunks(self, tsn: int) -> int:
+        """
+        Prune chunks up to the given TSN.
+        """
+        spans = [
+            (first, last)
+            for first, last in self._run_lasts.items()
+            if uint32_gte(tsn, first)
+        ]
+        for first, last in spans:
+            del self._run_lasts[first]
+            del self._run_firsts[last]
+        for stream_seq, (first, last) in list(self._ordered.items()):
+            if uint32_gte(tsn, first):
+                spans.append(self._ordered.pop(stream_seq))
+        for first, last in list(self._unordered):
+            if uint32_gte(tsn, first):
+                self._unordered.remove((first, last))
+                spans.append((first, last))
+
+        size = 0
+        for first, last in spans:
+            while True:
+                size += len(self._chunks.pop(first).user_data)
+                if first == last:
                     break
-                expected_tsn = chunk.tsn
-                start_pos = pos
-            elif chunk.tsn != expected_tsn:
-                if ordered:
+                first = tsn_plus_one(first)
+                if uint32_gt(first, tsn):
+                    # the remaining fragments lack the start of their message
+                    self._add_run(first, last)
                     break
-                else:
-                    start_pos = None
-                    pos += 1
-                    continue
+        return size
 
-            if chunk.flags & SCTP_DATA_LAST_FRAG:
-                user_data = b"".join(
-                    [c.user_data for c in self.reassembly[start_pos : pos + 1]]
-                )
-                self.reassembly = (
-                    self.reassembly[:start_pos] + self.reassembly[pos + 1 :]
-                )
-                if ordered and chunk.stream_seq == self.sequence_number:
-                    self.sequence_number = uint16_add(self.sequence_number, 1)
-                pos = start_pos
-                yield (chunk.stream_id, chunk.protocol, user_data)
+    def _add_run(self, first: int, last: int) -> None:
+        first_chunk = self._chunks[first]
+        if (first_chunk.flags & SCTP_DATA_FIRST_FRAG) and (
+            self._chunks[last].flags & SCTP_DATA_LAST_FRAG
+        ):
+            if first_chunk.flags & SCTP_DATA_UNORDERED:
+                self._unordered.append((first, last))
+            elif uint16_gt(self.sequence_number, first_chunk.stream_seq):
+                # a late message, deliver it right away
+                self._unordered.append((first, last))
             else:
-                pos += 1
+                self._ordered[first_chunk.stream_seq] = (first, last)
+        else:
+            self._run_lasts[first] = last
+            self._run_firsts[last] = first
 
-            expected_tsn = tsn_plus_one(expected_tsn)
+    def _pop_message(self, first: int, last: int) -> tuple[int, int, bytes]:
+        count = (last - first) % SCTP_TSN_MODULO + 1
+        chunks = [self._chunks.pop((first + i) % SCTP_TSN_MODULO) for i in range(count)]
+        chunk = chunks[-1]
+        return (chunk.stream_id, chunk.protocol, b"".join(c.user_data for c in chunks))
 
-    def prune_chunks(self, tsn: int) -> int:
+
+class InterleavedInboundStream:
+    """
+    Reassembly of the messages received on a stream in I-DATA chunks.
+
+    The fragments of different messages may be interleaved, so they are
+    grouped by message identifier and ordered by fragment sequence number.
+    """
+
+    def __init__(self) -> None:
+        # message identifier of the next ordered message
+        self.sequence_number = 0
+
+        # fragments awaiting reassembly, by (unordered, MID) then by FSN
+        self._fragments: dict[tuple[bool, int], dict[int, IDataChunk]] = {}
+        self._last_fsns: dict[tuple[bool, int], int] = {}
+
+        # complete messages
+        self._ordered: set[int] = set()
+        self._ready: Deque[tuple[bool, int]] = deque()
+
+    def add_chunk(self, chunk: IDataChunk) -> None:
+        key = (bool(chunk.flags & SCTP_DATA_UNORDERED), chunk.mid)
+        fragments = self._fragments.setdefault(key, {})
+        assert chunk.fsn not in fragments, "duplicate chunk in reassembly"
+        fragments[chunk.fsn] = chunk
+        if chunk.flags & SCTP_DATA_LAST_FRAG:
+            self._last_fsns[key] = chunk.fsn
+
+        if self._last_fsns.get(key) == len(fragments) - 1:
+            del self._last_fsns[key]
+            if key[0] or uint32_gt(self.sequence_number, chunk.mid):
+                self._ready.append(key)
+            else:
+                self._ordered.add(chunk.mid)
+
+    def pop_messages(self) -> Iterator[tuple[int, int, bytes]]:
+        while self._ready:
+            yield self._pop_message(self._ready.popleft())
+
+        while self.sequence_number in self._ordered:
+            self._ordered.remove(self.sequence_number)
+            key = (False, self.sequence_number)
+            self.sequence_number = tsn_plus_one(self.sequence_number)
+            yield self._pop_message(key)
+
+    def skip_messages(self, unordered: bool, mid: int) -> int:
         """
-        Prune chunks up to the given TSN.
+        Skip the messages up to the given MID, as requested by an
+        I-FORWARD-TSN chunk.
+
+        Complete ordered messages are delivered, incomplete messages are
+        dropped and the size of their fragments is returned.
         """
-        pos = -1
         size = 0
-        for i, chunk in enumerate(self.reassembly):
-            if uint32_gte(tsn, chunk.tsn):
-                pos = i
-                size += len(chunk.user_data)
+        skipped = sorted(
+            (key for key in self._fragments if key[0] == unordered),
+            key=lambda key: (key[1] - mid - 1) % SCTP_TSN_MODULO,
+        )
+        for key in skipped:
+            if uint32_gt(key[1], mid) or key in self._ready:
+                continue
+            if key[1] in self._ordered and not unordered:
+                self._ordered.remove(key[1])
+                self._ready.append(key)
             else:
-                break
+                self._last_fsns.pop(key, None)
+                for chunk in self._fragments.pop(key).values():
+                    size += len(chunk.user_data)
 
-        self.reassembly = self.reassembly[pos + 1 :]
+        if not unordered and uint32_gte(mid, self.sequence_number):
+            self.sequence_number = tsn_plus_one(mid)
         return size
 
+    def _pop_message(self, key: tuple[bool, int]) -> tuple[int, int, bytes]:
+        fragments = self._fragments.pop(key)
+        chunks = [fragments[fsn] for fsn in range(len(fragments))]
+        chunk = chunks[0]
+        return (chunk.stream_id, chunk.protocol, b"".join(c.user_data for c in chunks))
+
+
+AnyInboundStream = Union[InboundStream, InterleavedInboundStream]
+
 
 @dataclass
 class RTCSctpCapabilities:
@@ -617,6 +884,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._loop = asyncio.get_event_loop()
         self._hmac_key = os.urandom(16)
 
+        self._local_interleaving = True
         self._local_partial_reliability = True
         self._local_port = port
         self._local_verification_tag = random32()
@@ -628,7 +896,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         # inbound
         self._advertised_rwnd = 1024 * 1024
-        self._inbound_streams: dict[int, InboundStream] = {}
+        self._inbound_streams: dict[int, AnyInboundStream] = {}
         self._inbound_streams_count = 0
         self._inbound_streams_max = MAX_STREAMS
         self._last_received_tsn: Optional[int] = None
@@ -637,16 +905,22 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._sack_needed = False
 
         # outbound
+        self._bundle_depth = 0
+        self._bundle_queue: list[Chunk] = []
         self._cwnd = 3 * USERDATA_MAX_LENGTH
         self._fast_recovery_exit = None
         self._fast_recovery_transmit = False
-        self._forward_tsn_chunk: Optional[ForwardTsnChunk] = None
+        self._forward_tsn_chunk: Optional[Union[ForwardTsnChunk, IForwardTsnChunk]] = (
+            None
+        )
         self._flight_size = 0
         self._local_tsn = random32()
         self._last_sacked_tsn = tsn_minus_one(self._local_tsn)
         self._advanced_peer_ack_tsn = tsn_minus_one(self._local_tsn)
         self._outbound_queue: Deque[DataChunk] = deque()
+        self._outbound_stream_mid: dict[tuple[int, bool], int] = {}
         self._outbound_stream_seq: dict[int, int] = {}
+        self._outbound_streams: dict[int, Deque[IDataChunk]] = {}
         self._outbound_streams_count = MAX_STREAMS
         self._partial_bytes_acked = 0
         self._sent_queue: Deque[DataChunk] = deque()
@@ -673,7 +947,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         # data channels
         self._data_channel_id: Optional[int] = None
-        self._data_channel_queue: DataChannelQueue = deque()
+        self._data_channel_queue: DataChannelQueue = {}
         self._data_channels: dict[int, RTCDataChannel] = {}
 
         # FIXME: this is only used by RTCPeerConnection
@@ -795,6 +1069,14 @@ class RTCSctpTransport(AsyncIOEventEmitter):
     def _flight_size_increase(self, chunk: DataChunk) -> None:
         self._flight_size += chunk._book_size
 
+    @property
+    def _interleaving(self) -> bool:
+        """
+        Whether messages are sent in I-DATA chunks, which requires both
+        parties to support them.
+        """
+        return self._local_interleaving and IDataChunk.type in self._remote_extensions
+
     def _get_extensions(self, params: list[tuple[int, bytes]]) -> None:
         """
         Gets what extensions are supported by the remote party.
@@ -815,18 +1097,25 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             extensions.append(ForwardTsnChunk.type)
 
         extensions.append(ReconfigChunk.type)
+        if self._local_interleaving:
+            extensions.append(IDataChunk.type)
+            if self._local_partial_reliability:
+                extensions.append(IForwardTsnChunk.type)
         params.append((SCTP_SUPPORTED_CHUNK_EXT, bytes(extensions)))
 
-    def _get_inbound_stream(self, stream_id: int) -> InboundStream:
+    def _get_inbound_stream(self, stream_id: int) -> AnyInboundStream:
         """
         Get or create the inbound stream with the specified ID.
         """
         if stream_id not in self._inbound_streams:
-            self._inbound_streams[stream_id] = InboundStream()
+            if self._interleaving:
+                self._inbound_streams[stream_id] = InterleavedInboundStream()
+            else:
+                self._inbound_streams[stream_id] = InboundStream()
         return self._inbound_streams[stream_id]
 
     def _get_timestamp(self) -> int:
-        return int(time.time())
+        return int(clock.current_time())
 
     async def _handle_data(self, data: bytes) -> None:
         """
@@ -852,13 +1141,14 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             )
             return
 
-        # handle chunks
-        for chunk in chunks:
-            await self._receive_chunk(chunk)
+        async with self._bundling():
+            # handle chunks
+            for chunk in chunks:
+                await self._receive_chunk(chunk)
 
-        # send SACK if needed
-        if self._sack_needed:
-            await self._send_sack()
+            # send SACK if needed
+            if self._sack_needed:
+                await self._send_sack()
 
     def _maybe_abandon(self, chunk: DataChunk) -> bool:
         """
@@ -873,23 +1163,21 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         abandon = (
             chunk._max_retransmits is not None
             and chunk._sent_count > chunk._max_retransmits
-        ) or (chunk._expiry is not None and chunk._expiry < time.time())
+        ) or (chunk._expiry is not None and chunk._expiry < clock.current_time())
         if not abandon:
             return False
 
-        chunk_pos = self._sent_queue.index(chunk)
-        for pos in range(chunk_pos, -1, -1):
-            ochunk = self._sent_queue[pos]
-            ochunk._abandoned = True
-            ochunk._retransmit = False
-            if ochunk.flags & SCTP_DATA_FIRST_FRAG:
-                break
-        for pos in range(chunk_pos, len(self._sent_queue)):
-            ochunk = self._sent_queue[pos]
-            ochunk._abandoned = True
-            ochunk._retransmit = False
-            if ochunk.flags & SCTP_DATA_LAST_FRAG:
-                break
+        # DATA fragments which have not been sent yet are left alone, as
+        # their TSNs are already assigned
+        chunk._abandoned = True
+        chunk._retransmit = False
+        for ochunk in chunk._fragments:
+            if ochunk._sent_count or isinstance(ochunk, IDataChunk):
+                ochunk._abandoned = True
+                ochunk._retransmit = False
+
+            # break the reference cycle between the fragments
+            ochunk._fragments = []
 
         return True
 
@@ -903,19 +1191,23 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             return True
 
         # consolidate misordered entries
-        self._sack_misordered.add(tsn)
-        for tsn in sorted(self._sack_misordered):
-            if tsn == tsn_plus_one(self._last_received_tsn):
-                self._last_received_tsn = tsn
-            else:
-                break
+        if tsn != tsn_plus_one(self._last_received_tsn):
+            self._sack_misordered.add(tsn)
+            return False
+        self._last_received_tsn = tsn
+        next_tsn = tsn_plus_one(tsn)
+        while next_tsn in self._sack_misordered:
+            self._sack_misordered.remove(next_tsn)
+            self._last_received_tsn = next_tsn
+            next_tsn = tsn_plus_one(next_tsn)
 
         # filter out obsolete entries
-        def is_obsolete(x: int) -> bool:
-            return uint32_gt(x, self._last_received_tsn)
+        if self._sack_duplicates:
 
-        self._sack_duplicates = list(filter(is_obsolete, self._sack_duplicates))
-        self._sack_misordered = set(filter(is_obsolete, self._sack_misordered))
+            def is_obsolete(x: int) -> bool:
+                return uint32_gt(x, self._last_received_tsn)
+
+            self._sack_duplicates = list(filter(is_obsolete, self._sack_duplicates))
         return False
 
     async def _receive(self, stream_id: int, pp_id: int, data: bytes) -> None:
@@ -935,7 +1227,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             await self._receive_data_chunk(chunk)
         elif isinstance(chunk, SackChunk):
             await self._receive_sack_chunk(chunk)
-        elif isinstance(chunk, ForwardTsnChunk):
+        elif isinstance(chunk, (ForwardTsnChunk, IForwardTsnChunk)):
             await self._receive_forward_tsn_chunk(chunk)
         elif isinstance(chunk, HeartbeatChunk):
             heartbeat_ack = HeartbeatAckChunk()
@@ -1076,8 +1368,12 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
     async def _receive_data_chunk(self, chunk: DataChunk) -> None:
         """
-        Handle a DATA chunk.
+        Handle a DATA or I-DATA chunk.
         """
+        # only the negotiated kind of chunk can be used (RFC 8260)
+        if isinstance(chunk, IDataChunk) != self._interleaving:
+            return
+
         self._sack_needed = True
 
         # mark as received
@@ -1088,16 +1384,25 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         inbound_stream = self._get_inbound_stream(chunk.stream_id)
 
         # defragment data
-        inbound_stream.add_chunk(chunk)
+        if isinstance(inbound_stream, InterleavedInboundStream):
+            inbound_stream.add_chunk(cast(IDataChunk, chunk))
+        else:
+            inbound_stream.add_chunk(chunk)
         self._advertised_rwnd -= len(chunk.user_data)
         for message in inbound_stream.pop_messages():
             self._advertised_rwnd += len(message[2])
             await self._receive(*message)
 
-    async def _receive_forward_tsn_chunk(self, chunk: ForwardTsnChunk) -> None:
+    async def _receive_forward_tsn_chunk(
+        self, chunk: Union[ForwardTsnChunk, IForwardTsnChunk]
+    ) -> None:
         """
-        Handle a FORWARD TSN chunk.
+        Handle a FORWARD TSN or I-FORWARD-TSN chunk.
         """
+        # only the negotiated kind of chunk can be used (RFC 8260)
+        if isinstance(chunk, IForwardTsnChunk) != self._interleaving:
+            return
+
         self._sack_needed = True
 
         # it's a duplicate
@@ -1121,6 +1426,21 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         self._sack_misordered = set(filter(is_obsolete, self._sack_misordered))
 
         # update reassembly
+        if isinstance(chunk, IForwardTsnChunk):
+            for stream_id, unordered, mid in chunk.streams:
+                interleaved_stream = cast(
+                    InterleavedInboundStream, self._get_inbound_stream(stream_id)
+                )
+
+                # drop skipped messages and perform delivery
+                self._advertised_rwnd += interleaved_stream.skip_messages(
+                    unordered, mid
+                )
+                for message in interleaved_stream.pop_messages():
+                    self._advertised_rwnd += len(message[2])
+                    await self._receive(*message)
+            return
+
         for stream_id, stream_seq in chunk.streams:
             inbound_stream = self._get_inbound_stream(stream_id)
 
@@ -1132,7 +1452,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         # prune obsolete chunks
         for stream_id, inbound_stream in self._inbound_streams.items():
-            self._advertised_rwnd += inbound_stream.prune_chunks(
+            self._advertised_rwnd += cast(InboundStream, inbound_stream).prune_chunks(
                 self._last_received_tsn
             )
 
@@ -1143,7 +1463,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         if uint32_gt(self._last_sacked_tsn, chunk.cumulative_tsn):
             return
 
-        received_time = time.time()
+        received_time = clock.current_time()
         self._last_sacked_tsn = chunk.cumulative_tsn
         cwnd_fully_utilized = self._flight_size >= self._cwnd
         done = 0
@@ -1154,6 +1474,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             self._last_sacked_tsn, self._sent_queue[0].tsn
         ):
             schunk = self._sent_queue.popleft()
+            schunk._fragments = []
             done += 1
             if not schunk._acked:
                 done_bytes += schunk._book_size
@@ -1278,6 +1599,8 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                 # mark closed streams
                 for stream_id in self._reconfig_request.streams:
                     self._outbound_stream_seq.pop(stream_id, None)
+                    self._outbound_stream_mid.pop((stream_id, False), None)
+                    self._outbound_stream_mid.pop((stream_id, True), None)
                     self._data_channel_closed(stream_id)
 
                 self._reconfig_request = None
@@ -1295,15 +1618,22 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         """
         Send data ULP -> stream.
         """
-        if ordered:
+        interleaving = self._interleaving
+        if interleaving:
+            # I-DATA numbers ordered and unordered messages separately
+            mid = self._outbound_stream_mid.get((stream_id, not ordered), 0)
+            self._outbound_stream_mid[(stream_id, not ordered)] = tsn_plus_one(mid)
+            stream_seq = 0
+        elif ordered:
             stream_seq = self._outbound_stream_seq.get(stream_id, 0)
         else:
             stream_seq = 0
 
         fragments = math.ceil(len(user_data) / USERDATA_MAX_LENGTH)
+        message: list[DataChunk] = []
         pos = 0
         for fragment in range(0, fragments):
-            chunk = DataChunk()
+            chunk = IDataChunk() if interleaving else DataChunk()
             chunk.flags = 0
             if not ordered:
                 chunk.flags = SCTP_DATA_UNORDERED
@@ -1311,7 +1641,6 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                 chunk.flags |= SCTP_DATA_FIRST_FRAG
             if fragment == fragments - 1:
                 chunk.flags |= SCTP_DATA_LAST_FRAG
-            chunk.tsn = self._local_tsn
             chunk.stream_id = stream_id
             chunk.stream_seq = stream_seq
             chunk.protocol = pp_id
@@ -1323,6 +1652,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             chunk._acked = False
             chunk._book_size = len(chunk.user_data)
             chunk._expiry = expiry
+            chunk._fragments = message
             chunk._max_retransmits = max_retransmits
             chunk._misses = 0
             chunk._retransmit = False
@@ -1330,19 +1660,85 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             chunk._sent_time = None
 
             pos += USERDATA_MAX_LENGTH
-            self._local_tsn = tsn_plus_one(self._local_tsn)
-            self._outbound_queue.append(chunk)
+            message.append(chunk)
+            if isinstance(chunk, IDataChunk):
+                # the TSN is assigned when the fragment is scheduled
+                chunk.mid = mid
+                chunk.fsn = fragment
+                self._outbound_streams.setdefault(stream_id, deque()).append(chunk)
+            else:
+                chunk.tsn = self._local_tsn
+                self._local_tsn = tsn_plus_one(self._local_tsn)
+                self._outbound_queue.append(chunk)
 
-        if ordered:
+        if ordered and not interleaving:
             self._outbound_stream_seq[stream_id] = uint16_add(stream_seq, 1)
 
         # transmit outbound data
         await self._transmit()
 
+    @contextlib.asynccontextmanager
+    async def _bundling(self) -> AsyncIterator[None]:
+        """
+        Bundle the DATA, SACK and FORWARD TSN chunks sent within this context,
+        they are transmitted when the outermost context exits.
+        """
+        self._bundle_depth += 1
+        try:
+            yield
+        finally:
+            # the chunks queued before an error are still transmitted
+            self._bundle_depth -= 1
+            if not self._bundle_depth and self._bundle_queue:
+                await self._send_bundle()
+
+    async def _send_bundle(self) -> None:
+        """
+        Transmit the queued chunks, packing as many as fit in each packet.
+
+        Control chunks go first, followed by DATA chunks in the order they
+        were queued, that is retransmissions before new data.
+        """
+        chunks = sorted(self._bundle_queue, key=lambda x: isinstance(x, DataChunk))
+        self._bundle_queue = []
+
+        packets: list[list[bytes]] = []
+        packet_length = PACKET_MAX_LENGTH
+        for chunk in chunks:
+            self.__log_debug("> %s", chunk)
+            chunk_data = bytes(chunk)
+            if packet_length + len(chunk_data) > PACKET_MAX_LENGTH:
+                packets.append([])
+                packet_length = 12
+            packets[-1].append(chunk_data)
+            packet_length += len(chunk_data)
+
+        datas = [
+            serialize_packet_data(
+                self._local_port,
+                self._remote_port,
+                self._remote_verification_tag,
+                b"".join(packet),
+            )
+            for packet in packets
+        ]
+        if len(datas) == 1:
+            await self.__transport._send_data(datas[0])
+        else:
+            await self.__transport._send_data_batch(datas)
+
     async def _send_chunk(self, chunk: Chunk) -> None:
         """
-        Transmit a chunk (no bundling for now).
+        Transmit a chunk, or queue it for bundling.
         """
+        if self._bundle_depth and isinstance(chunk, BUNDLED_CHUNK_CLASSES):
+            self._bundle_queue.append(chunk)
+            return
+
+        # preserve ordering with respect to queued chunks
+        if self._bundle_queue:
+            await self._send_bundle()
+
         self.__log_debug("> %s", chunk)
         await self.__transport._send_data(
             serialize_packet(
@@ -1518,62 +1914,93 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         """
         Transmit outbound data.
         """
-        # send FORWARD TSN
-        if self._forward_tsn_chunk is not None:
-            await self._send_chunk(self._forward_tsn_chunk)
-            self._forward_tsn_chunk = None
-
-            # ensure T3 is running
-            if not self._t3_handle:
-                self._t3_start()
-
-        # limit burst size
-        if self._fast_recovery_exit is not None:
-            burst_size = 2 * USERDATA_MAX_LENGTH
-        else:
-            burst_size = 4 * USERDATA_MAX_LENGTH
-        cwnd = min(self._flight_size + burst_size, self._cwnd)
-
-        # retransmit
-        retransmit_earliest = True
-        for chunk in self._sent_queue:
-            if chunk._retransmit:
-                if self._fast_recovery_transmit:
-                    self._fast_recovery_transmit = False
-                elif self._flight_size >= cwnd:
-                    return
+        async with self._bundling():
+            # send FORWARD TSN
+            if self._forward_tsn_chunk is not None:
+                await self._send_chunk(self._forward_tsn_chunk)
+                self._forward_tsn_chunk = None
+
+                # ensure T3 is running
+                if not self._t3_handle:
+                    self._t3_start()
+
+            # limit burst size
+            if self._fast_recovery_exit is not None:
+                burst_size = 2 * USERDATA_MAX_LENGTH
+            else:
+                burst_size = 4 * USERDATA_MAX_LENGTH
+            cwnd = min(self._flight_size + burst_size, self._cwnd)
+
+            # retransmit
+            retransmit_earliest = True
+            for chunk in self._sent_queue:
+                if chunk._retransmit:
+                    if self._fast_recovery_transmit:
+                        self._fast_recovery_transmit = False
+                    elif self._flight_size >= cwnd:
+                        return
+                    self._flight_size_increase(chunk)
+
+                    chunk._misses = 0
+                    chunk._retransmit = False
+                    chunk._sent_count += 1
+                    await self._send_chunk(chunk)
+                    if retransmit_earliest:
+                        # restart the T3 timer as the earliest outstanding TSN
+                        # is being retransmitted
+                        self._t3_restart()
+                retransmit_earliest = False
+
+            while self._flight_size < cwnd and (
+                self._outbound_queue or self._schedule_fragment()
+            ):
+                chunk = self._outbound_queue.popleft()
+                self._sent_queue.append(chunk)
                 self._flight_size_increase(chunk)
 
-                chunk._misses = 0
-                chunk._retransmit = False
+                # update counters
                 chunk._sent_count += 1
-                await self._send_chunk(chunk)
-                if retransmit_earliest:
-                    # restart the T3 timer as the earliest outstanding TSN
-                    # is being retransmitted
-                    self._t3_restart()
-            retransmit_earliest = False
+                chunk._sent_time = clock.current_time()
 
-        while self._outbound_queue and self._flight_size < cwnd:
-            chunk = self._outbound_queue.popleft()
-            self._sent_queue.append(chunk)
-            self._flight_size_increase(chunk)
+                await self._send_chunk(chunk)
+                if not self._t3_handle:
+                    self._t3_start()
 
-            # update counters
-            chunk._sent_count += 1
-            chunk._sent_time = time.time()
+    def _schedule_fragment(self) -> bool:
+        """
+        Queue the next I-DATA fragment for transmission, taking the streams
+        in turn so that a large message does not hold up the other streams.
+        """
+        while self._outbound_streams:
+            stream_id, queue = next(iter(self._outbound_streams.items()))
+            del self._outbound_streams[stream_id]
+            chunk = queue.popleft()
+            if queue:
+                self._outbound_streams[stream_id] = queue
+            elif stream_id in self._reconfig_queue:
+                # the reset of the stream waited for its last fragment
+                asyncio.ensure_future(self._transmit_reconfig())
+
+            # the rest of an abandoned message is not sent at all
+            if chunk._abandoned:
+                continue
 
-            await self._send_chunk(chunk)
-            if not self._t3_handle:
-                self._t3_start()
+            chunk.tsn = self._local_tsn
+            self._local_tsn = tsn_plus_one(self._local_tsn)
+            self._outbound_queue.append(chunk)
+            return True
+        return False
 
     async def _transmit_reconfig(self) -> None:
+        # I-DATA fragments are only given a TSN when they are scheduled, the
+        # streams are reset once their messages are covered by the last TSN
+        streams = self._reconfig_queue[0:RECONFIG_MAX_STREAMS]
         if (
             self._association_state == self.State.ESTABLISHED
-            and self._reconfig_queue
+            and streams
             and not self._reconfig_request
+            and not any(stream_id in self._outbound_streams for stream_id in streams)
         ):
-            streams = self._reconfig_queue[0:RECONFIG_MAX_STREAMS]
             self._reconfig_queue = self._reconfig_queue[RECONFIG_MAX_STREAMS:]
             param = StreamResetOutgoingParam(
                 request_sequence=self._reconfig_request_seq,
@@ -1595,14 +2022,27 @@ class RTCSctpTransport(AsyncIOEventEmitter):
 
         done = 0
         streams = {}
+        messages = {}
         while self._sent_queue and self._sent_queue[0]._abandoned:
             chunk = self._sent_queue.popleft()
             self._advanced_peer_ack_tsn = chunk.tsn
             done += 1
-            if not (chunk.flags & SCTP_DATA_UNORDERED):
+            if isinstance(chunk, IDataChunk):
+                unordered = bool(chunk.flags & SCTP_DATA_UNORDERED)
+                messages[(chunk.stream_id, unordered)] = chunk.mid
+            elif not (chunk.flags & SCTP_DATA_UNORDERED):
                 streams[chunk.stream_id] = chunk.stream_seq
 
-        if done:
+        if done and self._interleaving:
+            # build I-FORWARD-TSN
+            iforward_tsn_chunk = IForwardTsnChunk()
+            iforward_tsn_chunk.cumulative_tsn = self._advanced_peer_ack_tsn
+            iforward_tsn_chunk.streams = [
+                (stream_id, unordered, mid)
+                for (stream_id, unordered), mid in messages.items()
+            ]
+            self._forward_tsn_chunk = iforward_tsn_chunk
+        elif done:
             # build FORWARD TSN
             self._forward_tsn_chunk = ForwardTsnChunk()
             self._forward_tsn_chunk.cumulative_tsn = self._advanced_peer_ack_tsn
@@ -1636,11 +2076,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                     asyncio.ensure_future(self._transmit_reconfig())
             else:
                 # remove any queued messages for the datachannel
-                new_queue: DataChannelQueue = deque()
-                for queue_item in self._data_channel_queue:
-                    if queue_item[0] != channel:
-                        new_queue.append(queue_item)
-                self._data_channel_queue = new_queue
+                self._data_channel_queue.pop(channel, None)
 
                 # mark the datachannel as closed
                 if channel.id is not None:
@@ -1662,35 +2098,67 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         if self._association_state != self.State.ESTABLISHED:
             return
 
-        while self._data_channel_queue and not self._outbound_queue:
-            channel, protocol, user_data = self._data_channel_queue.popleft()
-
-            # register channel if necessary
-            stream_id = channel.id
-            if stream_id is None:
-                stream_id = self._data_channel_id
-                while stream_id in self._data_channels:
-                    stream_id += 2
-                self._data_channels[stream_id] = channel
-                channel._setId(stream_id)
-
-            # send data
-            if protocol == WEBRTC_DCEP:
-                await self._send(stream_id, protocol, user_data)
-            else:
-                if channel.maxPacketLifeTime:
-                    expiry = time.time() + (channel.maxPacketLifeTime / 1000)
+        async with self._bundling():
+            while (channel := self._data_channel_next()) is not None:
+                # take the channels in turn
+                queue = self._data_channel_queue.pop(channel)
+                protocol, user_data = queue.popleft()
+                if queue:
+                    self._data_channel_queue[channel] = queue
+
+                # register channel if necessary
+                stream_id = channel.id
+                if stream_id is None:
+                    stream_id = self._data_channel_id
+                    while stream_id in self._data_channels:
+                        stream_id += 2
+                    self._data_channels[stream_id] = channel
+                    channel._setId(stream_id)
+
+                # send data
+                if protocol == WEBRTC_DCEP:
+                    await self._send(stream_id, protocol, user_data)
                 else:
-                    expiry = None
-                await self._send(
-                    stream_id,
-                    protocol,
-                    user_data,
-                    expiry=expiry,
-                    max_retransmits=channel.maxRetransmits,
-                    ordered=channel.ordered,
-                )
-                channel._addBufferedAmount(-len(user_data))
+                    if channel.maxPacketLifeTime:
+                        expiry = clock.current_time() + (
+                            channel.maxPacketLifeTime / 1000
+                        )
+                    else:
+                        expiry = None
+                    await self._send(
+                        stream_id,
+                        protocol,
+                        user_data,
+                        expiry=expiry,
+                        max_retransmits=channel.maxRetransmits,
+                        ordered=channel.ordered,
+                    )
+                    channel._addBufferedAmount(-len(user_data))
+
+    def _data_channel_next(self) -> Optional[RTCDataChannel]:
+        """
+        Return the next data channel with a message which can be handed to
+        the SCTP layer.
+
+        With DATA chunks, a message is handed over once the previous ones
+        have been transmitted. With I-DATA chunks, each stream can have one
+        message being transmitted, and the messages are interleaved.
+        """
+        if self._interleaving:
+            for channel in self._data_channel_queue:
+                if channel.id not in self._outbound_streams:
+                    return channel
+            return None
+        elif self._outbound_queue:
+            return None
+        return next(iter(self._data_channel_queue), None)
+
+    def _data_channel_queue_message(
+        self, channel: RTCDataChannel, protocol: int, user_data: bytes
+    ) -> None:
+        self._data_channel_queue.setdefault(channel, deque()).append(
+            (protocol, user_data)
+        )
 
     def _data_channel_add_negotiated(self, channel: RTCDataChannel) -> None:
         if channel.id in self._data_channels:
@@ -1734,7 +2202,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
         )
         data += channel.label.encode("utf8")
         data += channel.protocol.encode("utf8")
-        self._data_channel_queue.append((channel, WEBRTC_DCEP, data))
+        self._data_channel_queue_message(channel, WEBRTC_DCEP, data)
         asyncio.ensure_future(self._data_channel_flush())
 
     async def _data_channel_receive(
@@ -1781,8 +2249,8 @@ class RTCSctpTransport(AsyncIOEventEmitter):
                 self._data_channels[stream_id] = channel
 
                 # send ack
-                self._data_channel_queue.append(
-                    (channel, WEBRTC_DCEP, pack("!B", DATA_CHANNEL_ACK))
+                self._data_channel_queue_message(
+                    channel, WEBRTC_DCEP, pack("!B", DATA_CHANNEL_ACK)
                 )
                 await self._data_channel_flush()
 
@@ -1818,7 +2286,7 @@ class RTCSctpTransport(AsyncIOEventEmitter):
             pp_id, user_data = WEBRTC_BINARY, data
 
         channel._addBufferedAmount(len(user_data))
-        self._data_channel_queue.append((channel, pp_id, user_data))
+        self._data_channel_queue_message(channel, pp_id, user_data)
         asyncio.ensure_future(self._data_channel_flush())
 
     class State(enum.Enum):
@@ -2,7 +2,7 @@ import math
 import os
 import struct
 from dataclasses import dataclass, field
-from struct import pack, unpack, unpack_from
+from struct import pack, pack_into, unpack, unpack_from
 from typing import Any, Optional, Union
 
 from av import AudioFrame
@@ -19,6 +19,9 @@ DYNAMIC_PAYLOAD_TYPES = range(96, 128)
 RTP_HEADER_LENGTH = 12
 RTCP_HEADER_LENGTH = 4
 
+RTP_HEADER = struct.Struct("!BBHLL")
+RTP_EXTENSION_HEADER = struct.Struct("!HH")
+
 PACKETS_LOST_MIN = -(1 << 23)
 PACKETS_LOST_MAX = (1 << 23) - 1
 
@@ -30,12 +33,22 @@ RTCP_RTPFB = 205
 RTCP_PSFB = 206
 
 RTCP_RTPFB_NACK = 1
+RTCP_RTPFB_TWCC = 15
 
 RTCP_PSFB_PLI = 1
 RTCP_PSFB_SLI = 2
 RTCP_PSFB_RPSI = 3
 RTCP_PSFB_APP = 15
 
+TRANSPORT_WIDE_CC_URI = (
+    "http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01"
+)
+
+# transport-wide congestion control packet status symbols
+TWCC_NOT_RECEIVED = 0
+TWCC_SMALL_DELTA = 1
+TWCC_LARGE_DELTA = 2
+
 
 @dataclass
 class HeaderExtensions:
@@ -68,10 +81,7 @@ class HeaderExtensionsMap:
                 self.__ids.transmission_offset = ext.id
             elif ext.uri == "urn:ietf:params:rtp-hdrext:ssrc-audio-level":
                 self.__ids.audio_level = ext.id
-            elif (
-                ext.uri
-                == "http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01"
-            ):
+            elif ext.uri == TRANSPORT_WIDE_CC_URI:
                 self.__ids.transport_sequence_number = ext.id
 
     def get(self, extension_profile: int, extension_value: bytes) -> HeaderExtensions:
@@ -289,25 +299,23 @@ def pack_header_extensions(extensions: list[tuple[int, bytes]]) -> tuple[int, by
         if x_id > 14 or x_length == 0 or x_length > 16:
             one_byte = False
 
+    value = bytearray()
     if one_byte:
         # One-Byte Header
         extension_profile = 0xBEDE
-        extension_value = b""
         for x_id, x_value in extensions:
-            x_length = len(x_value)
-            extension_value += pack("!B", (x_id << 4) | (x_length - 1))
-            extension_value += x_value
+            value.append((x_id << 4) | (len(x_value) - 1))
+            value += x_value
     else:
         # Two-Byte Header
         extension_profile = 0x1000
-        extension_value = b""
         for x_id, x_value in extensions:
-            x_length = len(x_value)
-            extension_value += pack("!BB", x_id, x_length)
-            extension_value += x_value
+            value.append(x_id)
+            value.append(len(x_value))
+            value += x_value
 
-    extension_value += b"\x00" * padl(len(extension_value))
-    return extension_profile, extension_value
+    value += b"\x00" * padl(len(value))
+    return extension_profile, bytes(value)
 
 
 def compute_audio_level_dbov(frame: AudioFrame) -> int:
@@ -398,6 +406,133 @@ class RtcpSourceInfo:
     items: list[tuple[Any, bytes]]
 
 
+@dataclass
+class RtcpTransportFeedback:
+    """
+    Feedback Control Information for a transport-wide congestion control
+    feedback message.
+
+    https://datatracker.ietf.org/doc/html/draft-holmer-rmcat-transport-wide-cc-extensions-01
+    """
+
+    base_sequence_number: int
+    reference_time: int
+    "The reference time, in multiples of 64ms."
+    feedback_count: int
+    deltas: list[Optional[int]] = field(default_factory=list)
+    "The receive delta of each packet in multiples of 250us, `None` if not received."
+
+    def __bytes__(self) -> bytes:
+        symbols = []
+        for delta in self.deltas:
+            if delta is None:
+                symbols.append(TWCC_NOT_RECEIVED)
+            elif delta >= 0 and delta <= 0xFF:
+                symbols.append(TWCC_SMALL_DELTA)
+            else:
+                assert delta >= -0x8000 and delta <= 0x7FFF
+                symbols.append(TWCC_LARGE_DELTA)
+
+        data = pack(
+            "!HHL",
+            self.base_sequence_number,
+            len(symbols),
+            ((self.reference_time & 0xFFFFFF) << 8) | self.feedback_count,
+        )
+
+        # packet status chunks
+        pos = 0
+        while pos < len(symbols):
+            run = 1
+            while (
+                pos + run < len(symbols)
+                and symbols[pos + run] == symbols[pos]
+                and run < 0x1FFF
+            ):
+                run += 1
+
+            if run >= 7:
+                # run length chunk
+                data += pack("!H", (symbols[pos] << 13) | run)
+                pos += run
+            elif max(symbols[pos : pos + 14]) < TWCC_LARGE_DELTA:
+                # status vector chunk with 14 one-bit symbols
+                chunk = 0x8000
+                for i, symbol in enumerate(symbols[pos : pos + 14]):
+                    chunk |= symbol << (13 - i)
+                data += pack("!H", chunk)
+                pos += 14
+            else:
+                # status vector chunk with 7 two-bit symbols
+                chunk = 0xC000
+                for i, symbol in enumerate(symbols[pos : pos + 7]):
+                    chunk |= symbol << (12 - 2 * i)
+                data += pack("!H", chunk)
+                pos += 7
+
+        # receive deltas
+        for delta, symbol in zip(self.deltas, symbols):
+            if symbol == TWCC_SMALL_DELTA:
+                data += pack("!B", delta)
+            elif symbol == TWCC_LARGE_DELTA:
+                data += pack("!h", delta)
+
+        data += b"\x00" * padl(len(data))
+        return data
+
+    @classmethod
+    def parse(cls, data: bytes) -> "RtcpTransportFeedback":
+        if len(data) < 8:
+            raise ValueError("RTCP transport-wide feedback is truncated")
+
+        base_sequence_number, status_count, reference = unpack_from("!HHL", data)
+        reference_time = reference >> 8
+        if reference_time & 0x800000:
+            reference_time -= 1 << 24
+        pos = 8
+
+        # packet status chunks
+        symbols: list[int] = []
+        while len(symbols) < status_count:
+            if len(data) < pos + 2:
+                raise ValueError("RTCP transport-wide feedback is truncated")
+            chunk = unpack_from("!H", data, pos)[0]
+            pos += 2
+
+            if not chunk & 0x8000:
+                symbols += [(chunk >> 13) & 0x03] * (chunk & 0x1FFF)
+            elif not chunk & 0x4000:
+                symbols += [(chunk >> (13 - i)) & 0x01 for i in range(14)]
+            else:
+                symbols += [(chunk >> (12 - 2 * i)) & 0x03 for i in range(7)]
+        del symbols[status_count:]
+
+        # receive deltas
+        deltas: list[Optional[int]] = []
+        for symbol in symbols:
+            if symbol == TWCC_NOT_RECEIVED:
+                deltas.append(None)
+            elif symbol == TWCC_SMALL_DELTA:
+                if len(data) < pos + 1:
+                    raise ValueError("RTCP transport-wide feedback is truncated")
+                deltas.append(data[pos])
+                pos += 1
+            elif symbol == TWCC_LARGE_DELTA:
+                if len(data) < pos + 2:
+                    raise ValueError("RTCP transport-wide feedback is truncated")
+                deltas.append(unpack_from("!h", data, pos)[0])
+                pos += 2
+            else:
+                raise ValueError("RTCP transport-wide feedback has invalid status")
+
+        return cls(
+            base_sequence_number=base_sequence_number,
+            reference_time=reference_time,
+            feedback_count=reference & 0xFF,
+            deltas=deltas,
+        )
+
+
 @dataclass
 class RtcpByePacket:
     sources: list[int]
@@ -480,8 +615,11 @@ class RtcpRtpfbPacket:
     # generick NACK
     lost: list[int] = field(default_factory=list)
 
+    # other feedback messages, e.g. transport-wide congestion control
+    fci: bytes = b""
+
     def __bytes__(self) -> bytes:
-        payload = pack("!LL", self.ssrc, self.media_ssrc)
+        payload = pack("!LL", self.ssrc, self.media_ssrc) + self.fci
         if self.lost:
             pid = self.lost[0]
             blp = 0
@@ -502,6 +640,9 @@ class RtcpRtpfbPacket:
             raise ValueError("RTCP RTP feedback length is invalid")
 
         ssrc, media_ssrc = unpack("!LL", data[0:8])
+        if fmt != RTCP_RTPFB_NACK:
+            return cls(fmt=fmt, ssrc=ssrc, media_ssrc=media_ssrc, fci=data[8:])
+
         lost = []
         for pos in range(8, len(data), 4):
             pid, blp = unpack("!HH", data[pos : pos + 4])
@@ -647,7 +788,7 @@ class RtpPacket:
         sequence_number: int = 0,
         timestamp: int = 0,
         ssrc: int = 0,
-        payload: bytes = b"",
+        payload: Union[bytes, memoryview] = b"",
     ) -> None:
         self.version = 2
         self.marker = marker
@@ -657,7 +798,7 @@ class RtpPacket:
         self.ssrc = ssrc
         self.csrc: list[int] = []
         self.extensions = HeaderExtensions()
-        self.payload = payload
+        self.payload: Union[bytes, memoryview] = payload
         self.padding_size = 0
 
     def __repr__(self) -> str:
@@ -669,14 +810,22 @@ class RtpPacket:
 
     @classmethod
     def parse(
-        cls, data: bytes, extensions_map: HeaderExtensionsMap = HeaderExtensionsMap()
+        cls,
+        data: Union[bytes, memoryview],
+        extensions_map: HeaderExtensionsMap = HeaderExtensionsMap(),
     ) -> "RtpPacket":
+        """
+        Parse an RTP packet.
+
+        If `data` is a :class:`memoryview`, the payload is a view into it
+        instead of a copy.
+        """
         if len(data) < RTP_HEADER_LENGTH:
             raise ValueError(
                 f"RTP packet length is less than {RTP_HEADER_LENGTH} bytes"
             )
 
-        v_p_x_cc, m_pt, sequence_number, timestamp, ssrc = unpack("!BBHLL", data[0:12])
+        v_p_x_cc, m_pt, sequence_number, timestamp, ssrc = RTP_HEADER.unpack_from(data)
         version = v_p_x_cc >> 6
         padding = (v_p_x_cc >> 5) & 1
         extension = (v_p_x_cc >> 4) & 1
@@ -695,20 +844,22 @@ class RtpPacket:
         )
 
         pos = RTP_HEADER_LENGTH
-        for i in range(0, cc):
-            packet.csrc.append(unpack_from("!L", data, pos)[0])
-            pos += 4
+        if cc:
+            packet.csrc = list(unpack_from("!%dL" % cc, data, pos))
+            pos += 4 * cc
 
         if extension:
             if len(data) < pos + 4:
                 raise ValueError("RTP packet has truncated extension profile / length")
-            extension_profile, extension_length = unpack_from("!HH", data, pos)
+            extension_profile, extension_length = RTP_EXTENSION_HEADER.unpack_from(
+                data, pos
+            )
             extension_length *= 4
             pos += 4
 
             if len(data) < pos + extension_length:
                 raise ValueError("RTP packet has truncated extension value")
-            extension_value = data[pos : pos + extension_length]
+            extension_value = bytes(data[pos : pos + extension_length])
             pos += extension_length
             packet.extensions = extensions_map.get(extension_profile, extension_value)
 
@@ -727,30 +878,90 @@ class RtpPacket:
         self, extensions_map: HeaderExtensionsMap = HeaderExtensionsMap()
     ) -> bytes:
         extension_profile, extension_value = extensions_map.set(self.extensions)
-        has_extension = bool(extension_value)
+        header = RTP_HEADER.pack(
+            self._first_octet(extension_value),
+            (self.marker << 7) | self.payload_type,
+            self.sequence_number,
+            self.timestamp,
+            self.ssrc,
+        )
+        if not (self.csrc or extension_value or self.padding_size):
+            return header + self.payload
+
+        # assemble the packet with a single copy of the payload
+        chunks: list[Union[bytes, memoryview]] = [header]
+        if self.csrc:
+            chunks.append(pack("!%dL" % len(self.csrc), *self.csrc))
+        if extension_value:
+            chunks.append(
+                RTP_EXTENSION_HEADER.pack(extension_profile, len(extension_value) >> 2)
+            )
+            chunks.append(extension_value)
+        chunks.append(self.payload)
+        if self.padding_size:
+            chunks.append(os.urandom(self.padding_size - 1))
+            chunks.append(bytes([self.padding_size]))
+        return b"".join(chunks)
+
+    def serialize_into(
+        self,
+        buffer: Union[bytearray, memoryview],
+        offset: int = 0,
+        extensions_map: HeaderExtensionsMap = HeaderExtensionsMap(),
+    ) -> int:
+        """
+        Serialize the packet into `buffer` at `offset`, so that a buffer can
+        be reused across packets.
+
+        Returns the number of bytes written.
+        """
+        extension_profile, extension_value = extensions_map.set(self.extensions)
+        length = (
+            RTP_HEADER_LENGTH
+            + 4 * len(self.csrc)
+            + (4 + len(extension_value) if extension_value else 0)
+            + len(self.payload)
+            + self.padding_size
+        )
+        if len(buffer) < offset + length:
+            raise ValueError("RTP packet does not fit in buffer")
 
-        padding = self.padding_size > 0
-        data = pack(
-            "!BBHLL",
-            (self.version << 6)
-            | (padding << 5)
-            | (has_extension << 4)
-            | len(self.csrc),
+        RTP_HEADER.pack_into(
+            buffer,
+            offset,
+            self._first_octet(extension_value),
             (self.marker << 7) | self.payload_type,
             self.sequence_number,
             self.timestamp,
             self.ssrc,
         )
-        for csrc in self.csrc:
-            data += pack("!L", csrc)
-        if has_extension:
-            data += pack("!HH", extension_profile, len(extension_value) >> 2)
-            data += extension_value
-        data += self.payload
-        if padding:
-            data += os.urandom(self.padding_size - 1)
-            data += bytes([self.padding_size])
-        return data
+        pos = offset + RTP_HEADER_LENGTH
+        if self.csrc:
+            pack_into("!%dL" % len(self.csrc), buffer, pos, *self.csrc)
+            pos += 4 * len(self.csrc)
+        if extension_value:
+            RTP_EXTENSION_HEADER.pack_into(
+                buffer, pos, extension_profile, len(extension_value) >> 2
+            )
+            pos += 4
+            buffer[pos : pos + len(extension_value)] = extension_value
+            pos += len(extension_value)
+        buffer[pos : pos + len(self.payload)] = self.payload
+        if self.padding_size:
+            pos += len(self.payload)
+            buffer[pos : pos + self.padding_size - 1] = os.urandom(
+                self.padding_size - 1
+            )
+            buffer[pos + self.padding_size - 1] = self.padding_size
+        return length
+
+    def _first_octet(self, extension_value: bytes) -> int:
+        return (
+            (self.version << 6)
+            | ((self.padding_size > 0) << 5)
+            | (bool(extension_value) << 4)
+            | len(self.csrc)
+        )
 
 
 def unwrap_rtx(rtx: RtpPacket, payload_type: int, ssrc: int) -> RtpPacket:
@@ -1,7 +1,7 @@
 import enum
 import ipaddress
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Optional, Union
 
 from . import rtp
@@ -233,6 +233,56 @@ def parse_group(
         dest.append(GroupDescription(semantic=bits[0], items=list(map(type, bits[1:]))))
 
 
+@dataclass
+class RidDescription:
+    rid: str
+    direction: str
+    params: Optional[str] = None
+
+    def __str__(self) -> str:
+        s = f"{self.rid} {self.direction}"
+        if self.params:
+            s += f" {self.params}"
+        return s
+
+
+def parse_rid(value: str) -> RidDescription:
+    bits = value.split(" ", 2)
+    return RidDescription(
+        rid=bits[0], direction=bits[1], params=bits[2] if len(bits) > 2 else None
+    )
+
+
+@dataclass
+class SimulcastDescription:
+    """
+    The simulcast streams of a media section, each stream being a RID or a
+    comma-separated list of alternative RIDs, paused ones prefixed by `~`.
+
+    https://datatracker.ietf.org/doc/html/rfc8853
+    """
+
+    send: list[str] = field(default_factory=list)
+    recv: list[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        bits = []
+        if self.send:
+            bits.append("send " + ";".join(self.send))
+        if self.recv:
+            bits.append("recv " + ";".join(self.recv))
+        return " ".join(bits)
+
+
+def parse_simulcast(value: str) -> SimulcastDescription:
+    simulcast = SimulcastDescription()
+    bits = value.split()
+    for direction, streams in zip(bits[::2], bits[1::2]):
+        if direction in ["send", "recv"]:
+            getattr(simulcast, direction).extend(streams.split(";"))
+    return simulcast
+
+
 @dataclass
 class SsrcDescription:
     ssrc: int
@@ -264,6 +314,10 @@ class MediaDescription:
         self.ssrc: list[SsrcDescription] = []
         self.ssrc_group: list[GroupDescription] = []
 
+        # simulcast
+        self.rid: list[RidDescription] = []
+        self.simulcast: Optional[SimulcastDescription] = None
+
         # formats
         self.fmt = fmt
         self.rtp = RTCRtpParameters()
@@ -329,6 +383,11 @@ class MediaDescription:
             if params:
                 lines.append(f"a=fmtp:{codec.payloadType} {params}")
 
+        for rid in self.rid:
+            lines.append(f"a=rid:{rid}")
+        if self.simulcast is not None:
+            lines.append(f"a=simulcast:{self.simulcast}")
+
         for k, v in self.sctpmap.items():
             lines.append(f"a=sctpmap:{k} {v}")
         if self.sctp_port is not None:
@@ -492,6 +551,8 @@ class SessionDescription:
                         current_media.rtcp_host = ipaddress_from_sdp(rest)
                     elif attr == "rtcp-mux":
                         current_media.rtcp_mux = True
+                    elif attr == "rid":
+                        current_media.rid.append(parse_rid(value))
                     elif attr == "setup":
                         current_media.dtls.role = DTLS_SETUP_ROLE[value]
                     elif attr in DIRECTIONS:
@@ -518,6 +579,8 @@ class SessionDescription:
                         getattr(current_media, attr)[int(format_id)] = format_desc
                     elif attr == "sctp-port":
                         current_media.sctp_port = int(value)
+                    elif attr == "simulcast":
+                        current_media.simulcast = parse_simulcast(value)
                     elif attr == "ssrc-group":
                         parse_group(current_media.ssrc_group, value, type=int)
                     elif attr == "ssrc":
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from .rtcrtpparameters import RTCRtpEncodingParameters
+
+# the bitrate of a layer at full resolution, when it has no maxBitrate
+DEFAULT_LAYER_BITRATE = 2500000
+
+# a layer is only sent once it can be given this fraction of its bitrate
+MIN_LAYER_BITRATE_RATIO = 0.25
+
+
+def layer_bitrate(encoding: RTCRtpEncodingParameters) -> int:
+    """
+    Return the bitrate at which a simulcast layer looks its best.
+    """
+    if encoding.maxBitrate:
+        return encoding.maxBitrate
+    scale = max(1.0, encoding.scaleResolutionDownBy)
+    return int(DEFAULT_LAYER_BITRATE / (scale * scale))
+
+
+def allocate_bitrate(
+    target: int, encodings: list[RTCRtpEncodingParameters]
+) -> list[Optional[int]]:
+    """
+    Split the target bitrate of a sender between its encodings.
+
+    The layers are served from the lowest resolution up. A layer is only sent
+    if it can be given its minimum bitrate, so under congestion the top layers
+    are disabled first, but the lowest layer is always sent. The lower layers
+    are then raised to their :func:`layer_bitrate`, and the top layer gets
+    whatever is left, up to its `maxBitrate` if it has one.
+
+    Returns the bitrate of each encoding, or `None` if it should not be sent.
+    """
+    order = sorted(
+        (i for i, encoding in enumerate(encodings) if encoding.active),
+        key=lambda i: -encodings[i].scaleResolutionDownBy,
+    )
+    shares: dict[int, int] = {}
+    remaining = target
+
+    # enable the layers which get their minimum
+    for i in order:
+        minimum = int(layer_bitrate(encodings[i]) * MIN_LAYER_BITRATE_RATIO)
+        if shares and remaining < minimum:
+            break
+        shares[i] = min(minimum, remaining)
+        remaining -= shares[i]
+
+    # share out the rest
+    top = list(shares)[-1] if shares else None
+    for i in shares:
+        if i == top and not encodings[i].maxBitrate:
+            extra = remaining
+        else:
+            extra = min(remaining, max(0, layer_bitrate(encodings[i]) - shares[i]))
+        shares[i] += extra
+        remaining -= extra
+
+    return [shares.get(i) for i in range(len(encodings))]
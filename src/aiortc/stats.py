@@ -44,7 +44,22 @@ class RTCInboundRtpStreamStats(RTCReceivedRtpStreamStats):
     metrics for the incoming RTP media stream.
     """
 
-    pass
+    targetPlayoutDelay: float = 0.0
+    "The current target playout delay in seconds, in adaptive playout mode."
+    lateFramesDropped: int = 0
+    "Total number of frames discarded because they were not complete in time."
+    framesDecoded: int = 0
+    "Total number of frames passed to the decoder."
+    totalDecodeTime: float = 0.0
+    "Total number of seconds spent decoding frames."
+    totalDecodeQueueDelay: float = 0.0
+    "Total number of seconds frames waited for a decoder thread."
+    fecPacketsReceived: int = 0
+    "Total number of FEC packets received."
+    packetsRecoveredByFec: int = 0
+    "Total number of lost packets repaired using FEC packets."
+    packetsRecoveredByRtx: int = 0
+    "Total number of lost packets recovered from retransmissions."
 
 
 @dataclass
@@ -66,6 +81,16 @@ class RTCOutboundRtpStreamStats(RTCSentRtpStreamStats):
     """
 
     trackId: str
+    rid: Optional[str] = None
+    "The RTP stream ID of the encoding, for simulcast."
+    totalPacketSendDelay: float = 0.0
+    packetsDiscardedOnSend: int = 0
+    keyFramesEncoded: int = 0
+    "Total number of keyframes produced by the encoder."
+    encoderReconfigurations: int = 0
+    "Total number of bitrate changes applied without recreating the encoder."
+    encoderResets: int = 0
+    "Total number of times the encoder was recreated."
 
 
 @dataclass
@@ -74,7 +74,10 @@ class ExperimentLogger:
     
     def setup_environment_variables(self):
         """Set up environment variables for logging paths."""
+        from aiortc import eventlog
+
         os.environ["RTCP_LOSS_LOG"] = self.get_rtcp_log_path()
+        eventlog.configure("RTCP_LOSS_LOG", os.environ["RTCP_LOSS_LOG"])
         os.environ["STATS_LOG"] = self.get_stats_log_path()
         os.environ["EXPERIMENT_DIR"] = str(self.experiment_dir)
         os.environ["VIDEOS_DIR"] = str(self.videos_dir)
@@ -13,7 +13,7 @@ from experiment_logger import init_experiment_logger, get_experiment_logger
 
 import cv2
 from aiohttp import web
-from aiortc import MediaStreamTrack, RTCPeerConnection, RTCSessionDescription
+from aiortc import MediaStreamTrack, RTCPeerConnection, RTCSessionDescription, eventlog
 from aiortc.contrib.media import MediaBlackhole, MediaPlayer, MediaRecorder, MediaRelay
 from av import VideoFrame
 from av import AudioFrame
@@ -171,6 +171,7 @@ class VideoDisplayTrack:
                 f.write("# GCC estimates log - timestamp_s, as_bps, ar_bps, gcc_bps\n")
             # Set environment variable for RTP sender to find the log file
             os.environ["GCC_ESTIMATES_LOG"] = gcc_log_path
+            eventlog.configure("GCC_ESTIMATES_LOG", gcc_log_path, format="csv")
         
         # FPS tracking for accurate video recording
         self.last_frame_time = None
@@ -427,7 +428,7 @@ class VideoDisplayTrack:
                                     "total_packets_received": self.total_packets,
                                     "decode_failures": self.decode_failures
                                 }
-                                f.write(f"server_reception: {server_info}\n")
+                                f.write(f"server_reception: {json.dumps(server_info)}\n")
                                 f.flush()
                         except Exception as e:
                             if self.frame_count % 100 == 0:  # Log error occasionally
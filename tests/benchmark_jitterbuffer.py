@@ -0,0 +1,129 @@
+"""
+Micro-benchmark of JitterBuffer frame assembly.
+
+Compares the incremental frame assembly with the previous implementation,
+which rescanned the buffer from its origin on every packet.
+
+Run with:
+
+    python -m tests.benchmark_jitterbuffer
+"""
+
+import argparse
+import random
+import time
+from typing import Optional
+
+from aiortc.jitterbuffer import JitterBuffer, JitterFrame
+from aiortc.rtp import RtpPacket
+
+
+class RescanningJitterBuffer(JitterBuffer):
+    """
+    Frame assembly as it was done before being made incremental.
+    """
+
+    def _remove_frame(self, sequence_number: int) -> Optional[JitterFrame]:
+        frame = None
+        frames = 0
+        packets: list[RtpPacket] = []
+        remove = 0
+        timestamp = None
+
+        for count in range(self.capacity):
+            pos = (self._origin + count) % self._capacity
+            packet = self._packets[pos]
+            if packet is None:
+                break
+            if timestamp is None:
+                timestamp = packet.timestamp
+            elif packet.timestamp != timestamp:
+                # we now have a complete frame, only store the first one
+                if frame is None:
+                    frame = JitterFrame(
+                        data=b"".join([x._data for x in packets]),  # type: ignore
+                        timestamp=timestamp,
+                    )
+                    remove = count
+
+                # check we have prefetched enough
+                frames += 1
+                if frames >= self._prefetch:
+                    self.remove(remove)
+                    return frame
+
+                # start a new frame
+                packets = []
+                timestamp = packet.timestamp
+
+            packets.append(packet)
+
+        return None
+
+
+def generate_packets(
+    count: int, packets_per_frame: int, reorder: float
+) -> list[RtpPacket]:
+    """
+    Generate video packets, swapping a fraction of adjacent packets.
+    """
+    packets = []
+    for i in range(count):
+        packet = RtpPacket(
+            sequence_number=i & 0xFFFF,
+            timestamp=(i // packets_per_frame) * 3000,
+        )
+        packet._data = b"\x00" * 1200  # type: ignore
+        packets.append(packet)
+
+    rng = random.Random(1234)
+    for i in range(count - 1):
+        if rng.random() < reorder:
+            packets[i], packets[i + 1] = packets[i + 1], packets[i]
+    return packets
+
+
+def run(
+    buffer_class: type[JitterBuffer], capacity: int, packets: list[RtpPacket]
+) -> tuple[float, int]:
+    jbuffer = buffer_class(capacity=capacity, is_video=True)
+    frames = 0
+    start = time.perf_counter()
+    for packet in packets:
+        _, frame = jbuffer.add(packet)
+        if frame is not None:
+            frames += 1
+    return len(packets) / (time.perf_counter() - start), frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JitterBuffer benchmark")
+    parser.add_argument("--packets", type=int, default=100000)
+    parser.add_argument("--reorder", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(
+        "%8s %18s %10s %11s %8s"
+        % ("capacity", "packets per frame", "rescan", "incremental", "speedup")
+    )
+    for capacity in [128, 512, 2048]:
+        # from small delta frames to a large keyframe filling the buffer
+        for packets_per_frame in [10, capacity // 2]:
+            packets = generate_packets(args.packets, packets_per_frame, args.reorder)
+            old_rate, old_frames = run(RescanningJitterBuffer, capacity, packets)
+            new_rate, new_frames = run(JitterBuffer, capacity, packets)
+            assert old_frames == new_frames
+            print(
+                "%8d %18d %10.0f %11.0f %7.1fx"
+                % (
+                    capacity,
+                    packets_per_frame,
+                    old_rate,
+                    new_rate,
+                    new_rate / old_rate,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark of the congestion controllers over an emulated cellular link.
+
+A video is sent between two peer connections over an emulated link, whose
+losses replay one of the 90 s cellular traces after a stabilization period.
+The link and its clock are emulated, so the runs are reproducible and take
+a few seconds each.
+
+Run with:
+
+    python -m tests.benchmark_netem --trace poor
+"""
+
+import argparse
+import asyncio
+import fractions
+import os
+import runpy
+import time
+from typing import Any
+
+import numpy
+from aiortc import (
+    RTCConfiguration,
+    RTCPeerConnection,
+    VideoStreamTrack,
+)
+from aiortc.contrib.netem import EmulatedEventLoop, EmulatedLink, TraceLoss
+from aiortc.mediastreams import MediaStreamError, MediaStreamTrack
+from av import VideoFrame
+
+TRACES_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "simulation_loss", "cellular_traces_90s.py"
+)
+
+
+class NoiseVideoStreamTrack(VideoStreamTrack):
+    """
+    A video track which reads frames of noise, which the encoder cannot
+    compress below its target bitrate.
+    """
+
+    def __init__(self, width: int, height: int, seed: int) -> None:
+        super().__init__()
+        self.height = height
+        self.random = numpy.random.RandomState(seed)
+        self.width = width
+
+    async def recv(self) -> VideoFrame:
+        pts, time_base = await self.next_timestamp()
+        frame = VideoFrame.from_ndarray(
+            self.random.randint(
+                0, 256, (self.height, self.width, 3), dtype=numpy.uint8
+            ),
+            format="rgb24",
+        )
+        frame.pts = pts
+        frame.time_base = fractions.Fraction(time_base)
+        return frame
+
+
+async def consume(track: MediaStreamTrack) -> None:
+    try:
+        while True:
+            await track.recv()
+    except MediaStreamError:
+        pass
+
+
+async def run(
+    loop: EmulatedEventLoop, trace: dict[str, list[float]], args: Any
+) -> list[tuple[float, float]]:
+    """
+    Send video over the link, and return the throughput of each second.
+    """
+    pc1 = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+    pc2 = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+    pc1.addTrack(NoiseVideoStreamTrack(args.width, args.height, args.seed))
+    consumers = []
+    pc2.on(
+        "track", lambda track: consumers.append(asyncio.ensure_future(consume(track)))
+    )
+
+    # the media goes over the emulated link, the feedback only has a delay
+    loss = TraceLoss(
+        trace["gaps"],
+        trace["loss"],
+        start=loop.time() + args.stabilize,
+        seed=args.seed,
+    )
+    uplink = EmulatedLink(
+        bandwidth=args.bandwidth,
+        delay=args.delay,
+        queue_size=args.queue_size,
+        queue=args.queue,
+        loss=loss,
+        seed=args.seed,
+    )
+    with loop.network.link(uplink):
+        await pc1.setLocalDescription(await pc1.createOffer())
+    await pc2.setRemoteDescription(pc1.localDescription)
+    with loop.network.link(EmulatedLink(delay=args.delay)):
+        await pc2.setLocalDescription(await pc2.createAnswer())
+    await pc1.setRemoteDescription(pc2.localDescription)
+
+    samples = []
+    last_bytes = 0
+    while loop.time() < loss.start + loss.duration + args.recovery:
+        await asyncio.sleep(1)
+        samples.append(
+            (
+                loop.time() - loss.start,
+                (uplink.stats.bytes_delivered - last_bytes) * 8 / 1000,
+            )
+        )
+        last_bytes = uplink.stats.bytes_delivered
+
+    await pc1.close()
+    await pc2.close()
+    await asyncio.gather(*consumers)
+    return samples
+
+
+def main() -> None:
+    traces = runpy.run_path(TRACES_PATH)["CELLULAR_TRACES_90S"]
+
+    parser = argparse.ArgumentParser(description="Congestion control benchmark")
+    parser.add_argument("--trace", choices=sorted(traces), default="median")
+    parser.add_argument(
+        "--cc", nargs="+", default=["remb", "gcc-twcc"], help="Controllers to compare"
+    )
+    parser.add_argument("--bandwidth", type=int, default=2000000, help="bits/s")
+    parser.add_argument("--delay", type=float, default=0.025, help="seconds")
+    parser.add_argument("--queue", choices=["droptail", "red"], default="droptail")
+    parser.add_argument("--queue-size", type=int, default=50, help="packets")
+    parser.add_argument("--stabilize", type=float, default=10.0, help="seconds")
+    parser.add_argument("--recovery", type=float, default=30.0, help="seconds")
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        "%10s %14s %12s %14s %10s"
+        % ("cc", "baseline kbps", "trace kbps", "recovery kbps", "real time")
+    )
+    for cc in args.cc:
+        os.environ["AIORTC_CC"] = cc
+        loop = EmulatedEventLoop()
+        start = time.perf_counter()
+        try:
+            samples = loop.run_until_complete(run(loop, traces[args.trace], args))
+        finally:
+            loop.close()
+        elapsed = time.perf_counter() - start
+
+        if args.verbose:
+            for t, kbps in samples:
+                print("%s %6.1f s %8.1f kbps" % (cc, t, kbps))
+
+        def mean(values: list[float]) -> float:
+            return sum(values) / len(values) if values else 0.0
+
+        duration = sum(traces[args.trace]["gaps"])
+        print(
+            "%10s %14.1f %12.1f %14.1f %9.1fs"
+            % (
+                cc,
+                mean([kbps for t, kbps in samples if t <= 0]),
+                mean([kbps for t, kbps in samples if 0 < t <= duration]),
+                mean([kbps for t, kbps in samples if t > duration]),
+                elapsed,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
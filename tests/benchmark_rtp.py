@@ -0,0 +1,245 @@
+"""
+Micro-benchmark of RTP packet parsing and serialization.
+
+Compares the previous implementation, which copied the payload when parsing
+and built the wire format and header extensions by repeated concatenation,
+with parsing over a memoryview, serializing with a single join and
+serializing into a reusable buffer.
+
+Run with:
+
+    python -m tests.benchmark_rtp
+"""
+
+import argparse
+import os
+import time
+from collections.abc import Callable
+from struct import pack, unpack, unpack_from
+from unittest.mock import patch
+
+from aiortc.codecs.vpx import vp8_depayload
+from aiortc.rtcrtpparameters import RTCRtpHeaderExtensionParameters, RTCRtpParameters
+from aiortc.rtp import (
+    RTP_HEADER_LENGTH,
+    HeaderExtensions,
+    HeaderExtensionsMap,
+    RtpPacket,
+    padl,
+)
+
+
+def legacy_pack_header_extensions(
+    extensions: list[tuple[int, bytes]],
+) -> tuple[int, bytes]:
+    """
+    Serialize header extensions according to RFC 5285.
+    """
+    extension_profile = 0
+    extension_value = b""
+
+    if not extensions:
+        return extension_profile, extension_value
+
+    one_byte = True
+    for x_id, x_value in extensions:
+        x_length = len(x_value)
+        assert x_id > 0 and x_id < 256
+        assert x_length >= 0 and x_length < 256
+        if x_id > 14 or x_length == 0 or x_length > 16:
+            one_byte = False
+
+    if one_byte:
+        # One-Byte Header
+        extension_profile = 0xBEDE
+        extension_value = b""
+        for x_id, x_value in extensions:
+            x_length = len(x_value)
+            extension_value += pack("!B", (x_id << 4) | (x_length - 1))
+            extension_value += x_value
+    else:
+        # Two-Byte Header
+        extension_profile = 0x1000
+        extension_value = b""
+        for x_id, x_value in extensions:
+            x_length = len(x_value)
+            extension_value += pack("!BB", x_id, x_length)
+            extension_value += x_value
+
+    extension_value += b"\x00" * padl(len(extension_value))
+    return extension_profile, extension_value
+
+
+class LegacyRtpPacket(RtpPacket):
+    """
+    Parsing and serialization as they were done before.
+    """
+
+    @classmethod
+    def parse(
+        cls, data: bytes, extensions_map: HeaderExtensionsMap = HeaderExtensionsMap()
+    ) -> "RtpPacket":
+        if len(data) < RTP_HEADER_LENGTH:
+            raise ValueError(
+                f"RTP packet length is less than {RTP_HEADER_LENGTH} bytes"
+            )
+
+        v_p_x_cc, m_pt, sequence_number, timestamp, ssrc = unpack("!BBHLL", data[0:12])
+        version = v_p_x_cc >> 6
+        padding = (v_p_x_cc >> 5) & 1
+        extension = (v_p_x_cc >> 4) & 1
+        cc = v_p_x_cc & 0x0F
+        if version != 2:
+            raise ValueError("RTP packet has invalid version")
+        if len(data) < RTP_HEADER_LENGTH + 4 * cc:
+            raise ValueError("RTP packet has truncated CSRC")
+
+        packet = cls(
+            marker=(m_pt >> 7),
+            payload_type=(m_pt & 0x7F),
+            sequence_number=sequence_number,
+            timestamp=timestamp,
+            ssrc=ssrc,
+        )
+
+        pos = RTP_HEADER_LENGTH
+        for i in range(0, cc):
+            packet.csrc.append(unpack_from("!L", data, pos)[0])
+            pos += 4
+
+        if extension:
+            if len(data) < pos + 4:
+                raise ValueError("RTP packet has truncated extension profile / length")
+            extension_profile, extension_length = unpack_from("!HH", data, pos)
+            extension_length *= 4
+            pos += 4
+
+            if len(data) < pos + extension_length:
+                raise ValueError("RTP packet has truncated extension value")
+            extension_value = data[pos : pos + extension_length]
+            pos += extension_length
+            packet.extensions = extensions_map.get(extension_profile, extension_value)
+
+        if padding:
+            padding_len = data[-1]
+            if not padding_len or padding_len > len(data) - pos:
+                raise ValueError("RTP packet padding length is invalid")
+            packet.padding_size = padding_len
+            packet.payload = data[pos:-padding_len]
+        else:
+            packet.payload = data[pos:]
+
+        return packet
+
+    def serialize(
+        self, extensions_map: HeaderExtensionsMap = HeaderExtensionsMap()
+    ) -> bytes:
+        extension_profile, extension_value = extensions_map.set(self.extensions)
+        has_extension = bool(extension_value)
+
+        padding = self.padding_size > 0
+        data = pack(
+            "!BBHLL",
+            (self.version << 6)
+            | (padding << 5)
+            | (has_extension << 4)
+            | len(self.csrc),
+            (self.marker << 7) | self.payload_type,
+            self.sequence_number,
+            self.timestamp,
+            self.ssrc,
+        )
+        for csrc in self.csrc:
+            data += pack("!L", csrc)
+        if has_extension:
+            data += pack("!HH", extension_profile, len(extension_value) >> 2)
+            data += extension_value
+        data += self.payload
+        if padding:
+            data += os.urandom(self.padding_size - 1)
+            data += bytes([self.padding_size])
+        return data
+
+
+def create_extensions_map() -> HeaderExtensionsMap:
+    extensions_map = HeaderExtensionsMap()
+    extensions_map.configure(
+        RTCRtpParameters(
+            headerExtensions=[
+                RTCRtpHeaderExtensionParameters(
+                    id=1, uri="urn:ietf:params:rtp-hdrext:sdes:mid"
+                ),
+                RTCRtpHeaderExtensionParameters(
+                    id=2,
+                    uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time",
+                ),
+            ]
+        )
+    )
+    return extensions_map
+
+
+def measure(func: Callable[[], object], count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RTP packet benchmark")
+    parser.add_argument("--packets", type=int, default=200000)
+    args = parser.parse_args()
+
+    extensions_map = create_extensions_map()
+    buffer = bytearray(1500)
+
+    print("%8s %10s %18s %12s %12s" % ("payload", "operation", "", "before", "after"))
+    for payload_size in [160, 1200]:
+        packet = RtpPacket(
+            payload_type=96,
+            sequence_number=1234,
+            timestamp=5678,
+            ssrc=1234,
+            payload=b"\x90\x80\x01" + b"\x00" * (payload_size - 3),
+        )
+        packet.extensions = HeaderExtensions(mid="0", abs_send_time=123456)
+        data = packet.serialize(extensions_map)
+        legacy = LegacyRtpPacket.parse(data, extensions_map)
+
+        def parse_after() -> bytes:
+            parsed = RtpPacket.parse(memoryview(data), extensions_map)
+            return vp8_depayload(parsed.payload)
+
+        def parse_before() -> bytes:
+            parsed = LegacyRtpPacket.parse(data, extensions_map)
+            return vp8_depayload(parsed.payload)
+
+        for operation, variant, before, after in [
+            ("parse", "depayload", parse_before, parse_after),
+            (
+                "serialize",
+                "bytes",
+                lambda: legacy.serialize(extensions_map),
+                lambda: packet.serialize(extensions_map),
+            ),
+            (
+                "serialize",
+                "reusable buffer",
+                lambda: legacy.serialize(extensions_map),
+                lambda: packet.serialize_into(buffer, 0, extensions_map),
+            ),
+        ]:
+            with patch(
+                "aiortc.rtp.pack_header_extensions", legacy_pack_header_extensions
+            ):
+                before_rate = measure(before, args.packets)
+            after_rate = measure(after, args.packets)
+            print(
+                "%8d %10s %18s %12.0f %12.0f"
+                % (payload_size, operation, variant, before_rate, after_rate)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of data channel throughput over a loopback DTLS transport pair.
+
+Compares the previous implementation, which sent every SCTP chunk in its own
+packet, with bundling the DATA, SACK and FORWARD TSN chunks into packets up
+to the path MTU and handing them to the DTLS transport in one go.
+
+Run with:
+
+    python -m tests.benchmark_sctp
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiortc.rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
+from aiortc.rtcsctptransport import (
+    Chunk,
+    RTCSctpTransport,
+    serialize_packet,
+)
+
+from .utils import dummy_dtls_transport_pair
+
+
+class LegacyRTCSctpTransport(RTCSctpTransport):
+    """
+    Every chunk is sent as soon as it is produced, in its own packet.
+    """
+
+    async def _send_chunk(self, chunk: Chunk) -> None:
+        await self.transport._send_data(
+            serialize_packet(
+                self._local_port,
+                self._remote_port,
+                self._remote_verification_tag,
+                chunk,
+            )
+        )
+
+
+async def run(
+    transport_class: type[RTCSctpTransport], message_size: int, total_size: int
+) -> tuple[float, int]:
+    """
+    Send `total_size` bytes in messages of `message_size` bytes and return
+    the throughput in MB/s and the number of packets sent by both ends.
+    """
+    async with dummy_dtls_transport_pair() as (client_transport, server_transport):
+        client = transport_class(client_transport)
+        server = transport_class(server_transport)
+        server_channels: list[RTCDataChannel] = []
+        server.on("datachannel", server_channels.append)
+
+        await server.start(client.getCapabilities(), client.port)
+        await client.start(server.getCapabilities(), server.port)
+        channel = RTCDataChannel(client, RTCDataChannelParameters(label="bench"))
+        while not server_channels or channel.readyState != "open":
+            await asyncio.sleep(0.01)
+
+        count = total_size // message_size
+        done = asyncio.Event()
+        received = 0
+
+        def on_message(message: bytes) -> None:
+            nonlocal received
+            received += 1
+            if received == count:
+                done.set()
+
+        server_channels[0].on("message", on_message)
+
+        packets_before = (
+            client_transport._get_stats()[client_transport._stats_id].packetsSent
+            + server_transport._get_stats()[server_transport._stats_id].packetsSent
+        )
+        message = b"M" * message_size
+        start = time.perf_counter()
+        for i in range(count):
+            channel.send(message)
+        await done.wait()
+        elapsed = time.perf_counter() - start
+        packets = (
+            client_transport._get_stats()[client_transport._stats_id].packetsSent
+            + server_transport._get_stats()[server_transport._stats_id].packetsSent
+            - packets_before
+        )
+
+        await client.stop()
+        await server.stop()
+        return count * message_size / elapsed / 1000000, packets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SCTP throughput benchmark")
+    parser.add_argument("--megabytes", type=float, default=2.0)
+    args = parser.parse_args()
+
+    total_size = int(args.megabytes * 1000000)
+
+    print(
+        "%8s %12s %12s %12s %12s"
+        % ("message", "before MB/s", "after MB/s", "before pkts", "after pkts")
+    )
+    for message_size in [100, 1200, 16384]:
+        before, before_packets = asyncio.run(
+            run(LegacyRTCSctpTransport, message_size, total_size)
+        )
+        after, after_packets = asyncio.run(
+            run(RTCSctpTransport, message_size, total_size)
+        )
+        print(
+            "%8d %12.2f %12.2f %12d %12d"
+            % (message_size, before, after, before_packets, after_packets)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark of small data channel messages sent while a large message is in
+flight on another data channel.
+
+Compares the previous implementation, which sent messages in DATA chunks
+one after the other, with sending them in I-DATA chunks and interleaving
+the fragments of messages on different streams (RFC 8260).
+
+Run with:
+
+    python -m tests.benchmark_sctp_interleaving
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Union
+
+from aiortc.rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
+from aiortc.rtcsctptransport import RTCSctpTransport
+
+from .utils import dummy_dtls_transport_pair
+
+
+async def run(
+    interleaving: bool, message_size: int, pings: int
+) -> tuple[list[float], float]:
+    """
+    Send one message of `message_size` bytes on a bulk channel, then
+    `pings` small messages on a control channel, and return the latency
+    of each small message and of the large message.
+    """
+    async with dummy_dtls_transport_pair() as (client_transport, server_transport):
+        client = RTCSctpTransport(client_transport)
+        server = RTCSctpTransport(server_transport)
+        client._local_interleaving = interleaving
+        server._local_interleaving = interleaving
+        server_channels: list[RTCDataChannel] = []
+        server.on("datachannel", server_channels.append)
+
+        await server.start(client.getCapabilities(), client.port)
+        await client.start(server.getCapabilities(), server.port)
+        bulk = RTCDataChannel(client, RTCDataChannelParameters(label="bulk"))
+        control = RTCDataChannel(client, RTCDataChannelParameters(label="control"))
+        while (
+            len(server_channels) < 2
+            or bulk.readyState != "open"
+            or control.readyState != "open"
+        ):
+            await asyncio.sleep(0.01)
+
+        bulk_done = asyncio.Event()
+        bulk_elapsed = 0.0
+        ping_sent: list[float] = []
+        ping_elapsed: list[float] = []
+
+        def on_message(message: Union[bytes, str]) -> None:
+            nonlocal bulk_elapsed
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                bulk_elapsed = now - start
+                bulk_done.set()
+            else:
+                ping_elapsed.append(now - ping_sent[int(message)])
+
+        for server_channel in server_channels:
+            server_channel.on("message", on_message)
+
+        start = time.perf_counter()
+        bulk.send(b"M" * message_size)
+        for i in range(pings):
+            ping_sent.append(time.perf_counter())
+            control.send(str(i))
+            await asyncio.sleep(0.01)
+        await bulk_done.wait()
+        while len(ping_elapsed) < pings:
+            await asyncio.sleep(0.01)
+
+        await client.stop()
+        await server.stop()
+        return ping_elapsed, bulk_elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SCTP interleaving benchmark")
+    parser.add_argument("--megabytes", type=int, default=16)
+    parser.add_argument("--pings", type=int, default=20)
+    args = parser.parse_args()
+
+    message_size = args.megabytes * 1024 * 1024
+    print("%10s %14s %14s %14s" % ("", "ping p50 (ms)", "ping max (ms)", "bulk (s)"))
+    for name, interleaving in [("before", False), ("after", True)]:
+        ping_elapsed, bulk_elapsed = asyncio.run(
+            run(interleaving, message_size, args.pings)
+        )
+        print(
+            "%10s %14.1f %14.1f %14.2f"
+            % (
+                name,
+                statistics.median(ping_elapsed) * 1000,
+                max(ping_elapsed) * 1000,
+                bulk_elapsed,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark of large data channel messages over a lossy loopback link.
+
+Compares the previous implementation, which kept the chunks awaiting
+reassembly in a list scanned from the start whenever a chunk arrived and
+consolidated the received TSNs by sorting them on every packet, with
+indexing chunks and received TSNs by TSN.
+
+Run with:
+
+    python -m tests.benchmark_sctp_reassembly
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Iterator
+from typing import cast
+
+from aiortc.rtcdatachannel import RTCDataChannel, RTCDataChannelParameters
+from aiortc.rtcsctptransport import (
+    SCTP_DATA_FIRST_FRAG,
+    SCTP_DATA_LAST_FRAG,
+    SCTP_DATA_UNORDERED,
+    DataChunk,
+    InboundStream,
+    RTCSctpTransport,
+    tsn_plus_one,
+)
+from aiortc.utils import uint16_add, uint16_gt, uint32_gt, uint32_gte
+
+from .utils import dummy_dtls_transport_pair, set_loss_pattern
+
+
+class LegacyInboundStream:
+    """
+    Reassembly as it was done before.
+    """
+
+    def __init__(self) -> None:
+        self.reassembly: list[DataChunk] = []
+        self.sequence_number = 0
+
+    def add_chunk(self, chunk: DataChunk) -> None:
+        if not self.reassembly or uint32_gt(chunk.tsn, self.reassembly[-1].tsn):
+            self.reassembly.append(chunk)
+            return
+
+        for i, rchunk in enumerate(self.reassembly):
+            assert rchunk.tsn != chunk.tsn, "duplicate chunk in reassembly"
+
+            if uint32_gt(rchunk.tsn, chunk.tsn):
+                self.reassembly.insert(i, chunk)
+                break
+
+    def pop_messages(self) -> Iterator[tuple[int, int, bytes]]:
+        pos = 0
+        start_pos = None
+        while pos < len(self.reassembly):
+            chunk = self.reassembly[pos]
+            if start_pos is None:
+                ordered = not (chunk.flags & SCTP_DATA_UNORDERED)
+                if not (chunk.flags & SCTP_DATA_FIRST_FRAG):
+                    if ordered:
+                        break
+                    else:
+                        pos += 1
+                        continue
+                if ordered and uint16_gt(chunk.stream_seq, self.sequence_number):
+                    break
+                expected_tsn = chunk.tsn
+                start_pos = pos
+            elif chunk.tsn != expected_tsn:
+                if ordered:
+                    break
+                else:
+                    start_pos = None
+                    pos += 1
+                    continue
+
+            if chunk.flags & SCTP_DATA_LAST_FRAG:
+                user_data = b"".join(
+                    [c.user_data for c in self.reassembly[start_pos : pos + 1]]
+                )
+                self.reassembly = (
+                    self.reassembly[:start_pos] + self.reassembly[pos + 1 :]
+                )
+                if ordered and chunk.stream_seq == self.sequence_number:
+                    self.sequence_number = uint16_add(self.sequence_number, 1)
+                pos = start_pos
+                yield (chunk.stream_id, chunk.protocol, user_data)
+            else:
+                pos += 1
+
+            expected_tsn = tsn_plus_one(expected_tsn)
+
+
+class LegacyRTCSctpTransport(RTCSctpTransport):
+    def _get_inbound_stream(self, stream_id: int) -> InboundStream:
+        if stream_id not in self._inbound_streams:
+            self._inbound_streams[stream_id] = cast(
+                InboundStream, LegacyInboundStream()
+            )
+        return self._inbound_streams[stream_id]
+
+    def _mark_received(self, tsn: int) -> bool:
+        if uint32_gte(self._last_received_tsn, tsn) or tsn in self._sack_misordered:
+            self._sack_duplicates.append(tsn)
+            return True
+
+        self._sack_misordered.add(tsn)
+        for tsn in sorted(self._sack_misordered):
+            if tsn == tsn_plus_one(self._last_received_tsn):
+                self._last_received_tsn = tsn
+            else:
+                break
+
+        def is_obsolete(x: int) -> bool:
+            return uint32_gt(x, self._last_received_tsn)
+
+        self._sack_duplicates = list(filter(is_obsolete, self._sack_duplicates))
+        self._sack_misordered = set(filter(is_obsolete, self._sack_misordered))
+        return False
+
+
+async def run(
+    transport_class: type[RTCSctpTransport], message_size: int, loss: int
+) -> tuple[float, float]:
+    """
+    Send one message of `message_size` bytes, losing one packet in `loss`,
+    and return the elapsed wall clock and CPU times.
+    """
+    async with dummy_dtls_transport_pair() as (client_transport, server_transport):
+        client = transport_class(client_transport)
+        server = transport_class(server_transport)
+        server_channels: list[RTCDataChannel] = []
+        server.on("datachannel", server_channels.append)
+
+        await server.start(client.getCapabilities(), client.port)
+        await client.start(server.getCapabilities(), server.port)
+        channel = RTCDataChannel(client, RTCDataChannelParameters(label="bench"))
+        while not server_channels or channel.readyState != "open":
+            await asyncio.sleep(0.01)
+
+        done = asyncio.Event()
+        server_channels[0].on("message", lambda message: done.set())
+
+        loss_pattern = [True] + [False] * (loss - 1)
+        set_loss_pattern(client_transport.transport, loss_pattern)
+        set_loss_pattern(server_transport.transport, loss_pattern)
+
+        start = time.perf_counter()
+        start_cpu = time.process_time()
+        channel.send(b"M" * message_size)
+        await done.wait()
+        elapsed = time.perf_counter() - start
+        elapsed_cpu = time.process_time() - start_cpu
+
+        await client.stop()
+        await server.stop()
+        return elapsed, elapsed_cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SCTP reassembly benchmark")
+    parser.add_argument("--megabytes", type=int, default=16)
+    parser.add_argument("--loss", type=int, default=20, help="lose 1 packet in N")
+    args = parser.parse_args()
+
+    message_size = args.megabytes * 1024 * 1024
+    print("%10s %10s %12s %12s" % ("", "", "wall (s)", "cpu (s)"))
+    for name, transport_class in [
+        ("before", LegacyRTCSctpTransport),
+        ("after", RTCSctpTransport),
+    ]:
+        elapsed, elapsed_cpu = asyncio.run(
+            run(transport_class, message_size, args.loss)
+        )
+        print(
+            "%10s %10s %12.2f %12.2f"
+            % (name, f"{args.megabytes} MiB", elapsed, elapsed_cpu)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark of the call setup latency under a spike of new connections.
+
+Pairs of peer connections are all created at once, and the time from the
+start of the spike to each pair being connected is measured. Without a pool
+every peer connection generates its certificate on the event loop; with a
+pool the certificates and their DTLS contexts were generated beforehand by a
+background thread, optionally being reused by several connections.
+
+Run with:
+
+    python -m tests.benchmark_setup --connections 100
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiortc import RTCConfiguration, RTCPeerConnection
+from aiortc.certificatepool import CertificatePool
+
+
+async def connect(pool: CertificatePool, start: float) -> float:
+    """
+    Connect a pair of peer connections, and return the time it took since
+    the start of the spike.
+    """
+    pc1 = RTCPeerConnection(RTCConfiguration(iceServers=[]), certificatePool=pool)
+    pc2 = RTCPeerConnection(RTCConfiguration(iceServers=[]), certificatePool=pool)
+    connected = asyncio.Event()
+
+    @pc1.on("connectionstatechange")
+    def on_connectionstatechange() -> None:
+        if pc1.connectionState == "connected":
+            connected.set()
+
+    pc1.createDataChannel("chat")
+    await pc1.setLocalDescription(await pc1.createOffer())
+    await pc2.setRemoteDescription(pc1.localDescription)
+    await pc2.setLocalDescription(await pc2.createAnswer())
+    await pc1.setRemoteDescription(pc2.localDescription)
+    await connected.wait()
+    elapsed = time.perf_counter() - start
+
+    await pc1.close()
+    await pc2.close()
+    return elapsed
+
+
+async def spike(pool: CertificatePool, connections: int) -> list[float]:
+    start = time.perf_counter()
+    return await asyncio.gather(*[connect(pool, start) for i in range(connections)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Call setup benchmark")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--reuse", type=int, default=10)
+    args = parser.parse_args()
+
+    print("%12s %10s %10s %10s %10s" % ("pool", "hits", "median", "p95", "max"))
+    for name, size, reuse in [
+        ("none", 0, 1),
+        ("per call", 2 * args.connections, 1),
+        ("reused", 2 * args.connections // args.reuse + 1, args.reuse),
+    ]:
+        pool = CertificatePool(size=size, reuse=reuse)
+
+        # a server keeps its pool full ahead of the spike
+        pool.fill()
+        while len(pool) < size:
+            time.sleep(0.1)
+
+        times = sorted(asyncio.run(spike(pool, args.connections)))
+        print(
+            "%12s %10d %9.0fms %9.0fms %9.0fms"
+            % (
+                name,
+                pool.stats.hits,
+                times[len(times) // 2] * 1000,
+                times[int(len(times) * 0.95)] * 1000,
+                times[-1] * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from aiortc import RTCPeerConnection
+from aiortc.certificatepool import CertificatePool
+from aiortc.rtcdtlstransport import SRTP_PROFILES
+
+from .utils import asynctest
+
+
+def wait_filled(pool: CertificatePool) -> None:
+    # the pool has a single thread, which runs the jobs in order
+    assert pool._executor is not None
+    pool._executor.submit(lambda: None).result()
+
+
+class CertificatePoolTest(TestCase):
+    def test_get(self) -> None:
+        pool = CertificatePool(size=2)
+        self.assertEqual(len(pool), 0)
+
+        # the first certificate is generated on the spot
+        certificate1 = pool.get()
+        self.assertEqual(pool.stats.misses, 1)
+        wait_filled(pool)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.stats.generated, 2)
+
+        # the next ones come from the pool, which is filled again
+        certificate2 = pool.get()
+        certificate3 = pool.get()
+        self.assertEqual(pool.stats.hits, 2)
+        self.assertEqual(
+            len(set(map(id, (certificate1, certificate2, certificate3)))), 3
+        )
+        wait_filled(pool)
+        self.assertEqual(len(pool), 2)
+
+        # the DTLS context was created in the background
+        self.assertEqual(len(certificate2._ssl_contexts), 1)
+        context = certificate2._get_ssl_context(SRTP_PROFILES)
+        self.assertIs(certificate2._get_ssl_context(SRTP_PROFILES), context)
+        self.assertIsNot(certificate2._get_ssl_context(SRTP_PROFILES[:1]), context)
+
+    def test_reuse(self) -> None:
+        pool = CertificatePool(size=1, reuse=3)
+        pool.fill()
+        wait_filled(pool)
+
+        certificates = [pool.get() for i in range(4)]
+        self.assertIs(certificates[1], certificates[0])
+        self.assertIs(certificates[2], certificates[0])
+        self.assertIsNot(certificates[3], certificates[0])
+        self.assertEqual(pool.stats.hits, 3)
+        self.assertEqual(pool.stats.misses, 1)
+
+    def test_rotation(self) -> None:
+        pool = CertificatePool(size=1, rotation=0)
+        pool.fill()
+        wait_filled(pool)
+        self.assertEqual(len(pool), 1)
+
+        # stale certificates are not handed out
+        pool.get()
+        self.assertEqual(pool.stats.hits, 0)
+        self.assertEqual(pool.stats.misses, 1)
+
+    @asynctest
+    async def test_peer_connection(self) -> None:
+        pool = CertificatePool(size=1)
+        pool.fill()
+        wait_filled(pool)
+
+        pc = RTCPeerConnection(certificatePool=pool)
+        self.assertEqual(pool.stats.hits, 1)
+        await pc.close()
@@ -29,3 +29,12 @@ class ClockTest(TestCase):
             2018, 6, 28, 9, 3, 5, 423998, tzinfo=datetime.timezone.utc
         )
         self.assertEqual(clock.datetime_to_ntp(dt), 16059593044731306503)
+
+    def test_set_time_source(self) -> None:
+        clock.set_time_source(lambda: 1536624000.5)
+        try:
+            self.assertEqual(clock.current_time(), 1536624000.5)
+            self.assertEqual(clock.current_ms(), 3745612800500)
+        finally:
+            clock.set_time_source(None)
+        self.assertNotEqual(clock.current_time(), 1536624000.5)
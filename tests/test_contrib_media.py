@@ -12,7 +12,13 @@ from unittest.mock import patch
 import av
 import av.container
 import av.stream
-from aiortc.contrib.media import MediaBlackhole, MediaPlayer, MediaRecorder, MediaRelay
+from aiortc.contrib.media import (
+    MediaBlackhole,
+    MediaPlayer,
+    MediaQueue,
+    MediaRecorder,
+    MediaRelay,
+)
 from aiortc.mediastreams import AudioStreamTrack, MediaStreamError, VideoStreamTrack
 
 from .codecs import CodecTestCase
@@ -181,6 +187,78 @@ class MediaBlackholeTest(TestCase):
         await recorder.stop()
 
 
+class MediaQueueTest(TestCase):
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            MediaQueue(policy="bogus")
+        with self.assertRaises(ValueError):
+            MediaQueue(maxsize=0)
+
+    @asynctest
+    async def test_block(self) -> None:
+        queue = MediaQueue(maxsize=2, policy="block")
+        await queue.put(av.Packet(b"1"))
+        await queue.put(av.Packet(b"2"))
+        self.assertTrue(queue.full())
+
+        # the producer waits for the consumer
+        put = asyncio.ensure_future(queue.put(av.Packet(b"3")))
+        await asyncio.sleep(0)
+        self.assertFalse(put.done())
+        self.assertEqual(bytes(await queue.get()), b"1")
+        await put
+        self.assertEqual(queue.qsize(), 2)
+        self.assertEqual(queue.dropped, 0)
+
+        # without waiting, the packet is queued anyway
+        queue.put_nowait(av.Packet(b"4"))
+        self.assertEqual(queue.qsize(), 3)
+        self.assertEqual(queue.dropped, 0)
+
+    @asynctest
+    async def test_block_frames(self) -> None:
+        queue = MediaQueue(maxsize=2, policy="block")
+        frames = [av.VideoFrame(width=32, height=32) for i in range(3)]
+        await queue.put(frames[0])
+        await queue.put(frames[1])
+
+        # without waiting, the oldest frame is dropped
+        queue.put_nowait(frames[2])
+        self.assertIs(await queue.get(), frames[1])
+        self.assertEqual(queue.dropped, 1)
+
+    @asynctest
+    async def test_drop_oldest(self) -> None:
+        queue = MediaQueue(maxsize=2, policy="drop-oldest")
+        frames = [av.VideoFrame(width=32, height=32) for i in range(5)]
+        for frame in frames:
+            await queue.put(frame)
+        self.assertEqual(queue.qsize(), 2)
+        self.assertEqual(queue.dropped, 3)
+        self.assertIs(await queue.get(), frames[3])
+        self.assertIs(await queue.get(), frames[4])
+
+    @asynctest
+    async def test_drop_oldest_packets(self) -> None:
+        queue = MediaQueue(maxsize=2, policy="drop-oldest")
+        for i in range(5):
+            await queue.put(av.Packet(b"%d" % i))
+
+        # encoded packets are never dropped
+        self.assertEqual(queue.qsize(), 5)
+        self.assertEqual(queue.dropped, 0)
+        self.assertEqual(bytes(await queue.get()), b"0")
+
+    @asynctest
+    async def test_never_drop(self) -> None:
+        queue = MediaQueue(maxsize=2, policy="never-drop")
+        for i in range(5):
+            await queue.put(av.Packet(b"%d" % i))
+        self.assertFalse(queue.full())
+        self.assertEqual(queue.qsize(), 5)
+        self.assertEqual(queue.dropped, 0)
+
+
 class MediaRelayTest(MediaTestCase):
     @asynctest
     async def test_audio_stop_consumer(self) -> None:
@@ -220,6 +298,50 @@ class MediaRelayTest(MediaTestCase):
         # stop source track
         source.stop()
 
+    @asynctest
+    async def test_video_stop_blocked_consumer(self) -> None:
+        source = VideoStreamTrack()
+        relay = MediaRelay()
+        proxy1 = relay.subscribe(source, queue_size=1, queue_policy="block")
+        proxy2 = relay.subscribe(source, queue_size=1, queue_policy="block")
+
+        # the queues fill up, which holds up the relay
+        await asyncio.gather(proxy1.recv(), proxy2.recv())
+        await asyncio.sleep(0.1)
+        self.assertTrue(proxy1._queue.full())
+        self.assertTrue(proxy2._queue.full())
+
+        # stopping the first consumer lets the second one carry on
+        proxy1.stop()
+        for i in range(3):
+            frame = await asyncio.wait_for(proxy2.recv(), timeout=1)
+            self.assertIsInstance(frame, av.VideoFrame)
+
+        # stop source track
+        source.stop()
+
+    @asynctest
+    async def test_video_slow_consumer(self) -> None:
+        source = VideoStreamTrack()
+        relay = MediaRelay()
+        proxy1 = relay.subscribe(source, queue_size=2)
+        proxy2 = relay.subscribe(source, queue_size=2)
+
+        # the first consumer keeps up, the second one falls behind
+        await asyncio.gather(proxy1.recv(), proxy2.recv())
+        for i in range(4):
+            frame1 = await proxy1.recv()
+        frame2 = await proxy2.recv()
+        self.assertGreater(frame2.pts, 0)
+
+        # the second consumer only gets the latest frames
+        self.assertEqual(proxy1.framesDropped, 0)
+        self.assertGreater(proxy2.framesDropped, 0)
+        self.assertLessEqual(frame1.pts - frame2.pts, 2 * 3000)
+
+        # stop source track
+        source.stop()
+
     @asynctest
     async def test_audio_stop_consumer_unbuffered(self) -> None:
         source = AudioStreamTrack()
@@ -628,6 +750,36 @@ class MediaPlayerTest(MediaTestCase):
                 await player.video.recv()
             self.assertEqual(player.video.readyState, "ended")
 
+    @asynctest
+    async def test_video_file_png_small_queue(self) -> None:
+        path = self.create_video_file("test-%3d.png", duration=1)
+        player = MediaPlayer(path, queue_size=2)
+
+        if not isinstance(self, MediaPlayerNoDecodeTest):
+            # file playback waits for the consumer instead of dropping frames
+            for i in range(30):
+                frame = await player.video.recv()
+                self.assertVideo(frame)
+                self.assertLessEqual(player.video._queue.qsize(), 2)
+            with self.assertRaises(MediaStreamError):
+                await player.video.recv()
+            self.assertEqual(player.video.framesDropped, 0)
+
+    @asynctest
+    async def test_audio_and_video_file_stop_video_small_queue(self) -> None:
+        path = self.create_audio_and_video_file(name="test.ts", duration=3)
+        player = MediaPlayer(
+            path, decode=not isinstance(self, MediaPlayerNoDecodeTest), queue_size=2
+        )
+        for i in range(5):
+            await asyncio.gather(player.audio.recv(), player.video.recv())
+
+        # the stopped video track does not hold up the audio track
+        player.video.stop()
+        for i in range(60):
+            await asyncio.wait_for(player.audio.recv(), timeout=5)
+        player.audio.stop()
+
 
 class MediaPlayerNoDecodeTest(MediaPlayerTest):
     def assertAudio(self, packet: Any) -> None:
@@ -0,0 +1,221 @@
+import asyncio
+import time
+from collections.abc import Callable, Coroutine
+from unittest import TestCase
+
+from aiortc import clock
+from aiortc.contrib.netem import (
+    EmulatedEventLoop,
+    EmulatedLink,
+    RandomLoss,
+    TraceLoss,
+)
+
+import aioice
+
+
+def run(coro: Callable[[EmulatedEventLoop], Coroutine[None, None, None]]) -> None:
+    loop = EmulatedEventLoop()
+    try:
+        loop.run_until_complete(coro(loop))
+    finally:
+        loop.close()
+
+
+class DatagramRecorder(asyncio.DatagramProtocol):
+    def __init__(self) -> None:
+        self.closed = False
+        self.received: list[tuple[float, bytes, tuple]] = []
+
+    def connection_lost(self, exc: Exception) -> None:
+        self.closed = True
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.received.append((asyncio.get_event_loop().time(), data, addr))
+
+
+class LossModelTest(TestCase):
+    def test_random_loss(self) -> None:
+        def losses(seed: int) -> list[bool]:
+            loss = RandomLoss(0.2, seed=seed)
+            return [loss.lost(0.0) for i in range(1000)]
+
+        self.assertEqual(losses(1), losses(1))
+        self.assertNotEqual(losses(1), losses(2))
+        self.assertAlmostEqual(losses(1).count(True) / 1000, 0.2, delta=0.05)
+
+    def test_trace_loss(self) -> None:
+        loss = TraceLoss([1.0, 2.0, 0.5], [0.0, 50.0, 100.0])
+        self.assertEqual(loss.duration, 3.5)
+        self.assertEqual(loss.loss_at(-1.0), 0.0)
+        self.assertEqual(loss.loss_at(0.5), 0.0)
+        self.assertEqual(loss.loss_at(1.0), 0.5)
+        self.assertEqual(loss.loss_at(3.2), 1.0)
+        self.assertEqual(loss.loss_at(3.5), 0.0)
+
+        # the trace starts with the first packet
+        self.assertFalse(loss.lost(10.0))
+        self.assertEqual(loss.start, 10.0)
+        self.assertTrue(loss.lost(13.0))
+        self.assertFalse(loss.lost(14.0))
+
+    def test_trace_loss_invalid(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            TraceLoss([1.0, 2.0], [10.0])
+        self.assertEqual(str(cm.exception), "A loss trace needs as many gaps as losses")
+
+
+class EmulatedEventLoopTest(TestCase):
+    def test_virtual_clock(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            start = loop.time()
+            wall_start = clock.current_time()
+            await asyncio.sleep(3600)
+            self.assertAlmostEqual(loop.time() - start, 3600, places=3)
+            self.assertAlmostEqual(clock.current_time() - wall_start, 3600, places=3)
+
+            # the work done in threads takes no virtual time
+            start = loop.time()
+            await loop.run_in_executor(None, time.sleep, 0.05)
+            self.assertLess(loop.time() - start, 0.001)
+
+        started = time.monotonic()
+        run(test)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+        # the clock is restored once the loop stops
+        self.assertAlmostEqual(clock.current_time(), time.time(), delta=1.0)
+
+    def test_datagram_endpoints(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            transport1, protocol1 = await loop.create_datagram_endpoint(
+                DatagramRecorder, local_addr=("10.0.0.1", 0)
+            )
+            transport2, protocol2 = await loop.create_datagram_endpoint(
+                DatagramRecorder, local_addr=("10.0.0.1", 0)
+            )
+            addr1 = transport1.get_extra_info("sockname")
+            addr2 = transport2.get_extra_info("sockname")
+            self.assertEqual(addr1, ("10.0.0.1", 49152))
+            self.assertEqual(addr2, ("10.0.0.1", 49153))
+
+            with self.assertRaises(OSError):
+                await loop.create_datagram_endpoint(DatagramRecorder, local_addr=addr1)
+
+            # datagrams to unknown addresses are dropped
+            transport1.sendto(b"hello", addr2)
+            transport1.sendto(b"nobody", ("10.0.0.2", 1234))
+            await asyncio.sleep(0)
+            self.assertEqual([r[1:] for r in protocol2.received], [(b"hello", addr1)])
+
+            transport2.close()
+            await asyncio.sleep(0)
+            self.assertTrue(protocol2.closed)
+            transport1.sendto(b"closed", addr2)
+            await asyncio.sleep(0)
+            self.assertEqual(len(protocol2.received), 1)
+
+        run(test)
+
+    def test_ice_connection(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            link = EmulatedLink(delay=0.05, loss=RandomLoss(0.2, seed=1))
+            conn_a = aioice.Connection(ice_controlling=True)
+            conn_b = aioice.Connection(ice_controlling=False)
+            with loop.network.link(link):
+                await conn_a.gather_candidates()
+            await conn_b.gather_candidates()
+
+            for local, remote in ((conn_a, conn_b), (conn_b, conn_a)):
+                for candidate in remote.local_candidates:
+                    await local.add_remote_candidate(candidate)
+                await local.add_remote_candidate(None)
+                local.remote_username = remote.local_username
+                local.remote_password = remote.local_password
+
+            # the connectivity checks survive the losses
+            await asyncio.gather(conn_a.connect(), conn_b.connect())
+            await conn_a.send(b"howdee")
+            self.assertEqual(await conn_b.recv(), b"howdee")
+            self.assertGreater(link.stats.packets_delivered, 0)
+
+            await conn_a.close()
+            await conn_b.close()
+
+        run(test)
+
+
+class EmulatedLinkTest(TestCase):
+    def test_bandwidth_and_delay(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            # 1000 bytes with the headers take 0.1 s at 80 kbit/s
+            link = EmulatedLink(bandwidth=80000, delay=0.05)
+            received: list[tuple[float, bytes]] = []
+            start = loop.time()
+            for i in range(3):
+                link.send(
+                    bytes([i]) * 972,
+                    lambda data: received.append((loop.time() - start, data[:1])),
+                )
+            await asyncio.sleep(1)
+
+            self.assertEqual([r[1] for r in received], [b"\x00", b"\x01", b"\x02"])
+            for (elapsed, data), expected in zip(received, [0.15, 0.25, 0.35]):
+                self.assertAlmostEqual(elapsed, expected, places=3)
+            self.assertEqual(link.stats.bytes_delivered, 2916)
+
+        run(test)
+
+    def test_droptail(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            link = EmulatedLink(bandwidth=80000, queue_size=2)
+            received: list[bytes] = []
+            for i in range(4):
+                link.send(bytes([i]) * 972, received.append)
+            self.assertEqual(link.queue_length(loop.time()), 2)
+            await asyncio.sleep(1)
+
+            self.assertEqual([data[:1] for data in received], [b"\x00", b"\x01"])
+            self.assertEqual(link.stats.packets_dropped, 2)
+            self.assertEqual(link.queue_length(loop.time()), 0)
+
+            # the queue has been drained
+            link.send(b"again", received.append)
+            await asyncio.sleep(1)
+            self.assertEqual(received[-1], b"again")
+
+        run(test)
+
+    def test_red(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            # a standing queue makes RED drop packets long before it is full
+            link = EmulatedLink(bandwidth=80000, queue_size=100, queue="red")
+            for i in range(2000):
+                link.send(b"x" * 972, lambda data: None)
+                if link.queue_length(loop.time()) >= 60:
+                    await asyncio.sleep(0.1)
+            self.assertGreater(link.stats.packets_dropped, 0)
+
+        run(test)
+
+    def test_invalid_queue(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            EmulatedLink(queue="codel")
+        self.assertEqual(
+            str(cm.exception), "Queue management must be 'droptail' or 'red'"
+        )
+
+    def test_loss(self) -> None:
+        async def test(loop: EmulatedEventLoop) -> None:
+            link = EmulatedLink(loss=TraceLoss([1.0], [100.0]))
+            received: list[bytes] = []
+            link.send(b"lost", received.append)
+            await asyncio.sleep(2)
+            link.send(b"delivered", received.append)
+            await asyncio.sleep(0.1)
+
+            self.assertEqual(received, [b"delivered"])
+            self.assertEqual(link.stats.packets_lost, 1)
+            self.assertEqual(link.stats.packets_sent, 2)
+
+        run(test)
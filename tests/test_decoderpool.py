@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from typing import Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+from aiortc.codecs import PCMU_CODEC
+from aiortc.decoderpool import MAX_FRAMES_PER_RUN, DecoderPool, default_workers
+from aiortc.jitterbuffer import JitterFrame
+from av.frame import Frame
+
+from .utils import asynctest
+
+
+class DecoderPoolTest(TestCase):
+    def test_default_workers(self) -> None:
+        with patch.dict("os.environ", {"AIORTC_DECODER_THREADS": "3"}):
+            self.assertEqual(default_workers(), 3)
+            self.assertEqual(DecoderPool().workers, 3)
+        with patch.dict("os.environ", {"AIORTC_DECODER_THREADS": "bogus"}):
+            self.assertGreaterEqual(default_workers(), 1)
+        self.assertEqual(DecoderPool(workers=2).workers, 2)
+
+    @asynctest
+    async def test_streams(self) -> None:
+        loop = asyncio.get_event_loop()
+        pool = DecoderPool(workers=2)
+
+        batches: list[list[list[Optional[Frame]]]] = [[], [], []]
+        ended = [asyncio.Event() for batch in batches]
+
+        def deliver(index: int, frames: list[Optional[Frame]]) -> None:
+            batches[index].append(frames)
+            if frames[-1] is None:
+                ended[index].set()
+
+        streams = [
+            pool.create_stream(loop, lambda frames, index=index: deliver(index, frames))
+            for index in range(len(batches))
+        ]
+
+        # hold the workers until all the frames are queued
+        gate = threading.Event()
+        for i in range(pool.workers):
+            pool._submit(gate.wait)
+
+        for timestamp in range(0, 50 * 160, 160):
+            for stream in streams:
+                stream.decode(
+                    PCMU_CODEC, JitterFrame(data=b"\xff" * 160, timestamp=timestamp)
+                )
+        for stream in streams:
+            stream.close()
+        gate.set()
+        await asyncio.wait_for(
+            asyncio.gather(*[event.wait() for event in ended]), timeout=5
+        )
+
+        for stream, stream_batches in zip(streams, batches):
+            frames = [frame for batch in stream_batches for frame in batch]
+
+            # the frames of each stream are decoded in order, then the end
+            self.assertEqual(len(frames), 51)
+            self.assertEqual(
+                [frame.pts for frame in frames[:-1]], list(range(0, 50 * 160, 160))
+            )
+            self.assertIsNone(frames[-1])
+
+            # the frames are handed over in batches
+            self.assertEqual(
+                [len(batch) for batch in stream_batches],
+                [MAX_FRAMES_PER_RUN] * 6 + [3],
+            )
+
+            self.assertEqual(stream.stats.frames_decoded, 50)
+            self.assertGreater(stream.stats.total_decode_time, 0)
+            self.assertGreaterEqual(stream.stats.total_queue_delay, 0)
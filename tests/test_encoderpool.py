@@ -0,0 +1,293 @@
+import asyncio
+import fractions
+from unittest import TestCase
+
+from aiortc.codecs import CODECS
+from aiortc.codecs.base import Encoder
+from aiortc.contrib.media import MediaRelay
+from aiortc.encoderpool import (
+    ENCODED_FRAME_CACHE_SIZE,
+    EncoderPool,
+    bitrate_bucket,
+    scale_frame,
+    track_source,
+)
+from aiortc.mediastreams import VideoStreamTrack
+from av import VideoFrame
+from av.frame import Frame
+from av.packet import Packet
+
+from .utils import asynctest
+
+VP8_CODEC = CODECS["video"][0]
+H264_CODEC = CODECS["video"][2]
+
+
+class CountingEncoder(Encoder):
+    def __init__(self) -> None:
+        self.encoded: list[tuple[Frame, bool]] = []
+        self.packed = 0
+        self.target_bitrate = 500000
+
+    def encode(
+        self, frame: Frame, force_keyframe: bool = False
+    ) -> tuple[list[bytes], int]:
+        self.encoded.append((frame, force_keyframe))
+        return [b"frame%d" % len(self.encoded)], frame.pts
+
+    def pack(self, packet: Packet) -> tuple[list[bytes], int]:
+        self.packed += 1
+        return [bytes(packet)], 0
+
+
+def create_frame(pts: int) -> VideoFrame:
+    frame = VideoFrame(width=32, height=32)
+    frame.pts = pts
+    frame.time_base = fractions.Fraction(1, 90000)
+    return frame
+
+
+class EncoderPoolTest(TestCase):
+    def setUp(self) -> None:
+        self.encoders: list[CountingEncoder] = []
+
+    def factory(self, codec: object) -> CountingEncoder:
+        encoder = CountingEncoder()
+        self.encoders.append(encoder)
+        return encoder
+
+    def test_bitrate_bucket(self) -> None:
+        self.assertIsNone(bitrate_bucket(None))
+        self.assertIsNone(bitrate_bucket(0))
+        self.assertEqual(bitrate_bucket(1000000), bitrate_bucket(1200000))
+        self.assertNotEqual(bitrate_bucket(1000000), bitrate_bucket(2000000))
+
+    def test_track_source(self) -> None:
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        self.assertIs(track_source(source), source)
+        self.assertIs(track_source(relay.subscribe(source)), source)
+
+    @asynctest
+    async def test_encode_once(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        handles = [pool.acquire(relay.subscribe(source), VP8_CODEC) for i in range(3)]
+        self.assertEqual(len(pool), 1)
+
+        frame = create_frame(3000)
+        results = await asyncio.gather(*[handle.encode(frame) for handle in handles])
+        self.assertEqual(results, [([b"frame1"], 3000)] * 3)
+        self.assertEqual(len(self.encoders), 1)
+
+        # the keyframe requested for the new viewers is only sent once
+        self.assertEqual(self.encoders[0].encoded, [(frame, True)])
+
+        # a keyframe request applies to the next frame for all viewers
+        frame = create_frame(6000)
+        await handles[1].encode(frame, force_keyframe=True)
+        for handle in handles:
+            await handle.encode(frame)
+        self.assertEqual(self.encoders[0].encoded[1], (frame, True))
+        self.assertEqual(len(self.encoders[0].encoded), 2)
+
+        for handle in handles:
+            handle.close()
+        self.assertEqual(len(pool), 0)
+
+    @asynctest
+    async def test_skipped_frame(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        handle1 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        handle2 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        frames = [create_frame(i * 3000) for i in range(4)]
+
+        # the second viewer skips a frame
+        await handle1.encode(frames[0])
+        await handle2.encode(frames[0])
+        await handle1.encode(frames[1])
+        await handle1.encode(frames[2])
+        self.assertEqual(await handle2.encode(frames[2]), ([], 0))
+
+        # the next frame is a keyframe for both viewers
+        self.assertEqual(await handle2.encode(frames[3]), ([b"frame4"], 9000))
+        self.assertEqual(await handle1.encode(frames[3]), ([b"frame4"], 9000))
+        self.assertEqual(
+            [keyframe for frame, keyframe in self.encoders[0].encoded],
+            [True, False, False, True],
+        )
+
+        # a viewer which skipped a frame not encoded yet gets it as a keyframe
+        frames = [create_frame(i * 3000) for i in range(4, 6)]
+        await handle1.encode(frames[0])
+        self.assertEqual(await handle2.encode(frames[1]), ([b"frame6"], 15000))
+        self.assertEqual(await handle1.encode(frames[1]), ([b"frame6"], 15000))
+        self.assertEqual(self.encoders[0].encoded[-1], (frames[1], True))
+
+    @asynctest
+    async def test_evicted_frame(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        handle1 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        handle2 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        frames = [create_frame(i * 3000) for i in range(ENCODED_FRAME_CACHE_SIZE + 2)]
+        for frame in frames:
+            await handle1.encode(frame)
+
+        # the lagging viewer does not get the evicted frame encoded again
+        self.assertEqual(await handle2.encode(frames[0]), ([], 0))
+        self.assertEqual(len(self.encoders[0].encoded), len(frames))
+
+        # it catches up with the keyframe it asked for
+        keyframe = create_frame(len(frames) * 3000)
+        await handle1.encode(keyframe)
+        self.assertEqual(self.encoders[0].encoded[-1], (keyframe, True))
+        for frame in frames[1:]:
+            self.assertEqual(await handle2.encode(frame), ([], 0))
+        self.assertEqual(await handle2.encode(keyframe), ([b"frame11"], 30000))
+
+    @asynctest
+    async def test_restarted_source(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        source = VideoStreamTrack()
+        handle = pool.acquire(source, VP8_CODEC)
+        for i in range(4):
+            await handle.encode(create_frame(i * 3000))
+
+        # a looping source starts over with a keyframe, and keeps going
+        for i in range(4):
+            frame = create_frame(i * 3000)
+            self.assertEqual(await handle.encode(frame), ([b"frame%d" % (i + 5)], i * 3000))
+        self.assertEqual(
+            [keyframe for frame, keyframe in self.encoders[0].encoded],
+            [True, False, False, False, True, False, False, False],
+        )
+
+    @asynctest
+    async def test_restarted_relay(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        handle1 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        handle2 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        for i in range(4):
+            frame = create_frame(i * 3000)
+            await handle1.encode(frame)
+            await handle2.encode(frame)
+
+        # the restarted source is encoded once, as a keyframe for both viewers
+        frame = create_frame(0)
+        self.assertEqual(await handle1.encode(frame), ([b"frame5"], 0))
+        self.assertEqual(await handle2.encode(frame), ([b"frame5"], 0))
+        self.assertEqual(self.encoders[0].encoded[-1], (frame, True))
+
+        frame = create_frame(3000)
+        self.assertEqual(await handle2.encode(frame), ([b"frame6"], 3000))
+        self.assertEqual(await handle1.encode(frame), ([b"frame6"], 3000))
+        self.assertEqual(len(self.encoders[0].encoded), 6)
+
+    @asynctest
+    async def test_raw_track(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        source = VideoStreamTrack()
+
+        # the senders of a track read different frames, they do not share
+        handle1 = pool.acquire(source, VP8_CODEC)
+        handle2 = pool.acquire(source, VP8_CODEC)
+        self.assertEqual(len(pool), 2)
+        await handle1.encode(create_frame(0))
+        await handle2.encode(create_frame(3000))
+        self.assertEqual(len(self.encoders[0].encoded), 1)
+        self.assertEqual(len(self.encoders[1].encoded), 1)
+
+        handle1.close()
+        handle2.close()
+        self.assertEqual(len(pool), 0)
+
+    @asynctest
+    async def test_pack_once(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        handles = [pool.acquire(relay.subscribe(source), VP8_CODEC) for i in range(2)]
+
+        packet = Packet(b"payload")
+        for handle in handles:
+            self.assertEqual(await handle.encode(packet), ([b"payload"], 0))
+        self.assertEqual(self.encoders[0].packed, 1)
+
+    @asynctest
+    async def test_separate_encoders(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        source1 = VideoStreamTrack()
+        source2 = VideoStreamTrack()
+
+        handle1 = pool.acquire(source1, VP8_CODEC)
+        handle2 = pool.acquire(source2, VP8_CODEC)
+        handle3 = pool.acquire(source1, H264_CODEC)
+        self.assertEqual(len(pool), 3)
+
+        for handle in (handle1, handle2, handle3):
+            handle.close()
+        self.assertEqual(len(pool), 0)
+
+    def test_scale_frame(self) -> None:
+        frame = scale_frame(create_frame(3000), 3)
+        self.assertEqual((frame.width, frame.height), (10, 10))
+        self.assertEqual(frame.pts, 3000)
+
+    @asynctest
+    async def test_scaled_encoders(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        source = VideoStreamTrack()
+        handle1 = pool.acquire(source, VP8_CODEC)
+        handle2 = pool.acquire(source, VP8_CODEC, scale=2)
+        self.assertEqual(len(pool), 2)
+
+        frame = create_frame(3000)
+        await handle1.encode(frame)
+        await handle2.encode(frame)
+        self.assertIs(self.encoders[0].encoded[0][0], frame)
+        self.assertEqual(self.encoders[1].encoded[0][0].width, 16)
+
+        handle1.close()
+        handle2.close()
+        self.assertEqual(len(pool), 0)
+
+    @asynctest
+    async def test_target_bitrate(self) -> None:
+        pool = EncoderPool(factory=self.factory)
+        relay = MediaRelay()
+        source = VideoStreamTrack()
+        handle1 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+        handle2 = pool.acquire(relay.subscribe(source), VP8_CODEC)
+
+        # the target defaults to the encoder's
+        self.assertEqual(handle1.target_bitrate, 500000)
+
+        # similar targets share an encoder, which uses the lowest one
+        handle1.target_bitrate = 1000000
+        handle2.target_bitrate = 1100000
+        self.assertEqual(len(pool), 1)
+        await handle1.encode(create_frame(0))
+        self.assertEqual(self.encoders[-1].target_bitrate, 1000000)
+
+        # a small change across a bucket boundary is ignored
+        handle2.target_bitrate = 1500000
+        self.assertEqual(len(pool), 1)
+
+        # a different target uses another encoder, starting with a keyframe
+        handle2.target_bitrate = 3000000
+        self.assertEqual(len(pool), 2)
+        frame = create_frame(3000)
+        await handle2.encode(frame)
+        self.assertEqual(self.encoders[-1].target_bitrate, 3000000)
+        self.assertEqual(self.encoders[-1].encoded, [(frame, True)])
+
+        handle1.close()
+        handle2.close()
+        self.assertEqual(len(pool), 0)
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from aiortc import clock, eventlog
+from aiortc.eventlog import EventLog
+
+
+class EventLogTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "events.log")
+
+    def tearDown(self) -> None:
+        eventlog.close_all()
+        self.directory.cleanup()
+
+    def read_lines(self) -> list[str]:
+        with open(self.path, encoding="utf-8") as fp:
+            return fp.read().splitlines()
+
+    def test_csv(self) -> None:
+        event_log = EventLog(self.path, format="csv")
+        event_log.log("gcc_estimates", as_bps=300000, ar_bps=250000, gcc_bps=250000)
+        event_log.close()
+
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 1)
+        fields = lines[0].split(", ")
+        self.assertEqual(fields[1:], ["300000", "250000", "250000"])
+        float(fields[0])
+
+    def test_jsonl(self) -> None:
+        event_log = EventLog(self.path)
+        event_log.log("rr_sent", ssrc=1234, fraction_lost=12)
+        event_log.log("remb", ar_bps=250000, ssrcs=[1234])
+        event_log.close()
+
+        events = [json.loads(line) for line in self.read_lines()]
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]["event"], "rr_sent")
+        self.assertEqual(events[0]["ssrc"], 1234)
+        self.assertEqual(events[0]["fraction_lost"], 12)
+        self.assertEqual(events[1]["event"], "remb")
+        self.assertEqual(events[1]["ssrcs"], [1234])
+        self.assertIn("time", events[1])
+
+    def test_virtual_clock(self) -> None:
+        clock.set_time_source(lambda: 1536624000.5)
+        try:
+            event_log = EventLog(self.path)
+            event_log.log("rr_sent", ssrc=1234)
+            event_log.close()
+        finally:
+            clock.set_time_source(None)
+
+        events = [json.loads(line) for line in self.read_lines()]
+        self.assertEqual(events[0]["time"], 1536624000.5)
+
+    def test_invalid_format(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            EventLog(self.path, format="xml")
+        self.assertEqual(str(cm.exception), "Unsupported event log format xml")
+
+    def test_overflow(self) -> None:
+        event_log = EventLog(self.path, capacity=2)
+        with patch.object(event_log, "_write"):
+            for i in range(5):
+                event_log.log("rr_sent", ssrc=i)
+            self.assertEqual(event_log.dropped, 3)
+            event_log.close()
+
+    def test_sampling(self) -> None:
+        event_log = EventLog(self.path, sample_rate=0.0)
+        event_log.log("rr_sent", ssrc=1234)
+        event_log.close()
+
+        self.assertEqual(self.read_lines(), [])
+
+    def test_configure(self) -> None:
+        event_log = eventlog.configure("TEST_EVENT_LOG", self.path)
+        self.assertIs(eventlog.get("TEST_EVENT_LOG"), event_log)
+
+        # disabling the log closes the previous one
+        self.assertIsNone(eventlog.configure("TEST_EVENT_LOG", None))
+        self.assertIsNone(eventlog.get("TEST_EVENT_LOG"))
+        self.assertFalse(event_log._thread.is_alive())
+
+    def test_get_from_environment(self) -> None:
+        with patch.dict(os.environ, {"TEST_EVENT_LOG": self.path}):
+            event_log = eventlog.get("TEST_EVENT_LOG")
+        self.assertIsNotNone(event_log)
+        self.assertEqual(event_log.path, self.path)
+
+        event_log.log("rr_sent", ssrc=1234)
+        eventlog.close_all()
+        self.assertEqual(len(self.read_lines()), 1)
+
+    def test_get_unset(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(eventlog.get("TEST_EVENT_LOG"))
@@ -0,0 +1,182 @@
+from unittest import TestCase
+
+from aiortc.fec import (
+    FEC_MAX_RATE,
+    FecDecoder,
+    FecEncoder,
+    FecPacket,
+    fec_protect,
+    pack_packet_mask,
+    unpack_packet_mask,
+)
+from aiortc.rtp import RtpPacket
+from aiortc.utils import uint16_add
+
+
+def create_packets(count: int, seq: int = 0) -> list[RtpPacket]:
+    return [
+        RtpPacket(
+            payload_type=100,
+            marker=int(i == count - 1),
+            sequence_number=uint16_add(seq, i),
+            timestamp=3000,
+            ssrc=1234,
+            payload=bytes([i]) * (100 + i),
+        )
+        for i in range(count)
+    ]
+
+
+def assertPacketsEqual(
+    self: TestCase, packets: list[RtpPacket], expected: list[RtpPacket]
+) -> None:
+    self.assertEqual(
+        [
+            (p.sequence_number, p.marker, p.payload_type, p.timestamp, p.payload)
+            for p in packets
+        ],
+        [
+            (p.sequence_number, p.marker, p.payload_type, p.timestamp, p.payload)
+            for p in expected
+        ],
+    )
+
+
+class FecPacketTest(TestCase):
+    def test_packet_mask(self) -> None:
+        for offsets, length in (([0, 3, 14], 2), ([0, 45], 6), ([1, 46, 108], 14)):
+            data = pack_packet_mask(offsets)
+            self.assertEqual(len(data), length)
+            self.assertEqual(unpack_packet_mask(data + b"\xff"), (offsets, length))
+
+    def test_packet_mask_truncated(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            unpack_packet_mask(pack_packet_mask([0, 45])[:4])
+        self.assertEqual(str(cm.exception), "FEC packet mask is truncated")
+
+    def test_roundtrip(self) -> None:
+        packets = create_packets(3, seq=65535)
+        fec = fec_protect(packets)
+        self.assertEqual(fec.sequence_numbers, [65535, 0, 1])
+        self.assertEqual(len(fec.payload), 102)
+        self.assertEqual(FecPacket.parse(bytes(fec)), fec)
+
+    def test_parse_invalid(self) -> None:
+        data = bytes(fec_protect(create_packets(2)))
+
+        with self.assertRaises(ValueError) as cm:
+            FecPacket.parse(data[:10])
+        self.assertEqual(str(cm.exception), "FEC packet is truncated")
+
+        with self.assertRaises(ValueError) as cm:
+            FecPacket.parse(b"\x80" + data[1:])
+        self.assertEqual(str(cm.exception), "FEC packet does not use a flexible mask")
+
+        with self.assertRaises(ValueError) as cm:
+            FecPacket.parse(data[:8] + b"\x02" + data[9:])
+        self.assertEqual(str(cm.exception), "FEC packet does not protect a single SSRC")
+
+        with self.assertRaises(ValueError) as cm:
+            FecPacket.parse(data[:18] + b"\x80\x00")
+        self.assertEqual(str(cm.exception), "FEC packet does not protect any packet")
+
+
+class FecEncoderTest(TestCase):
+    def test_rate(self) -> None:
+        encoder = FecEncoder()
+        self.assertEqual(encoder.rate, 0.0)
+        self.assertEqual(encoder.encode(create_packets(10)), [])
+
+        # the protection rises with the losses
+        encoder.update_loss(26)
+        self.assertAlmostEqual(encoder.rate, 0.203125)
+        encoder.update_loss(128)
+        self.assertEqual(encoder.rate, FEC_MAX_RATE)
+
+        # but decays slowly
+        encoder.update_loss(0)
+        self.assertEqual(encoder.rate, FEC_MAX_RATE)
+        for i in range(20):
+            encoder.update_loss(0)
+        self.assertEqual(encoder.rate, 0.0)
+
+    def test_encode(self) -> None:
+        encoder = FecEncoder()
+        encoder.update_loss(26)
+
+        # the packets are interleaved across the FEC packets
+        fec_packets = encoder.encode(create_packets(10))
+        self.assertEqual(
+            [fec.sequence_numbers for fec in fec_packets],
+            [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]],
+        )
+
+        # each frame is protected by at least one FEC packet
+        fec_packets = encoder.encode(create_packets(1))
+        self.assertEqual(len(fec_packets), 1)
+        self.assertGreater(encoder.overhead, encoder.rate)
+
+        # the packets of large frames are protected in groups of 109
+        fec_packets = encoder.encode(create_packets(120))
+        self.assertEqual(
+            [len(fec.offsets) for fec in fec_packets], [5] * 17 + [4] * 8 + [3]
+        )
+
+
+class FecDecoderTest(TestCase):
+    def test_recover(self) -> None:
+        packets = create_packets(4)
+        fec = fec_protect(packets)
+        decoder = FecDecoder()
+
+        # the FEC packet arrives before the packets
+        self.assertEqual(decoder.add_fec(fec), [])
+        self.assertEqual(decoder.add(packets[0]), [])
+        self.assertEqual(decoder.add(packets[3]), [])
+        assertPacketsEqual(self, decoder.add(packets[1]), packets[2:3])
+
+        # the packet arrives late
+        self.assertEqual(decoder.add(packets[2]), [])
+
+    def test_recover_burst(self) -> None:
+        packets = create_packets(6)
+        decoder = FecDecoder()
+        for packet in packets[0:2] + packets[4:6]:
+            self.assertEqual(decoder.add(packet), [])
+
+        # interleaved FEC packets repair consecutive losses
+        assertPacketsEqual(
+            self, decoder.add_fec(fec_protect(packets[0::2])), packets[2:3]
+        )
+        assertPacketsEqual(
+            self, decoder.add_fec(fec_protect(packets[1::2])), packets[3:4]
+        )
+
+    def test_recover_cascade(self) -> None:
+        packets = create_packets(4)
+        decoder = FecDecoder()
+        self.assertEqual(decoder.add(packets[0]), [])
+        self.assertEqual(decoder.add(packets[3]), [])
+
+        # the first FEC packet waits for the second one to repair a packet
+        self.assertEqual(decoder.add_fec(fec_protect(packets)), [])
+        assertPacketsEqual(
+            self, decoder.add_fec(fec_protect(packets[1::2])), packets[1:3]
+        )
+
+    def test_recover_nothing(self) -> None:
+        packets = create_packets(4)
+        fec = fec_protect(packets)
+        decoder = FecDecoder()
+
+        # all the packets were received
+        for packet in packets:
+            decoder.add(packet)
+        self.assertEqual(decoder.add_fec(fec), [])
+
+        # the FEC packet does not match the packets
+        decoder = FecDecoder()
+        for packet in create_packets(3):
+            decoder.add(packet)
+        fec.length_recovery = 1000
+        self.assertEqual(decoder.add_fec(fec), [])
@@ -0,0 +1,146 @@
+from unittest import TestCase
+
+from aiortc.cc import create_controller, list_algorithms
+from aiortc.cc.gcc_twcc import GccTwccController, TransportFeedbackGenerator
+from aiortc.rtp import RtcpTransportFeedback
+
+
+class TransportFeedbackGeneratorTest(TestCase):
+    def test_feedback(self) -> None:
+        generator = TransportFeedbackGenerator(interval_ms=100)
+        self.assertIsNone(generator.feedback(1000))
+
+        generator.add(65534, 1000)
+        generator.add(65535, 1001)
+        generator.add(1, 1010)
+        feedback = generator.feedback(1010)
+        self.assertEqual(
+            feedback,
+            RtcpTransportFeedback(
+                base_sequence_number=65534,
+                reference_time=15,
+                feedback_count=0,
+                deltas=[160, 4, None, 36],
+            ),
+        )
+
+        # interval has not elapsed
+        generator.add(2, 1050)
+        self.assertIsNone(generator.feedback(1050))
+
+        # packets which were already reported are ignored
+        generator.add(0, 1060)
+        feedback = generator.feedback(1110)
+        self.assertEqual(feedback.base_sequence_number, 2)
+        self.assertEqual(feedback.feedback_count, 1)
+        self.assertEqual(feedback.deltas, [104])
+
+    def test_feedback_large_gap(self) -> None:
+        generator = TransportFeedbackGenerator()
+        generator.add(1, 0)
+        generator.add(2, 10000)
+
+        # the second packet does not fit in a 16-bit delta
+        feedback = generator.feedback(10000)
+        self.assertEqual(feedback.deltas, [0])
+        feedback = generator.feedback(10100)
+        self.assertEqual(feedback.base_sequence_number, 2)
+        self.assertEqual(feedback.deltas, [64])
+
+
+class BottleneckLink:
+    """
+    Send 1200-byte packets at the target bitrate through a bottleneck.
+    """
+
+    def __init__(self, controller: GccTwccController) -> None:
+        self.controller = controller
+        self.generator = TransportFeedbackGenerator()
+        self.now_ms = 0.0
+        self.queue_free_ms = 0.0
+        self.seq = 0
+
+    def run(self, duration_ms: int, capacity_bps: int) -> None:
+        end_ms = self.now_ms + duration_ms
+        while self.now_ms < end_ms:
+            self.seq = (self.seq + 1) & 0xFFFF
+            self.controller.on_packet_sent(
+                transport_sequence_number=self.seq,
+                send_time_ms=int(self.now_ms),
+                payload_size=1200,
+                ssrc=1234,
+            )
+            self.queue_free_ms = (
+                max(self.queue_free_ms, self.now_ms) + 1200 * 8000 / capacity_bps
+            )
+            self.generator.add(self.seq, int(self.queue_free_ms) + 20)
+
+            self.now_ms += 1200 * 8000 / self.controller.target_bitrate()
+            feedback = self.generator.feedback(int(self.now_ms))
+            if feedback is not None:
+                self.controller.on_transport_feedback(feedback)
+
+
+class GccTwccControllerTest(TestCase):
+    def test_registered(self) -> None:
+        self.assertIn("gcc-twcc", list_algorithms())
+        controller = create_controller("gcc-twcc")
+        self.assertIsInstance(controller, GccTwccController)
+        self.assertTrue(controller.uses_transport_feedback)
+        self.assertIsNone(
+            controller.on_packet_received(
+                abs_send_time=0, arrival_time_ms=0, payload_size=100, ssrc=1234
+            )
+        )
+
+    def test_receiver_report_before_feedback(self) -> None:
+        controller = GccTwccController(initial_bitrate=1_000_000)
+        controller.on_receiver_report(51)
+        self.assertEqual(controller.target_bitrate(), 900_000)
+
+    def test_feedback_ignores_unknown_packets(self) -> None:
+        controller = GccTwccController(initial_bitrate=1_000_000)
+        controller.on_transport_feedback(
+            RtcpTransportFeedback(
+                base_sequence_number=1,
+                reference_time=0,
+                feedback_count=0,
+                deltas=[None] * 50,
+            )
+        )
+        self.assertEqual(controller.target_bitrate(), 1_000_000)
+
+        # once feedback is flowing, receiver reports are ignored
+        controller.on_receiver_report(255)
+        self.assertEqual(controller.target_bitrate(), 1_000_000)
+
+    def test_loss_fast_decrease(self) -> None:
+        controller = GccTwccController(initial_bitrate=1_000_000)
+        for seq in range(1, 41):
+            controller.on_packet_sent(
+                transport_sequence_number=seq,
+                send_time_ms=seq,
+                payload_size=1200,
+                ssrc=1234,
+            )
+
+        # 25% loss is acted upon without waiting for the update interval
+        controller.on_transport_feedback(
+            RtcpTransportFeedback(
+                base_sequence_number=1,
+                reference_time=0,
+                feedback_count=0,
+                deltas=[4, 4, 4, None] * 10,
+            )
+        )
+        self.assertEqual(controller.target_bitrate(), 875_000)
+
+    def test_capacity_drop(self) -> None:
+        controller = GccTwccController(initial_bitrate=1_000_000)
+        link = BottleneckLink(controller)
+
+        link.run(duration_ms=10000, capacity_bps=2_000_000)
+        self.assertGreater(controller.target_bitrate(), 500_000)
+
+        link.run(duration_ms=3000, capacity_bps=300_000)
+        self.assertLess(controller.target_bitrate(), 500_000)
@@ -148,6 +148,35 @@ class H264Test(CodecTestCase):
         self.assertTrue(len(packages[0]) < 1300)
         self.assertEqual(timestamp, 3000)
 
+    def test_encoder_target_bitrate_in_place(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(H264_CODEC), H264Encoder)
+        encoder.encode(self.create_video_frame(width=640, height=480, pts=0))
+        codec = encoder.codec
+        self.assertEqual(encoder.stats.keyframes, 1)
+
+        # changes below the ceiling are applied to the running codec
+        for pts, bitrate in ((3000, 1500000), (6000, 600000), (9000, 2000000)):
+            encoder.target_bitrate = bitrate
+            encoder.encode(self.create_video_frame(width=640, height=480, pts=pts))
+            self.assertIs(encoder.codec, codec)
+            self.assertEqual(codec.bit_rate, bitrate)
+        self.assertEqual(encoder.stats.reconfigurations, 3)
+        self.assertEqual(encoder.stats.resets, 0)
+        self.assertEqual(encoder.stats.keyframes, 1)
+
+        # a change above the ceiling recreates the codec
+        encoder.target_bitrate = 3000000
+        encoder.encode(self.create_video_frame(width=640, height=480, pts=12000))
+        self.assertIsNot(encoder.codec, codec)
+        self.assertEqual(encoder.stats.rate_resets, 1)
+        self.assertEqual(encoder.stats.resets, 1)
+        self.assertEqual(encoder.stats.keyframes, 2)
+
+        # so does a change of resolution
+        encoder.encode(self.create_video_frame(width=320, height=240, pts=15000))
+        self.assertEqual(encoder.stats.rate_resets, 1)
+        self.assertEqual(encoder.stats.resets, 2)
+
     def test_roundtrip_1280_720(self) -> None:
         self.roundtrip_video(H264_CODEC, 1280, 720)
 
@@ -0,0 +1,176 @@
+import asyncio
+import socket
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import aioice
+import aioice.cache
+import aioice.stun
+from aioice.cache import (
+    INTERFACES_TTL,
+    InterfaceCache,
+    TtlCache,
+    resolve_host,
+    resolve_host_addresses,
+)
+
+from .test_rtcicetransport import unused_udp_ports
+from .utils import asynctest
+
+
+class StunServer(asyncio.DatagramProtocol):
+    def __init__(self) -> None:
+        self.requests = 0
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        request = aioice.stun.parse_message(data)
+        self.requests += 1
+        response = aioice.stun.Message(
+            message_method=aioice.stun.Method.BINDING,
+            message_class=aioice.stun.Class.RESPONSE,
+            transaction_id=request.transaction_id,
+        )
+        response.attributes["XOR-MAPPED-ADDRESS"] = ("1.2.3.4", addr[1])
+        self.transport.sendto(bytes(response), addr)
+
+
+class TtlCacheTest(TestCase):
+    @asynctest
+    async def test_get(self) -> None:
+        cache: TtlCache[str, int] = TtlCache(ttl=0.05)
+        fetches: list[str] = []
+
+        async def fetch(key: str) -> int:
+            fetches.append(key)
+            value = len(fetches)
+            await asyncio.sleep(0.01)
+            return value
+
+        # concurrent lookups share a fetch
+        values = await asyncio.gather(
+            cache.get("a", lambda: fetch("a")),
+            cache.get("a", lambda: fetch("a")),
+            cache.get("b", lambda: fetch("b")),
+        )
+        self.assertEqual(values, [1, 1, 2])
+        self.assertEqual(await cache.get("a", lambda: fetch("a")), 1)
+        self.assertEqual(len(cache), 2)
+
+        # the values expire
+        await asyncio.sleep(0.06)
+        self.assertEqual(await cache.get("a", lambda: fetch("a")), 3)
+        self.assertEqual(fetches, ["a", "b", "a"])
+
+    @asynctest
+    async def test_get_failed(self) -> None:
+        cache: TtlCache[str, int] = TtlCache(ttl=10)
+
+        async def fail() -> int:
+            raise OSError("unreachable")
+
+        async def fetch() -> int:
+            return 1
+
+        with self.assertRaises(OSError):
+            await cache.get("a", fail)
+        self.assertEqual(await cache.get("a", fetch), 1)
+
+
+class InterfaceCacheTest(TestCase):
+    def test_get(self) -> None:
+        cache = InterfaceCache()
+        addresses = [("192.168.1.2", 4), ("2001:db8::2", 6)]
+        with patch("aioice.cache.enumerate_addresses", return_value=addresses) as m:
+            self.assertEqual(
+                cache.get(use_ipv4=True, use_ipv6=True),
+                ["192.168.1.2", "2001:db8::2"],
+            )
+            self.assertEqual(cache.get(use_ipv4=True, use_ipv6=False), ["192.168.1.2"])
+            self.assertEqual(cache.get(use_ipv4=False, use_ipv6=True), ["2001:db8::2"])
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(cache.generation, 1)
+
+            # an unchanged enumeration keeps the generation
+            cache.invalidate()
+            cache.get(use_ipv4=True, use_ipv6=True)
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(cache.generation, 1)
+
+        # the addresses are enumerated again once stale
+        now = time.monotonic() + INTERFACES_TTL
+        with (
+            patch("aioice.cache.time.monotonic", return_value=now),
+            patch("aioice.cache.enumerate_addresses", return_value=[("10.0.0.2", 4)]),
+        ):
+            self.assertEqual(cache.get(use_ipv4=True, use_ipv6=True), ["10.0.0.2"])
+            self.assertEqual(cache.generation, 2)
+
+
+class ResolveHostTest(TestCase):
+    @asynctest
+    async def test_resolve_address(self) -> None:
+        self.assertEqual(await resolve_host("1.2.3.4"), "1.2.3.4")
+        self.assertEqual(await resolve_host("::1"), "::1")
+
+    @asynctest
+    async def test_resolve_name(self) -> None:
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "getaddrinfo", wraps=loop.getaddrinfo) as m:
+            self.assertEqual(await resolve_host("localhost"), "127.0.0.1")
+            self.assertEqual(await resolve_host("localhost"), "127.0.0.1")
+        self.assertEqual(m.call_count, 1)
+
+    @asynctest
+    async def test_resolve_name_addresses(self) -> None:
+        infos = [
+            (socket.AF_INET6, socket.SOCK_DGRAM, 17, "", ("2001:db8::1", 0, 0, 0)),
+            (socket.AF_INET, socket.SOCK_DGRAM, 17, "", ("192.0.2.1", 0)),
+            (socket.AF_INET, socket.SOCK_DGRAM, 17, "", ("192.0.2.1", 0)),
+        ]
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "getaddrinfo", return_value=infos) as m:
+            for i in range(2):
+                self.assertEqual(
+                    await resolve_host_addresses("turn.example.com", socket.AF_UNSPEC),
+                    ["2001:db8::1", "192.0.2.1"],
+                )
+            self.assertEqual(
+                await resolve_host("turn.example.com", socket.AF_UNSPEC), "2001:db8::1"
+            )
+        self.assertEqual(m.call_count, 1)
+
+
+class ServerReflexiveCacheTest(TestCase):
+    @asynctest
+    async def test_shared_udp_port(self) -> None:
+        loop = asyncio.get_running_loop()
+        transport, server = await loop.create_datagram_endpoint(
+            StunServer, local_addr=("0.0.0.0", 0)
+        )
+        stun_server = ("127.0.0.1", transport.get_extra_info("sockname")[1])
+
+        # the connections sharing a port share its mapping
+        (port,) = unused_udp_ports(1)
+        connections = [
+            aioice.Connection(
+                ice_controlling=True,
+                stun_server=stun_server,
+                udp_port=port,
+                use_ipv6=False,
+            )
+            for i in range(3)
+        ]
+        await asyncio.gather(*[c.gather_candidates() for c in connections])
+        for connection in connections:
+            srflx = [c for c in connection.local_candidates if c.type == "srflx"]
+            self.assertTrue(srflx)
+            self.assertEqual(set((c.host, c.port) for c in srflx), {("1.2.3.4", port)})
+        self.assertEqual(server.requests, len(srflx))
+
+        for connection in connections:
+            await connection.close()
+        transport.close()
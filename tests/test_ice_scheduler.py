@@ -0,0 +1,149 @@
+import asyncio
+from unittest import TestCase
+
+import aioice
+from aioice.scheduler import TICK, TimerWheel, get_timer_wheel
+
+from .utils import asynctest
+
+
+class TimerWheelTest(TestCase):
+    @asynctest
+    async def test_call_later(self) -> None:
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(loop)
+        fired: list[tuple[str, float]] = []
+        start = loop.time()
+
+        def fire(name: str) -> None:
+            fired.append((name, loop.time() - start))
+
+        wheel.call_later(0.05, lambda: fire("b"))
+        wheel.call_later(0.02, lambda: fire("a"))
+        cancelled = wheel.call_later(0.03, lambda: fire("cancelled"))
+        cancelled.cancel()
+        self.assertTrue(cancelled.cancelled())
+        self.assertEqual(len(wheel), 2)
+
+        await asyncio.sleep(0.1)
+        self.assertEqual([name for name, elapsed in fired], ["a", "b"])
+        for (name, elapsed), delay in zip(fired, [0.02, 0.05]):
+            self.assertGreaterEqual(elapsed, delay - TICK)
+            self.assertLess(elapsed, delay + 2 * TICK)
+        self.assertEqual(len(wheel), 0)
+
+    @asynctest
+    async def test_coalesce(self) -> None:
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(loop)
+        fired: list[int] = []
+
+        # the timers of a tick only use one timer of the event loop
+        for i in range(100):
+            wheel.call_later(0.02, lambda i=i: fired.append(i))
+        self.assertEqual(len(loop._scheduled), 1)  # type: ignore
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(fired, list(range(100)))
+
+    @asynctest
+    async def test_reschedule_from_callback(self) -> None:
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(loop)
+        fired: list[int] = []
+
+        def fire() -> None:
+            fired.append(len(fired))
+            if len(fired) < 3:
+                wheel.call_later(0, fire)
+
+        wheel.call_later(0, fire)
+        await asyncio.sleep(0.05)
+        self.assertEqual(fired, [0, 1, 2])
+
+    @asynctest
+    async def test_exception(self) -> None:
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(loop)
+        contexts: list[dict] = []
+        loop.set_exception_handler(lambda loop, context: contexts.append(context))
+        fired: list[bool] = []
+
+        def fail() -> None:
+            raise ValueError("oops")
+
+        wheel.call_later(0, fail)
+        wheel.call_later(0, lambda: fired.append(True))
+        await asyncio.sleep(0.05)
+        self.assertEqual(fired, [True])
+        self.assertEqual(len(contexts), 1)
+        self.assertIsInstance(contexts[0]["exception"], ValueError)
+
+    @asynctest
+    async def test_get_timer_wheel(self) -> None:
+        self.assertIs(get_timer_wheel(), get_timer_wheel())
+
+
+class ConnectionSchedulerTest(TestCase):
+    @asynctest
+    async def test_connect(self) -> None:
+        conn_a = aioice.Connection(ice_controlling=True)
+        conn_b = aioice.Connection(ice_controlling=False)
+        await asyncio.gather(conn_a.gather_candidates(), conn_b.gather_candidates())
+
+        # along with unreachable candidates, which fail
+        for local, remote in ((conn_a, conn_b), (conn_b, conn_a)):
+            for candidate in remote.local_candidates:
+                await local.add_remote_candidate(candidate)
+            local.remote_username = remote.local_username
+            local.remote_password = remote.local_password
+        for port in range(9, 19):
+            await conn_a.add_remote_candidate(
+                aioice.Candidate(
+                    foundation="bogus%d" % port,
+                    component=1,
+                    transport="udp",
+                    priority=1,
+                    host="127.0.0.1",
+                    port=port,
+                    type="host",
+                )
+            )
+
+        wheel = get_timer_wheel()
+        await asyncio.gather(conn_a.connect(), conn_b.connect())
+
+        self.assertEqual(
+            conn_a._check_states[aioice.ice.CandidatePair.State.SUCCEEDED]
+            + conn_a._check_states[aioice.ice.CandidatePair.State.FAILED],
+            len(conn_a._check_list),
+        )
+        self.assertEqual(
+            [q for q in conn_b._check_queues.values() if q],
+            [],
+        )
+
+        # consent freshness is scheduled on the wheel
+        self.assertIsNotNone(conn_a._consent_timer)
+        self.assertGreater(len(wheel), 0)
+        await conn_a.close()
+        await conn_b.close()
+        self.assertIsNone(conn_a._consent_timer)
+
+    @asynctest
+    async def test_connect_waits_for_candidates(self) -> None:
+        conn = aioice.Connection(ice_controlling=True)
+        await conn.gather_candidates()
+        conn.remote_username = "abcd"
+        conn.remote_password = "abcdefghijklmnopqrstuv"
+
+        # without pairs to check, nothing runs until the end-of-candidates
+        task = asyncio.create_task(conn.connect())
+        await asyncio.sleep(0.1)
+        self.assertFalse(task.done())
+        self.assertIsNone(conn._check_timer)
+
+        await conn.add_remote_candidate(None)
+        with self.assertRaises(ConnectionError):
+            await task
+        await conn.close()
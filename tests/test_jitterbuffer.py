@@ -286,6 +286,82 @@ class JitterBufferTest(TestCase):
         self.assertEqual(frame.data, b"000000010002")
         self.assertEqual(frame.timestamp, 1234)
 
+    def test_remove_video_frame_after_gap(self) -> None:
+        """
+        Video jitter buffer, filling a gap completes several frames.
+        """
+        jbuffer = JitterBuffer(capacity=16, is_video=True)
+
+        for sequence_number, timestamp in [(0, 1234), (2, 1235), (3, 1236)]:
+            packet = RtpPacket(sequence_number=sequence_number, timestamp=timestamp)
+            packet._data = b"%04d" % sequence_number  # type: ignore
+            pli_flag, frame = jbuffer.add(packet)
+            self.assertIsNone(frame)
+
+        packet = RtpPacket(sequence_number=1, timestamp=1234)
+        packet._data = b"0001"  # type: ignore
+        pli_flag, frame = jbuffer.add(packet)
+        self.assertEqual(frame.data, b"00000001")
+        self.assertEqual(frame.timestamp, 1234)
+        self.assertEqual(jbuffer._origin, 2)
+
+        # the next complete frame is returned with the next packet
+        packet = RtpPacket(sequence_number=5, timestamp=1237)
+        packet._data = b"0005"  # type: ignore
+        pli_flag, frame = jbuffer.add(packet)
+        self.assertEqual(frame.data, b"0002")
+        self.assertEqual(frame.timestamp, 1235)
+        self.assertEqual(jbuffer._origin, 3)
+
+    def test_get_frame(self) -> None:
+        """
+        Video jitter buffer, complete frames are retrieved one at a time.
+        """
+        jbuffer = JitterBuffer(capacity=16, prefetch=0, is_video=True)
+        self.assertIsNone(jbuffer.get_frame())
+
+        for sequence_number, timestamp in [(0, 1234), (2, 1235), (3, 1236)]:
+            packet = RtpPacket(sequence_number=sequence_number, timestamp=timestamp)
+            packet._data = b"%04d" % sequence_number  # type: ignore
+            pli_flag, frame = jbuffer.add(packet)
+            self.assertIsNone(frame)
+
+        packet = RtpPacket(sequence_number=1, timestamp=1234)
+        packet._data = b"0001"  # type: ignore
+        pli_flag, frame = jbuffer.add(packet)
+        self.assertEqual(frame.data, b"00000001")
+
+        frame = jbuffer.get_frame()
+        self.assertEqual(frame.data, b"0002")
+        self.assertEqual(frame.timestamp, 1235)
+        self.assertIsNone(jbuffer.get_frame())
+        self.assertEqual(jbuffer._origin, 3)
+
+    def test_remove_incomplete_frame(self) -> None:
+        """
+        Video jitter buffer, an incomplete frame is given up on.
+        """
+        jbuffer = JitterBuffer(capacity=16, prefetch=0, is_video=True)
+        self.assertIsNone(jbuffer.incomplete_frame_timestamp())
+
+        for sequence_number, timestamp in [(0, 1234), (2, 1234), (3, 1235)]:
+            packet = RtpPacket(sequence_number=sequence_number, timestamp=timestamp)
+            packet._data = b"%04d" % sequence_number  # type: ignore
+            pli_flag, frame = jbuffer.add(packet)
+            self.assertIsNone(frame)
+        self.assertEqual(jbuffer.incomplete_frame_timestamp(), 1234)
+
+        # the rest of the frame is discarded, up to the next frame
+        jbuffer.remove_incomplete_frame()
+        self.assertEqual(jbuffer._origin, 3)
+        self.assertEqual(jbuffer.incomplete_frame_timestamp(), 1235)
+
+        packet = RtpPacket(sequence_number=4, timestamp=1236)
+        packet._data = b"0004"  # type: ignore
+        pli_flag, frame = jbuffer.add(packet)
+        self.assertEqual(frame.data, b"0003")
+        self.assertEqual(frame.timestamp, 1235)
+
     def test_pli_flag(self) -> None:
         """
         Video jitter buffer.
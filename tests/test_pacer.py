@@ -0,0 +1,104 @@
+import asyncio
+from unittest import TestCase
+
+from aiortc.pacer import Pacer, PacerPriority
+
+from .utils import asynctest
+
+
+class PacerTest(TestCase):
+    def setUp(self) -> None:
+        self.batches: list[list[bytes]] = []
+        self.sent: list[tuple[bytes, float]] = []
+
+    async def send(self, datas: list[bytes]) -> None:
+        self.batches.append(datas)
+        for data in datas:
+            self.sent.append((data, asyncio.get_event_loop().time()))
+
+    @asynctest
+    async def test_disabled(self) -> None:
+        pacer = Pacer(send=self.send, factor=0)
+        self.assertFalse(pacer.enabled)
+
+        await pacer.send(lambda: b"a", ssrc=1234, priority=PacerPriority.VIDEO)
+        self.assertEqual(self.batches, [[b"a"]])
+
+        # a frame is sent as a single batch
+        await pacer.send_batch(
+            [lambda: b"b", lambda: b"c"], ssrc=1234, priority=PacerPriority.VIDEO
+        )
+        self.assertEqual(self.batches, [[b"a"], [b"b", b"c"]])
+
+    @asynctest
+    async def test_no_target(self) -> None:
+        pacer = Pacer(send=self.send)
+        self.assertIsNone(pacer.pacing_rate)
+
+        # without a target bitrate, packets are not delayed
+        await pacer.send_batch(
+            [lambda: b"x" * 1200] * 10, ssrc=1234, priority=PacerPriority.VIDEO
+        )
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(self.sent), 10)
+        self.assertEqual(len(self.batches), 1)
+        pacer.stop()
+
+    @asynctest
+    async def test_pacing(self) -> None:
+        # 1200 bytes every 10ms
+        pacer = Pacer(send=self.send, factor=2)
+        pacer.set_target_bitrate(1234, 480_000)
+        self.assertEqual(pacer.pacing_rate, 960_000)
+
+        start = asyncio.get_event_loop().time()
+        for i in range(10):
+            await pacer.send(
+                lambda: b"x" * 1200, ssrc=1234, priority=PacerPriority.VIDEO
+            )
+        await asyncio.sleep(0.15)
+        self.assertEqual(len(self.sent), 10)
+
+        # packets are spread over time instead of sent in a burst
+        self.assertGreaterEqual(self.sent[-1][1] - start, 0.07)
+        self.assertEqual(pacer.queue_delay(), 0.0)
+        self.assertGreater(pacer.stats(1234).total_send_delay, 0.0)
+        self.assertEqual(pacer.stats(1234).packets_discarded, 0)
+        pacer.stop()
+
+    @asynctest
+    async def test_priority(self) -> None:
+        pacer = Pacer(send=self.send)
+        pacer.set_target_bitrate(1234, 100_000)
+
+        for i in range(3):
+            await pacer.send(lambda: b"v" * 1200, ssrc=1, priority=PacerPriority.VIDEO)
+        await pacer.send(
+            lambda: b"r" * 1200, ssrc=1, priority=PacerPriority.RETRANSMISSION
+        )
+        await pacer.send(lambda: b"a" * 100, ssrc=2, priority=PacerPriority.AUDIO)
+        await asyncio.sleep(0)
+
+        # audio goes first without waiting for budget, then retransmissions
+        self.assertEqual([x[0][0:1] for x in self.sent[0:2]], [b"a", b"r"])
+        pacer.stop()
+
+    @asynctest
+    async def test_discard_stale(self) -> None:
+        pacer = Pacer(send=self.send, max_queue_delay=0.05)
+        pacer.set_target_bitrate(1234, 100_000)
+
+        for i in range(5):
+            await pacer.send(
+                lambda: b"x" * 1200, ssrc=1234, priority=PacerPriority.VIDEO
+            )
+        await asyncio.sleep(0.1)
+
+        stats = pacer.stats(1234)
+        self.assertGreater(stats.packets_discarded, 0)
+        self.assertEqual(len(self.sent) + stats.packets_discarded, 5)
+
+        # streams which go away no longer contribute to the pacing rate
+        pacer.remove_stream(1234)
+        self.assertIsNone(pacer.pacing_rate)
+        pacer.stop()
@@ -0,0 +1,165 @@
+from unittest import TestCase
+
+import numpy as np
+from aiortc.rate import RateCounter, RemoteBitrateEstimator
+from aiortc.rate_replay import (
+    DetectorParameters,
+    ReplayResult,
+    incoming_bitrate,
+    replay,
+    replay_batch,
+)
+
+from .test_rate import Stream
+
+
+def capacity_drop_trace() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    stream = Stream(capacity=500000)
+    frames = list(stream.generate_frames(1000))
+    stream.capacity = 250000
+    frames += list(stream.generate_frames(1000))
+    abs_send_time, arrival_time_ms, payload_size = zip(*frames)
+    return np.array(abs_send_time), np.array(arrival_time_ms), np.array(payload_size)
+
+
+def jittery_trace() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Several packets per frame, over a link whose capacity changes.
+    """
+    rng = np.random.default_rng(21)
+    abs_send_time = []
+    arrival_time_ms = []
+    payload_size = []
+    send_time_us = 0
+    arrival_time_us = 0
+    for frame in range(900):
+        capacity = [2000000, 600000, 3000000][frame // 300]
+        for i in range(6):
+            abs_send_time.append((send_time_us * (1 << 18) // 1000000) & 0xFFFFFF)
+            arrival_time_us = (
+                max(arrival_time_us, send_time_us)
+                + round(1200 * 8000000 / capacity)
+                + int(abs(rng.normal(0, 500)))
+            )
+            arrival_time_ms.append(arrival_time_us // 1000)
+            payload_size.append(1200)
+            send_time_us += 100
+        send_time_us += 33333 - 600
+    return np.array(abs_send_time), np.array(arrival_time_ms), np.array(payload_size)
+
+
+def run_online(
+    abs_send_time: np.ndarray,
+    arrival_time_ms: np.ndarray,
+    payload_size: np.ndarray,
+    parameters: DetectorParameters,
+) -> tuple[list[int], list[int]]:
+    estimator = RemoteBitrateEstimator()
+    estimator.detector.k_up = parameters.k_up
+    estimator.detector.k_down = parameters.k_down
+    estimator.detector.threshold = parameters.threshold
+    estimator.detector.overuse_time_threshold = parameters.overuse_time_threshold
+
+    times = []
+    bitrates = []
+    for send_time, arrival_time, size in zip(
+        abs_send_time.tolist(), arrival_time_ms.tolist(), payload_size.tolist()
+    ):
+        res = estimator.add(
+            abs_send_time=send_time,
+            arrival_time_ms=arrival_time,
+            payload_size=size,
+            ssrc=1234,
+        )
+        if res is not None:
+            times.append(arrival_time)
+            bitrates.append(res[0])
+    return times, bitrates
+
+
+PARAMETERS = [
+    DetectorParameters(),
+    DetectorParameters(k_up=0.02, k_down=0.01),
+    DetectorParameters(threshold=6, overuse_time_threshold=30),
+    DetectorParameters(k_up=0.004, k_down=0.06, threshold=30),
+]
+
+
+class IncomingBitrateTest(TestCase):
+    def test_matches_rate_counter(self) -> None:
+        # includes packets in the same millisecond and a gap longer than the window
+        arrival_time_ms = np.array([0, 0, 5, 10, 500, 1200, 3000, 3000, 3001, 3500])
+        payload_size = np.array([100, 200, 300, 400, 500, 600, 700, 800, 900, 1000])
+
+        counter = RateCounter(1000, 8000)
+        initialized = True
+        expected = []
+        for now_ms, size in zip(arrival_time_ms.tolist(), payload_size.tolist()):
+            if counter.rate(now_ms) is not None:
+                initialized = True
+            elif initialized:
+                counter.reset()
+                initialized = False
+            counter.add(size, now_ms)
+            rate = counter.rate(now_ms)
+            expected.append(-1 if rate is None else rate)
+
+        self.assertEqual(
+            incoming_bitrate(arrival_time_ms, payload_size).tolist(), expected
+        )
+
+    def test_empty(self) -> None:
+        self.assertEqual(
+            incoming_bitrate(np.array([], dtype=np.int64), np.array([])).tolist(), []
+        )
+
+
+class ReplayTest(TestCase):
+    def assertMatchesOnline(
+        self,
+        trace: tuple[np.ndarray, np.ndarray, np.ndarray],
+        parameters: DetectorParameters,
+        result: ReplayResult,
+    ) -> None:
+        times, bitrates = run_online(*trace, parameters)
+        self.assertEqual(result.time_ms.tolist(), times)
+        self.assertEqual(result.bitrate.tolist(), bitrates)
+
+    def test_capacity_drop(self) -> None:
+        trace = capacity_drop_trace()
+        result = replay(*trace)
+        self.assertMatchesOnline(trace, DetectorParameters(), result)
+
+    def test_jittery(self) -> None:
+        trace = jittery_trace()
+        result = replay(*trace)
+        self.assertGreater(len(result.bitrate), 0)
+        self.assertMatchesOnline(trace, DetectorParameters(), result)
+
+    def test_batch(self) -> None:
+        trace = jittery_trace()
+        results = replay_batch(*trace, parameters=PARAMETERS)
+        self.assertEqual(len(results), len(PARAMETERS))
+        for parameters, result in zip(PARAMETERS, results):
+            self.assertMatchesOnline(trace, parameters, result)
+
+    def test_batch_processes(self) -> None:
+        trace = capacity_drop_trace()
+        results = replay_batch(*trace, parameters=PARAMETERS, processes=2)
+        self.assertEqual(len(results), len(PARAMETERS))
+        for parameters, result in zip(PARAMETERS, results):
+            self.assertMatchesOnline(trace, parameters, result)
+
+    def test_empty(self) -> None:
+        result = replay(np.array([]), np.array([]), np.array([]))
+        self.assertEqual(result.time_ms.tolist(), [])
+        self.assertEqual(result.bitrate.tolist(), [])
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            replay(np.array([0, 1]), np.array([10, 5]), np.array([100, 100]))
+        self.assertEqual(str(cm.exception), "Arrival times must be non-decreasing")
+
+        with self.assertRaises(ValueError) as cm:
+            replay(np.array([0]), np.array([10, 20]), np.array([100, 100]))
+        self.assertEqual(str(cm.exception), "Trace arrays must have the same length")
@@ -15,13 +15,18 @@ from aiortc.rtcdtlstransport import (
 from aiortc.rtcrtpparameters import (
     RTCRtpCodecParameters,
     RTCRtpDecodingParameters,
+    RTCRtpHeaderExtensionParameters,
+    RTCRtpParameters,
     RTCRtpReceiveParameters,
 )
 from aiortc.rtp import (
     RTCP_PSFB_APP,
     RTCP_PSFB_PLI,
     RTCP_RTPFB_NACK,
+    RTCP_RTPFB_TWCC,
+    TRANSPORT_WIDE_CC_URI,
     AnyRtcpPacket,
+    HeaderExtensionsMap,
     RtcpByePacket,
     RtcpPsfbPacket,
     RtcpReceiverInfo,
@@ -29,6 +34,7 @@ from aiortc.rtp import (
     RtcpRtpfbPacket,
     RtcpSenderInfo,
     RtcpSrPacket,
+    RtcpTransportFeedback,
     RtpPacket,
     pack_remb_fci,
 )
@@ -160,6 +166,40 @@ class RTCDtlsTransportTest(TestCase):
         with self.assertRaises(ConnectionError):
             await session1._send_data(b"foo")
 
+    @asynctest
+    async def test_data_batch(self) -> None:
+        transport1, transport2 = dummy_ice_transport_pair()
+
+        certificate1 = RTCCertificate.generateCertificate()
+        session1 = RTCDtlsTransport(transport1, [certificate1])
+
+        certificate2 = RTCCertificate.generateCertificate()
+        session2 = RTCDtlsTransport(transport2, [certificate2])
+        receiver2 = DummyDataReceiver()
+        session2._register_data_receiver(receiver2)
+
+        await asyncio.gather(
+            session1.start(session2.getLocalParameters()),
+            session2.start(session1.getLocalParameters()),
+        )
+        self.assertCounters(session1, session2, 2, 2)
+
+        # send several data packets in one go, each in its own record
+        await session1._send_data_batch([b"ping", b"pong", b"peng"])
+        await asyncio.sleep(0.1)
+        self.assertCounters(session1, session2, 5, 2)
+        self.assertEqual(receiver2.data, [b"ping", b"pong", b"peng"])
+
+        # shutdown
+        await session1.stop()
+        await asyncio.sleep(0.1)
+        self.assertEqual(session1.state, "closed")
+        self.assertEqual(session2.state, "closed")
+
+        # try sending after close
+        with self.assertRaises(ConnectionError):
+            await session1._send_data_batch([b"foo"])
+
     @asynctest
     async def test_data_handler_error(self) -> None:
         transport1, transport2 = dummy_ice_transport_pair()
@@ -255,6 +295,111 @@ class RTCDtlsTransportTest(TestCase):
         with self.assertRaises(ConnectionError):
             await session1._send_rtp(RTP)
 
+    @asynctest
+    async def test_rtp_batch(self) -> None:
+        transport1, transport2 = dummy_ice_transport_pair()
+
+        certificate1 = RTCCertificate.generateCertificate()
+        session1 = RTCDtlsTransport(transport1, [certificate1])
+
+        certificate2 = RTCCertificate.generateCertificate()
+        session2 = RTCDtlsTransport(transport2, [certificate2])
+        receiver2 = DummyRtpReceiver()
+        session2._register_rtp_receiver(
+            receiver2,
+            RTCRtpReceiveParameters(
+                codecs=[
+                    RTCRtpCodecParameters(
+                        mimeType="audio/PCMU", clockRate=8000, payloadType=0
+                    )
+                ],
+                encodings=[RTCRtpDecodingParameters(ssrc=4028317929, payloadType=0)],
+            ),
+        )
+
+        await asyncio.gather(
+            session1.start(session2.getLocalParameters()),
+            session2.start(session1.getLocalParameters()),
+        )
+        self.assertCounters(session1, session2, 2, 2)
+
+        # send several RTP packets in one go, they are received in one go
+        packets = []
+        for i in range(3):
+            packet = RtpPacket.parse(RTP)
+            packet.sequence_number += i
+            packets.append(packet.serialize())
+        await session1._send_rtp_batch(packets)
+        await asyncio.sleep(0.1)
+        self.assertCounters(session1, session2, 5, 2)
+        self.assertEqual(
+            [packet.sequence_number for packet in receiver2.rtp_packets],
+            [15743, 15744, 15745],
+        )
+
+        # shutdown
+        await session1.stop()
+        await asyncio.sleep(0.1)
+        self.assertEqual(session1.state, "closed")
+        self.assertEqual(session2.state, "closed")
+
+        # try sending after close
+        with self.assertRaises(ConnectionError):
+            await session1._send_rtp_batch([RTP])
+
+    @asynctest
+    async def test_rtp_transport_feedback(self) -> None:
+        transport1, transport2 = dummy_ice_transport_pair()
+
+        certificate1 = RTCCertificate.generateCertificate()
+        session1 = RTCDtlsTransport(transport1, [certificate1])
+
+        certificate2 = RTCCertificate.generateCertificate()
+        session2 = RTCDtlsTransport(transport2, [certificate2])
+        parameters = RTCRtpParameters(
+            headerExtensions=[
+                RTCRtpHeaderExtensionParameters(id=1, uri=TRANSPORT_WIDE_CC_URI)
+            ]
+        )
+        extensions_map = HeaderExtensionsMap()
+        extensions_map.configure(parameters)
+        session2._rtp_header_extensions_map.configure(parameters)
+
+        feedbacks: list[RtcpTransportFeedback] = []
+
+        async def mock_send_transport_feedback(
+            feedback: RtcpTransportFeedback, media_ssrc: int
+        ) -> None:
+            feedbacks.append(feedback)
+
+        session2._send_transport_feedback = mock_send_transport_feedback  # type: ignore
+
+        await asyncio.gather(
+            session1.start(session2.getLocalParameters()),
+            session2.start(session1.getLocalParameters()),
+        )
+
+        # the first packet is reported on arrival
+        for sequence_number in range(2):
+            packet = RtpPacket(
+                payload_type=0, sequence_number=sequence_number, ssrc=1234
+            )
+            packet.extensions.transport_sequence_number = sequence_number
+            await session1._send_rtp(packet.serialize(extensions_map))
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(feedbacks), 1)
+        self.assertEqual(feedbacks[0].base_sequence_number, 0)
+
+        # the second one is reported once the interval elapses
+        await asyncio.sleep(0.2)
+        self.assertEqual(len(feedbacks), 2)
+        self.assertEqual(feedbacks[1].base_sequence_number, 1)
+
+        # shutdown
+        await session1.stop()
+        await session2.stop()
+        self.assertIsNone(session2._transport_feedback_task)
+
     @asynctest
     async def test_rtp_malformed(self) -> None:
         transport1, transport2 = dummy_ice_transport_pair()
@@ -544,6 +689,12 @@ class RtpRouterTest(TestCase):
         packet = RtcpRtpfbPacket(fmt=RTCP_RTPFB_NACK, ssrc=1234, media_ssrc=3456)
         self.assertEqual(router.route_rtcp(packet), set([sender]))
 
+        # RTPFB - transport-wide feedback goes to all senders
+        other_sender = DummyRtpSender()
+        router.register_sender(other_sender, ssrc=4567)
+        packet = RtcpRtpfbPacket(fmt=RTCP_RTPFB_TWCC, ssrc=1234, media_ssrc=1)
+        self.assertEqual(router.route_rtcp(packet), set([sender, other_sender]))
+
     def test_route_rtp(self) -> None:
         receiver1 = DummyRtpReceiver()
         receiver2 = DummyRtpReceiver()
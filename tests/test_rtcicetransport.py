@@ -1,6 +1,10 @@
 import asyncio
+import os
+import socket
 from typing import Optional
+from unittest.mock import patch
 
+import aioice
 import aioice.ice
 import aioice.stun
 from aioice import ConnectionClosed
@@ -12,6 +16,7 @@ from aiortc.rtcicetransport import (
     RTCIceParameters,
     RTCIceTransport,
     connection_kwargs,
+    default_udp_sockets,
     parse_stun_turn_uri,
 )
 
@@ -27,6 +32,22 @@ async def mock_get_event() -> Optional[aioice.ice.ConnectionEvent]:
     return ConnectionClosed()
 
 
+def unused_udp_port(port: int) -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("", port))
+
+
+def unused_udp_ports(count: int) -> list[int]:
+    socks = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for i in range(count)]
+    try:
+        for sock in socks:
+            sock.bind(("", 0))
+        return [sock.getsockname()[1] for sock in socks]
+    finally:
+        for sock in socks:
+            sock.close()
+
+
 class ConnectionKwargsTest(TestCase):
     def test_empty(self) -> None:
         self.assertEqual(connection_kwargs([]), {})
@@ -252,6 +273,37 @@ class RTCIceGathererTest(TestCase):
         # close
         await gatherer._connection.close()
 
+    @asynctest
+    async def test_gather_udp_port(self) -> None:
+        (port,) = unused_udp_ports(1)
+        with patch.dict(os.environ, {"AIORTC_UDP_SOCKETS": "2"}):
+            gatherer_1 = RTCIceGatherer(iceServers=[], udpPort=port)
+            gatherer_2 = RTCIceGatherer(iceServers=[], udpPort=port)
+        await asyncio.gather(gatherer_1.gather(), gatherer_2.gather())
+        self.assertEqual(
+            gatherer_1.getLocalCandidates(), gatherer_2.getLocalCandidates()
+        )
+        self.assertEqual(len(gatherer_1.getLocalParameters().usernameFragment), 8)
+
+        # the port is released with the last gatherer
+        await gatherer_1._connection.close()
+        with self.assertRaises(OSError):
+            unused_udp_port(port)
+        await gatherer_2._connection.close()
+        unused_udp_port(port)
+
+    def test_gather_udp_port_components(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            aioice.Connection(ice_controlling=True, components=2, udp_port=0)
+        self.assertEqual(
+            str(cm.exception), "A shared UDP port supports a single component."
+        )
+
+    def test_default_udp_sockets(self) -> None:
+        for value, sockets in (("", 1), ("0", 1), ("4", 4), ("many", 1)):
+            with patch.dict(os.environ, {"AIORTC_UDP_SOCKETS": value}):
+                self.assertEqual(default_udp_sockets(), sockets)
+
     def test_default_ice_servers(self) -> None:
         self.assertEqual(
             RTCIceGatherer.getDefaultIceServers(),
@@ -335,6 +387,47 @@ class RTCIceTransportTest(TestCase):
         self.assertEqual(transport_1.state, "closed")
         self.assertEqual(transport_2.state, "closed")
 
+    @asynctest
+    async def test_connect_udp_port(self) -> None:
+        server_port, port_1, port_2 = unused_udp_ports(3)
+
+        # two calls sharing the port of a server
+        ports = (server_port, port_1, server_port, port_2)
+        gatherers = [RTCIceGatherer(iceServers=[], udpPort=port) for port in ports]
+        transports = [RTCIceTransport(gatherer) for gatherer in gatherers]
+        await asyncio.gather(*[gatherer.gather() for gatherer in gatherers])
+        for gatherer, port in zip(gatherers, ports):
+            candidates = gatherer.getLocalCandidates()
+            self.assertTrue(len(candidates) > 0)
+            self.assertEqual(set(c.port for c in candidates), {port})
+
+        # connect
+        calls = [(0, 1), (2, 3)]
+        for a, b in calls:
+            for candidate in gatherers[b].getLocalCandidates():
+                await transports[a].addRemoteCandidate(candidate)
+            for candidate in gatherers[a].getLocalCandidates():
+                await transports[b].addRemoteCandidate(candidate)
+        await asyncio.gather(
+            *[
+                transports[a].start(gatherers[b].getLocalParameters())
+                for a, b in calls + [(b, a) for a, b in calls]
+            ]
+        )
+        self.assertEqual([t.state for t in transports], ["completed"] * 4)
+
+        # the datagrams reach the right call
+        for a, b in calls:
+            await transports[a]._connection.send(b"from %d" % a)
+            await transports[b]._connection.send(b"from %d" % b)
+        for a, b in calls:
+            self.assertEqual(await transports[b]._connection.recv(), b"from %d" % a)
+            self.assertEqual(await transports[a]._connection.recv(), b"from %d" % b)
+
+        # cleanup
+        await asyncio.gather(*[transport.stop() for transport in transports])
+        self.assertEqual([t.state for t in transports], ["closed"] * 4)
+
     @asynctest
     async def test_connect_fail(self) -> None:
         gatherer_1 = RTCIceGatherer()
@@ -24,18 +24,21 @@ from aiortc.mediastreams import AudioStreamTrack, MediaStreamTrack, VideoStreamT
 from aiortc.rtcpeerconnection import (
     filter_preferred_codecs,
     find_common_codecs,
+    find_send_encodings,
     is_codec_compatible,
 )
 from aiortc.rtcrtpparameters import (
     RTCRtcpFeedback,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpEncodingParameters,
 )
 from aiortc.rtcrtpsender import RTCRtpSender
-from aiortc.sdp import SessionDescription
+from aiortc.sdp import MediaDescription, SessionDescription, SimulcastDescription
 from aiortc.stats import RTCStatsReport
 
 from .test_contrib_media import MediaTestCase
+from .test_rtcicetransport import unused_udp_ports
 from .utils import asynctest, lf2crlf
 
 LONG_DATA = b"\xff" * 2000
@@ -46,6 +49,7 @@ H264_SDP = lf2crlf(
 a=rtcp-fb:99 nack
 a=rtcp-fb:99 nack pli
 a=rtcp-fb:99 goog-remb
+a=rtcp-fb:99 transport-cc
 a=fmtp:99 level-asymmetry-allowed=1;packetization-mode=1;profile-level-id=42001f
 a=rtpmap:100 rtx/90000
 a=fmtp:100 apt=99
@@ -53,6 +57,7 @@ a=rtpmap:101 H264/90000
 a=rtcp-fb:101 nack
 a=rtcp-fb:101 nack pli
 a=rtcp-fb:101 goog-remb
+a=rtcp-fb:101 transport-cc
 a=fmtp:101 level-asymmetry-allowed=1;packetization-mode=1;profile-level-id=42e01f
 a=rtpmap:102 rtx/90000
 a=fmtp:102 apt=101
@@ -63,6 +68,7 @@ VP8_SDP = lf2crlf(
 a=rtcp-fb:97 nack
 a=rtcp-fb:97 nack pli
 a=rtcp-fb:97 goog-remb
+a=rtcp-fb:97 transport-cc
 a=rtpmap:98 rtx/90000
 a=fmtp:98 apt=97
 """
@@ -376,6 +382,38 @@ class RTCRtpCodecParametersTest(TestCase):
             ],
         )
 
+    def test_filter_preferred_codecs_fec(self) -> None:
+        vp8 = RTCRtpCodecParameters(
+            mimeType="video/VP8", clockRate=90000, payloadType=100
+        )
+        fec = RTCRtpCodecParameters(
+            mimeType="video/flexfec-03", clockRate=90000, payloadType=101
+        )
+
+        # FEC is not used by default
+        self.assertEqual(filter_preferred_codecs([vp8, fec], []), [vp8])
+
+        # when preferred, FEC comes after the media codecs
+        self.assertEqual(
+            filter_preferred_codecs(
+                [vp8, fec],
+                [
+                    RTCRtpCodecCapability(mimeType="video/flexfec-03", clockRate=90000),
+                    RTCRtpCodecCapability(mimeType="video/VP8", clockRate=90000),
+                ],
+            ),
+            [vp8, fec],
+        )
+
+        # FEC alone is useless
+        self.assertEqual(
+            filter_preferred_codecs(
+                [vp8, fec],
+                [RTCRtpCodecCapability(mimeType="video/flexfec-03", clockRate=90000)],
+            ),
+            [],
+        )
+
     def test_is_codec_compatible(self) -> None:
         # compatible: identical
         self.assertTrue(
@@ -502,6 +540,38 @@ class RTCRtpCodecParametersTest(TestCase):
         )
 
 
+class FindSendEncodingsTest(TestCase):
+    def test_single(self) -> None:
+        encodings = [RTCRtpEncodingParameters()]
+        media = MediaDescription(kind="video", port=9, profile="UDP", fmt=[])
+        self.assertEqual(find_send_encodings(encodings, media), encodings)
+
+    def test_simulcast(self) -> None:
+        high = RTCRtpEncodingParameters(rid="h")
+        mid = RTCRtpEncodingParameters(rid="m", scaleResolutionDownBy=2)
+        low = RTCRtpEncodingParameters(rid="l", scaleResolutionDownBy=4)
+        encodings = [high, mid, low]
+
+        # offer
+        self.assertEqual(find_send_encodings(encodings, None), encodings)
+
+        # the remote party does not receive simulcast
+        media = MediaDescription(kind="video", port=9, profile="UDP", fmt=[])
+        self.assertEqual(find_send_encodings(encodings, media), [high])
+
+        # the remote party receives some of the layers
+        media.simulcast = SimulcastDescription(recv=["h", "l"])
+        self.assertEqual(find_send_encodings(encodings, media), [high, low])
+
+        # the remote party pauses one of the layers
+        media.simulcast = SimulcastDescription(recv=["h", "~l"])
+        accepted = find_send_encodings(encodings, media)
+        self.assertEqual([e.rid for e in accepted], ["h", "l"])
+        self.assertEqual([e.ssrc for e in accepted], [high.ssrc, low.ssrc])
+        self.assertEqual([e.active for e in accepted], [True, False])
+        self.assertTrue(low.active)
+
+
 class RTCPeerConnectionTest(TestCase):
     def assertBundled(self, pc: RTCPeerConnection) -> None:
         transceivers = pc.getTransceivers()
@@ -999,6 +1069,14 @@ a=rtpmap:8 PCMA/8000
         pc2 = RTCPeerConnection()
         await self._test_connect_audio_bidirectional(pc1, pc2)
 
+    @asynctest
+    async def test_connect_audio_bidirectional_with_udp_port(self) -> None:
+        (port,) = unused_udp_ports(1)
+        pc1 = RTCPeerConnection(RTCConfiguration(iceServers=[], udpPort=port))
+        pc2 = RTCPeerConnection()
+        await self._test_connect_audio_bidirectional(pc1, pc2)
+        self.assertIn(" %d typ host" % port, pc1.localDescription.sdp)
+
     async def _test_connect_audio_bidirectional_trickle(self, with_mid: bool) -> None:
         pc1 = RTCPeerConnection()
         pc1_states = track_states(pc1)
@@ -2820,6 +2898,91 @@ a=rtpmap:0 PCMU/8000
             ["stable", "have-remote-offer", "stable", "closed"],
         )
 
+    @asynctest
+    async def test_connect_video_simulcast_not_accepted(self) -> None:
+        pc1 = RTCPeerConnection()
+        pc2 = RTCPeerConnection()
+
+        # create offer
+        high = RTCRtpEncodingParameters(rid="h")
+        low = RTCRtpEncodingParameters(rid="l", scaleResolutionDownBy=2)
+        pc1.addTransceiver(VideoStreamTrack(), "sendonly", sendEncodings=[high, low])
+        await pc1.setLocalDescription(await pc1.createOffer())
+        for line in [
+            "a=extmap:10 urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id",
+            f"a=ssrc-group:FID {high.ssrc} {high.rtx.ssrc}",
+            f"a=ssrc-group:FID {low.ssrc} {low.rtx.ssrc}",
+            "a=rid:h send",
+            "a=rid:l send",
+            "a=simulcast:send h;l",
+        ]:
+            self.assertTrue(line in pc1.localDescription.sdp, line)
+
+        # the answer does not accept simulcast
+        await pc2.setRemoteDescription(pc1.localDescription)
+        await pc2.setLocalDescription(await pc2.createAnswer())
+        self.assertFalse("a=simulcast" in pc2.localDescription.sdp)
+        self.assertFalse("rtp-stream-id" in pc2.localDescription.sdp)
+
+        # handle answer
+        await pc1.setRemoteDescription(pc2.localDescription)
+        await self.assertIceCompleted(pc1, pc2)
+        await asyncio.sleep(1)
+
+        # only the first encoding is sent
+        report = await pc1.getStats()
+        self.assertEqual(
+            [s.ssrc for s in report.values() if s.type == "outbound-rtp"],
+            [high.ssrc],
+        )
+
+        # close
+        await pc1.close()
+        await pc2.close()
+
+    @asynctest
+    async def test_connect_video_fec(self) -> None:
+        pc1 = RTCPeerConnection()
+        pc2 = RTCPeerConnection()
+
+        # FEC is enabled through the codec preferences
+        capabilities = RTCRtpSender.getCapabilities("video")
+        preferences = [c for c in capabilities.codecs if c.name != "H264"]
+
+        # create offer
+        transceiver = pc1.addTransceiver(VideoStreamTrack(), "sendonly")
+        transceiver.setCodecPreferences(preferences)
+        await pc1.setLocalDescription(await pc1.createOffer())
+        encoding = transceiver.sender._encodings[0]
+        for line in [
+            "a=rtpmap:103 flexfec-03/90000",
+            "a=fmtp:103 repair-window=10000000",
+            f"a=ssrc-group:FID {encoding.ssrc} {encoding.rtx.ssrc}",
+            f"a=ssrc-group:FEC-FR {encoding.ssrc} {encoding.fec.ssrc}",
+        ]:
+            self.assertTrue(line in pc1.localDescription.sdp, line)
+
+        # the answer accepts FEC
+        pc2.addTransceiver("video", "recvonly").setCodecPreferences(preferences)
+        await pc2.setRemoteDescription(pc1.localDescription)
+        await pc2.setLocalDescription(await pc2.createAnswer())
+        self.assertTrue("flexfec-03/90000" in pc2.localDescription.sdp)
+
+        # handle answer
+        await pc1.setRemoteDescription(pc2.localDescription)
+        await self.assertIceCompleted(pc1, pc2)
+        await asyncio.sleep(1)
+
+        # no FEC is sent without losses
+        report = await pc2.getStats()
+        stats = [s for s in report.values() if s.type == "inbound-rtp"]
+        self.assertEqual([s.ssrc for s in stats], [encoding.ssrc])
+        self.assertEqual(stats[0].fecPacketsReceived, 0)
+
+        # close
+        await pc1.close()
+        await pc2.close()
+
     @asynctest
     async def test_connect_video_h264(self) -> None:
         pc1 = RTCPeerConnection()
@@ -8,12 +8,14 @@ from unittest.mock import MagicMock, patch
 import av
 from aiortc.codecs import PCMU_CODEC, get_encoder
 from aiortc.exceptions import InvalidStateError
+from aiortc.fec import fec_protect
 from aiortc.mediastreams import MediaStreamError
 from aiortc.rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
     RTCRtpDecodingParameters,
+    RTCRtpFecParameters,
     RTCRtpHeaderExtensionCapability,
     RTCRtpReceiveParameters,
     RTCRtpRtxParameters,
@@ -26,7 +28,7 @@ from aiortc.rtcrtpreceiver import (
     StreamStatistics,
     TimestampMapper,
 )
-from aiortc.rtp import RtcpPacket, RtpPacket
+from aiortc.rtp import RtcpPacket, RtpPacket, wrap_rtx
 from aiortc.stats import RTCStatsReport
 from aiortc.utils import uint16_add
 
@@ -287,6 +289,11 @@ class RTCRtpReceiverTest(CodecTestCase):
                         "profile-level-id": "42e01f",
                     },
                 ),
+                RTCRtpCodecCapability(
+                    mimeType="video/flexfec-03",
+                    clockRate=90000,
+                    parameters={"repair-window": 10000000},
+                ),
             ],
         )
         self.assertEqual(
@@ -298,6 +305,9 @@ class RTCRtpReceiverTest(CodecTestCase):
                 RTCRtpHeaderExtensionCapability(
                     uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time"
                 ),
+                RTCRtpHeaderExtensionCapability(
+                    uri="http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01"
+                ),
             ],
         )
 
@@ -423,6 +433,100 @@ class RTCRtpReceiverTest(CodecTestCase):
             # check PLI was triggered
             self.assertEqual(pli, [1234])
 
+    @asynctest
+    async def test_rtp_adaptive_playout(self) -> None:
+        with patch.dict("os.environ", {"AIORTC_PLAYOUT_DELAY": "adaptive"}):
+            async with create_receiver("audio") as receiver:
+                receiver._track = RemoteStreamTrack(kind="audio")
+
+                await receiver.receive(RTCRtpReceiveParameters(codecs=[PCMU_CODEC]))
+
+                # receive RTP, frames are released after the target delay
+                for i in range(5):
+                    packet = RtpPacket.parse(load("rtp.bin"))
+                    packet.sequence_number += i
+                    packet.timestamp += i * 160
+                    await receiver._handle_rtp_packet(packet, arrival_time_ms=i * 20)
+                    await asyncio.sleep(0.02)
+
+                frame = self.ensureIsInstance(
+                    await receiver.track.recv(), av.AudioFrame
+                )
+                self.assertEqual(frame.pts, 0)
+                frame = self.ensureIsInstance(
+                    await receiver.track.recv(), av.AudioFrame
+                )
+                self.assertEqual(frame.pts, 160)
+
+                # check stats
+                report = await receiver.getStats()
+                stats = next(s for s in report.values() if s.type == "inbound-rtp")
+                self.assertGreaterEqual(stats.targetPlayoutDelay, 0.01)
+                self.assertEqual(stats.lateFramesDropped, 0)
+
+    @asynctest
+    async def test_rtp_adaptive_playout_missing_video_packet(self) -> None:
+        pli = []
+
+        async def mock_send_rtcp_pli(media_ssrc: int) -> None:
+            pli.append(media_ssrc)
+
+        with patch.dict("os.environ", {"AIORTC_PLAYOUT_DELAY": "adaptive"}):
+            async with create_receiver("video") as receiver:
+                receiver._send_rtcp_pli = mock_send_rtcp_pli  # type: ignore
+                receiver._track = RemoteStreamTrack(kind="video")
+
+                await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+                # a packet is lost and never retransmitted
+                packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=4)
+                packets[1].marker = 0
+                packets[2].timestamp = packets[1].timestamp
+                for packet in [packets[0], packets[1], packets[3]]:
+                    await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+                    await asyncio.sleep(0.1)
+
+                # the incomplete frame is given up on once it is due
+                packets = create_rtp_video_packets(
+                    self, codec=VP8_CODEC, frames=1, seq=4
+                )
+                packets[0].timestamp += 12000
+                await receiver._handle_rtp_packet(packets[0], arrival_time_ms=0)
+                self.assertEqual(pli, [1234])
+
+                report = await receiver.getStats()
+                stats = next(s for s in report.values() if s.type == "inbound-rtp")
+                self.assertEqual(stats.lateFramesDropped, 1)
+
+    @asynctest
+    async def test_rtp_adaptive_playout_missing_last_video_packet(self) -> None:
+        pli = []
+
+        async def mock_send_rtcp_pli(media_ssrc: int) -> None:
+            pli.append(media_ssrc)
+
+        with patch.dict("os.environ", {"AIORTC_PLAYOUT_DELAY": "adaptive"}):
+            async with create_receiver("video") as receiver:
+                receiver._send_rtcp_pli = mock_send_rtcp_pli  # type: ignore
+                receiver._track = RemoteStreamTrack(kind="video")
+
+                await receiver.receive(RTCRtpReceiveParameters(codecs=[VP8_CODEC]))
+
+                # a packet is lost and no more packets arrive
+                packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=4)
+                packets[1].marker = 0
+                packets[2].timestamp = packets[1].timestamp
+                for packet in [packets[0], packets[1], packets[3]]:
+                    await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+
+                # the incomplete frame is given up on once it is due
+                await asyncio.sleep(0.5)
+                self.assertEqual(pli, [1234])
+
+                report = await receiver.getStats()
+                stats = next(s for s in report.values() if s.type == "inbound-rtp")
+                self.assertEqual(stats.lateFramesDropped, 1)
+
     @asynctest
     async def test_rtp_empty_video_packet(self) -> None:
         async with create_receiver("video") as receiver:
@@ -512,6 +616,73 @@ class RTCRtpReceiverTest(CodecTestCase):
             packet = RtpPacket(payload_type=101, ssrc=2345)
             await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
 
+    @asynctest
+    async def test_rtp_fec_and_rtx(self) -> None:
+        nacks = []
+
+        async def mock_send_rtcp_nack(media_ssrc: int, lost: list[int]) -> None:
+            nacks.append((media_ssrc, lost))
+
+        async with create_receiver("video") as receiver:
+            receiver._send_rtcp_nack = mock_send_rtcp_nack  # type: ignore
+            receiver._track = RemoteStreamTrack(kind="video")
+
+            await receiver.receive(
+                RTCRtpReceiveParameters(
+                    codecs=[
+                        VP8_CODEC,
+                        RTCRtpCodecParameters(
+                            mimeType="video/rtx",
+                            clockRate=90000,
+                            payloadType=101,
+                            parameters={"apt": 100},
+                        ),
+                        RTCRtpCodecParameters(
+                            mimeType="video/flexfec-03",
+                            clockRate=90000,
+                            payloadType=102,
+                        ),
+                    ],
+                    encodings=[
+                        RTCRtpDecodingParameters(
+                            ssrc=1234,
+                            payloadType=100,
+                            rtx=RTCRtpRtxParameters(ssrc=2345),
+                            fec=RTCRtpFecParameters(ssrc=3456),
+                        )
+                    ],
+                )
+            )
+            packets = create_rtp_video_packets(self, codec=VP8_CODEC, frames=6)
+
+            # packet 2 is lost, then repaired by FEC
+            for packet in packets[0:2] + packets[3:4]:
+                await receiver._handle_rtp_packet(packet, arrival_time_ms=0)
+            self.assertEqual(nacks, [(1234, [2])])
+            fec = RtpPacket(
+                payload_type=102,
+                ssrc=3456,
+                payload=bytes(fec_protect(packets[0:4])),
+            )
+            await receiver._handle_rtp_packet(fec, arrival_time_ms=0)
+
+            # packet 4 is lost, then retransmitted
+            await receiver._handle_rtp_packet(packets[5], arrival_time_ms=0)
+            self.assertEqual(nacks[1], (1234, [4]))
+            rtx = wrap_rtx(packets[4], payload_type=101, sequence_number=0, ssrc=2345)
+            await receiver._handle_rtp_packet(rtx, arrival_time_ms=0)
+
+            # receive an invalid FEC packet
+            fec = RtpPacket(payload_type=102, ssrc=3456, payload=b"\x00")
+            await receiver._handle_rtp_packet(fec, arrival_time_ms=0)
+
+            # check stats
+            report = await receiver.getStats()
+            stats = [s for s in report.values() if s.type == "inbound-rtp"][0]
+            self.assertEqual(stats.fecPacketsReceived, 1)
+            self.assertEqual(stats.packetsRecoveredByFec, 1)
+            self.assertEqual(stats.packetsRecoveredByRtx, 1)
+
     @asynctest
     async def test_rtp_rtx_unknown_ssrc(self) -> None:
         async with create_receiver("video") as receiver:
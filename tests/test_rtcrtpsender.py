@@ -5,13 +5,18 @@ from unittest.mock import MagicMock, patch
 
 from aiortc import MediaStreamTrack
 from aiortc.codecs import PCMU_CODEC
+from aiortc.contrib.media import MediaRelay
+from aiortc.encoderpool import EncoderPool
 from aiortc.exceptions import InvalidStateError
+from aiortc.fec import FecPacket
 from aiortc.mediastreams import AudioStreamTrack, VideoStreamTrack
 from aiortc.rtcrtpparameters import (
     RTCRtpCapabilities,
     RTCRtpCodecCapability,
     RTCRtpCodecParameters,
+    RTCRtpEncodingParameters,
     RTCRtpHeaderExtensionCapability,
+    RTCRtpHeaderExtensionParameters,
     RTCRtpSendParameters,
 )
 from aiortc.rtcrtpsender import RTCRtpSender
@@ -19,15 +24,19 @@ from aiortc.rtp import (
     RTCP_PSFB_APP,
     RTCP_PSFB_PLI,
     RTCP_RTPFB_NACK,
+    RTCP_RTPFB_TWCC,
+    TRANSPORT_WIDE_CC_URI,
+    HeaderExtensionsMap,
     RtcpPsfbPacket,
     RtcpReceiverInfo,
     RtcpRrPacket,
     RtcpRtpfbPacket,
+    RtcpTransportFeedback,
     RtpPacket,
     is_rtcp,
     pack_remb_fci,
 )
-from aiortc.stats import RTCStatsReport
+from aiortc.stats import RTCOutboundRtpStreamStats, RTCStatsReport
 
 from tests.test_mediastreams import VideoPacketStreamTrack
 
@@ -41,6 +50,10 @@ H264_CODEC = RTCRtpCodecParameters(
     mimeType="video/H264", clockRate=90000, payloadType=98
 )
 
+FLEXFEC_CODEC = RTCRtpCodecParameters(
+    mimeType="video/flexfec-03", clockRate=90000, payloadType=102
+)
+
 
 class BuggyStreamTrack(MediaStreamTrack):
     kind = "audio"
@@ -109,6 +122,11 @@ class RTCRtpSenderTest(TestCase):
                         "profile-level-id": "42e01f",
                     },
                 ),
+                RTCRtpCodecCapability(
+                    mimeType="video/flexfec-03",
+                    clockRate=90000,
+                    parameters={"repair-window": 10000000},
+                ),
             ],
         )
         self.assertEqual(
@@ -120,6 +138,9 @@ class RTCRtpSenderTest(TestCase):
                 RTCRtpHeaderExtensionCapability(
                     uri="http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time"
                 ),
+                RTCRtpHeaderExtensionCapability(
+                    uri="http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01"
+                ),
             ],
         )
 
@@ -213,6 +234,66 @@ class RTCRtpSenderTest(TestCase):
             # clean shutdown
             await sender.stop()
 
+    @asynctest
+    async def test_handle_rtcp_transport_feedback(self) -> None:
+        queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
+        parameters = RTCRtpSendParameters(
+            codecs=[VP8_CODEC],
+            headerExtensions=[
+                RTCRtpHeaderExtensionParameters(id=4, uri=TRANSPORT_WIDE_CC_URI)
+            ],
+        )
+        extensions_map = HeaderExtensionsMap()
+        extensions_map.configure(parameters)
+
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data, extensions_map))
+
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
+
+            with patch.dict("os.environ", {"AIORTC_CC": "gcc-twcc"}):
+                sender = RTCRtpSender(VideoStreamTrack(), local_transport)
+            await sender.send(parameters)
+
+            # packets carry consecutive transport-wide sequence numbers
+            packet1 = await queue.get()
+            packet2 = await queue.get()
+            self.assertIsNotNone(packet1.extensions.transport_sequence_number)
+            self.assertEqual(
+                packet2.extensions.transport_sequence_number,
+                packet1.extensions.transport_sequence_number + 1,
+            )
+
+            # receive RTCP transport-wide feedback
+            packet = RtcpRtpfbPacket(
+                fmt=RTCP_RTPFB_TWCC,
+                ssrc=1234,
+                media_ssrc=sender._ssrc,
+                fci=bytes(
+                    RtcpTransportFeedback(
+                        base_sequence_number=(
+                            packet1.extensions.transport_sequence_number
+                        ),
+                        reference_time=0,
+                        feedback_count=0,
+                        deltas=[4, None],
+                    )
+                ),
+            )
+            await sender._handle_rtcp_packet(packet)
+
+            # receive RTCP transport-wide feedback (malformed)
+            packet = RtcpRtpfbPacket(
+                fmt=RTCP_RTPFB_TWCC, ssrc=1234, media_ssrc=sender._ssrc, fci=b"JUNK"
+            )
+            await sender._handle_rtcp_packet(packet)
+
+            # clean shutdown
+            await sender.stop()
+
     @asynctest
     async def test_handle_rtcp_rr(self) -> None:
         async with dummy_dtls_transport_pair() as (local_transport, _):
@@ -268,12 +349,13 @@ class RTCRtpSenderTest(TestCase):
         """
         queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
 
-        async def mock_send_rtp(data: bytes) -> None:
-            if not is_rtcp(data):
-                await queue.put(RtpPacket.parse(data))
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data))
 
         async with dummy_dtls_transport_pair() as (local_transport, _):
-            local_transport._send_rtp = mock_send_rtp  # type: ignore
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
 
             sender = RTCRtpSender(VideoStreamTrack(), local_transport)
             self.assertEqual(sender.kind, "video")
@@ -288,6 +370,44 @@ class RTCRtpSenderTest(TestCase):
             await asyncio.sleep(0.1)
             await sender.stop()
 
+    @asynctest
+    async def test_replace_track(self) -> None:
+        """
+        Replace the track with a relay of another source.
+        """
+        queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
+
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data))
+
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
+
+            pool = EncoderPool()
+            relay = MediaRelay()
+            source1 = VideoStreamTrack()
+            source2 = VideoStreamTrack()
+            sender = RTCRtpSender(
+                relay.subscribe(source1), local_transport, encoderPool=pool
+            )
+            await sender.send(RTCRtpSendParameters(codecs=[VP8_CODEC]))
+            await queue.get()
+            self.assertEqual([key[0] for key in pool._encoders], [source1])
+
+            # the encoder of the new source is used
+            sender.replaceTrack(relay.subscribe(source2))
+            self.assertEqual(len(pool), 0)
+            await queue.get()
+            while not queue.empty():
+                queue.get_nowait()
+            await queue.get()
+            self.assertEqual([key[0] for key in pool._encoders], [source2])
+
+            await sender.stop()
+            self.assertEqual(len(pool), 0)
+
     @asynctest
     async def test_handle_encoded_packet(self) -> None:
         async with dummy_dtls_transport_pair() as (local_transport, _):
@@ -307,12 +427,13 @@ class RTCRtpSenderTest(TestCase):
         """
         queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
 
-        async def mock_send_rtp(data: bytes) -> None:
-            if not is_rtcp(data):
-                await queue.put(RtpPacket.parse(data))
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data))
 
         async with dummy_dtls_transport_pair() as (local_transport, _):
-            local_transport._send_rtp = mock_send_rtp  # type: ignore
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
 
             sender = RTCRtpSender(VideoStreamTrack(), local_transport)
             sender._ssrc = 1234
@@ -346,12 +467,13 @@ class RTCRtpSenderTest(TestCase):
         """
         queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
 
-        async def mock_send_rtp(data: bytes) -> None:
-            if not is_rtcp(data):
-                await queue.put(RtpPacket.parse(data))
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data))
 
         async with dummy_dtls_transport_pair() as (local_transport, _):
-            local_transport._send_rtp = mock_send_rtp  # type: ignore
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
 
             sender = RTCRtpSender(VideoStreamTrack(), local_transport)
             sender._ssrc = 1234
@@ -392,6 +514,213 @@ class RTCRtpSenderTest(TestCase):
             self.assertEqual(found_rtx.ssrc, 2345)
             self.assertEqual(found_rtx.payload[0:2], pack("!H", packet.sequence_number))
 
+    @asynctest
+    async def test_simulcast_invalid(self) -> None:
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            with self.assertRaises(ValueError) as cm:
+                RTCRtpSender(
+                    "audio",
+                    local_transport,
+                    sendEncodings=[
+                        RTCRtpEncodingParameters(rid="h"),
+                        RTCRtpEncodingParameters(rid="l"),
+                    ],
+                )
+            self.assertEqual(str(cm.exception), "Simulcast is only supported for video")
+
+            with self.assertRaises(ValueError) as cm:
+                RTCRtpSender(
+                    "video",
+                    local_transport,
+                    sendEncodings=[
+                        RTCRtpEncodingParameters(rid="h"),
+                        RTCRtpEncodingParameters(),
+                    ],
+                )
+            self.assertEqual(
+                str(cm.exception), "Simulcast encodings must have distinct RIDs"
+            )
+
+    @asynctest
+    async def test_simulcast(self) -> None:
+        """
+        Send two simulcast layers, then drop the top one under congestion.
+        """
+        queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
+        parameters = RTCRtpSendParameters(
+            codecs=[VP8_CODEC],
+            headerExtensions=[
+                RTCRtpHeaderExtensionParameters(
+                    id=10, uri="urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id"
+                )
+            ],
+        )
+        extensions_map = HeaderExtensionsMap()
+        extensions_map.configure(parameters)
+
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data, extensions_map))
+
+        async def received_rids() -> set[str]:
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.2)
+            rids = set()
+            while not queue.empty():
+                rids.add(queue.get_nowait().extensions.rtp_stream_id)
+            return rids
+
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
+
+            high = RTCRtpEncodingParameters(rid="h")
+            low = RTCRtpEncodingParameters(rid="l", scaleResolutionDownBy=4)
+            sender = RTCRtpSender(
+                VideoStreamTrack(), local_transport, sendEncodings=[high, low]
+            )
+            self.assertEqual(sender._ssrc, high.ssrc)
+            await sender.send(parameters)
+
+            # both layers are sent, each with its own SSRC
+            packet = await queue.get()
+            self.assertEqual(await received_rids(), {"h", "l"})
+
+            # the receiver estimates a bitrate too low for the top layer
+            await sender._handle_rtcp_packet(
+                RtcpPsfbPacket(
+                    fmt=RTCP_PSFB_APP,
+                    ssrc=1234,
+                    media_ssrc=0,
+                    fci=pack_remb_fci(100000, [low.ssrc]),
+                )
+            )
+            await received_rids()
+            self.assertEqual(await received_rids(), {"l"})
+
+            # check stats
+            report = await sender.getStats()
+            stats = [
+                s for s in report.values() if isinstance(s, RTCOutboundRtpStreamStats)
+            ]
+            self.assertEqual(
+                [(s.ssrc, s.rid) for s in stats],
+                [(high.ssrc, "h"), (low.ssrc, "l")],
+            )
+            self.assertTrue(packet.ssrc in (high.ssrc, low.ssrc))
+
+            await sender.stop()
+
+    @asynctest
+    async def test_simulcast_rr(self) -> None:
+        """
+        Feed congestion control once per RR, with the loss of the lowest layer.
+        """
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            high = RTCRtpEncodingParameters(rid="h")
+            low = RTCRtpEncodingParameters(rid="l", scaleResolutionDownBy=4)
+            sender = RTCRtpSender(
+                VideoStreamTrack(), local_transport, sendEncodings=[high, low]
+            )
+            await sender.send(RTCRtpSendParameters(codecs=[VP8_CODEC]))
+
+            controller = sender._RTCRtpSender__cc_controller  # type: ignore
+            with patch.object(controller, "on_receiver_report") as mock_report:
+                await sender._handle_rtcp_packet(
+                    RtcpRrPacket(
+                        ssrc=1234,
+                        reports=[
+                            RtcpReceiverInfo(
+                                ssrc=ssrc,
+                                fraction_lost=fraction_lost,
+                                packets_lost=0,
+                                highest_sequence=630,
+                                jitter=1906,
+                                lsr=0,
+                                dlsr=0,
+                            )
+                            for ssrc, fraction_lost in [
+                                (high.ssrc, 64),
+                                (low.ssrc, 16),
+                            ]
+                        ],
+                    )
+                )
+            mock_report.assert_called_once_with(16)
+
+            await sender.stop()
+
+    @asynctest
+    async def test_fec(self) -> None:
+        """
+        Send FEC packets once the receiver reports losses, within the target.
+        """
+        queue: asyncio.Queue[RtpPacket] = asyncio.Queue()
+
+        async def mock_send_rtp_batch(datas: list[bytes]) -> None:
+            for data in datas:
+                if not is_rtcp(data):
+                    await queue.put(RtpPacket.parse(data))
+
+        async def received_ssrcs() -> set[int]:
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.2)
+            ssrcs = set()
+            while not queue.empty():
+                packet = queue.get_nowait()
+                if packet.payload_type == FLEXFEC_CODEC.payloadType:
+                    FecPacket.parse(packet.payload)
+                ssrcs.add(packet.ssrc)
+            return ssrcs
+
+        async with dummy_dtls_transport_pair() as (local_transport, _):
+            local_transport._send_rtp_batch = mock_send_rtp_batch  # type: ignore
+
+            sender = RTCRtpSender(VideoStreamTrack(), local_transport)
+            fec_ssrc = sender._encodings[0].fec.ssrc
+            await sender.send(RTCRtpSendParameters(codecs=[VP8_CODEC, FLEXFEC_CODEC]))
+
+            # no FEC is sent without losses
+            await queue.get()
+            self.assertEqual(await received_ssrcs(), {sender._ssrc})
+
+            # the receiver reports 25% losses
+            await sender._handle_rtcp_packet(
+                RtcpRrPacket(
+                    ssrc=1234,
+                    reports=[
+                        RtcpReceiverInfo(
+                            ssrc=sender._ssrc,
+                            fraction_lost=64,
+                            packets_lost=10,
+                            highest_sequence=630,
+                            jitter=1906,
+                            lsr=0,
+                            dlsr=0,
+                        )
+                    ],
+                )
+            )
+            await sender._handle_rtcp_packet(
+                RtcpPsfbPacket(
+                    fmt=RTCP_PSFB_APP,
+                    ssrc=1234,
+                    media_ssrc=0,
+                    fci=pack_remb_fci(900000, [sender._ssrc]),
+                )
+            )
+            self.assertEqual(await received_ssrcs(), {sender._ssrc, fec_ssrc})
+
+            # the media is encoded at the target, less the FEC
+            stream = sender._RTCRtpSender__streams[0]  # type: ignore
+            self.assertEqual(stream.target_bitrate, 900000)
+            self.assertLessEqual(stream.media_bitrate, 600000)
+            self.assertLessEqual(stream.encoder.target_bitrate, 600000)
+
+            await sender.stop()
+
     @asynctest
     async def test_disabled(self) -> None:
         async with dummy_dtls_transport_pair() as (local_transport, _):
@@ -413,6 +742,8 @@ class RTCRtpSenderTest(TestCase):
 
             outbound_rtp = report["outbound-rtp_" + str(id(sender))]
             self.assertEqual(outbound_rtp.packetsSent, 0)
+            self.assertEqual(outbound_rtp.packetsDiscardedOnSend, 0)
+            self.assertEqual(outbound_rtp.totalPacketSendDelay, 0.0)
 
             # clean shutdown
             await sender.stop()
@@ -11,6 +11,7 @@ from aiortc.rtcsctptransport import (
     SCTP_DATA_FIRST_FRAG,
     SCTP_DATA_LAST_FRAG,
     SCTP_DATA_UNORDERED,
+    SCTP_TSN_MODULO,
     USERDATA_MAX_LENGTH,
     AbortChunk,
     Chunk,
@@ -20,8 +21,11 @@ from aiortc.rtcsctptransport import (
     ForwardTsnChunk,
     HeartbeatAckChunk,
     HeartbeatChunk,
+    IDataChunk,
+    IForwardTsnChunk,
     InboundStream,
     InitChunk,
+    InterleavedInboundStream,
     ReconfigChunk,
     RTCSctpCapabilities,
     RTCSctpTransport,
@@ -216,6 +220,63 @@ class SctpPacketTest(TestCase):
             repr(chunk), "ForwardTsnChunk(cumulative_tsn=1234, streams=[(12, 34)])"
         )
 
+    def test_roundtrip_idata(self) -> None:
+        first = IDataChunk(flags=SCTP_DATA_FIRST_FRAG)
+        first.tsn = 1234
+        first.stream_id = 12
+        first.mid = 34
+        first.protocol = 51
+        first.user_data = b"foo"
+
+        middle = IDataChunk()
+        middle.tsn = 1235
+        middle.stream_id = 12
+        middle.mid = 34
+        middle.fsn = 1
+        middle.user_data = b"barbaz"
+
+        data = serialize_packet(5000, 5000, 0, first, middle)
+        _, _, _, chunks = parse_packet(data)
+        self.assertEqual(len(chunks), 2)
+
+        chunk = cast(IDataChunk, chunks[0])
+        self.assertIsInstance(chunk, IDataChunk)
+        self.assertEqual(chunk.type, 64)
+        self.assertEqual(chunk.flags, SCTP_DATA_FIRST_FRAG)
+        self.assertEqual(chunk.tsn, 1234)
+        self.assertEqual(chunk.stream_id, 12)
+        self.assertEqual(chunk.mid, 34)
+        self.assertEqual(chunk.fsn, 0)
+        self.assertEqual(chunk.protocol, 51)
+        self.assertEqual(chunk.user_data, b"foo")
+        self.assertEqual(
+            repr(chunk), "IDataChunk(flags=2, tsn=1234, stream_id=12, mid=34, fsn=0)"
+        )
+
+        chunk = cast(IDataChunk, chunks[1])
+        self.assertEqual(chunk.flags, 0)
+        self.assertEqual(chunk.tsn, 1235)
+        self.assertEqual(chunk.mid, 34)
+        self.assertEqual(chunk.fsn, 1)
+        self.assertEqual(chunk.protocol, 0)
+        self.assertEqual(chunk.user_data, b"barbaz")
+
+    def test_roundtrip_iforward_tsn(self) -> None:
+        chunk = IForwardTsnChunk()
+        chunk.cumulative_tsn = 1234
+        chunk.streams = [(12, False, 34), (56, True, 78)]
+
+        data = serialize_packet(5000, 5000, 0, chunk)
+        chunk = self.roundtrip_packet(data, IForwardTsnChunk)
+        self.assertEqual(chunk.type, 194)
+        self.assertEqual(chunk.cumulative_tsn, 1234)
+        self.assertEqual(chunk.streams, [(12, False, 34), (56, True, 78)])
+        self.assertEqual(
+            repr(chunk),
+            "IForwardTsnChunk(cumulative_tsn=1234, "
+            "streams=[(12, False, 34), (56, True, 78)])",
+        )
+
     def test_parse_heartbeat(self) -> None:
         data = load("sctp_heartbeat.bin")
         chunk = self.roundtrip_packet(data, HeartbeatChunk)
@@ -297,6 +358,24 @@ class SctpPacketTest(TestCase):
             "gaps=[(2, 2), (4, 4)])",
         )
 
+    def test_serialize_bundle(self) -> None:
+        sack = SackChunk()
+        sack.cumulative_tsn = 1234
+        data = DataChunk(flags=SCTP_DATA_FIRST_FRAG | SCTP_DATA_LAST_FRAG)
+        data.tsn = 1235
+        data.protocol = 51
+        data.user_data = b"ping"
+
+        packet = serialize_packet(5000, 5000, 1, sack, data)
+        source_port, destination_port, verification_tag, chunks = parse_packet(packet)
+        self.assertEqual(verification_tag, 1)
+        self.assertEqual(len(chunks), 2)
+        self.assertIsInstance(chunks[0], SackChunk)
+        self.assertEqual(chunks[0].cumulative_tsn, 1234)
+        self.assertIsInstance(chunks[1], DataChunk)
+        self.assertEqual(chunks[1].tsn, 1235)
+        self.assertEqual(chunks[1].user_data, b"ping")
+
     def test_parse_shutdown(self) -> None:
         data = load("sctp_shutdown.bin")
         chunk = self.roundtrip_packet(data, ShutdownChunk)
@@ -335,7 +414,7 @@ class ChunkFactory:
             chunk.user_data = frag
             chunks.append(chunk)
 
-            self.tsn += 1
+            self.tsn = tsn_plus_one(self.tsn)
 
         if ordered:
             self.stream_seq += 1
@@ -605,6 +684,154 @@ class SctpStreamTest(TestCase):
         self.assertEqual(stream.reassembly, [chunks[2]])
         self.assertEqual(stream.sequence_number, 2)
 
+    def test_prune_chunks_complete_message(self) -> None:
+        stream = InboundStream()
+        factory = ChunkFactory(tsn=100)
+        chunks = factory.create([b"foo"]) + factory.create([b"bar", b"baz", b"qux"])
+
+        # the second message is complete but waits for the first one
+        for chunk in chunks[1:]:
+            stream.add_chunk(chunk)
+        self.assertEqual(list(stream.pop_messages()), [])
+
+        # pruning part of it leaves the remaining fragments
+        self.assertEqual(stream.prune_chunks(102), 6)
+        self.assertEqual(stream.reassembly, [chunks[3]])
+
+        stream.sequence_number = 2
+        self.assertEqual(list(stream.pop_messages()), [])
+        self.assertEqual(stream.prune_chunks(103), 3)
+        self.assertEqual(stream.reassembly, [])
+
+    def test_skipped_message(self) -> None:
+        stream = InboundStream()
+        chunks = (
+            self.factory.create([b"foo"])
+            + self.factory.create([b"bar"])
+            + self.factory.create([b"baz"])
+        )
+
+        # the second and third messages wait for the first one
+        stream.add_chunk(chunks[1])
+        stream.add_chunk(chunks[2])
+        self.assertEqual(list(stream.pop_messages()), [])
+
+        # a FORWARD TSN skips the first and second messages
+        stream.sequence_number = 2
+        self.assertEqual(
+            list(stream.pop_messages()), [(456, 123, b"bar"), (456, 123, b"baz")]
+        )
+        self.assertEqual(stream.reassembly, [])
+        self.assertEqual(stream.sequence_number, 3)
+
+    def test_many_fragments_tsn_wraparound(self) -> None:
+        stream = InboundStream()
+        factory = ChunkFactory(tsn=SCTP_TSN_MODULO - 500)
+        frags = [bytes([i % 256]) * 10 for i in range(1000)]
+        chunks = factory.create(frags) + factory.create([b"foo"])
+
+        # feed the fragments in reverse order
+        for chunk in reversed(chunks):
+            stream.add_chunk(chunk)
+        self.assertEqual(stream.reassembly, chunks)
+
+        self.assertEqual(
+            list(stream.pop_messages()),
+            [(456, 123, b"".join(frags)), (456, 123, b"foo")],
+        )
+        self.assertEqual(stream.reassembly, [])
+        self.assertEqual(stream.sequence_number, 2)
+
+
+class InterleavedInboundStreamTest(TestCase):
+    def create(
+        self, mid: int, fragments: list[bytes], flags: int = 0
+    ) -> list[IDataChunk]:
+        chunks = []
+        for i, fragment in enumerate(fragments):
+            chunk = IDataChunk(flags=flags)
+            if i == 0:
+                chunk.flags |= SCTP_DATA_FIRST_FRAG
+                chunk.protocol = 123
+            if i == len(fragments) - 1:
+                chunk.flags |= SCTP_DATA_LAST_FRAG
+            chunk.stream_id = 456
+            chunk.mid = mid
+            chunk.fsn = i
+            chunk.user_data = fragment
+            chunks.append(chunk)
+        return chunks
+
+    def test_duplicate(self) -> None:
+        stream = InterleavedInboundStream()
+        chunks = self.create(0, [b"foo", b"bar"])
+
+        stream.add_chunk(chunks[0])
+        with self.assertRaises(AssertionError) as cm:
+            stream.add_chunk(chunks[0])
+        self.assertEqual(str(cm.exception), "duplicate chunk in reassembly")
+
+    def test_interleaved_fragments(self) -> None:
+        stream = InterleavedInboundStream()
+        first = self.create(0, [b"foo", b"bar", b"baz"])
+        second = self.create(1, [b"qux", b"quux"])
+
+        # fragments of both messages arrive interleaved
+        stream.add_chunk(first[0])
+        stream.add_chunk(second[0])
+        stream.add_chunk(second[1])
+        stream.add_chunk(first[2])
+        self.assertEqual(list(stream.pop_messages()), [])
+        self.assertEqual(stream.sequence_number, 0)
+
+        stream.add_chunk(first[1])
+        self.assertEqual(
+            list(stream.pop_messages()),
+            [(456, 123, b"foobarbaz"), (456, 123, b"quxquux")],
+        )
+        self.assertEqual(stream.sequence_number, 2)
+
+    def test_unordered(self) -> None:
+        stream = InterleavedInboundStream()
+        ordered = self.create(0, [b"foo", b"bar"])
+        unordered = self.create(0, [b"baz", b"qux"], flags=SCTP_DATA_UNORDERED)
+
+        stream.add_chunk(ordered[0])
+        stream.add_chunk(unordered[1])
+        stream.add_chunk(unordered[0])
+        self.assertEqual(list(stream.pop_messages()), [(456, 123, b"bazqux")])
+        self.assertEqual(stream.sequence_number, 0)
+
+        stream.add_chunk(ordered[1])
+        self.assertEqual(list(stream.pop_messages()), [(456, 123, b"foobar")])
+        self.assertEqual(stream.sequence_number, 1)
+
+    def test_skip_messages(self) -> None:
+        stream = InterleavedInboundStream()
+        first = self.create(0, [b"foo", b"bar"])
+        second = self.create(1, [b"baz"])
+        third = self.create(2, [b"qux", b"quux"])
+        fourth = self.create(3, [b"corge"])
+
+        # the first and third messages are incomplete
+        stream.add_chunk(first[0])
+        stream.add_chunk(second[0])
+        stream.add_chunk(third[0])
+        stream.add_chunk(fourth[0])
+        self.assertEqual(list(stream.pop_messages()), [])
+
+        # an I-FORWARD-TSN skips the first three messages
+        self.assertEqual(stream.skip_messages(False, 2), 6)
+        self.assertEqual(stream.sequence_number, 3)
+        self.assertEqual(
+            list(stream.pop_messages()), [(456, 123, b"baz"), (456, 123, b"corge")]
+        )
+        self.assertEqual(stream.sequence_number, 4)
+
+        # skipping the same messages again is a no-op
+        self.assertEqual(stream.skip_messages(False, 2), 0)
+        self.assertEqual(stream.sequence_number, 4)
+
 
 class SctpUtilTest(TestCase):
     def test_tsn_minus_one(self) -> None:
@@ -741,14 +968,14 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 2048)
             self.assertEqual(client._outbound_streams_count, 256)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(server.maxChannels, 256)
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 256)
             self.assertEqual(server._outbound_streams_count, 2048)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # client requests additional outbound streams
             param = StreamAddOutgoingParam(
@@ -780,14 +1007,14 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 256)
             self.assertEqual(client._outbound_streams_count, 2048)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(server.maxChannels, 256)
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 2048)
             self.assertEqual(server._outbound_streams_count, 256)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             await asyncio.sleep(0.1)
 
@@ -814,14 +1041,14 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(server.maxChannels, 65535)
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel
             channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
@@ -836,6 +1063,130 @@ class RTCSctpTransportTest(TestCase):
             self.assertEqual(server_channels[0].id, 1)
             self.assertEqual(server_channels[0].label, "chat")
 
+    @asynctest
+    async def test_connect_then_client_sends_bundled_data(self) -> None:
+        async with client_and_server() as (client, server):
+            server_channels = track_channels(server)
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+
+            # create data channel
+            channel = RTCDataChannel(client, RTCDataChannelParameters(label="chat"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 1)
+
+            messages = []
+            server_channels[0].on("message", messages.append)
+
+            # small messages are bundled into a single packet
+            with patch.object(
+                client.transport, "_send_data", wraps=client.transport._send_data
+            ) as mock_send_data:
+                for i in range(10):
+                    channel.send(f"message {i}")
+                await asyncio.sleep(0.1)
+
+            self.assertEqual(mock_send_data.call_count, 1)
+            self.assertEqual(messages, [f"message {i}" for i in range(10)])
+
+            # large messages are split over several packets, sent in one go
+            with patch.object(
+                client.transport,
+                "_send_data_batch",
+                wraps=client.transport._send_data_batch,
+            ) as mock_send_data_batch:
+                channel.send(b"M" * (2 * USERDATA_MAX_LENGTH + 1))
+                await asyncio.sleep(0.1)
+
+            self.assertEqual(mock_send_data_batch.call_count, 1)
+            self.assertEqual(len(mock_send_data_batch.call_args[0][0]), 3)
+            self.assertEqual(messages[-1], b"M" * (2 * USERDATA_MAX_LENGTH + 1))
+
+    @asynctest
+    async def test_connect_then_client_bundling_error(self) -> None:
+        async with client_and_server() as (client, server):
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+
+            # the queued chunks are sent even if bundling is interrupted
+            with patch.object(
+                client.transport, "_send_data", wraps=client.transport._send_data
+            ) as mock_send_data:
+                with self.assertRaises(ValueError):
+                    async with client._bundling():
+                        await client._send_sack()
+                        raise ValueError("some error")
+
+            self.assertEqual(mock_send_data.call_count, 1)
+            self.assertEqual(client._bundle_depth, 0)
+            self.assertEqual(client._bundle_queue, [])
+
+    @asynctest
+    async def test_connect_then_client_sends_interleaved_data(self) -> None:
+        async with client_and_server() as (client, server):
+            server_channels = track_channels(server)
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+            self.assertEqual(client._interleaving, True)
+            self.assertEqual(server._interleaving, True)
+
+            # create data channels
+            bulk = RTCDataChannel(client, RTCDataChannelParameters(label="bulk"))
+            control = RTCDataChannel(client, RTCDataChannelParameters(label="control"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 2)
+
+            messages = []
+            for server_channel in server_channels:
+                server_channel.on("message", messages.append)
+
+            # a small message is not held up by a large one
+            bulk.send(b"M" * 100000)
+            control.send("ping")
+            await asyncio.sleep(0.5)
+            self.assertEqual(messages, ["ping", b"M" * 100000])
+
+    @asynctest
+    async def test_connect_then_client_sends_data_without_interleaving(
+        self,
+    ) -> None:
+        async with client_and_server() as (client, server):
+            client._local_interleaving = False
+            server_channels = track_channels(server)
+
+            # connect
+            await server.start(client.getCapabilities(), client.port)
+            await client.start(server.getCapabilities(), server.port)
+            await wait_for_outcome(client, server)
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
+            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(client._interleaving, False)
+            self.assertEqual(server._interleaving, False)
+
+            # create data channels
+            bulk = RTCDataChannel(client, RTCDataChannelParameters(label="bulk"))
+            control = RTCDataChannel(client, RTCDataChannelParameters(label="control"))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(server_channels), 2)
+
+            messages = []
+            for server_channel in server_channels:
+                server_channel.on("message", messages.append)
+
+            # messages are sent one after the other
+            bulk.send(b"M" * 100000)
+            control.send("ping")
+            await asyncio.sleep(0.5)
+            self.assertEqual(messages, [b"M" * 100000, "ping"])
+
     @asynctest
     async def test_connect_then_client_creates_data_channel_with_custom_id(
         self,
@@ -855,13 +1206,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel
             channel = RTCDataChannel(
@@ -908,13 +1259,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel
             channel = RTCDataChannel(
@@ -959,13 +1310,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel
             channel = RTCDataChannel(
@@ -1006,13 +1357,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel
             self.assertRaises(
@@ -1043,13 +1394,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel for client
             channel_client = RTCDataChannel(
@@ -1094,13 +1445,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel for client
             channel_client = RTCDataChannel(
@@ -1163,13 +1514,13 @@ class RTCSctpTransportTest(TestCase):
             )
             self.assertEqual(client._inbound_streams_count, 65535)
             self.assertEqual(client._outbound_streams_count, 65535)
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
             self.assertEqual(server._inbound_streams_count, 65535)
             self.assertEqual(server._outbound_streams_count, 65535)
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             self.assertEqual(channel_client.readyState, "open")
             self.assertEqual(channel_server.readyState, "open")
@@ -1199,11 +1550,11 @@ class RTCSctpTransportTest(TestCase):
             self.assertEqual(
                 client._association_state, RTCSctpTransport.State.ESTABLISHED
             )
-            self.assertEqual(client._remote_extensions, [192, 130])
+            self.assertEqual(client._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
 
             # create data channel
             channel = RTCDataChannel(server, RTCDataChannelParameters(label="chat"))
@@ -1250,12 +1601,12 @@ class RTCSctpTransportTest(TestCase):
             self.assertEqual(
                 client._association_state, RTCSctpTransport.State.ESTABLISHED
             )
-            self.assertEqual(client._remote_extensions, [130])
+            self.assertEqual(client._remote_extensions, [130, 64])
             self.assertEqual(client._remote_partial_reliability, False)
             self.assertEqual(
                 server._association_state, RTCSctpTransport.State.ESTABLISHED
             )
-            self.assertEqual(server._remote_extensions, [192, 130])
+            self.assertEqual(server._remote_extensions, [192, 130, 64, 194])
             self.assertEqual(server._remote_partial_reliability, True)
 
     @asynctest
@@ -1369,6 +1720,9 @@ class RTCSctpTransportTest(TestCase):
             client._maybe_abandon(client._sent_queue[1])
             for chunk in client._outbound_queue:
                 self.assertEqual(chunk._abandoned, True)
+            for chunk in client._sent_queue:
+                self.assertEqual(chunk._abandoned, True)
+                self.assertEqual(chunk._fragments, [])
 
             # try abandon middle chunk (again)
             client._maybe_abandon(client._sent_queue[1])
@@ -1392,6 +1746,97 @@ class RTCSctpTransportTest(TestCase):
             self.assertIsNone(client._forward_tsn_chunk)
             self.assertIsNotNone(client._t3_handle)
 
+    @asynctest
+    async def test_maybe_abandon_max_retransmits_interleaved(self) -> None:
+        async with client_standalone() as client:
+            client._local_tsn = 1
+            client._last_sacked_tsn = 0
+            client._advanced_peer_ack_tsn = 0
+            client._remote_extensions = [IDataChunk.type, IForwardTsnChunk.type]
+            client._send_chunk = noop_send_chunk  # type: ignore
+
+            # queue 3 chunks, only the first one is sent
+            client._cwnd = USERDATA_MAX_LENGTH
+            await client._send(
+                123, 456, b"M" * USERDATA_MAX_LENGTH * 3, max_retransmits=0
+            )
+            self.assertEqual(outstanding_tsns(client), [1])
+            self.assertEqual(queued_tsns(client), [])
+            self.assertEqual(len(client._outbound_streams[123]), 2)
+            self.assertEqual(client._local_tsn, 2)
+
+            # abandon the message
+            client._maybe_abandon(client._sent_queue[0])
+            for chunk in [*client._sent_queue, *client._outbound_streams[123]]:
+                self.assertEqual(chunk._abandoned, True)
+                self.assertEqual(chunk._fragments, [])
+
+            # update advanced peer ack point
+            client._update_advanced_peer_ack_point()
+            self.assertEqual(outstanding_tsns(client), [])
+            self.assertEqual(client._advanced_peer_ack_tsn, 1)
+
+            # check I-FORWARD-TSN
+            forward_tsn_chunk = cast(IForwardTsnChunk, client._forward_tsn_chunk)
+            self.assertIsInstance(forward_tsn_chunk, IForwardTsnChunk)
+            self.assertEqual(forward_tsn_chunk.cumulative_tsn, 1)
+            self.assertEqual(forward_tsn_chunk.streams, [(123, False, 0)])
+
+            # transmit, the rest of the message is never sent
+            client._cwnd = USERDATA_MAX_LENGTH * 4
+            client._t3_cancel()
+            await client._transmit()
+            self.assertIsNone(client._forward_tsn_chunk)
+            self.assertEqual(outstanding_tsns(client), [])
+            self.assertEqual(client._outbound_streams, {})
+            self.assertEqual(client._local_tsn, 2)
+
+    @asynctest
+    async def test_reset_stream_interleaved(self) -> None:
+        async with client_standalone() as client:
+            client._local_tsn = 1
+            client._remote_extensions = [IDataChunk.type, IForwardTsnChunk.type]
+            client._send_chunk = noop_send_chunk  # type: ignore
+            channel = RTCDataChannel(
+                client, RTCDataChannelParameters(label="chat", negotiated=True, id=123)
+            )
+            client._association_state = RTCSctpTransport.State.ESTABLISHED
+
+            reconfigs = []
+
+            async def mock_send_reconfig_param(param: object) -> None:
+                reconfigs.append(param)
+
+            client._send_reconfig_param = mock_send_reconfig_param  # type: ignore
+
+            # queue 3 chunks, only the first one is sent
+            client._cwnd = USERDATA_MAX_LENGTH
+            await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 3)
+            self.assertEqual(outstanding_tsns(client), [1])
+            self.assertEqual(len(client._outbound_streams[123]), 2)
+
+            # the stream reset waits for the rest of the message
+            channel.close()
+            await asyncio.sleep(0)
+            self.assertEqual(reconfigs, [])
+
+            client._cwnd = USERDATA_MAX_LENGTH * 4
+            await client._transmit()
+            await asyncio.sleep(0)
+            self.assertEqual(outstanding_tsns(client), [1, 2, 3])
+            self.assertEqual(client._outbound_streams, {})
+            self.assertEqual(len(reconfigs), 1)
+            self.assertEqual(reconfigs[0].last_tsn, 3)
+            self.assertEqual(reconfigs[0].streams, [123])
+
+            # the peer acknowledges the reset
+            await client._receive_reconfig_param(
+                StreamResetResponseParam(
+                    response_sequence=reconfigs[0].request_sequence, result=1
+                )
+            )
+            self.assertEqual(channel.readyState, "closed")
+
     @asynctest
     async def test_stale_cookie(self) -> None:
         mock_timestamp_values = [0, 61]
@@ -1589,6 +2034,27 @@ class RTCSctpTransportTest(TestCase):
             # sack point must not changed
             self.assertEqual(client._last_sacked_tsn, sack_point)
 
+    @asynctest
+    async def test_receive_sack_fragments(self) -> None:
+        async with client_standalone() as client:
+            client._local_tsn = 1
+            client._last_sacked_tsn = 0
+            client._ssthresh = 131072
+            client._send_chunk = noop_send_chunk  # type: ignore
+
+            # send 3 chunks
+            await client._send(123, 456, b"M" * USERDATA_MAX_LENGTH * 3)
+            chunks = list(client._sent_queue)
+            self.assertEqual(outstanding_tsns(client), [1, 2, 3])
+
+            # receive sack
+            chunk = SackChunk()
+            chunk.cumulative_tsn = 3
+            await client._receive_chunk(chunk)
+            self.assertEqual(outstanding_tsns(client), [])
+            for chunk in chunks:
+                self.assertEqual(chunk._fragments, [])
+
     @asynctest
     async def test_receive_shutdown(self) -> None:
         async with client_standalone() as client:
@@ -13,6 +13,7 @@ from aiortc.rtp import (
     RtcpRtpfbPacket,
     RtcpSdesPacket,
     RtcpSrPacket,
+    RtcpTransportFeedback,
     RtpPacket,
     clamp_packets_lost,
     pack_header_extensions,
@@ -232,6 +233,65 @@ class RtcpPacketTest(TestCase):
             RtcpPacket.parse(data)
         self.assertEqual(str(cm.exception), "RTCP RTP feedback length is invalid")
 
+    def test_rtpfb_transport_feedback(self) -> None:
+        feedback = RtcpTransportFeedback(
+            base_sequence_number=65534,
+            reference_time=-2,
+            feedback_count=7,
+            deltas=[4, None, None, 300, -1] + [1] * 20 + [None, 2],
+        )
+        packet = RtcpRtpfbPacket(
+            fmt=rtp.RTCP_RTPFB_TWCC,
+            ssrc=2336520123,
+            media_ssrc=4145934052,
+            fci=bytes(feedback),
+        )
+        data = bytes(packet)
+
+        packets = RtcpPacket.parse(data)
+        self.assertEqual(len(packets), 1)
+        parsed = self.ensureIsInstance(packets[0], RtcpRtpfbPacket)
+        self.assertEqual(parsed.fmt, rtp.RTCP_RTPFB_TWCC)
+        self.assertEqual(parsed.lost, [])
+        self.assertEqual(RtcpTransportFeedback.parse(parsed.fci), feedback)
+        self.assertEqual(bytes(parsed), data)
+
+    def test_transport_feedback_chunks(self) -> None:
+        # run length chunk
+        feedback = RtcpTransportFeedback(
+            base_sequence_number=1,
+            reference_time=0,
+            feedback_count=0,
+            deltas=[1] * 8,
+        )
+        self.assertEqual(
+            bytes(feedback),
+            b"\x00\x01\x00\x08\x00\x00\x00\x00\x20\x08" + b"\x01" * 8 + b"\x00" * 2,
+        )
+
+        # one-bit status vector chunk
+        feedback.deltas = [1, None, 1]
+        self.assertEqual(
+            bytes(feedback),
+            b"\x00\x01\x00\x03\x00\x00\x00\x00\xa8\x00\x01\x01",
+        )
+
+        # two-bit status vector chunk
+        feedback.deltas = [1, -4, None]
+        self.assertEqual(
+            bytes(feedback),
+            b"\x00\x01\x00\x03\x00\x00\x00\x00\xd8\x00\x01\xff\xfc\x00\x00\x00",
+        )
+
+    def test_transport_feedback_truncated(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            RtcpTransportFeedback.parse(b"\x00\x01\x00\x03\x00\x00\x00")
+        self.assertEqual(str(cm.exception), "RTCP transport-wide feedback is truncated")
+
+        with self.assertRaises(ValueError) as cm:
+            RtcpTransportFeedback.parse(b"\x00\x01\x00\x03\x00\x00\x00\x00\xa0\x00")
+        self.assertEqual(str(cm.exception), "RTCP transport-wide feedback is truncated")
+
     def test_compound(self) -> None:
         data = load("rtcp_sr.bin") + load("rtcp_sdes.bin")
 
@@ -402,6 +462,48 @@ class RtpPacketTest(TestCase):
                 str(cm.exception), "RTP packet has truncated extension value"
             )
 
+    def test_memoryview(self) -> None:
+        data = load("rtp_with_csrc.bin")
+        packet = RtpPacket.parse(memoryview(data))
+        self.assertEqual(packet.sequence_number, 16082)
+        self.assertEqual(packet.csrc, [2882400001, 3735928559])
+        self.assertIsInstance(packet.payload, memoryview)
+        self.assertEqual(packet.payload, data[20:])
+        self.assertEqual(packet.serialize(), data)
+
+    def test_serialize_into(self) -> None:
+        extensions_map = rtp.HeaderExtensionsMap()
+        extensions_map.configure(
+            RTCRtpParameters(
+                headerExtensions=[
+                    RTCRtpHeaderExtensionParameters(
+                        id=9, uri="urn:ietf:params:rtp-hdrext:sdes:mid"
+                    )
+                ]
+            )
+        )
+
+        buffer = bytearray(1500)
+        for name, offset in [("rtp_with_csrc.bin", 0), ("rtp_with_sdes_mid.bin", 4)]:
+            data = load(name)
+            packet = RtpPacket.parse(data, extensions_map)
+            length = packet.serialize_into(buffer, offset, extensions_map)
+            self.assertEqual(length, len(data))
+            self.assertEqual(buffer[offset : offset + length], data)
+
+        # padding
+        data = load("rtp_only_padding.bin")
+        packet = RtpPacket.parse(data)
+        length = packet.serialize_into(memoryview(buffer))
+        self.assertEqual(length, len(data))
+        self.assertEqual(buffer[0:12], data[0:12])
+        self.assertEqual(buffer[length - 1], data[-1])
+
+        # buffer too short
+        with self.assertRaises(ValueError) as cm:
+            packet.serialize_into(bytearray(len(data) - 1))
+        self.assertEqual(str(cm.exception), "RTP packet does not fit in buffer")
+
     def test_truncated(self) -> None:
         data = load("rtp.bin")[0:11]
         with self.assertRaises(ValueError) as cm:
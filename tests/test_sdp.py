@@ -12,7 +12,9 @@ from aiortc.sdp import (
     GroupDescription,
     H264Level,
     H264Profile,
+    RidDescription,
     SessionDescription,
+    SimulcastDescription,
     SsrcDescription,
     parse_h264_profile_level_id,
 )
@@ -1792,6 +1794,79 @@ a=setup:actpass
             ],
         )
 
+    def test_video_simulcast(self) -> None:
+        d = SessionDescription.parse(
+            lf2crlf(
+                """v=0
+o=- 863426017819471768 2 IN IP4 127.0.0.1
+s=-
+t=0 0
+a=group:BUNDLE 0
+a=msid-semantic:WMS *
+m=video 45076 UDP/TLS/RTP/SAVPF 97
+c=IN IP4 192.168.99.58
+a=sendonly
+a=extmap:10 urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id
+a=mid:0
+a=rtcp:9 IN IP4 0.0.0.0
+a=rtcp-mux
+a=rtpmap:97 VP8/90000
+a=rid:h send
+a=rid:m send max-br=500000
+a=rid:l send
+a=simulcast:send h;m;~l recv x,y
+a=candidate:2665802302 1 udp 2122262783 2a02:a03f:3eb0:e000:b0aa:d60a:cff2:933c 38475 typ host
+a=end-of-candidates
+a=ice-ufrag:5+Ix
+a=ice-pwd:uK8IlylxzDMUhrkVzdmj0M+v
+a=fingerprint:sha-256 6B:8B:5D:EA:59:04:20:23:29:C8:87:1C:CC:87:32:BE:DD:8C:66:A5:8E:50:55:EA:8C:D3:B6:5C:09:5E:D6:BC
+a=setup:actpass
+"""
+            )
+        )
+        self.assertEqual(
+            d.media[0].rid,
+            [
+                RidDescription(rid="h", direction="send"),
+                RidDescription(rid="m", direction="send", params="max-br=500000"),
+                RidDescription(rid="l", direction="send"),
+            ],
+        )
+        self.assertEqual(
+            d.media[0].simulcast,
+            SimulcastDescription(send=["h", "m", "~l"], recv=["x,y"]),
+        )
+        self.assertEqual(
+            str(d),
+            lf2crlf(
+                """v=0
+o=- 863426017819471768 2 IN IP4 127.0.0.1
+s=-
+t=0 0
+a=group:BUNDLE 0
+a=msid-semantic:WMS *
+m=video 45076 UDP/TLS/RTP/SAVPF 97
+c=IN IP4 192.168.99.58
+a=sendonly
+a=extmap:10 urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id
+a=mid:0
+a=rtcp:9 IN IP4 0.0.0.0
+a=rtcp-mux
+a=rtpmap:97 VP8/90000
+a=rid:h send
+a=rid:m send max-br=500000
+a=rid:l send
+a=simulcast:send h;m;~l recv x,y
+a=candidate:2665802302 1 udp 2122262783 2a02:a03f:3eb0:e000:b0aa:d60a:cff2:933c 38475 typ host
+a=end-of-candidates
+a=ice-ufrag:5+Ix
+a=ice-pwd:uK8IlylxzDMUhrkVzdmj0M+v
+a=fingerprint:sha-256 6B:8B:5D:EA:59:04:20:23:29:C8:87:1C:CC:87:32:BE:DD:8C:66:A5:8E:50:55:EA:8C:D3:B6:5C:09:5E:D6:BC
+a=setup:actpass
+"""
+            ),
+        )
+
     def test_safari(self) -> None:
         d = SessionDescription.parse(
             lf2crlf(
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from aiortc.rtcrtpparameters import RTCRtpEncodingParameters
+from aiortc.simulcast import allocate_bitrate, layer_bitrate
+
+
+class SimulcastTest(TestCase):
+    def setUp(self) -> None:
+        self.encodings = [
+            RTCRtpEncodingParameters(rid="h"),
+            RTCRtpEncodingParameters(rid="m", scaleResolutionDownBy=2),
+            RTCRtpEncodingParameters(rid="l", scaleResolutionDownBy=4),
+        ]
+
+    def test_layer_bitrate(self) -> None:
+        self.assertEqual(layer_bitrate(self.encodings[0]), 2500000)
+        self.assertEqual(layer_bitrate(self.encodings[1]), 625000)
+        self.assertEqual(layer_bitrate(self.encodings[2]), 156250)
+        self.assertEqual(
+            layer_bitrate(RTCRtpEncodingParameters(maxBitrate=300000)), 300000
+        )
+
+    def test_allocate_single(self) -> None:
+        self.assertEqual(
+            allocate_bitrate(3000000, [RTCRtpEncodingParameters()]), [3000000]
+        )
+        self.assertEqual(
+            allocate_bitrate(100000, [RTCRtpEncodingParameters()]), [100000]
+        )
+        self.assertEqual(
+            allocate_bitrate(3000000, [RTCRtpEncodingParameters(maxBitrate=1000000)]),
+            [1000000],
+        )
+
+    def test_allocate_simulcast(self) -> None:
+        # the lowest layer is always sent
+        self.assertEqual(allocate_bitrate(20000, self.encodings), [None, None, 20000])
+
+        # the top layers are disabled first
+        self.assertEqual(
+            allocate_bitrate(400000, self.encodings), [None, 243750, 156250]
+        )
+
+        # the top layer gets what is left
+        self.assertEqual(
+            allocate_bitrate(3000000, self.encodings), [2218750, 625000, 156250]
+        )
+        self.assertEqual(sum(allocate_bitrate(3000000, self.encodings)), 3000000)
+
+    def test_allocate_inactive(self) -> None:
+        self.encodings[2].active = False
+        self.assertEqual(
+            allocate_bitrate(3000000, self.encodings), [2375000, 625000, None]
+        )
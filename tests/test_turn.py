@@ -0,0 +1,328 @@
+import asyncio
+import socket
+import struct
+from typing import Optional, Union, cast
+from unittest import TestCase
+from unittest.mock import patch
+
+import aioice
+from aioice import stun
+from aioice.turn import TurnTransport, create_turn_endpoint, is_channel_data
+
+from .utils import asynctest
+
+
+class TurnAllocation(asyncio.DatagramProtocol):
+    def __init__(self, server: "TurnServer", client_addr: tuple[str, int]) -> None:
+        self.channel_to_peer: dict[int, tuple[str, int]] = {}
+        self.client_addr = client_addr
+        self.peer_to_channel: dict[tuple[str, int], int] = {}
+        self.server = server
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.DatagramTransport, transport)
+
+    def datagram_received(self, data: Union[bytes, str], addr: tuple) -> None:
+        channel = self.peer_to_channel.get((addr[0], addr[1]))
+        if channel is not None:
+            data = cast(bytes, data)
+            self.server.transport.sendto(
+                struct.pack("!HH", channel, len(data)) + data, self.client_addr
+            )
+
+
+class TurnServer(asyncio.DatagramProtocol):
+    """
+    A TURN server relaying over UDP, without authentication.
+    """
+
+    def __init__(self) -> None:
+        self.allocations: dict[tuple[str, int], TurnAllocation] = {}
+        self.channel_binds = 0
+
+    def close(self) -> None:
+        for allocation in self.allocations.values():
+            allocation.transport.close()
+        self.transport.close()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.DatagramTransport, transport)
+
+    def datagram_received(self, data: Union[bytes, str], addr: tuple) -> None:
+        data = cast(bytes, data)
+        allocation = self.allocations.get(addr)
+        if is_channel_data(data):
+            channel, length = struct.unpack("!HH", data[0:4])
+            if allocation is not None and channel in allocation.channel_to_peer:
+                allocation.transport.sendto(
+                    data[4 : 4 + length], allocation.channel_to_peer[channel]
+                )
+            return
+
+        request = stun.parse_message(data)
+        response = stun.Message(
+            message_method=request.message_method,
+            message_class=stun.Class.RESPONSE,
+            transaction_id=request.transaction_id,
+        )
+        if request.message_method == stun.Method.ALLOCATE:
+            asyncio.create_task(self.allocate(response, addr))
+            return
+        elif request.message_method == stun.Method.CHANNEL_BIND:
+            assert allocation is not None
+            channel = request.attributes["CHANNEL-NUMBER"]
+            peer = request.attributes["XOR-PEER-ADDRESS"]
+            allocation.channel_to_peer[channel] = peer
+            allocation.peer_to_channel[peer] = channel
+            self.channel_binds += 1
+        elif request.message_method == stun.Method.REFRESH:
+            response.attributes["LIFETIME"] = request.attributes["LIFETIME"]
+            if request.attributes["LIFETIME"] == 0 and allocation is not None:
+                allocation.transport.close()
+                del self.allocations[addr]
+        self.transport.sendto(bytes(response), addr)
+
+    async def allocate(self, response: stun.Message, addr: tuple[str, int]) -> None:
+        if addr not in self.allocations:
+            loop = asyncio.get_running_loop()
+            _, self.allocations[addr] = await loop.create_datagram_endpoint(
+                lambda: TurnAllocation(self, addr), local_addr=("127.0.0.1", 0)
+            )
+        relayed_address = self.allocations[addr].transport.get_extra_info("sockname")
+        response.attributes["LIFETIME"] = 600
+        response.attributes["XOR-MAPPED-ADDRESS"] = addr
+        response.attributes["XOR-RELAYED-ADDRESS"] = relayed_address
+        self.transport.sendto(bytes(response), addr)
+
+
+class EchoServer(asyncio.DatagramProtocol):
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.DatagramTransport, transport)
+
+    def datagram_received(self, data: Union[bytes, str], addr: tuple) -> None:
+        self.transport.sendto(data, addr)
+
+
+class Receiver(asyncio.DatagramProtocol):
+    def __init__(self) -> None:
+        self.closed: asyncio.Future[None] = asyncio.Future()
+        self.received: asyncio.Queue[tuple[bytes, tuple[str, int]]] = asyncio.Queue()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.closed.set_result(None)
+
+    def datagram_received(self, data: Union[bytes, str], addr: tuple) -> None:
+        self.received.put_nowait((cast(bytes, data), addr))
+
+
+async def run_turn_server() -> tuple[asyncio.DatagramTransport, TurnServer]:
+    transport, server = await asyncio.get_running_loop().create_datagram_endpoint(
+        TurnServer, local_addr=("127.0.0.1", 0)
+    )
+    return cast(asyncio.DatagramTransport, transport), server
+
+
+async def run_echo_server() -> tuple[asyncio.DatagramTransport, tuple[str, int]]:
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        EchoServer, local_addr=("127.0.0.1", 0)
+    )
+    return cast(asyncio.DatagramTransport, transport), transport.get_extra_info(
+        "sockname"
+    )
+
+
+class TurnTransportTest(TestCase):
+    async def connect(
+        self, server_transport: asyncio.DatagramTransport, **kwargs: int
+    ) -> tuple[TurnTransport, Receiver]:
+        return await create_turn_endpoint(
+            Receiver,
+            server_addr=server_transport.get_extra_info("sockname"),
+            username=None,
+            password=None,
+            **kwargs,
+        )
+
+    @asynctest
+    async def test_send(self) -> None:
+        server_transport, server = await run_turn_server()
+        echo_transport, echo_addr = await run_echo_server()
+        transport, receiver = await self.connect(server_transport)
+
+        # the first datagram waits for the channel
+        transport.sendto(b"ping", echo_addr)
+        self.assertEqual(transport.stats.packets_sent, 0)
+        self.assertEqual(await receiver.received.get(), (b"ping", echo_addr))
+        self.assertEqual(transport.stats.channels_bound, 1)
+
+        # the next ones are sent as ChannelData right away
+        overhead_sent = transport.stats.overhead_sent
+        transport.sendto(b"pong!", echo_addr)
+        self.assertEqual(transport.stats.packets_sent, 2)
+        self.assertEqual(transport.stats.bytes_sent, 9)
+        self.assertEqual(transport.stats.overhead_sent, overhead_sent + 4)
+        self.assertEqual(await receiver.received.get(), (b"pong!", echo_addr))
+        self.assertEqual(transport.stats.packets_received, 2)
+        self.assertEqual(transport.stats.bytes_received, 9)
+
+        transport.close()
+        await receiver.closed
+        echo_transport.close()
+        server.close()
+
+    @asynctest
+    async def test_bind_channel(self) -> None:
+        server_transport, server = await run_turn_server()
+        echo_transport, echo_addr = await run_echo_server()
+        transport, receiver = await self.connect(server_transport)
+
+        # a channel bound ahead of time spares the first datagram the wait
+        transport.bind_channel(echo_addr)
+        transport.bind_channel(echo_addr)
+        await asyncio.sleep(0.1)
+        self.assertEqual(server.channel_binds, 1)
+        transport.sendto(b"ping", echo_addr)
+        self.assertEqual(transport.stats.packets_sent, 1)
+        self.assertEqual(await receiver.received.get(), (b"ping", echo_addr))
+
+        transport.close()
+        await receiver.closed
+        echo_transport.close()
+        server.close()
+
+    @asynctest
+    async def test_refresh_channel(self) -> None:
+        server_transport, server = await run_turn_server()
+        echo_transport, echo_addr = await run_echo_server()
+        transport, receiver = await self.connect(
+            server_transport, channel_refresh_time=0
+        )
+        transport.sendto(b"ping", echo_addr)
+        await receiver.received.get()
+        await asyncio.sleep(0.1)
+        channel_binds = server.channel_binds
+
+        # datagrams do not wait for the channel to be refreshed
+        for i in range(3):
+            transport.sendto(b"ping", echo_addr)
+        self.assertEqual(transport.stats.packets_sent, 4)
+        for i in range(3):
+            await receiver.received.get()
+        self.assertEqual(server.channel_binds, channel_binds + 1)
+
+        transport.close()
+        await receiver.closed
+        echo_transport.close()
+        server.close()
+
+    @asynctest
+    async def test_fallback_address(self) -> None:
+        server_transport, server = await run_turn_server()
+        echo_transport, echo_addr = await run_echo_server()
+        port = server_transport.get_extra_info("sockname")[1]
+
+        # the first address of the server does not answer
+        infos = [
+            (socket.AF_INET, socket.SOCK_DGRAM, 17, "", ("127.0.0.2", 0)),
+            (socket.AF_INET, socket.SOCK_DGRAM, 17, "", ("127.0.0.1", 0)),
+        ]
+        loop = asyncio.get_running_loop()
+        with (
+            patch.object(loop, "getaddrinfo", return_value=infos),
+            patch("aioice.stun.RETRY_MAX", 1),
+            patch("aioice.stun.RETRY_RTO", 0.1),
+        ):
+            transport, receiver = await create_turn_endpoint(
+                Receiver,
+                server_addr=("turn.example.com", port),
+                username=None,
+                password=None,
+            )
+        self.assertEqual(len(server.allocations), 1)
+
+        transport.sendto(b"ping", echo_addr)
+        self.assertEqual(await receiver.received.get(), (b"ping", echo_addr))
+
+        transport.close()
+        await receiver.closed
+        echo_transport.close()
+        server.close()
+
+
+class TurnMuxTest(TestCase):
+    def setUp(self) -> None:
+        self.retry_max = aioice.stun.RETRY_MAX
+        self.retry_rto = aioice.stun.RETRY_RTO
+        aioice.stun.RETRY_MAX = 1
+        aioice.stun.RETRY_RTO = 0.1
+
+    def tearDown(self) -> None:
+        aioice.stun.RETRY_MAX = self.retry_max
+        aioice.stun.RETRY_RTO = self.retry_rto
+
+    @asynctest
+    async def test_connect(self) -> None:
+        server_transport, server = await run_turn_server()
+        server_addr = server_transport.get_extra_info("sockname")
+
+        # the relayed connections share an allocation
+        relayed = [
+            aioice.Connection(
+                ice_controlling=True,
+                turn_server=server_addr,
+                turn_shared=True,
+                transport_policy=aioice.TransportPolicy.RELAY,
+                use_ipv6=False,
+            )
+            for i in range(3)
+        ]
+        peers = [
+            aioice.Connection(ice_controlling=False, use_ipv6=False) for i in range(3)
+        ]
+        await asyncio.gather(*[c.gather_candidates() for c in relayed + peers])
+        self.assertEqual(len(server.allocations), 1)
+        for connection in relayed:
+            self.assertEqual(
+                [c.to_sdp() for c in connection.local_candidates],
+                [c.to_sdp() for c in relayed[0].local_candidates],
+            )
+        self.assertEqual([c.type for c in relayed[0].local_candidates], ["relay"])
+
+        # each connection reaches its own peer through the allocation
+        for local, remote in zip(relayed + peers, peers + relayed):
+            for candidate in remote.local_candidates:
+                await local.add_remote_candidate(candidate)
+            await local.add_remote_candidate(None)
+            local.remote_username = remote.local_username
+            local.remote_password = remote.local_password
+        await asyncio.gather(*[c.connect() for c in relayed + peers])
+
+        for i, (local, remote) in enumerate(zip(relayed, peers)):
+            await local.send(b"ping %d" % i)
+            self.assertEqual(await remote.recv(), b"ping %d" % i)
+            await remote.send(b"pong %d" % i)
+            self.assertEqual(await local.recv(), b"pong %d" % i)
+
+        # the allocation is deleted with the last connection
+        for connection in relayed[:-1]:
+            await connection.close()
+        self.assertEqual(len(server.allocations), 1)
+        await relayed[-1].close()
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(server.allocations), 0)
+
+        for connection in peers:
+            await connection.close()
+        server.close()
+
+    def test_components(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            aioice.Connection(
+                ice_controlling=True,
+                components=2,
+                turn_server=("127.0.0.1", 3478),
+                turn_shared=True,
+            )
+        self.assertEqual(
+            str(cm.exception), "A shared TURN allocation supports a single component."
+        )
@@ -247,6 +247,23 @@ class Vp8Test(CodecTestCase):
         self.assertTrue(len(payloads[0]) < 1300)
         self.assertAlmostEqual(timestamp, 3000, delta=1)
 
+    def test_encoder_target_bitrate_reset_interval(self) -> None:
+        encoder = self.ensureIsInstance(get_encoder(VP8_CODEC), Vp8Encoder)
+        encoder.encode(self.create_video_frame(width=640, height=480, pts=0))
+        self.assertEqual(encoder.stats.keyframes, 1)
+
+        # the encoder was recreated less than a second ago
+        encoder.target_bitrate = 1000000
+        encoder.encode(self.create_video_frame(width=640, height=480, pts=3000))
+        self.assertEqual(encoder.codec.bit_rate, 500000)
+        self.assertEqual(encoder.stats.rate_resets, 0)
+
+        encoder.encode(self.create_video_frame(width=640, height=480, pts=90000))
+        self.assertEqual(encoder.codec.bit_rate, 1000000)
+        self.assertEqual(encoder.stats.rate_resets, 1)
+        self.assertEqual(encoder.stats.resets, 1)
+        self.assertEqual(encoder.stats.keyframes, 2)
+
     def test_number_of_threads(self) -> None:
         self.assertEqual(number_of_threads(1920 * 1080, 16), 8)
         self.assertEqual(number_of_threads(1920 * 1080, 8), 3)
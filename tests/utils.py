@@ -54,6 +54,16 @@ class DummyConnection:
             raise ConnectionError
         return data
 
+    async def recv_batch(self) -> list[bytes]:
+        datas = [await self.recv()]
+        while not self.rx_queue.empty():
+            data = self.rx_queue.get_nowait()
+            if data is None:
+                self.rx_queue.put_nowait(None)
+                break
+            datas.append(data)
+        return datas
+
     async def send(self, data: bytes) -> None:
         if self.closed:
             raise ConnectionError
@@ -66,6 +76,10 @@ class DummyConnection:
 
         await self.tx_queue.put(data)
 
+    async def send_batch(self, datas: list[bytes]) -> None:
+        for data in datas:
+            await self.send(data)
+
 
 class DummyIceTransport:
     def __init__(self, connection: DummyConnection, role: str) -> None:
@@ -78,9 +92,15 @@ class DummyIceTransport:
     async def _recv(self) -> bytes:
         return await self._connection.recv()
 
+    async def _recv_batch(self) -> list[bytes]:
+        return await self._connection.recv_batch()
+
     async def _send(self, data: bytes) -> None:
         await self._connection.send(data)
 
+    async def _send_batch(self, datas: list[bytes]) -> None:
+        await self._connection.send_batch(datas)
+
 
 class TestCase(unittest.TestCase):
     def ensureIsInstance(self, obj: object, cls: type[T]) -> T:
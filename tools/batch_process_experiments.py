@@ -1,19 +1,61 @@
 #!/usr/bin/env python3
 """
 Batch process all experiment folders with gcc_analyzer and rename_experiment.
+
+Experiments are analyzed in parallel worker processes, which run gcc_analyzer
+in-process. A folder is skipped when its inputs (logs, videos and the analyzer
+itself) are unchanged since its last analysis, as recorded in
+analysis/batch_inputs.json. Per-condition metrics of all the folders are then
+aggregated into experiments/batch_summary.csv.
 """
 
 import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import statistics
 import subprocess
 import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import time
+from typing import Dict, List, Optional, Tuple
+
+TOOLS_DIR = Path(__file__).resolve().parent
+
+# Files read by gcc_analyzer, relative to the experiment folder
+ANALYSIS_INPUTS = [
+    'logs/stats.log',
+    'logs/gcc_estimates.log',
+    'packet_loss_timing.log',
+    'logs/packet_loss_timing.log',
+    'experiment_info.json',
+    'h264_decode_failures.log',
+    'logs/h264_decode_failures.log',
+]
+
+# Reference video used for SSIM, relative to the working directory
+SSIM_REFERENCE_VIDEO = 'long_video_for_testing.mp4'
+
+# Bitrates and estimates reported by gcc_analyzer, with their summary label
+SUMMARY_BITRATES = [
+    ('client_sent_bitrate_mbps', 'client_sent'),
+    ('server_received_bitrate_mbps', 'server_received'),
+    ('server_sent_bitrate_mbps', 'server_sent'),
+    ('client_received_bitrate_mbps', 'client_received'),
+    ('as_estimate', 'as'),
+    ('ar_estimate', 'ar'),
+    ('gcc_combined', 'gcc'),
+]
 
 def run_command(cmd, description):
     """Run a command and handle errors."""
     print(f"{description}...")
     print(f"   Command: {' '.join(cmd)}")
-    
+
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
         print(f"{description} completed successfully")
@@ -31,37 +73,202 @@ def run_command(cmd, description):
         print(f"{description} failed with error: {e}")
         return False
 
-def process_experiment_folder(exp_dir, args):
-    """Process a single experiment folder."""
-    print(f"\nProcessing: {exp_dir.name}")
-    print("=" * 60)
-    
-    success_count = 0
-    total_commands = 0
-    
-    # Step 1: Run gcc_analyzer
-    if args.analyze:
-        total_commands += 1
-        gcc_cmd = [
-            "python", "tools/gcc_analyzer.py", str(exp_dir),
-            "--all", "--plot", "--store-values"
-        ]
-        
-        # Add --no-ssim if requested
-        if args.no_ssim:
-            gcc_cmd.append("--no-ssim")
-        
-        if run_command(gcc_cmd, "GCC Analysis"):
-            success_count += 1
-    
-    # Step 2: Rename experiment folder
-    if args.rename:
-        total_commands += 1
-        rename_cmd = ["python", "tools/rename_experiment.py", str(exp_dir)]
-        if run_command(rename_cmd, "Folder Renaming"):
-            success_count += 1
-    
-    return success_count, total_commands
+def analyzer_arguments(args) -> List[str]:
+    """gcc_analyzer options used for every experiment folder."""
+    analyzer_args = ["--all", "--plot", "--store-values"]
+
+    # Add --no-ssim if requested
+    if args.no_ssim:
+        analyzer_args.append("--no-ssim")
+    return analyzer_args
+
+def file_signature(path: Path) -> Optional[List[int]]:
+    """Size and modification time of a file, None if it does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def input_fingerprint(exp_dir: Path, analyzer_args: List[str]) -> Dict:
+    """Describe everything the analysis of an experiment folder depends on."""
+    files = {name: file_signature(exp_dir / name) for name in ANALYSIS_INPUTS}
+
+    if "--no-ssim" not in analyzer_args:
+        # Trimmed videos are written by the analysis itself
+        for video in sorted((exp_dir / "videos").glob("*.mp4")):
+            if not video.name.startswith("trimmed_loss_period_"):
+                files[f"videos/{video.name}"] = file_signature(video)
+        files[SSIM_REFERENCE_VIDEO] = file_signature(Path(SSIM_REFERENCE_VIDEO))
+
+    # Re-analyze everything when the analyzer changes
+    for script in ["gcc_analyzer.py", "experiment_logs.py"]:
+        files[f"tools/{script}"] = file_signature(TOOLS_DIR / script)
+
+    return {'analyzer_args': analyzer_args, 'files': files}
+
+def is_up_to_date(exp_dir: Path, fingerprint: Dict) -> bool:
+    """Check if the stored analysis of a folder was made from the same inputs."""
+    if not (exp_dir / "analysis" / "gcc_analysis_results.json").exists():
+        return False
+    try:
+        with open(exp_dir / "analysis" / "batch_inputs.json", 'r') as f:
+            return json.load(f) == fingerprint
+    except (OSError, ValueError):
+        return False
+
+def analyze_experiment(exp_dir: str, analyzer_args: List[str]) -> Tuple[str, int, str]:
+    """Run gcc_analyzer on one experiment folder, in the current process."""
+    # Imported here so that only worker processes pay for plotting and video imports
+    import gcc_analyzer
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            returncode = gcc_analyzer.main([exp_dir] + analyzer_args)
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+
+    if returncode == 0:
+        fingerprint = input_fingerprint(Path(exp_dir), analyzer_args)
+        with open(Path(exp_dir) / "analysis" / "batch_inputs.json", 'w') as f:
+            json.dump(fingerprint, f, indent=2)
+
+    return exp_dir, returncode, output.getvalue()
+
+def analyze_experiments(experiment_folders: List[Path], args) -> List[str]:
+    """Analyze the folders in parallel, returning the names of failed folders."""
+    analyzer_args = analyzer_arguments(args)
+
+    pending = []
+    for exp_dir in experiment_folders:
+        if not args.force and is_up_to_date(exp_dir, input_fingerprint(exp_dir, analyzer_args)):
+            print(f"Skipping {exp_dir.name}: inputs unchanged since last analysis")
+        else:
+            pending.append(str(exp_dir))
+
+    print(f"\nAnalyzing {len(pending)} of {len(experiment_folders)} folders with {args.jobs} worker(s)...")
+
+    failed_folders = []
+
+    def report(done, exp_dir, returncode, output):
+        name = Path(exp_dir).name
+        print(f"\nProgress: {done}/{len(pending)} - {name}")
+        if returncode == 0:
+            print(f"GCC Analysis completed successfully")
+            if args.verbose and output.strip():
+                print(f"   Output: {output.strip()}")
+        else:
+            print(f"GCC Analysis failed with return code {returncode}")
+            if output.strip():
+                print(f"   Output: {output.strip()}")
+            failed_folders.append(name)
+
+    if args.jobs <= 1:
+        for done, exp_dir in enumerate(pending, 1):
+            report(done, *analyze_experiment(exp_dir, analyzer_args))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(pending))) as executor:
+            futures = [executor.submit(analyze_experiment, exp_dir, analyzer_args) for exp_dir in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                report(done, *future.result())
+
+    return failed_folders
+
+def experiment_condition(exp_dir: Path) -> str:
+    """Loss condition of an experiment, as used by rename_experiment."""
+    try:
+        with open(exp_dir / "logs" / "loss_config.json", 'r') as f:
+            loss_config = json.load(f)
+    except (OSError, ValueError):
+        return 'unknown'
+
+    profile = loss_config.get('profile', 'unknown')
+    rtt = loss_config.get('rtt_ms', 0)
+    duration = loss_config.get('duration_s', 0)
+    return f"{profile}_rtt{rtt}_dur{duration}"
+
+def experiment_metrics(results: Dict) -> Dict[str, float]:
+    """Extract the summary metrics from the results of gcc_analyzer."""
+    metrics = {}
+
+    for key, label in SUMMARY_BITRATES:
+        percentiles = results.get('utilization', {}).get(key, {}).get('percentiles', {})
+        if 'p50' in percentiles:
+            metrics[f'util_{label}_p50'] = percentiles['p50']
+
+        recovery_time_s = results.get('recovery', {}).get(key, {}).get('recovery_time_s')
+        if recovery_time_s is not None:
+            metrics[f'recovery_{label}_s'] = recovery_time_s
+
+    for key in ['ssim', 'fps']:
+        percentiles = results.get(key, {}).get('percentiles', {})
+        if 'p50' in percentiles:
+            metrics[f'{key}_p50'] = percentiles['p50']
+
+    if 'failure_rate_percent' in results.get('h264', {}):
+        metrics['h264_failure_rate_percent'] = results['h264']['failure_rate_percent']
+
+    return metrics
+
+def summarize_experiments(experiment_folders: List[Path], summary_file: Path) -> List[Dict]:
+    """Aggregate the metrics of all analyzed folders per loss condition."""
+    by_condition = {}
+    for exp_dir in experiment_folders:
+        try:
+            with open(exp_dir / "analysis" / "gcc_analysis_results.json", 'r') as f:
+                results = json.load(f)
+        except (OSError, ValueError):
+            continue
+        by_condition.setdefault(experiment_condition(exp_dir), []).append(experiment_metrics(results))
+
+    metric_names = []
+    for key, label in SUMMARY_BITRATES:
+        metric_names.append(f'util_{label}_p50')
+    for key, label in SUMMARY_BITRATES:
+        metric_names.append(f'recovery_{label}_s')
+    metric_names += ['ssim_p50', 'fps_p50', 'h264_failure_rate_percent']
+
+    # Median across experiments of the same condition, missing values are ignored
+    rows = []
+    for condition, experiments in sorted(by_condition.items()):
+        row = {'condition': condition, 'experiments': len(experiments)}
+        for name in metric_names:
+            values = [metrics[name] for metrics in experiments if name in metrics]
+            row[name] = round(statistics.median(values), 4) if values else ''
+        rows.append(row)
+
+    with open(summary_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['condition', 'experiments'] + metric_names)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    return rows
+
+def print_summary(rows: List[Dict], summary_file: Path):
+    """Print the main per-condition metrics."""
+    columns = [
+        ('condition', 'Condition', 36),
+        ('experiments', 'N', 4),
+        ('util_gcc_p50', 'GCC util %', 11),
+        ('recovery_gcc_s', 'GCC rec s', 10),
+        ('util_client_received_p50', 'RX util %', 10),
+        ('ssim_p50', 'SSIM', 7),
+        ('fps_p50', 'FPS', 6),
+    ]
+
+    print(f"\nPer-condition summary (median across experiments):")
+    print("  ".join(title.ljust(width) for _, title, width in columns))
+    for row in rows:
+        cells = []
+        for name, _, width in columns:
+            value = row[name]
+            cells.append((f"{value:.2f}" if isinstance(value, float) else str(value)).ljust(width))
+        print("  ".join(cells))
+    print(f"Full summary saved to: {summary_file}")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -71,19 +278,22 @@ def main():
 Examples:
     # Process all experiments (analyze + rename)
     python tools/batch_process_experiments.py --analyze --rename
-    
+
     # Only analyze (no renaming)
     python tools/batch_process_experiments.py --analyze --no-ssim
-    
+
     # Only rename (no analysis)
     python tools/batch_process_experiments.py --rename
-    
+
     # Process specific pattern
     python tools/batch_process_experiments.py --analyze --rename --pattern "gcc-v0_20250817*"
+
+    # Nightly sweep: 16 workers, no confirmation
+    python tools/batch_process_experiments.py --analyze --jobs 16 --yes
         """
     )
-    
-    parser.add_argument('--analyze', action='store_true', 
+
+    parser.add_argument('--analyze', action='store_true',
                        help='Run gcc_analyzer on each experiment folder')
     parser.add_argument('--rename', action='store_true',
                        help='Rename experiment folders with loss conditions')
@@ -93,20 +303,28 @@ Examples:
                        help='Pattern to match experiment folders (default: gcc-v0_*)')
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be processed without actually running')
-    
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                       help='Number of experiment folders analyzed in parallel (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-analyze folders even if their inputs are unchanged')
+    parser.add_argument('--yes', '-y', action='store_true',
+                       help='Do not ask for confirmation')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Show the analyzer output of successful folders')
+
     args = parser.parse_args()
-    
+
     if not args.analyze and not args.rename:
         print("Please specify at least one action: --analyze or --rename")
         parser.print_help()
         return 1
-    
+
     # Find experiment folders
     experiments_dir = Path("experiments")
     if not experiments_dir.exists():
         print(f"Experiments directory not found: {experiments_dir}")
         return 1
-    
+
     # Get all matching experiment folders
     experiment_folders = []
     for item in experiments_dir.iterdir():
@@ -118,78 +336,84 @@ Examples:
                     experiment_folders.append(item)
             else:
                 experiment_folders.append(item)
-    
+
     if not experiment_folders:
         print(f"No experiment folders found matching pattern: {args.pattern}")
         return 1
-    
+
     # Sort by creation time (oldest first)
     experiment_folders.sort(key=lambda x: x.stat().st_ctime)
-    
+
     print(f"Found {len(experiment_folders)} experiment folders:")
     for exp_dir in experiment_folders:
         print(f"   - {exp_dir.name}")
-    
+
     if args.dry_run:
+        analyzer_args = analyzer_arguments(args)
         print(f"\nDRY RUN - Would process {len(experiment_folders)} folders:")
         for exp_dir in experiment_folders:
             print(f"   - {exp_dir.name}")
             if args.analyze:
-                print(f"     → Run gcc_analyzer --all --plot --store-values")
+                if not args.force and is_up_to_date(exp_dir, input_fingerprint(exp_dir, analyzer_args)):
+                    print(f"     → Skip gcc_analyzer, inputs unchanged")
+                else:
+                    print(f"     → Run gcc_analyzer {' '.join(analyzer_args)}")
             if args.rename:
                 print(f"     → Run rename_experiment")
         return 0
-    
+
     # Confirm before proceeding
     print(f"\nAbout to process {len(experiment_folders)} experiment folders")
     if args.analyze:
-        print(f"   - GCC Analysis: --all --plot --store-values" + (" --no-ssim" if args.no_ssim else ""))
+        print(f"   - GCC Analysis: {' '.join(analyzer_arguments(args))} ({args.jobs} worker(s))")
     if args.rename:
         print(f"   - Folder Renaming: with loss conditions")
-    
-    response = input("\nContinue? (y/N): ").strip().lower()
-    if response not in ['y', 'yes']:
-        print("Cancelled")
-        return 0
-    
-    # Process each experiment folder
+
+    if not args.yes:
+        response = input("\nContinue? (y/N): ").strip().lower()
+        if response not in ['y', 'yes']:
+            print("Cancelled")
+            return 0
+
+    # Process the experiment folders
     print(f"\nStarting batch processing...")
     start_time = time.time()
-    
-    total_success = 0
-    total_commands = 0
+
     failed_folders = []
-    
-    for i, exp_dir in enumerate(experiment_folders, 1):
-        print(f"\nProgress: {i}/{len(experiment_folders)}")
-        
-        success, commands = process_experiment_folder(exp_dir, args)
-        total_success += success
-        total_commands += commands
-        
-        if success < commands:
-            failed_folders.append(exp_dir.name)
-    
+
+    if args.analyze:
+        failed_folders += analyze_experiments(experiment_folders, args)
+
+        summary_file = experiments_dir / "batch_summary.csv"
+        rows = summarize_experiments(experiment_folders, summary_file)
+        if rows:
+            print_summary(rows, summary_file)
+
+    # Rename once the analysis is done, as it moves the folders
+    if args.rename:
+        for exp_dir in experiment_folders:
+            print(f"\nRenaming: {exp_dir.name}")
+            rename_cmd = [sys.executable, str(TOOLS_DIR / "rename_experiment.py"), str(exp_dir)]
+            if not run_command(rename_cmd, "Folder Renaming"):
+                failed_folders.append(exp_dir.name)
+
     # Summary
     elapsed_time = time.time() - start_time
     print(f"\n" + "=" * 60)
     print(f"BATCH PROCESSING COMPLETE")
     print(f"   Total folders: {len(experiment_folders)}")
-    print(f"   Successful commands: {total_success}/{total_commands}")
-    print(f"   Failed commands: {total_commands - total_success}")
+    print(f"   Failed folders: {len(failed_folders)}")
     print(f"   Elapsed time: {elapsed_time:.1f}s")
-    
+
     if failed_folders:
         print(f"\nFailed folders:")
         for folder in failed_folders:
             print(f"   - {folder}")
-    
-    if total_success == total_commands:
-        print(f"\nAll operations completed successfully!")
-        return 0
-    else:
         print(f"\nSome operations failed. Check the output above.")
         return 1
 
+    print(f"\nAll operations completed successfully!")
+    return 0
+
 if __name__ == "__main__":
-    exit(main()) 
\ No newline at end of file
+    exit(main())
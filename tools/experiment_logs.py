@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Columnar loaders for experiment logs.
+
+The text logs written during an experiment (stats.log, gcc_estimates.log,
+server_reception_stats.log) are parsed once into NumPy columns, which are
+cached next to the log as "<log>.columns.npz". The cache is reused as long
+as the log's size and modification time are unchanged.
+
+Missing numeric values are stored as NaN and missing strings as "".
+
+Usage:
+    # Convert the logs of experiments ahead of analysis
+    python tools/experiment_logs.py experiments/gcc-v0_*
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+Columns = Dict[str, np.ndarray]
+
+# Bump when the layout of the cached columns changes
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.columns.npz'
+
+# Streams reported in the client stats, with their column prefix
+STATS_STREAMS = [
+    ('CLIENT SENT', 'client_sent'),
+    ('SERVER RECEIVED', 'server_received'),
+    ('SERVER SENT', 'server_sent'),
+    ('CLIENT RECEIVED', 'client_received'),
+]
+
+# The browser reports whole FPS values for the client streams
+INTEGER_FPS_STREAMS = ('CLIENT SENT', 'CLIENT RECEIVED')
+
+GCC_FIELDS = ['as', 'ar', 'gcc']
+
+SERVER_RECEPTION_FIELDS = [
+    'frame_number',
+    'server_received_fps',
+    'total_packets_received',
+    'decode_failures',
+]
+SERVER_RECEPTION_INTEGER_FIELDS = ('frame_number', 'total_packets_received', 'decode_failures')
+
+STATS_PATTERN = re.compile(
+    r'stats: \[STATS\]([^\n]*)'
+    r'|(CLIENT SENT|SERVER RECEIVED|SERVER SENT|CLIENT RECEIVED): '
+    r'bitrate=(\d+)bps, fps=([\d.]+), res=([^\n]+)'
+)
+TIME_PATTERN = re.compile(r'time=(\d+)')
+
+
+def load_columns(log_file: str, parser: Callable[[str], Columns]) -> Columns:
+    """Return the columns of a log, parsing it only if the cache is stale."""
+    cache_file = log_file + CACHE_SUFFIX
+    stat = os.stat(log_file)
+    source = np.array([CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+    try:
+        with np.load(cache_file) as cached:
+            if np.array_equal(cached['_source'], source):
+                return {name: cached[name] for name in cached.files if name != '_source'}
+    except (OSError, KeyError, ValueError):
+        pass
+
+    columns = parser(log_file)
+
+    # Write atomically so concurrent analyses never see a partial cache
+    try:
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            np.savez(f, _source=source, **columns)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Could not cache columns for {log_file}: {e}")
+
+    return columns
+
+
+def parse_client_stats_columns(stats_file: str) -> Columns:
+    """Parse the client stats log in a single pass over its content."""
+    with open(stats_file, 'r') as f:
+        content = f.read()
+
+    rows = []
+    row = None
+    for match in STATS_PATTERN.finditer(content):
+        header, stream, bitrate, fps, res = match.groups()
+        if header is not None:
+            # A new entry, which is skipped if it has no timestamp
+            timestamp_match = TIME_PATTERN.search(header)
+            row = {'timestamp_s': float(timestamp_match.group(1)) / 1000.0} if timestamp_match else None
+            if row is not None:
+                rows.append(row)
+        elif row is not None and stream not in row:
+            if stream in INTEGER_FPS_STREAMS and not fps.isdigit():
+                continue
+            row[stream] = (int(bitrate), float(fps), res.strip())
+
+    # Only keep entries with at least some data
+    rows = [row for row in rows if len(row) > 1]
+    rows.sort(key=lambda row: row['timestamp_s'])
+
+    columns = {'timestamp_s': np.array([row['timestamp_s'] for row in rows], dtype=np.float64)}
+    for stream, prefix in STATS_STREAMS:
+        values = [row.get(stream, (np.nan, np.nan, '')) for row in rows]
+        bitrate_bps = np.array([v[0] for v in values], dtype=np.float64)
+        columns[f'{prefix}_bitrate_bps'] = bitrate_bps
+        columns[f'{prefix}_bitrate_mbps'] = bitrate_bps / 1000000.0
+        columns[f'{prefix}_fps'] = np.array([v[1] for v in values], dtype=np.float64)
+        columns[f'{prefix}_resolution'] = np.array([v[2] for v in values], dtype=np.str_)
+    return columns
+
+
+def parse_gcc_estimates_columns(gcc_file: str) -> Columns:
+    """Parse the GCC estimates log: timestamp_s, as_bps, ar_bps, gcc_bps."""
+    try:
+        with warnings.catch_warnings():
+            # an empty log is not an error
+            warnings.simplefilter('ignore', UserWarning)
+            table = np.loadtxt(gcc_file, delimiter=',', comments='#', usecols=(0, 1, 2, 3), ndmin=2)
+    except ValueError:
+        # Malformed lines, fall back to skipping them one at a time
+        parsed = []
+        with open(gcc_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('#') or not line:
+                    continue
+                try:
+                    parsed.append([float(p) for p in line.split(',')[:4]])
+                except ValueError:
+                    continue
+        table = np.array([p for p in parsed if len(p) == 4], dtype=np.float64).reshape(-1, 4)
+
+    table = table[np.argsort(table[:, 0], kind='stable')]
+    columns = {'timestamp_s': table[:, 0]}
+    for i, name in enumerate(GCC_FIELDS, 1):
+        # A zero estimate means that none was available
+        bitrate_bps = np.where(table[:, i] != 0, table[:, i], np.nan)
+        columns[f'{name}_bps'] = bitrate_bps
+        columns[f'{name}_mbps'] = bitrate_bps / 1000000.0
+    return columns
+
+
+def parse_server_reception_columns(stats_file: str) -> Columns:
+    """Parse the server reception log, one record per line."""
+    rows = []
+    with open(stats_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("server_reception:"):
+                continue
+
+            record = line.split("server_reception: ", 1)[1]
+            try:
+                try:
+                    server_info = json.loads(record)
+                except json.JSONDecodeError:
+                    # Older experiments logged the Python representation
+                    server_info = ast.literal_eval(record)
+                rows.append((
+                    float(server_info['timestamp_ms']) / 1000.0,
+                    [server_info[name] for name in SERVER_RECEPTION_FIELDS],
+                    server_info['server_received_resolution'],
+                ))
+            except Exception as e:
+                print(f"Failed to parse server reception line: {line}, error: {e}")
+
+    rows.sort(key=lambda row: row[0])
+    columns = {'timestamp_s': np.array([row[0] for row in rows], dtype=np.float64)}
+    for i, name in enumerate(SERVER_RECEPTION_FIELDS):
+        columns[name] = np.array([row[1][i] for row in rows], dtype=np.float64)
+    columns['server_received_resolution'] = np.array([row[2] for row in rows], dtype=np.str_)
+    return columns
+
+
+def load_client_stats(stats_file: str) -> Columns:
+    return load_columns(stats_file, parse_client_stats_columns)
+
+
+def load_gcc_estimates(gcc_file: str) -> Columns:
+    return load_columns(gcc_file, parse_gcc_estimates_columns)
+
+
+def load_server_reception_stats(stats_file: str) -> Columns:
+    return load_columns(stats_file, parse_server_reception_columns)
+
+
+def client_stats_records(columns: Columns) -> List[Dict]:
+    """Convert client stats columns to one dict per entry."""
+    records = [{'timestamp_s': float(t)} for t in columns['timestamp_s']]
+    for stream, prefix in STATS_STREAMS:
+        bitrates = columns[f'{prefix}_bitrate_bps']
+        fps_values = columns[f'{prefix}_fps']
+        resolutions = columns[f'{prefix}_resolution']
+        integer_fps = stream in INTEGER_FPS_STREAMS
+        for i in np.flatnonzero(~np.isnan(bitrates)):
+            bitrate = int(bitrates[i])
+            records[i].update({
+                f'{prefix}_bitrate_bps': bitrate,
+                f'{prefix}_bitrate_mbps': bitrate / 1000000.0,
+                f'{prefix}_fps': int(fps_values[i]) if integer_fps else float(fps_values[i]),
+                f'{prefix}_resolution': str(resolutions[i]),
+            })
+    return records
+
+
+def gcc_estimate_records(columns: Columns) -> List[Dict]:
+    """Convert GCC estimate columns to one dict per entry, None if missing."""
+    records = []
+    fields = [(name, columns[f'{name}_bps'].tolist()) for name in GCC_FIELDS]
+    for i, timestamp_s in enumerate(columns['timestamp_s'].tolist()):
+        record = {'timestamp_s': timestamp_s}
+        for name, values in fields:
+            bitrate = None if np.isnan(values[i]) else int(values[i])
+            record[f'{name}_bps'] = bitrate
+            record[f'{name}_mbps'] = bitrate / 1000000.0 if bitrate else None
+        records.append(record)
+    return records
+
+
+def server_reception_records(columns: Columns) -> List[Dict]:
+    """Convert server reception columns to one dict per entry."""
+    records = []
+    for i, timestamp_s in enumerate(columns['timestamp_s'].tolist()):
+        record = {'timestamp_s': timestamp_s}
+        for name in SERVER_RECEPTION_FIELDS:
+            value = columns[name][i]
+            record[name] = int(value) if name in SERVER_RECEPTION_INTEGER_FIELDS else float(value)
+        record['server_received_resolution'] = str(columns['server_received_resolution'][i])
+        records.append(record)
+    return records
+
+
+def convert_experiment(exp_dir: Path) -> List[str]:
+    """Build the column caches for the logs of an experiment."""
+    converted = []
+    for name, loader in [
+        ('stats.log', load_client_stats),
+        ('gcc_estimates.log', load_gcc_estimates),
+        ('server_reception_stats.log', load_server_reception_stats),
+    ]:
+        log_file = exp_dir / "logs" / name
+        if log_file.exists():
+            loader(str(log_file))
+            converted.append(name)
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert experiment logs to cached columns')
+    parser.add_argument('experiment_dirs', nargs='+', help='Paths to experiment directories')
+    args = parser.parse_args()
+
+    for exp_dir in args.experiment_dirs:
+        converted = convert_experiment(Path(exp_dir))
+        print(f"{exp_dir}: {', '.join(converted) if converted else 'no logs found'}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
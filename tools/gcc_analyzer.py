@@ -48,6 +48,9 @@ Available Metrics:
 Options:
     --plot           Generate plots for applicable metrics
     --no-percentiles Skip percentile calculations (faster)
+
+Logs are parsed once into columns cached next to them as <log>.columns.npz
+(see experiment_logs.py), later runs on the same experiment reuse the cache.
 """
 
 import argparse
@@ -62,167 +65,54 @@ from typing import Dict, List, Tuple, Optional
 import cv2
 from skimage.metrics import structural_similarity as ssim
 
+from experiment_logs import (
+    Columns,
+    client_stats_records,
+    gcc_estimate_records,
+    load_client_stats,
+    load_gcc_estimates,
+    load_server_reception_stats,
+    server_reception_records,
+)
+
 # Global configuration
 ANALYSIS_DELAY_S = 10.0  # Default delay for OUT bitrate utilization analysis
 
 def parse_client_stats(stats_file: str) -> List[Dict]:
     """Parse client stats log and extract bitrate/FPS data."""
-    bitrate_data = []
-    
     if not os.path.exists(stats_file):
         print(f"Client stats file not found: {stats_file}")
         return []
     
-    with open(stats_file, 'r') as f:
-        content = f.read()
-        
-    # Split by stats entries
-    stats_entries = content.split('stats: [STATS]')
-    
-    for entry in stats_entries[1:]:  # Skip first empty entry
-        lines = entry.strip().split('\n')
-        if not lines:
-            continue
-            
-        # Parse timestamp from first line
-        import re
-        timestamp_match = re.search(r'time=(\d+)', lines[0])
-        if not timestamp_match:
-            continue
-            
-        timestamp_ms = timestamp_match.group(1)
-        timestamp_s = float(timestamp_ms) / 1000.0
-        
-        # Parse each stats line separately
-        data_entry = {'timestamp_s': timestamp_s}
-        
-        # Join all lines for regex matching
-        full_entry = '\n'.join(lines)
-        
-        # Parse CLIENT SENT
-        client_sent_match = re.search(r'CLIENT SENT: bitrate=(\d+)bps, fps=(\d+), res=([^\n]+)', full_entry)
-        if client_sent_match:
-            bitrate, fps, res = client_sent_match.groups()
-            data_entry.update({
-                'client_sent_bitrate_bps': int(bitrate),
-                'client_sent_bitrate_mbps': int(bitrate) / 1000000.0,
-                'client_sent_fps': int(fps),
-                'client_sent_resolution': res.strip()
-            })
-        
-        # Parse SERVER RECEIVED
-        server_received_match = re.search(r'SERVER RECEIVED: bitrate=(\d+)bps, fps=([\d.]+), res=([^\n]+)', full_entry)
-        if server_received_match:
-            bitrate, fps, res = server_received_match.groups()
-            data_entry.update({
-                'server_received_bitrate_bps': int(bitrate),
-                'server_received_bitrate_mbps': int(bitrate) / 1000000.0,
-                'server_received_fps': float(fps),
-                'server_received_resolution': res.strip()
-            })
-        
-        # Parse SERVER SENT
-        server_sent_match = re.search(r'SERVER SENT: bitrate=(\d+)bps, fps=([\d.]+), res=([^\n]+)', full_entry)
-        if server_sent_match:
-            bitrate, fps, res = server_sent_match.groups()
-            data_entry.update({
-                'server_sent_bitrate_bps': int(bitrate),
-                'server_sent_bitrate_mbps': int(bitrate) / 1000000.0,
-                'server_sent_fps': float(fps),
-                'server_sent_resolution': res.strip()
-            })
-        
-        # Parse CLIENT RECEIVED
-        client_received_match = re.search(r'CLIENT RECEIVED: bitrate=(\d+)bps, fps=(\d+), res=([^\n]+)', full_entry)
-        if client_received_match:
-            bitrate, fps, res = client_received_match.groups()
-            data_entry.update({
-                'client_received_bitrate_bps': int(bitrate),
-                'client_received_bitrate_mbps': int(bitrate) / 1000000.0,
-                'client_received_fps': int(fps),
-                'client_received_resolution': res.strip()
-            })
-        
-        # Only add entry if we have at least some data
-        if len(data_entry) > 1:  # More than just timestamp_s
-            bitrate_data.append(data_entry)
-    
-    return sorted(bitrate_data, key=lambda x: x['timestamp_s'])
+    return client_stats_records(load_client_stats(stats_file))
 
 def parse_server_reception_stats(stats_file: str) -> List[Dict]:
     """Parse server reception stats log and extract server-side metrics."""
-    server_data = []
-    
     if not os.path.exists(stats_file):
         print(f"Server reception stats file not found: {stats_file}")
         return []
     
-    with open(stats_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line.startswith("server_reception:"):
-                continue
-                
-            # Parse server reception metrics
-            import re
-            import json
-            try:
-                # Extract the JSON part after "server_reception: "
-                json_str = line.split("server_reception: ", 1)[1]
-                server_info = json.loads(json_str)
-                
-                timestamp_s = float(server_info['timestamp_ms']) / 1000.0
-                
-                server_data.append({
-                    'timestamp_s': timestamp_s,
-                    'frame_number': server_info['frame_number'],
-                    'server_received_fps': server_info['server_received_fps'],
-                    'server_received_resolution': server_info['server_received_resolution'],
-                    'total_packets_received': server_info['total_packets_received'],
-                    'decode_failures': server_info['decode_failures']
-                })
-            except Exception as e:
-                print(f"Failed to parse server reception line: {line}, error: {e}")
-                continue
-    
-    return sorted(server_data, key=lambda x: x['timestamp_s'])
+    return server_reception_records(load_server_reception_stats(stats_file))
 
 def parse_gcc_estimates(gcc_file: str) -> List[Dict]:
     """Parse GCC estimates log and extract As, Ar, GCC data."""
-    gcc_data = []
-    
     if not os.path.exists(gcc_file):
         print(f"GCC estimates file not found: {gcc_file}")
         return []
     
-    with open(gcc_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith('#') or not line:
-                continue
-            
-            # Parse: timestamp_s, as_bps, ar_bps, gcc_bps
-            try:
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) >= 4:
-                    timestamp_s = float(parts[0])
-                    as_bps = int(parts[1]) if parts[1] != '0' else None
-                    ar_bps = int(parts[2]) if parts[2] != '0' else None
-                    gcc_bps = int(parts[3]) if parts[3] != '0' else None
-                    
-                    gcc_data.append({
-                        'timestamp_s': timestamp_s,
-                        'as_bps': as_bps,
-                        'ar_bps': ar_bps, 
-                        'gcc_bps': gcc_bps,
-                        'as_mbps': as_bps / 1000000.0 if as_bps else None,
-                        'ar_mbps': ar_bps / 1000000.0 if ar_bps else None,
-                        'gcc_mbps': gcc_bps / 1000000.0 if gcc_bps else None
-                    })
-            except (ValueError, IndexError):
-                continue
-    
-    return sorted(gcc_data, key=lambda x: x['timestamp_s'])
+    return gcc_estimate_records(load_gcc_estimates(gcc_file))
+
+def read_columns(log_file: str, loader, description: str) -> Optional[Columns]:
+    """Load the cached columns of a log, None if the log does not exist."""
+    if not os.path.exists(log_file):
+        print(f"{description} file not found: {log_file}")
+        return None
+    
+    return loader(log_file)
+
+def has_rows(columns: Optional[Columns]) -> bool:
+    """Check that columns were loaded and hold at least one entry."""
+    return columns is not None and len(columns['timestamp_s']) > 0
 
 def parse_loss_timing(timing_file: str) -> Dict:
     """Parse packet loss timing information."""
@@ -265,11 +155,49 @@ def calculate_reference_bitrate(data: List[Dict], loss_start_s: float, bitrate_f
     
     return reference_bitrate, len(ref_data)
 
+def calculate_reference_bitrate_columns(columns: Optional[Columns], loss_start_s: float, bitrate_field: str) -> Tuple[float, int]:
+    """Calculate reference bitrate from 10 seconds before loss starts, over columns."""
+    if not has_rows(columns):
+        return 0.0, 0
+    
+    relative = columns['timestamp_s'] - columns['timestamp_s'][0]
+    loss_start_relative = loss_start_s - columns['timestamp_s'][0]
+    values = columns[bitrate_field]
+    
+    # Get 10 seconds before loss
+    mask = (relative >= loss_start_relative - 10.0) & (relative <= loss_start_relative) & ~np.isnan(values)
+    ref_samples = int(np.count_nonzero(mask))
+    if not ref_samples:
+        return 0.0, 0
+    
+    return float(np.mean(values[mask])), ref_samples
+
+def utilization_percent(columns: Columns, bitrate_field: str, ref_bitrate: float, start_rel: float, end_rel: float) -> np.ndarray:
+    """Utilization of a bitrate between two relative times, capped at 100%."""
+    relative = columns['timestamp_s'] - columns['timestamp_s'][0]
+    values = columns[bitrate_field]
+    mask = (relative >= start_rel) & (relative <= end_rel) & ~np.isnan(values)
+    return np.minimum(values[mask] / ref_bitrate * 100, 100.0)
 
+def recovery_time(columns: Columns, bitrate_field: str, ref_bitrate: float, loss_end_rel: float, threshold: float) -> Optional[float]:
+    """Time after loss end until a bitrate first reaches the threshold of its reference."""
+    relative = columns['timestamp_s'] - columns['timestamp_s'][0]
+    # NaN never compares true, so missing values are skipped
+    recovered = np.flatnonzero((relative > loss_end_rel) & (columns[bitrate_field] / ref_bitrate >= threshold))
+    if not len(recovered):
+        return None
+    
+    return float(relative[recovered[0]] - loss_end_rel)
+
+def fps_between(columns: Columns, fps_field: str, start_ms: float, end_ms: float) -> np.ndarray:
+    """Positive FPS values reported between two timestamps."""
+    timestamps_ms = columns['timestamp_s'] * 1000
+    fps = columns[fps_field]
+    return fps[(timestamps_ms >= start_ms) & (timestamps_ms <= end_ms) & (fps > 0)]
 
 def calculate_percentiles(values: List[float]) -> Dict:
     """Calculate 5, 25, 50, 75, 95 percentiles."""
-    if not values:
+    if len(values) == 0:
         return {}
     
     return {
@@ -319,7 +247,7 @@ def analyze_bitrate(bitrate_data: List[Dict], gcc_data: List[Dict], timing_info:
     
     return result
 
-def analyze_comprehensive_utilization(bitrate_data: List[Dict], gcc_data: List[Dict], timing_info: Dict, experiment_info: Dict, args) -> Dict:
+def analyze_comprehensive_utilization(bitrate_columns: Optional[Columns], gcc_columns: Optional[Columns], timing_info: Dict, experiment_info: Dict, args) -> Dict:
     """Analyze bandwidth utilization during loss for all 4 bitrate types."""
     if 'loss_start' not in timing_info:
         return {}
@@ -330,9 +258,23 @@ def analyze_comprehensive_utilization(bitrate_data: List[Dict], gcc_data: List[D
     results = {}
     all_utilizations = {}  # Store all utilization data for plotting
     
+    def add_utilization(key, label, columns, field, ref_bitrate, ref_samples, start_rel, end_rel):
+        utilizations_percent = utilization_percent(columns, field, ref_bitrate, start_rel, end_rel)
+        if not len(utilizations_percent):
+            return
+        all_utilizations[label] = utilizations_percent.tolist()
+        
+        results[key] = {
+            'reference_bitrate_mbps': ref_bitrate,
+            'reference_samples': ref_samples,
+            'utilization_samples': len(utilizations_percent)
+        }
+        if not args.no_percentiles:
+            results[key]['percentiles'] = calculate_percentiles(utilizations_percent)
+    
     # Analyze all 4 bitrates
-    if bitrate_data:
-        t0 = bitrate_data[0]['timestamp_s']
+    if has_rows(bitrate_columns):
+        t0 = bitrate_columns['timestamp_s'][0]
         loss_start_rel = loss_start_s - t0
         loss_end_rel = loss_end_s - t0
         
@@ -345,35 +287,18 @@ def analyze_comprehensive_utilization(bitrate_data: List[Dict], gcc_data: List[D
         ]
         
         for field, label in bitrate_fields:
-            # Get loss period data for this bitrate
-            loss_data = [d for d in bitrate_data if loss_start_rel <= (d['timestamp_s'] - t0) <= loss_end_rel and field in d and d[field] is not None]
-            
-            if loss_data:
-                # Calculate reference bitrate from 5 seconds before loss
-                ref_bitrate, ref_samples = calculate_reference_bitrate(bitrate_data, loss_start_s, field)
-                
-                if ref_bitrate > 0:
-                    utilizations = [d[field] / ref_bitrate for d in loss_data]
-                    utilizations_percent = [min(u * 100, 100.0) for u in utilizations]
-                    all_utilizations[label] = utilizations_percent
-                    
-                    results[field] = {
-                        'reference_bitrate_mbps': ref_bitrate,
-                        'reference_samples': ref_samples,
-                        'utilization_samples': len(utilizations)
-                    }
-                    if not args.no_percentiles:
-                        results[field]['percentiles'] = calculate_percentiles(utilizations_percent)
+            # Calculate reference bitrate from 10 seconds before loss
+            ref_bitrate, ref_samples = calculate_reference_bitrate_columns(bitrate_columns, loss_start_s, field)
+            if ref_bitrate > 0:
+                add_utilization(field, label, bitrate_columns, field, ref_bitrate, ref_samples, loss_start_rel, loss_end_rel)
     
     # GCC-level estimates (As, Ar, GCC)
-    if gcc_data:
-        gcc_t0 = gcc_data[0]['timestamp_s']
+    if has_rows(gcc_columns):
+        gcc_t0 = gcc_columns['timestamp_s'][0]
         # GCC estimates always start from loss start (no delay)
         gcc_loss_analysis_start_rel = loss_start_s - gcc_t0
         gcc_loss_end_rel = loss_end_s - gcc_t0
         
-        gcc_loss_data = [d for d in gcc_data if gcc_loss_analysis_start_rel <= (d['timestamp_s'] - gcc_t0) <= gcc_loss_end_rel]
-        
         # As (Loss-based) utilization
         # Use max_as_bitrate as reference if available, otherwise use historical data
         max_as_bitrate_bps = experiment_info.get('max_as_bitrate')
@@ -382,56 +307,16 @@ def analyze_comprehensive_utilization(bitrate_data: List[Dict], gcc_data: List[D
             ref_as_samples = 1  # Configured value, not historical samples
             print(f"  Using configured As reference: {ref_as:.2f} Mbps (from --max-as-bitrate)")
         else:
-            ref_as, ref_as_samples = calculate_reference_bitrate(gcc_data, loss_start_s, 'as_mbps')
-        
-        if ref_as > 0 and gcc_loss_data:
-            as_loss_data = [d for d in gcc_loss_data if d['as_mbps'] is not None]
-            if as_loss_data:
-                as_utilizations = [d['as_mbps'] / ref_as for d in as_loss_data]
-                as_utilizations_percent = [min(u * 100, 100.0) for u in as_utilizations]
-                all_utilizations['As (Loss-based)'] = as_utilizations_percent
-                
-                results['as_estimate'] = {
-                    'reference_bitrate_mbps': ref_as,
-                    'reference_samples': ref_as_samples,
-                    'utilization_samples': len(as_utilizations)
-                }
-                if not args.no_percentiles:
-                    results['as_estimate']['percentiles'] = calculate_percentiles(as_utilizations_percent)
-        
-        # Ar (REMB) utilization  
-        ref_ar, ref_ar_samples = calculate_reference_bitrate(gcc_data, loss_start_s, 'ar_mbps')
-        if ref_ar > 0 and gcc_loss_data:
-            ar_loss_data = [d for d in gcc_loss_data if d['ar_mbps'] is not None]
-            if ar_loss_data:
-                ar_utilizations = [d['ar_mbps'] / ref_ar for d in ar_loss_data]
-                ar_utilizations_percent = [min(u * 100, 100.0) for u in ar_utilizations]
-                all_utilizations['Ar (REMB)'] = ar_utilizations_percent
-                
-                results['ar_estimate'] = {
-                    'reference_bitrate_mbps': ref_ar,
-                    'reference_samples': ref_ar_samples,
-                    'utilization_samples': len(ar_utilizations)
-                }
-                if not args.no_percentiles:
-                    results['ar_estimate']['percentiles'] = calculate_percentiles(ar_utilizations_percent)
-        
-        # GCC (Combined) utilization
-        ref_gcc, ref_gcc_samples = calculate_reference_bitrate(gcc_data, loss_start_s, 'gcc_mbps')
-        if ref_gcc > 0 and gcc_loss_data:
-            gcc_loss_data_valid = [d for d in gcc_loss_data if d['gcc_mbps'] is not None]
-            if gcc_loss_data_valid:
-                gcc_utilizations = [d['gcc_mbps'] / ref_gcc for d in gcc_loss_data_valid]
-                gcc_utilizations_percent = [min(u * 100, 100.0) for u in gcc_utilizations]
-                all_utilizations['GCC (Combined)'] = gcc_utilizations_percent
-                
-                results['gcc_combined'] = {
-                    'reference_bitrate_mbps': ref_gcc,
-                    'reference_samples': ref_gcc_samples,
-                    'utilization_samples': len(gcc_utilizations)
-                }
-                if not args.no_percentiles:
-                    results['gcc_combined']['percentiles'] = calculate_percentiles(gcc_utilizations_percent)
+            ref_as, ref_as_samples = calculate_reference_bitrate_columns(gcc_columns, loss_start_s, 'as_mbps')
+        
+        gcc_estimates = [
+            ('as_estimate', 'As (Loss-based)', 'as_mbps', ref_as, ref_as_samples),
+            ('ar_estimate', 'Ar (REMB)', 'ar_mbps') + calculate_reference_bitrate_columns(gcc_columns, loss_start_s, 'ar_mbps'),
+            ('gcc_combined', 'GCC (Combined)', 'gcc_mbps') + calculate_reference_bitrate_columns(gcc_columns, loss_start_s, 'gcc_mbps'),
+        ]
+        for key, label, field, ref_bitrate, ref_samples in gcc_estimates:
+            if ref_bitrate > 0:
+                add_utilization(key, label, gcc_columns, field, ref_bitrate, ref_samples, gcc_loss_analysis_start_rel, gcc_loss_end_rel)
     
     # Generate comprehensive utilization box plot if requested
     if args.plot and all_utilizations:
@@ -479,7 +364,7 @@ def analyze_utilization(bitrate_data: List[Dict], timing_info: Dict, args) -> Di
     
     return result
 
-def analyze_comprehensive_recovery(bitrate_data: List[Dict], gcc_data: List[Dict], timing_info: Dict, args) -> Dict:
+def analyze_comprehensive_recovery(bitrate_columns: Optional[Columns], gcc_columns: Optional[Columns], timing_info: Dict, args) -> Dict:
     """Analyze recovery time for all 4 bitrate types."""
     if 'loss_start' not in timing_info:
         return {}
@@ -495,92 +380,31 @@ def analyze_comprehensive_recovery(bitrate_data: List[Dict], gcc_data: List[Dict
     
     results = {}
     
-    # Analyze recovery for all 4 bitrates
-    if bitrate_data:
-        t0 = bitrate_data[0]['timestamp_s']
-        loss_end_rel = loss_end_s - t0
-        recovery_data = [d for d in bitrate_data if (d['timestamp_s'] - t0) > loss_end_rel]
-        
-        # Define the 4 bitrate fields to analyze
-        bitrate_fields = [
-            ('client_sent_bitrate_mbps', 'CLIENT SENT'),
-            ('server_received_bitrate_mbps', 'SERVER RECEIVED'),
-            ('server_sent_bitrate_mbps', 'SERVER SENT'),
-            ('client_received_bitrate_mbps', 'CLIENT RECEIVED')
-        ]
-        
-        for field, label in bitrate_fields:
-            ref_bitrate, _ = calculate_reference_bitrate(bitrate_data, loss_start_s, field)
-            if ref_bitrate > 0 and recovery_data:
-                recovery_time_s = None
-                for d in recovery_data:
-                    if field in d and d[field] is not None:
-                        utilization = d[field] / ref_bitrate
-                        if utilization >= recovery_threshold:
-                            recovery_time_s = (d['timestamp_s'] - t0) - loss_end_rel
-                            break
-                
-                results[field] = {
-                    'recovery_time_s': recovery_time_s,
-                    'recovery_threshold': recovery_threshold,
-                    'reference_bitrate_mbps': ref_bitrate
-                }
+    # Define the 4 bitrate fields and the GCC-level estimates (As, Ar, GCC) to analyze
+    recovery_fields = [
+        (bitrate_columns, 'client_sent_bitrate_mbps', 'client_sent_bitrate_mbps'),
+        (bitrate_columns, 'server_received_bitrate_mbps', 'server_received_bitrate_mbps'),
+        (bitrate_columns, 'server_sent_bitrate_mbps', 'server_sent_bitrate_mbps'),
+        (bitrate_columns, 'client_received_bitrate_mbps', 'client_received_bitrate_mbps'),
+        (gcc_columns, 'as_estimate', 'as_mbps'),
+        (gcc_columns, 'ar_estimate', 'ar_mbps'),
+        (gcc_columns, 'gcc_combined', 'gcc_mbps')
+    ]
     
-    # GCC-level recovery (As, Ar, GCC)
-    if gcc_data:
-        gcc_t0 = gcc_data[0]['timestamp_s']
-        gcc_loss_end_rel = loss_end_s - gcc_t0
-        gcc_recovery_data = [d for d in gcc_data if (d['timestamp_s'] - gcc_t0) > gcc_loss_end_rel]
-        
-        # As (Loss-based) recovery
-        ref_as, _ = calculate_reference_bitrate(gcc_data, loss_start_s, 'as_mbps')
-        if ref_as > 0 and gcc_recovery_data:
-            recovery_time_s = None
-            for d in gcc_recovery_data:
-                if d['as_mbps'] is not None:
-                    utilization = d['as_mbps'] / ref_as
-                    if utilization >= recovery_threshold:
-                        recovery_time_s = (d['timestamp_s'] - gcc_t0) - gcc_loss_end_rel
-                        break
-            
-            results['as_estimate'] = {
-                'recovery_time_s': recovery_time_s,
-                'recovery_threshold': recovery_threshold,
-                'reference_bitrate_mbps': ref_as
-            }
+    for columns, key, field in recovery_fields:
+        if not has_rows(columns):
+            continue
         
-        # Ar (REMB) recovery
-        ref_ar, _ = calculate_reference_bitrate(gcc_data, loss_start_s, 'ar_mbps')
-        if ref_ar > 0 and gcc_recovery_data:
-            recovery_time_s = None
-            for d in gcc_recovery_data:
-                if d['ar_mbps'] is not None:
-                    utilization = d['ar_mbps'] / ref_ar
-                    if utilization >= recovery_threshold:
-                        recovery_time_s = (d['timestamp_s'] - gcc_t0) - gcc_loss_end_rel
-                        break
-            
-            results['ar_estimate'] = {
-                'recovery_time_s': recovery_time_s,
-                'recovery_threshold': recovery_threshold,
-                'reference_bitrate_mbps': ref_ar
-            }
+        t0 = columns['timestamp_s'][0]
+        loss_end_rel = loss_end_s - t0
+        ref_bitrate, _ = calculate_reference_bitrate_columns(columns, loss_start_s, field)
         
-        # GCC (Combined) recovery
-        ref_gcc, _ = calculate_reference_bitrate(gcc_data, loss_start_s, 'gcc_mbps')
-        if ref_gcc > 0 and gcc_recovery_data:
-            recovery_time_s = None
-            for d in gcc_recovery_data:
-                if d['gcc_mbps'] is not None:
-                    utilization = d['gcc_mbps'] / ref_gcc
-                    if utilization >= recovery_threshold:
-                        recovery_time_s = (d['timestamp_s'] - gcc_t0) - gcc_loss_end_rel
-                        break
-            
-            results['gcc_combined'] = {
-                'recovery_time_s': recovery_time_s,
+        # Only report fields with data after the loss ended
+        if ref_bitrate > 0 and np.any(columns['timestamp_s'] - t0 > loss_end_rel):
+            results[key] = {
+                'recovery_time_s': recovery_time(columns, field, ref_bitrate, loss_end_rel, recovery_threshold),
                 'recovery_threshold': recovery_threshold,
-                'reference_bitrate_mbps': ref_gcc
+                'reference_bitrate_mbps': ref_bitrate
             }
     
     return results
@@ -616,9 +440,9 @@ def analyze_recovery(bitrate_data: List[Dict], timing_info: Dict, args) -> Dict:
         'reference_bitrate_mbps': ref_bitrate
     }
 
-def analyze_ssim(exp_dir: Path, timing_info: Dict, bitrate_data: List[Dict], args) -> Dict:
+def analyze_ssim(exp_dir: Path, timing_info: Dict, bitrate_columns: Optional[Columns], args) -> Dict:
     """Analyze video quality (SSIM) during loss."""
-    if 'loss_start' not in timing_info or not bitrate_data:
+    if 'loss_start' not in timing_info or not has_rows(bitrate_columns):
         return {}
     
     loss_start_ms = timing_info['loss_start']['timestamp_ms']
@@ -644,7 +468,7 @@ def analyze_ssim(exp_dir: Path, timing_info: Dict, bitrate_data: List[Dict], arg
             return {'error': 'Reference video not found: long_video_for_testing.mp4'}
         
         # Calculate relative timing using bitrate data
-        t0 = bitrate_data[0]['timestamp_s']
+        t0 = float(bitrate_columns['timestamp_s'][0])
         loss_start_s = loss_start_ms / 1000.0
         loss_end_s = loss_end_ms / 1000.0
         
@@ -699,9 +523,9 @@ def analyze_ssim(exp_dir: Path, timing_info: Dict, bitrate_data: List[Dict], arg
     except Exception as e:
         return {'error': str(e)}
 
-def analyze_fps(bitrate_data: List[Dict], timing_info: Dict, args) -> Dict:
+def analyze_fps(bitrate_columns: Optional[Columns], timing_info: Dict, args) -> Dict:
     """Analyze FPS during loss for all four endpoints."""
-    if not bitrate_data or 'loss_start' not in timing_info:
+    if not has_rows(bitrate_columns) or 'loss_start' not in timing_info:
         return {}
     
     loss_start_ms = timing_info['loss_start']['timestamp_ms']
@@ -720,30 +544,18 @@ def analyze_fps(bitrate_data: List[Dict], timing_info: Dict, args) -> Dict:
     for fps_field, label in fps_endpoints:
         # Calculate reference FPS from 10 seconds before loss
         reference_fps = None
-        reference_samples = []
-        for entry in bitrate_data:
-            timestamp_ms = entry['timestamp_s'] * 1000
-            if (loss_start_ms - 10000) <= timestamp_ms <= loss_start_ms:
-                fps = entry.get(fps_field, 0)
-                if fps > 0:
-                    reference_samples.append(fps)
-        
-        if reference_samples:
-            reference_fps = sum(reference_samples) / len(reference_samples)
+        reference_samples = fps_between(bitrate_columns, fps_field, loss_start_ms - 10000, loss_start_ms)
+        if len(reference_samples):
+            reference_fps = float(np.mean(reference_samples))
         
         # Extract FPS during loss (start from loss start)
-        fps_values = []
-        for entry in bitrate_data:
-            timestamp_ms = entry['timestamp_s'] * 1000
-            if loss_start_ms <= timestamp_ms <= loss_end_ms:
-                fps = entry.get(fps_field, 0)
-                if fps > 0:
-                    # Cap FPS to reference FPS if available
-                    if reference_fps and fps > reference_fps:
-                        fps = reference_fps
-                    fps_values.append(fps)
+        fps_values = fps_between(bitrate_columns, fps_field, loss_start_ms, loss_end_ms)
         
-        if fps_values:
+        if len(fps_values):
+            # Cap FPS to reference FPS if available
+            if reference_fps:
+                fps_values = np.minimum(fps_values, reference_fps)
+            
             result = {'fps_samples': len(fps_values)}
             if reference_fps:
                 result['reference_fps'] = round(reference_fps, 1)
@@ -764,11 +576,12 @@ def analyze_fps(bitrate_data: List[Dict], timing_info: Dict, args) -> Dict:
     main_result['all_endpoints'] = all_endpoints_copy
     
     if args.plot:
+        bitrate_data = client_stats_records(bitrate_columns)
         # Plot each FPS endpoint separately
         for fps_field, label in fps_endpoints:
             if fps_field in results and 'percentiles' in results[fps_field]:
                 # Extract individual values for plotting
-                fps_values = extract_fps_values_for_endpoint(bitrate_data, timing_info, fps_field)
+                fps_values = extract_fps_values_for_endpoint(bitrate_columns, timing_info, fps_field)
                 if fps_values:
                     # Create box plot for this endpoint
                     plot_fps_boxplot(fps_values, args.output_dir, label, fps_field)
@@ -1485,7 +1298,15 @@ def print_comprehensive_results(results: Dict, result_type: str, title: str):
                 else:
                     print(f"    Recovery time: No recovery detected within analysis window")
 
-def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data: List[Dict], timing_info: Dict, exp_dir: Path):
+def bitrate_values(columns: Columns, bitrate_field: str) -> List[Dict]:
+    """Bitrate values over time, skipping missing ones."""
+    valid = ~np.isnan(columns[bitrate_field])
+    return [
+        {'timestamp_s': timestamp_s, 'bitrate_mbps': bitrate_mbps}
+        for timestamp_s, bitrate_mbps in zip(columns['timestamp_s'][valid].tolist(), columns[bitrate_field][valid].tolist())
+    ]
+
+def save_metric_values(results: Dict, args, bitrate_columns: Optional[Columns], gcc_columns: Optional[Columns], timing_info: Dict, exp_dir: Path):
     """Save individual metric values to JSON files for aggregation."""
     if not args.store_values:
         return
@@ -1495,95 +1316,53 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
     values_dir.mkdir(exist_ok=True)
     
     # Save bitrate data (all bitrate values over time) - separate files for each type
-    if bitrate_data:
+    if has_rows(bitrate_columns):
         # Extract CLIENT SENT bitrate values
-        client_sent_bitrate_values = []
-        for d in bitrate_data:
-            if d.get('client_sent_bitrate_mbps') is not None:
-                client_sent_bitrate_values.append({
-                    'timestamp_s': d['timestamp_s'],
-                    'bitrate_mbps': d['client_sent_bitrate_mbps']
-                })
+        client_sent_bitrate_values = bitrate_values(bitrate_columns, 'client_sent_bitrate_mbps')
         
         with open(values_dir / "bitrate_client_sent.json", 'w') as f:
             json.dump(client_sent_bitrate_values, f, indent=2)
         print(f"Saved CLIENT SENT bitrate values to: {values_dir / 'bitrate_client_sent.json'}")
         
         # Extract SERVER RECEIVED bitrate values
-        server_received_bitrate_values = []
-        for d in bitrate_data:
-            if d.get('server_received_bitrate_mbps') is not None:
-                server_received_bitrate_values.append({
-                    'timestamp_s': d['timestamp_s'],
-                    'bitrate_mbps': d['server_received_bitrate_mbps']
-                })
+        server_received_bitrate_values = bitrate_values(bitrate_columns, 'server_received_bitrate_mbps')
         
         with open(values_dir / "bitrate_server_received.json", 'w') as f:
             json.dump(server_received_bitrate_values, f, indent=2)
         print(f"Saved SERVER RECEIVED bitrate values to: {values_dir / 'bitrate_server_received.json'}")
         
         # Extract SERVER SENT bitrate values
-        server_sent_bitrate_values = []
-        for d in bitrate_data:
-            if d.get('server_sent_bitrate_mbps') is not None:
-                server_sent_bitrate_values.append({
-                    'timestamp_s': d['timestamp_s'],
-                    'bitrate_mbps': d['server_sent_bitrate_mbps']
-                })
+        server_sent_bitrate_values = bitrate_values(bitrate_columns, 'server_sent_bitrate_mbps')
         
         with open(values_dir / "bitrate_server_sent.json", 'w') as f:
             json.dump(server_sent_bitrate_values, f, indent=2)
         print(f"Saved SERVER SENT bitrate values to: {values_dir / 'bitrate_server_sent.json'}")
         
         # Extract CLIENT RECEIVED bitrate values
-        client_received_bitrate_values = []
-        for d in bitrate_data:
-            if d.get('client_received_bitrate_mbps') is not None:
-                client_received_bitrate_values.append({
-                    'timestamp_s': d['timestamp_s'],
-                    'bitrate_mbps': d['client_received_bitrate_mbps']
-                })
+        client_received_bitrate_values = bitrate_values(bitrate_columns, 'client_received_bitrate_mbps')
         
         with open(values_dir / "bitrate_client_received.json", 'w') as f:
             json.dump(client_received_bitrate_values, f, indent=2)
         print(f"Saved CLIENT RECEIVED bitrate values to: {values_dir / 'bitrate_client_received.json'}")
         
         # Extract GCC estimates if available
-        if gcc_data:
+        if has_rows(gcc_columns):
             # As bitrate values
-            as_bitrate_values = []
-            for d in gcc_data:
-                if d.get('as_mbps') is not None:
-                    as_bitrate_values.append({
-                        'timestamp_s': d['timestamp_s'],
-                        'bitrate_mbps': d['as_mbps']
-                    })
+            as_bitrate_values = bitrate_values(gcc_columns, 'as_mbps')
             
             with open(values_dir / "bitrate_as.json", 'w') as f:
                 json.dump(as_bitrate_values, f, indent=2)
             print(f"Saved As bitrate values to: {values_dir / 'bitrate_as.json'}")
             
             # Ar bitrate values
-            ar_bitrate_values = []
-            for d in gcc_data:
-                if d.get('ar_mbps') is not None:
-                    ar_bitrate_values.append({
-                        'timestamp_s': d['timestamp_s'],
-                        'bitrate_mbps': d['ar_mbps']
-                    })
+            ar_bitrate_values = bitrate_values(gcc_columns, 'ar_mbps')
             
             with open(values_dir / "bitrate_ar.json", 'w') as f:
                 json.dump(ar_bitrate_values, f, indent=2)
             print(f"Saved Ar bitrate values to: {values_dir / 'bitrate_ar.json'}")
             
             # GCC bitrate values
-            gcc_bitrate_values = []
-            for d in gcc_data:
-                if d.get('gcc_mbps') is not None:
-                    gcc_bitrate_values.append({
-                        'timestamp_s': d['timestamp_s'],
-                        'bitrate_mbps': d['gcc_mbps']
-                    })
+            gcc_bitrate_values = bitrate_values(gcc_columns, 'gcc_mbps')
             
             with open(values_dir / "bitrate_gcc.json", 'w') as f:
                 json.dump(gcc_bitrate_values, f, indent=2)
@@ -1596,48 +1375,48 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
         # CLIENT SENT bitrate utilization
         if 'client_sent_bitrate_mbps' in util_results and 'percentiles' in util_results['client_sent_bitrate_mbps']:
             # Extract individual utilization values from the analysis
-            client_sent_util_values = extract_utilization_values(bitrate_data, timing_info, 'client_sent_bitrate_mbps', args)
+            client_sent_util_values = extract_utilization_values(bitrate_columns, timing_info, 'client_sent_bitrate_mbps', args)
             with open(values_dir / "util_client_sent.json", 'w') as f:
                 json.dump(client_sent_util_values, f, indent=2)
             print(f"Saved CLIENT SENT utilization values to: {values_dir / 'util_client_sent.json'}")
         
         # SERVER RECEIVED bitrate utilization
         if 'server_received_bitrate_mbps' in util_results and 'percentiles' in util_results['server_received_bitrate_mbps']:
-            server_received_util_values = extract_utilization_values(bitrate_data, timing_info, 'server_received_bitrate_mbps', args)
+            server_received_util_values = extract_utilization_values(bitrate_columns, timing_info, 'server_received_bitrate_mbps', args)
             with open(values_dir / "util_server_received.json", 'w') as f:
                 json.dump(server_received_util_values, f, indent=2)
             print(f"Saved SERVER RECEIVED utilization values to: {values_dir / 'util_server_received.json'}")
         
         # SERVER SENT bitrate utilization
         if 'server_sent_bitrate_mbps' in util_results and 'percentiles' in util_results['server_sent_bitrate_mbps']:
-            server_sent_util_values = extract_utilization_values(bitrate_data, timing_info, 'server_sent_bitrate_mbps', args)
+            server_sent_util_values = extract_utilization_values(bitrate_columns, timing_info, 'server_sent_bitrate_mbps', args)
             with open(values_dir / "util_server_sent.json", 'w') as f:
                 json.dump(server_sent_util_values, f, indent=2)
             print(f"Saved SERVER SENT utilization values to: {values_dir / 'util_server_sent.json'}")
         
         # CLIENT RECEIVED bitrate utilization
         if 'client_received_bitrate_mbps' in util_results and 'percentiles' in util_results['client_received_bitrate_mbps']:
-            client_received_util_values = extract_utilization_values(bitrate_data, timing_info, 'client_received_bitrate_mbps', args)
+            client_received_util_values = extract_utilization_values(bitrate_columns, timing_info, 'client_received_bitrate_mbps', args)
             with open(values_dir / "util_client_received.json", 'w') as f:
                 json.dump(client_received_util_values, f, indent=2)
             print(f"Saved CLIENT RECEIVED utilization values to: {values_dir / 'util_client_received.json'}")
         
         # GCC estimates utilization
-        if gcc_data:
+        if has_rows(gcc_columns):
             if 'as_estimate' in util_results and 'percentiles' in util_results['as_estimate']:
-                as_util_values = extract_gcc_utilization_values(gcc_data, timing_info, 'as_mbps')
+                as_util_values = extract_gcc_utilization_values(gcc_columns, timing_info, 'as_mbps')
                 with open(values_dir / "util_as.json", 'w') as f:
                     json.dump(as_util_values, f, indent=2)
                 print(f"Saved As utilization values to: {values_dir / 'util_as.json'}")
             
             if 'ar_estimate' in util_results and 'percentiles' in util_results['ar_estimate']:
-                ar_util_values = extract_gcc_utilization_values(gcc_data, timing_info, 'ar_mbps')
+                ar_util_values = extract_gcc_utilization_values(gcc_columns, timing_info, 'ar_mbps')
                 with open(values_dir / "util_ar.json", 'w') as f:
                     json.dump(ar_util_values, f, indent=2)
                 print(f"Saved Ar utilization values to: {values_dir / 'util_ar.json'}")
             
             if 'gcc_combined' in util_results and 'percentiles' in util_results['gcc_combined']:
-                gcc_util_values = extract_gcc_utilization_values(gcc_data, timing_info, 'gcc_mbps')
+                gcc_util_values = extract_gcc_utilization_values(gcc_columns, timing_info, 'gcc_mbps')
                 with open(values_dir / "util_gcc.json", 'w') as f:
                     json.dump(gcc_util_values, f, indent=2)
                 print(f"Saved GCC utilization values to: {values_dir / 'util_gcc.json'}")
@@ -1675,7 +1454,7 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
             print(f"Saved CLIENT RECEIVED recovery value to: {values_dir / 'recovery_client_received.json'}")
         
         # GCC estimates recovery
-        if gcc_data:
+        if has_rows(gcc_columns):
             if 'as_estimate' in rec_results:
                 as_recovery = rec_results['as_estimate'].get('recovery_time_s')
                 with open(values_dir / "recovery_as.json", 'w') as f:
@@ -1702,7 +1481,7 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
         print(f"Saved SSIM values to: {values_dir / 'ssim.json'}")
     elif 'ssim' in results and 'error' not in results['ssim']:
         # Only calculate if not already done
-        ssim_values = extract_ssim_values(exp_dir, timing_info, bitrate_data)
+        ssim_values = extract_ssim_values(exp_dir, timing_info, bitrate_columns)
         if ssim_values:
             with open(values_dir / "ssim.json", 'w') as f:
                 json.dump(ssim_values, f, indent=2)
@@ -1711,7 +1490,7 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
     # Save FPS values for all four endpoints
     if 'fps' in results:
         # Save main FPS values (client received)
-        fps_values = extract_fps_values(bitrate_data, timing_info)
+        fps_values = extract_fps_values(bitrate_columns, timing_info)
         if fps_values:
             with open(values_dir / "fps.json", 'w') as f:
                 json.dump(fps_values, f, indent=2)
@@ -1726,7 +1505,7 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
         ]
         
         for fps_field, filename in fps_endpoints:
-            fps_values = extract_fps_values_for_endpoint(bitrate_data, timing_info, fps_field)
+            fps_values = extract_fps_values_for_endpoint(bitrate_columns, timing_info, fps_field)
             if fps_values:
                 with open(values_dir / f"{filename}.json", 'w') as f:
                     json.dump(fps_values, f, indent=2)
@@ -1739,15 +1518,15 @@ def save_metric_values(results: Dict, args, bitrate_data: List[Dict], gcc_data:
             json.dump([failure_rate], f, indent=2)
         print(f"Saved H264 failure rate to: {values_dir / 'h264_failure_rate.json'}")
 
-def extract_utilization_values(bitrate_data: List[Dict], timing_info: Dict, bitrate_field: str, args = None) -> List[float]:
+def extract_utilization_values(bitrate_columns: Optional[Columns], timing_info: Dict, bitrate_field: str, args = None) -> List[float]:
     """Extract utilization values for a specific bitrate field."""
-    if 'loss_start' not in timing_info or not bitrate_data:
+    if 'loss_start' not in timing_info or not has_rows(bitrate_columns):
         return []
     
     loss_start_s = timing_info['loss_start']['timestamp_ms'] / 1000.0
     loss_end_s = timing_info.get('loss_end', {}).get('timestamp_ms', loss_start_s + 60) / 1000.0
     
-    t0 = bitrate_data[0]['timestamp_s']
+    t0 = bitrate_columns['timestamp_s'][0]
     
     # Determine analysis start time
     if bitrate_field == 'out_bitrate_mbps' and args and args.analysis_delay is not None:
@@ -1761,51 +1540,35 @@ def extract_utilization_values(bitrate_data: List[Dict], timing_info: Dict, bitr
     loss_end_rel = loss_end_s - t0
     
     # Get reference bitrate
-    ref_bitrate, _ = calculate_reference_bitrate(bitrate_data, loss_start_s, bitrate_field)
+    ref_bitrate, _ = calculate_reference_bitrate_columns(bitrate_columns, loss_start_s, bitrate_field)
     if ref_bitrate <= 0:
         return []
     
-    # Extract utilization values
-    utilizations = []
-    for d in bitrate_data:
-        timestamp_rel = d['timestamp_s'] - t0
-        if analysis_start_rel <= timestamp_rel <= loss_end_rel and d.get(bitrate_field) is not None:
-            utilization = d[bitrate_field] / ref_bitrate
-            utilizations.append(min(utilization * 100, 100.0))
-    
-    return utilizations
+    return utilization_percent(bitrate_columns, bitrate_field, ref_bitrate, analysis_start_rel, loss_end_rel).tolist()
 
-def extract_gcc_utilization_values(gcc_data: List[Dict], timing_info: Dict, bitrate_field: str) -> List[float]:
+def extract_gcc_utilization_values(gcc_columns: Optional[Columns], timing_info: Dict, bitrate_field: str) -> List[float]:
     """Extract utilization values for GCC estimates."""
-    if 'loss_start' not in timing_info or not gcc_data:
+    if 'loss_start' not in timing_info or not has_rows(gcc_columns):
         return []
     
     loss_start_s = timing_info['loss_start']['timestamp_ms'] / 1000.0
     loss_end_s = timing_info.get('loss_end', {}).get('timestamp_ms', loss_start_s + 60) / 1000.0
     
-    gcc_t0 = gcc_data[0]['timestamp_s']
+    gcc_t0 = gcc_columns['timestamp_s'][0]
     # GCC estimates always start from loss start (no delay)
     analysis_start_rel = loss_start_s - gcc_t0
     loss_end_rel = loss_end_s - gcc_t0
     
     # Get reference bitrate
-    ref_bitrate, _ = calculate_reference_bitrate(gcc_data, loss_start_s, bitrate_field)
+    ref_bitrate, _ = calculate_reference_bitrate_columns(gcc_columns, loss_start_s, bitrate_field)
     if ref_bitrate <= 0:
         return []
     
-    # Extract utilization values
-    utilizations = []
-    for d in gcc_data:
-        timestamp_rel = d['timestamp_s'] - gcc_t0
-        if analysis_start_rel <= timestamp_rel <= loss_end_rel and d.get(bitrate_field) is not None:
-            utilization = d[bitrate_field] / ref_bitrate
-            utilizations.append(min(utilization * 100, 100.0))
-    
-    return utilizations
+    return utilization_percent(gcc_columns, bitrate_field, ref_bitrate, analysis_start_rel, loss_end_rel).tolist()
 
-def extract_ssim_values(exp_dir: Path, timing_info: Dict, bitrate_data: List[Dict]) -> List[float]:
+def extract_ssim_values(exp_dir: Path, timing_info: Dict, bitrate_columns: Optional[Columns]) -> List[float]:
     """Extract SSIM values from video analysis."""
-    if 'loss_start' not in timing_info or not bitrate_data:
+    if 'loss_start' not in timing_info or not has_rows(bitrate_columns):
         return []
     
     loss_start_ms = timing_info['loss_start']['timestamp_ms']
@@ -1831,7 +1594,7 @@ def extract_ssim_values(exp_dir: Path, timing_info: Dict, bitrate_data: List[Dic
             return []
         
         # Calculate relative timing using bitrate data
-        t0 = bitrate_data[0]['timestamp_s']
+        t0 = float(bitrate_columns['timestamp_s'][0])
         loss_start_s = loss_start_ms / 1000.0
         loss_end_s = loss_end_ms / 1000.0
         
@@ -1847,42 +1610,20 @@ def extract_ssim_values(exp_dir: Path, timing_info: Dict, bitrate_data: List[Dic
     except Exception as e:
         return []
 
-def extract_fps_values(bitrate_data: List[Dict], timing_info: Dict) -> List[float]:
+def extract_fps_values(bitrate_columns: Optional[Columns], timing_info: Dict) -> List[float]:
     """Extract FPS values during loss period."""
-    if not bitrate_data or 'loss_start' not in timing_info:
-        return []
-    
-    loss_start_ms = timing_info['loss_start']['timestamp_ms']
-    loss_end_ms = timing_info.get('loss_end', {}).get('timestamp_ms', loss_start_ms + 60000)
-    
-    # Extract client received FPS during loss (start from loss start)
-    fps_values = []
-    for entry in bitrate_data:
-        timestamp_ms = entry['timestamp_s'] * 1000
-        if loss_start_ms <= timestamp_ms <= loss_end_ms:
-            fps = entry.get('client_received_fps', 0)  # Use client received FPS
-            if fps > 0:
-                fps_values.append(fps)
-    
-    return fps_values
+    # Use client received FPS
+    return extract_fps_values_for_endpoint(bitrate_columns, timing_info, 'client_received_fps')
 
-def extract_fps_values_for_endpoint(bitrate_data: List[Dict], timing_info: Dict, fps_field: str) -> List[float]:
+def extract_fps_values_for_endpoint(bitrate_columns: Optional[Columns], timing_info: Dict, fps_field: str) -> List[float]:
     """Extract FPS values for a specific endpoint."""
-    if not bitrate_data or 'loss_start' not in timing_info:
+    if not has_rows(bitrate_columns) or 'loss_start' not in timing_info:
         return []
     
     loss_start_ms = timing_info['loss_start']['timestamp_ms']
     loss_end_ms = timing_info.get('loss_end', {}).get('timestamp_ms', loss_start_ms + 60000)
     
-    fps_values = []
-    for entry in bitrate_data:
-        timestamp_ms = entry['timestamp_s'] * 1000
-        if loss_start_ms <= timestamp_ms <= loss_end_ms:
-            fps = entry.get(fps_field, 0)
-            if fps > 0:
-                fps_values.append(fps)
-    
-    return fps_values
+    return fps_between(bitrate_columns, fps_field, loss_start_ms, loss_end_ms).tolist()
 
 def print_results(results: Dict, args):
     """Print analysis results to terminal."""
@@ -2081,7 +1822,7 @@ def plot_client_received_bitrate_over_time(bitrate_data: List[Dict], timing_info
     plt.close()
     print(f"CLIENT RECEIVED bitrate plot saved: {output_path}")
 
-def main():
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(
         description='GCC Performance Analyzer',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -2108,7 +1849,7 @@ def main():
     parser.add_argument('--analysis-delay', nargs='?', const=ANALYSIS_DELAY_S, type=float, 
                        metavar='SECONDS', help=f'Analysis delay for OUT bitrate utilization (seconds, default: {ANALYSIS_DELAY_S})')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Validate experiment directory
     exp_dir = Path(args.experiment_dir)
@@ -2144,9 +1885,9 @@ def main():
         print(f"Client stats file not found: {client_stats_file}")
         return 1
     
-    # Parse data
+    # Parse data, reusing the columns cached next to each log
     print("Loading experiment data...")
-    bitrate_data = parse_client_stats(str(client_stats_file))
+    bitrate_columns = read_columns(str(client_stats_file), load_client_stats, "Client stats")
     timing_info = parse_loss_timing(str(timing_file))
     
     # Load experiment info to get max_as_bitrate
@@ -2158,12 +1899,16 @@ def main():
     
     # Load GCC estimates if available
     gcc_estimates_file = exp_dir / "logs" / "gcc_estimates.log"
-    gcc_data = parse_gcc_estimates(str(gcc_estimates_file))
+    gcc_columns = read_columns(str(gcc_estimates_file), load_gcc_estimates, "GCC estimates")
     
-    if not bitrate_data:
+    if not has_rows(bitrate_columns):
         print("No bitrate data found")
         return 1
     
+    # Plots still work on one dict per entry
+    bitrate_data = client_stats_records(bitrate_columns)
+    gcc_data = gcc_estimate_records(gcc_columns) if gcc_columns is not None else []
+    
     # Run analyses
     results = {}
     
@@ -2197,20 +1942,20 @@ def main():
     if args.utilization:
         print("Analyzing utilization (all 7 types)...")
         print("  Reference: 10 seconds before loss | Analysis: During loss (from loss start)")
-        results['utilization'] = analyze_comprehensive_utilization(bitrate_data, gcc_data, timing_info, experiment_info, args)
+        results['utilization'] = analyze_comprehensive_utilization(bitrate_columns, gcc_columns, timing_info, experiment_info, args)
     
     if args.recovery:
         print("Analyzing recovery (all 7 types)...")
         print("  Recovery: Time to reach 100% of reference after loss ends")
-        results['recovery'] = analyze_comprehensive_recovery(bitrate_data, gcc_data, timing_info, args)
+        results['recovery'] = analyze_comprehensive_recovery(bitrate_columns, gcc_columns, timing_info, args)
     
     if args.ssim:
         print("Analyzing SSIM...")
-        results['ssim'] = analyze_ssim(exp_dir, timing_info, bitrate_data, args)
+        results['ssim'] = analyze_ssim(exp_dir, timing_info, bitrate_columns, args)
     
     if args.fps:
         print("Analyzing FPS...")
-        results['fps'] = analyze_fps(bitrate_data, timing_info, args)
+        results['fps'] = analyze_fps(bitrate_columns, timing_info, args)
     
     if args.h264:
         print("Analyzing H264 failures...")
@@ -2220,7 +1965,7 @@ def main():
     print_results(results, args)
     
     # Save individual metric values if requested
-    save_metric_values(results, args, bitrate_data, gcc_data, timing_info, exp_dir)
+    save_metric_values(results, args, bitrate_columns, gcc_columns, timing_info, exp_dir)
     
     # Save results (without bitrate section)
     results_file = args.output_dir / "gcc_analysis_results.json"